@@ -4,10 +4,18 @@ Database dependency for FastAPI.
 Provides database session management for API endpoints.
 """
 
-from typing import Generator
-from sqlalchemy.orm import Session
+import threading
+from typing import AsyncGenerator, Generator, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
 
-from app.database import SessionLocal
+from app.config import settings
+from app.database import AsyncSessionLocal, SessionLocal
+from app.services.write_queue_service import WriteQueue
+
+# Shared time-entry write queue (created on first use when enabled)
+_write_queue: Optional[WriteQueue] = None
+_write_queue_lock = threading.Lock()
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -27,3 +35,62 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency that provides an async database session.
+
+    For async def routes: queries are awaited instead of blocking the
+    event loop that serves every other request.
+
+    Yields:
+        AsyncSession: SQLAlchemy async session
+
+    Example:
+        @app.get("/items")
+        async def get_items(db: AsyncSession = Depends(get_async_db)):
+            return (await db.scalars(select(Item))).all()
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_session_factory() -> sessionmaker:
+    """
+    Dependency that provides the session factory.
+
+    For work that outlives the request (background jobs), which must open
+    its own sessions instead of using the request-scoped one from get_db.
+    """
+    return SessionLocal
+
+
+def get_write_queue() -> Optional[WriteQueue]:
+    """
+    Dependency that provides the shared time-entry write queue.
+
+    Returns:
+        WriteQueue, or None when TIME_ENTRY_WRITE_QUEUE is off (each
+        request commits on its own session)
+    """
+    global _write_queue
+    if not settings.TIME_ENTRY_WRITE_QUEUE:
+        return None
+    with _write_queue_lock:
+        if _write_queue is None:
+            _write_queue = WriteQueue(
+                SessionLocal,
+                window=settings.TIME_ENTRY_WRITE_WINDOW_MS / 1000,
+                max_batch=settings.TIME_ENTRY_WRITE_MAX_BATCH,
+            )
+        return _write_queue
+
+
+def close_write_queue():
+    """Commit the queued writes and stop the writer thread, if it was started."""
+    global _write_queue
+    with _write_queue_lock:
+        write_queue, _write_queue = _write_queue, None
+    if write_queue is not None:
+        write_queue.close()
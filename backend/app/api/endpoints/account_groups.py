@@ -6,9 +6,11 @@ Provides CRUD operations for account groups.
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_db
+from app.api.integrity import still_referenced
 from app.models.account_group import AccountGroup
 from app.schemas import (
     AccountGroupCreate,
@@ -136,13 +138,21 @@ def delete_account_group(
     account_group_id: int,
     db: Session = Depends(get_db),
 ) -> None:
-    """Delete an account group."""
-    account_group = db.query(AccountGroup).filter(AccountGroup.id == account_group_id).first()
-    if not account_group:
+    """
+    Delete an account group.
+
+    Rows that still reference it (time entries, projects, templates) make
+    the database refuse the delete, which is returned as 409.
+    """
+    try:
+        deleted = db.query(AccountGroup).filter(AccountGroup.id == account_group_id).delete()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise still_referenced("Account group", account_group_id) from None
+
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Account group with id {account_group_id} not found",
         )
-
-    db.delete(account_group)
-    db.commit()
@@ -1,14 +1,17 @@
 """
 API endpoints for milestone management.
 
-This module provides CRUD operations for project milestones.
+This module provides CRUD operations for project milestones. The routes
+are async and use an AsyncSession, so a slow query waits on the driver
+thread instead of blocking the event loop.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.api.dependencies import get_db
+from app.api.dependencies import get_async_db
 from app.models import Milestone, Project
 from app.schemas.milestone import (
     MilestoneCreate,
@@ -29,7 +32,7 @@ router = APIRouter()
 async def create_milestone(
     project_id: int,
     milestone: MilestoneCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Create a new milestone for a project.
@@ -46,7 +49,7 @@ async def create_milestone(
         HTTPException: 404 if project not found
     """
     # Check if project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -64,8 +67,8 @@ async def create_milestone(
     )
 
     db.add(db_milestone)
-    db.commit()
-    db.refresh(db_milestone)
+    await db.commit()
+    await db.refresh(db_milestone)
 
     return db_milestone
 
@@ -78,7 +81,7 @@ async def create_milestone(
 )
 async def get_project_milestones(
     project_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get all milestones for a specific project.
@@ -94,7 +97,7 @@ async def get_project_milestones(
         HTTPException: 404 if project not found
     """
     # Check if project exists
-    project = db.query(Project).filter(Project.id == project_id).first()
+    project = await db.get(Project, project_id)
     if not project:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -103,11 +106,12 @@ async def get_project_milestones(
 
     # Get milestones ordered by start_date and display_order
     milestones = (
-        db.query(Milestone)
-        .filter(Milestone.project_id == project_id)
-        .order_by(Milestone.start_date, Milestone.display_order)
-        .all()
-    )
+        await db.scalars(
+            select(Milestone)
+            .where(Milestone.project_id == project_id)
+            .order_by(Milestone.start_date, Milestone.display_order)
+        )
+    ).all()
 
     return milestones
 
@@ -120,7 +124,7 @@ async def get_project_milestones(
 )
 async def get_milestone(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Get a specific milestone by ID.
@@ -135,7 +139,7 @@ async def get_milestone(
     Raises:
         HTTPException: 404 if milestone not found
     """
-    milestone = db.query(Milestone).filter(Milestone.id == id).first()
+    milestone = await db.get(Milestone, id)
     if not milestone:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -154,7 +158,7 @@ async def get_milestone(
 async def update_milestone(
     id: int,
     milestone_update: MilestoneUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Update an existing milestone.
@@ -172,7 +176,7 @@ async def update_milestone(
         HTTPException: 400 if validation fails
     """
     # Get existing milestone
-    db_milestone = db.query(Milestone).filter(Milestone.id == id).first()
+    db_milestone = await db.get(Milestone, id)
     if not db_milestone:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -207,8 +211,8 @@ async def update_milestone(
     for field, value in update_data.items():
         setattr(db_milestone, field, value)
 
-    db.commit()
-    db.refresh(db_milestone)
+    await db.commit()
+    await db.refresh(db_milestone)
 
     return db_milestone
 
@@ -221,7 +225,7 @@ async def update_milestone(
 )
 async def delete_milestone(
     id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Delete an existing milestone.
@@ -234,15 +238,15 @@ async def delete_milestone(
         HTTPException: 404 if milestone not found
     """
     # Get existing milestone
-    db_milestone = db.query(Milestone).filter(Milestone.id == id).first()
+    db_milestone = await db.get(Milestone, id)
     if not db_milestone:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Milestone with id {id} not found",
         )
 
-    db.delete(db_milestone)
-    db.commit()
+    await db.delete(db_milestone)
+    await db.commit()
 
     return None
 
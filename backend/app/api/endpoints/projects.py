@@ -6,9 +6,11 @@ Provides CRUD operations for projects.
 
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_db
+from app.api.integrity import missing_reference
 from app.models.project import Project
 from app.schemas import (
     ProjectCreate,
@@ -20,6 +22,18 @@ from app.schemas import (
 router = APIRouter()
 
 
+def _commit_or_404(db: Session, values: dict):
+    """Commit, turning a missing default account group / work category into a 404."""
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        error = missing_reference(db, values)
+        if error is None:
+            raise
+        raise error from None
+
+
 @router.post(
     "/",
     response_model=ProjectResponse,
@@ -47,7 +61,7 @@ def create_project(
     # Create new project
     db_project = Project(**project.model_dump())
     db.add(db_project)
-    db.commit()
+    _commit_or_404(db, project.model_dump())
     db.refresh(db_project)
 
     return ProjectResponse.model_validate(db_project)
@@ -131,7 +145,7 @@ def update_project(
     for field, value in update_data.items():
         setattr(project, field, value)
 
-    db.commit()
+    _commit_or_404(db, update_data)
     db.refresh(project)
 
     return ProjectResponse.model_validate(project)
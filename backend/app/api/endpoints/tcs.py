@@ -5,19 +5,46 @@ Provides endpoints for formatting time entries into TCS system format
 and automatic filling using Playwright.
 """
 
-import asyncio
-from datetime import date as DateType
+import json
+import sys
+import threading
+import time
+from datetime import date as DateType, datetime, timedelta
+from pathlib import Path
 from decimal import Decimal
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.api.dependencies import get_db
+from app.api.dependencies import get_db, get_session_factory
+from app.config import settings
 from app.services.tcs_service import (
     format_date_for_tcs,
     get_date_entries,
+    iter_date_range_formats,
+    iter_date_range_tcs_entries,
     convert_entries_to_tcs_format,
+    compute_fingerprint,
     validate_tcs_data,
 )
+from app.services.tcs_code_cache_service import (
+    check_codes,
+    describe_invalid_codes,
+    record_code_validations,
+)
+from app.services.tcs_history_service import (
+    list_fill_runs,
+    record_fill_run,
+    summarize_phases,
+)
+from app.services.tcs_job_service import TCSJobConflict, TCSJobManager
+from app.services.tcs_sync_service import (
+    get_sync_ledger,
+    is_unchanged,
+    list_dirty_days,
+    record_sync_result,
+)
 from app.schemas import (
     TCSFormatRequest,
     TCSFormatResponse,
@@ -25,10 +52,126 @@ from app.schemas import (
     TCSDateRangeResponse,
     TCSAutoFillRequest,
     TCSAutoFillResponse,
+    TCSDirtyDaysResponse,
+    TCSFillRunsResponse,
+    TCSAutoFillJob,
+    TCSAutoFillRangeRequest,
+    TCSAutoFillDayResult,
+    TCSAutoFillRangeResponse,
+    TCSPreflightRequest,
+    TCSPreflightResponse,
 )
 
 router = APIRouter()
 
+# 預先啟動的 TCS 瀏覽器池（TCS_BROWSER_POOL_SIZE > 0 時才建立）
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+# 背景自動填寫工作（第一次提交時建立）
+_job_manager = None
+
+
+def _ensure_tcs_automation_importable():
+    """Add backend to path to import tcs_automation module."""
+    backend_path = Path(__file__).parent.parent.parent.parent
+    if str(backend_path) not in sys.path:
+        sys.path.insert(0, str(backend_path))
+
+
+def _split_setting(value: str) -> list:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def get_request_policy():
+    """
+    Build the request-routing policy for TCS browsers from settings.
+
+    Returns:
+        RequestPolicy aborting TCS_BLOCKED_RESOURCE_TYPES and TCS_BLOCKED_URL_PATTERNS
+    """
+    _ensure_tcs_automation_importable()
+    from tcs_automation.tcs_automation import RequestPolicy
+
+    return RequestPolicy(
+        abort_types=_split_setting(settings.TCS_BLOCKED_RESOURCE_TYPES),
+        abort_urls=_split_setting(settings.TCS_BLOCKED_URL_PATTERNS),
+    )
+
+
+def get_browser_pool():
+    """
+    Return the shared TCS browser pool, creating it on first use.
+
+    Returns:
+        TCSBrowserPool, or None when TCS_BROWSER_POOL_SIZE is 0
+    """
+    global _browser_pool
+    if settings.TCS_BROWSER_POOL_SIZE <= 0:
+        return None
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _ensure_tcs_automation_importable()
+            from tcs_automation.browser_pool import TCSBrowserPool
+
+            _browser_pool = TCSBrowserPool(
+                tcs_url=settings.TCS_URL,
+                size=settings.TCS_BROWSER_POOL_SIZE,
+                headless=True,
+                max_uses=settings.TCS_BROWSER_POOL_MAX_USES,
+                idle_seconds=settings.TCS_BROWSER_POOL_IDLE_SECONDS,
+                acquire_timeout=settings.TCS_BROWSER_POOL_ACQUIRE_TIMEOUT,
+                timeout=settings.TCS_TIMEOUT,
+                request_policy=get_request_policy(),
+            )
+        return _browser_pool
+
+
+async def warm_up_browser_pool():
+    """Pre-launch pooled browsers in the background (no-op when disabled)."""
+    pool = get_browser_pool()
+    if pool is not None:
+        await pool.warm_up()
+
+
+async def close_browser_pool():
+    """Close the shared browser pool if it was created."""
+    global _browser_pool
+    with _browser_pool_lock:
+        pool, _browser_pool = _browser_pool, None
+    if pool is not None:
+        await pool.close()
+
+
+def get_job_manager() -> TCSJobManager:
+    """Return the shared auto-fill job manager, creating it on first use."""
+    global _job_manager
+    if _job_manager is None:
+        _job_manager = TCSJobManager(
+            max_workers=settings.TCS_JOB_WORKERS,
+            max_finished=settings.TCS_JOB_HISTORY,
+        )
+    return _job_manager
+
+
+def _get_job_or_404(job_id: str):
+    """Return the job with the id, or raise 404 if unknown or evicted."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"找不到工作 {job_id}",
+        )
+    return job
+
+
+async def close_job_manager():
+    """Cancel running auto-fill jobs if the manager was created."""
+    global _job_manager
+    manager, _job_manager = _job_manager, None
+    if manager is not None:
+        await manager.close()
+
 
 @router.post(
     "/format",
@@ -80,24 +223,14 @@ def format_tcs_for_date_range(
     Format all time entries for a date range into TCS format.
 
     Returns formatted text for multiple dates.
-    """
-    from datetime import timedelta
-    from decimal import Decimal
-
-    daily_formats = []
-    total_hours = Decimal("0")
-
-    # Iterate through date range
-    current_date = request.start_date
-    while current_date <= request.end_date:
-        entries = get_date_entries(db, current_date)
 
-        if entries:
-            daily_format = format_date_for_tcs(entries, current_date, db)
-            daily_formats.append(daily_format)
-            total_hours += daily_format.total_hours
-
-        current_date += timedelta(days=1)
+    All entries of the range are read in one ordered query, so empty
+    weekends and holidays cost nothing.
+    """
+    daily_formats = list(
+        iter_date_range_formats(db, request.start_date, request.end_date)
+    )
+    total_hours = sum((df.total_hours for df in daily_formats), Decimal("0"))
 
     if not daily_formats:
         raise HTTPException(
@@ -106,7 +239,9 @@ def format_tcs_for_date_range(
         )
 
     # Combine all daily formats
-    combined_text = "\n\n==========\n\n".join([df.formatted_text for df in daily_formats])
+    combined_text = "\n\n==========\n\n".join(
+        [df.formatted_text for df in daily_formats]
+    )
 
     return TCSDateRangeResponse(
         start_date=request.start_date.strftime("%Y/%m/%d"),
@@ -117,6 +252,528 @@ def format_tcs_for_date_range(
     )
 
 
+@router.post(
+    "/format/range/stream",
+    summary="Stream formatted time entries for date range",
+    description=(
+        "Stream time entries for a date range in TCS format, one day at a time. "
+        "format=text emits plain text with ========== separators, "
+        "format=ndjson emits one TCSFormatResponse JSON object per line."
+    ),
+    responses={
+        200: {
+            "content": {
+                "text/plain": {},
+                "application/x-ndjson": {},
+            },
+        },
+    },
+)
+def stream_tcs_for_date_range(
+    request: TCSDateRangeRequest,
+    output_format: Literal["text", "ndjson"] = Query(
+        "text",
+        alias="format",
+        description="輸出格式：text（純文字）或 ndjson（每行一個 TCSFormatResponse）",
+    ),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """
+    Stream the TCS format of a date range as each day is produced.
+
+    Unlike /format/range, nothing is accumulated on the server: rows are
+    fetched in batches and each day's block is sent as soon as it is
+    formatted, so memory stays constant regardless of range length.
+    """
+    daily_formats = iter_date_range_formats(db, request.start_date, request.end_date)
+
+    # Peek the first day so an empty range still returns a proper 404
+    first = next(daily_formats, None)
+    if first is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No time entries found between {request.start_date} and {request.end_date}",
+        )
+
+    if output_format == "ndjson":
+
+        def ndjson_lines():
+            yield first.model_dump_json() + "\n"
+            for daily_format in daily_formats:
+                yield daily_format.model_dump_json() + "\n"
+
+        return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
+
+    def text_blocks():
+        yield first.formatted_text
+        for daily_format in daily_formats:
+            yield "\n\n==========\n\n" + daily_format.formatted_text
+
+    return StreamingResponse(text_blocks(), media_type="text/plain; charset=utf-8")
+
+
+def _load_auto_fill_entries(request: TCSAutoFillRequest, db: Session):
+    """
+    Load, convert and validate the entries of the requested date.
+
+    Returns:
+        (tcs_entries, total_hours, fingerprint)
+
+    Raises:
+        HTTPException: 404 when the date has no entries, 400 when invalid
+    """
+    # 1. 查詢工時記錄
+    entries = get_date_entries(db, request.date)
+
+    if not entries:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"找不到 {request.date} 的工時記錄",
+        )
+
+    # 2. 轉換為 TCS 格式
+    tcs_entries = convert_entries_to_tcs_format(entries, db)
+
+    # 3. 驗證資料
+    is_valid, errors = validate_tcs_data(tcs_entries)
+    if not is_valid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"資料驗證失敗: {'; '.join(errors)}",
+        )
+
+    # 4. 計算總工時
+    total_hours = Decimal(sum(e["hours"] for e in tcs_entries))
+
+    return tcs_entries, total_hours, compute_fingerprint(tcs_entries)
+
+
+def _skipped_response(
+    request: TCSAutoFillRequest, db: Session, fingerprint: str
+) -> Optional[TCSAutoFillResponse]:
+    """Return the last sync result if the day is unchanged, else None (fill it)."""
+    ledger = get_sync_ledger(db, request.date)
+    if request.force or not is_unchanged(ledger, fingerprint):
+        return None
+    return TCSAutoFillResponse(
+        success=True,
+        message=f"{request.date} 的工時記錄自上次同步後未變更，略過填寫",
+        filled_count=ledger.synced_entry_count,
+        dry_run=request.dry_run,
+        total_hours=ledger.synced_total_hours,
+        skipped=True,
+    )
+
+
+def _report(job, stage: str, progress: float):
+    """Report a stage to the background job, if any."""
+    if job is not None:
+        job.report(stage, progress)
+
+
+async def _fill_and_save(
+    tcs, date_str: str, tcs_entries: list, job=None, on_event=None
+):
+    """
+    在已連接 TCS 的自動化實例上填寫、截圖並儲存
+
+    on_event 接收填寫期間的進度事件（瀏覽器池借出的實例也會換成這個回呼）。
+
+    Returns:
+        (rows, screenshot_path)：每行的驗證結果與截圖路徑（截圖失敗時為 None）
+    """
+    _report(job, "filling", 0.3)
+    tcs.on_event = on_event
+    rows = await tcs.fill_time_entries(date_str, tcs_entries)
+    if job is not None:
+        job.rows = rows
+
+    # 填寫完畢後截圖
+    _report(job, "screenshot", 0.6)
+    screenshot_path = None
+    try:
+        screenshot_path = await tcs.screenshot(frame_only=True, full_page=True)
+    except Exception as e:
+        # 截圖失敗不影響主要流程，只記錄錯誤
+        print(f"⚠️  截圖失敗（不影響主要流程）: {e}")
+    if job is not None:
+        job.screenshot_path = screenshot_path
+
+    # 儲存前預覽（自動確認模式，不需要等待輸入）
+    await tcs.preview_before_save(auto_confirm=True)
+
+    _report(job, "saving", 0.8)
+    await tcs.save()
+    return rows, screenshot_path
+
+
+def _collect_row_events(row_events: list, forward=None):
+    """Return an on_event callback keeping "row" events and forwarding every event."""
+
+    def on_event(event):
+        if event.get("type") == "row":
+            row_events.append(event)
+        if forward is not None:
+            forward(event)
+
+    return on_event
+
+
+def _code_cache_ttl() -> Optional[timedelta]:
+    """TTL of the code cache, None when TCS_CODE_CACHE_TTL_HOURS disables it."""
+    if settings.TCS_CODE_CACHE_TTL_HOURS <= 0:
+        return None
+    return timedelta(hours=settings.TCS_CODE_CACHE_TTL_HOURS)
+
+
+def _record_code_validations(db: Session, row_events: list):
+    """Cache the codes TCS validated; a cache error never fails the fill."""
+    if not row_events or _code_cache_ttl() is None:
+        return
+    try:
+        record_code_validations(db, row_events)
+    except Exception as e:
+        db.rollback()
+        print(f"⚠️  代碼快取寫入失敗（不影響主要流程）: {e}")
+
+
+def _known_invalid_codes(db: Session, tcs_entries: list) -> list:
+    """Messages for codes the cache knows TCS refuses (empty if the cache is off)."""
+    ttl = _code_cache_ttl()
+    if ttl is None:
+        return []
+    return describe_invalid_codes(check_codes(db, tcs_entries, ttl))
+
+
+def _reject_known_invalid_codes(
+    request: TCSAutoFillRequest, db: Session, tcs_entries: list
+):
+    """
+    Raise 400 before any browser launches when a code is known to be invalid.
+
+    force=True skips the check, e.g. after the code was added to TCS.
+    """
+    if request.force:
+        return
+    invalid = _known_invalid_codes(db, tcs_entries)
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"TCS 已知無效的代碼: {'; '.join(invalid)}",
+        )
+
+
+async def _run_in_browser(work, dry_run: bool, timings: dict, on_event=None):
+    """
+    Run await work(tcs) on a pooled browser, or on a freshly launched one
+    when the pool is disabled.
+
+    Phases recorded by a freshly launched browser are added to timings even
+    when it fails to start; on_event also receives its launch and
+    navigation progress events.
+    """
+    pool = get_browser_pool()
+    if pool is not None:
+        # 借用瀏覽器池中已載入 mainFrame 的瀏覽器（省去啟動與首次導覽）
+        return await pool.run(work, dry_run=dry_run, fast_mode=True)
+
+    from tcs_automation.tcs_automation import AsyncTCSAutomation
+
+    # 直接在 event loop 上執行 Playwright async API，不佔用執行緒
+    tcs = AsyncTCSAutomation()
+    tcs.on_event = on_event
+    tcs.request_policy = get_request_policy()
+    try:
+        # 執行自動填寫（使用快速模式以提升性能）
+        await tcs.start(headless=True, dry_run=dry_run, fast_mode=True)
+        return await work(tcs)
+    finally:
+        timings.update(tcs.timings)
+        await tcs.close()
+
+
+async def _fill_tcs(
+    request: TCSAutoFillRequest,
+    db: Session,
+    tcs_entries: list,
+    total_hours: Decimal,
+    fingerprint: str,
+    job=None,
+) -> TCSAutoFillResponse:
+    """
+    Fill the entries into TCS, record the sync result and timing history.
+
+    Args:
+        request: Auto-fill request
+        db: Database session
+        tcs_entries: Validated entries in TCS format
+        total_hours: Sum of the entry hours
+        fingerprint: Content fingerprint for the sync ledger
+        job: Background job to report stages, row results and screenshot to
+
+    Raises:
+        HTTPException: 500 when Playwright is missing or the fill fails
+    """
+    # 注意：這裡使用延遲導入，避免在沒有 Playwright 的環境中出錯
+    started_at = datetime.utcnow()
+    fill_begin = time.monotonic()
+    run_timings = {}  # 各階段耗時（毫秒），由自動化實例的 timings 彙整
+    fill_mode = None
+    row_events = []  # TCS 對每行代碼的驗證結果，填寫結束後寫入代碼快取
+    on_event = _collect_row_events(row_events, job.emit if job is not None else None)
+    try:
+        # Import here to avoid errors if playwright not installed
+        _ensure_tcs_automation_importable()
+
+        import tcs_automation.tcs_automation  # noqa: F401
+
+        # 轉換日期格式為 YYYYMMDD
+        date_str = request.date.strftime("%Y%m%d")
+
+        async def fill_and_save(tcs):
+            try:
+                _, screenshot_path = await _fill_and_save(
+                    tcs, date_str, tcs_entries, job, on_event
+                )
+                return screenshot_path
+            finally:
+                run_timings.update(tcs.timings)
+
+        _report(job, "connecting", 0.1)
+        fill_mode = "browser"
+        screenshot_path = await _run_in_browser(
+            fill_and_save,
+            request.dry_run,
+            run_timings,
+            on_event=on_event,
+        )
+
+        # 成功訊息
+        _report(job, "recording", 0.95)
+        _record_code_validations(db, row_events)
+        if request.dry_run:
+            message = (
+                f"[DRY RUN] 已模擬填寫 {len(tcs_entries)} 筆工時記錄（未真正儲存）"
+            )
+        else:
+            message = f"成功自動填寫 {len(tcs_entries)} 筆工時記錄到 TCS 系統"
+            record_sync_result(
+                db,
+                request.date,
+                fingerprint,
+                True,
+                message,
+                len(tcs_entries),
+                total_hours,
+            )
+        run_timings["total"] = (time.monotonic() - fill_begin) * 1000
+        run = record_fill_run(
+            db,
+            request.date,
+            started_at,
+            request.dry_run,
+            True,
+            fill_mode,
+            len(tcs_entries),
+            run_timings["total"],
+            run_timings,
+            message,
+        )
+
+        return TCSAutoFillResponse(
+            success=True,
+            message=message,
+            filled_count=len(tcs_entries),
+            dry_run=request.dry_run,
+            total_hours=total_hours,
+            screenshot_path=screenshot_path,
+            fill_mode=fill_mode,
+            timings=run.timings,
+        )
+
+    except ImportError as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Playwright 未安裝或配置錯誤: {str(e)}",
+        )
+    except Exception as playwright_error:
+        _record_code_validations(db, row_events)
+        if not request.dry_run:
+            record_sync_result(
+                db,
+                request.date,
+                fingerprint,
+                False,
+                str(playwright_error),
+                len(tcs_entries),
+                total_hours,
+            )
+        run_timings["total"] = (time.monotonic() - fill_begin) * 1000
+        record_fill_run(
+            db,
+            request.date,
+            started_at,
+            request.dry_run,
+            False,
+            fill_mode,
+            len(tcs_entries),
+            run_timings["total"],
+            run_timings,
+            str(playwright_error),
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Playwright 執行失敗: {str(playwright_error)}",
+        )
+
+
+async def _fill_tcs_range(
+    request: TCSAutoFillRangeRequest,
+    db: Session,
+    days: list,
+) -> tuple:
+    """
+    Fill several days on one TCS connection, one day after another.
+
+    Each day re-queries its date on the already loaded mainFrame, so only
+    the first day pays for browser launch and navigation. A failed day is
+    recorded and the next day continues.
+
+    Args:
+        request: Range auto-fill request
+        db: Database session
+        days: (date, tcs_entries, total_hours, fingerprint) of each day to fill
+
+    Returns:
+        (results, session_timings): TCSAutoFillDayResult per filled day and
+        the connection-level timings (launch, navigation)
+    """
+    results = {}
+    session_timings = {}
+    browser_started = False
+
+    def finish_day(
+        day,
+        success,
+        message,
+        fill_mode,
+        day_timings,
+        started_at,
+        begin,
+        rows=None,
+        screenshot_path=None,
+    ):
+        target_date, tcs_entries, total_hours, fingerprint = day
+        if not request.dry_run:
+            record_sync_result(
+                db,
+                target_date,
+                fingerprint,
+                success,
+                message,
+                len(tcs_entries),
+                total_hours,
+            )
+        day_timings["total"] = (time.monotonic() - begin) * 1000
+        run = record_fill_run(
+            db,
+            target_date,
+            started_at,
+            request.dry_run,
+            success,
+            fill_mode,
+            len(tcs_entries),
+            day_timings["total"],
+            day_timings,
+            message,
+        )
+        results[target_date] = TCSAutoFillDayResult(
+            date=target_date,
+            success=success,
+            message=message,
+            filled_count=len(tcs_entries) if success else 0,
+            total_hours=total_hours,
+            fill_mode=fill_mode if success else None,
+            screenshot_path=screenshot_path,
+            rows=rows or [],
+            timings=run.timings,
+        )
+
+    async def fill_days(tcs):
+        """在同一個 TCS 連線上依序填寫每一天，失敗的日期記錄為失敗"""
+        nonlocal browser_started
+        browser_started = True
+        session_timings.update(tcs.timings)
+        for day in days:
+            target_date, tcs_entries = day[0], day[1]
+            started_at = datetime.utcnow()
+            begin = time.monotonic()
+            before = dict(tcs.timings)
+            rows = screenshot_path = error = None
+            row_events = []
+            try:
+                rows, screenshot_path = await _fill_and_save(
+                    tcs,
+                    target_date.strftime("%Y%m%d"),
+                    tcs_entries,
+                    on_event=_collect_row_events(row_events),
+                )
+            except Exception as e:
+                error = e
+            _record_code_validations(db, row_events)
+            day_timings = {
+                phase: ms - before.get(phase, 0)
+                for phase, ms in tcs.timings.items()
+                if ms != before.get(phase, 0)
+            }
+            if error is None:
+                if request.dry_run:
+                    message = f"[DRY RUN] 已模擬填寫 {len(tcs_entries)} 筆工時記錄（未真正儲存）"
+                else:
+                    message = f"成功自動填寫 {len(tcs_entries)} 筆工時記錄到 TCS 系統"
+                finish_day(
+                    day,
+                    True,
+                    message,
+                    "browser",
+                    day_timings,
+                    started_at,
+                    begin,
+                    rows,
+                    screenshot_path,
+                )
+            else:
+                finish_day(
+                    day,
+                    False,
+                    f"Playwright 執行失敗: {error}",
+                    "browser",
+                    day_timings,
+                    started_at,
+                    begin,
+                )
+
+    started_at = datetime.utcnow()
+    begin = time.monotonic()
+    launch_timings = {}
+    try:
+        _ensure_tcs_automation_importable()
+        await _run_in_browser(fill_days, request.dry_run, launch_timings)
+    except Exception as e:
+        # 瀏覽器無法啟動：尚未填寫的日期都記錄為失敗
+        if isinstance(e, ImportError):
+            message = f"Playwright 未安裝或配置錯誤: {e}"
+        else:
+            message = f"Playwright 執行失敗: {e}"
+        if not browser_started:
+            session_timings.update(launch_timings)
+        for day in days:
+            if day[0] not in results:
+                finish_day(day, False, message, None, {}, started_at, begin)
+
+    return [results[day[0]] for day in days], session_timings
+
+
 @router.post(
     "/auto-fill",
     response_model=TCSAutoFillResponse,
@@ -136,7 +793,13 @@ async def auto_fill_tcs(
     此端點會：
     1. 查詢指定日期的工時記錄
     2. 驗證資料完整性
-    3. 使用 Playwright 自動填寫到 TCS 系統
+    3. 內容與上次成功同步相同時直接回傳（不啟動瀏覽器，force=True 可強制重填）
+    4. 代碼快取中有 TCS 已知無效的代碼時回傳 400（不啟動瀏覽器，force=True 可略過）
+    5. 自動填寫到 TCS 系統，並記錄同步結果與 TCS 回覆的代碼驗證結果：
+       TCS_FILL_MODE=http 時先以 HTTP 直接送出表單（未經真實 TCS 驗證），失敗時改用 Playwright
+    6. 回傳各階段耗時，並附加到本機耗時紀錄（GET /runs 查詢）
+
+    請求在整個填寫過程中保持連線；不想等待時改用 POST /auto-fill/jobs。
 
     Args:
         request: 包含日期和 dry_run 參數
@@ -146,122 +809,397 @@ async def auto_fill_tcs(
         執行結果，包含成功/失敗訊息和填寫筆數
 
     Raises:
-        HTTPException: 當找不到記錄或資料驗證失敗時
+        HTTPException: 當找不到記錄、資料驗證失敗或有已知無效的代碼時
     """
     try:
-        # 1. 查詢工時記錄
-        entries = get_date_entries(db, request.date)
+        tcs_entries, total_hours, fingerprint = _load_auto_fill_entries(request, db)
 
-        if not entries:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"找不到 {request.date} 的工時記錄",
-            )
+        # 5. 內容未變更：回傳上次同步的結果，不啟動瀏覽器
+        skipped = _skipped_response(request, db, fingerprint)
+        if skipped is not None:
+            return skipped
+
+        # 6. 代碼快取中已知無效的代碼：不啟動瀏覽器，直接回傳 400
+        _reject_known_invalid_codes(request, db, tcs_entries)
+
+        # 7. 執行 Playwright 自動填寫
+        return await _fill_tcs(request, db, tcs_entries, total_hours, fingerprint)
+
+    except HTTPException:
+        # 重新拋出 HTTP 異常
+        raise
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"資料錯誤: {str(e)}",
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"自動填寫失敗: {str(e)}",
+        )
+
+
+@router.post(
+    "/preflight",
+    response_model=TCSPreflightResponse,
+    summary="Check a date's entries before auto-filling",
+    description=(
+        "Validate the date's entries and check their codes against the local cache "
+        "of TCS validation results, without connecting to TCS."
+    ),
+)
+def preflight_tcs(
+    request: TCSPreflightRequest,
+    db: Session = Depends(get_db),
+) -> TCSPreflightResponse:
+    """
+    填寫前檢查
+
+    只查本地資料庫：資料驗證（同 /auto-fill）加上代碼快取。快取記錄每次填寫時
+    TCS 對專案、模組、工作類別代碼的回覆，TCS_CODE_CACHE_TTL_HOURS 小時內有效。
+    unknown 的代碼（從未驗證或已過期）不影響 ok，要到實際填寫時才由 TCS 驗證。
 
-        # 2. 轉換為 TCS 格式
+    Raises:
+        HTTPException: 找不到記錄（404）或關聯資料不存在（400）
+    """
+    entries = get_date_entries(db, request.date)
+    if not entries:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"找不到 {request.date} 的工時記錄",
+        )
+    try:
         tcs_entries = convert_entries_to_tcs_format(entries, db)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"資料錯誤: {str(e)}",
+        )
 
-        # 3. 驗證資料
-        is_valid, errors = validate_tcs_data(tcs_entries)
-        if not is_valid:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"資料驗證失敗: {'; '.join(errors)}",
-            )
+    _, errors = validate_tcs_data(tcs_entries)
+    ttl = _code_cache_ttl()
+    rows = check_codes(db, tcs_entries, ttl) if ttl is not None else []
+    errors += describe_invalid_codes(rows)
+    statuses = [check.status for row in rows for check in row.codes]
+    return TCSPreflightResponse(
+        date=request.date,
+        ok=not errors,
+        errors=errors,
+        rows=rows,
+        invalid_count=statuses.count("invalid"),
+        unknown_count=statuses.count("unknown"),
+    )
 
-        # 4. 計算總工時
-        total_hours = Decimal(sum(e["hours"] for e in tcs_entries))
 
-        # 5. 執行 Playwright 自動填寫
-        # 注意：這裡使用延遲導入，避免在沒有 Playwright 的環境中出錯
-        # 由於 Playwright 使用同步 API，需要在執行緒池中執行以避免與 asyncio 衝突
-        try:
-            # Import here to avoid errors if playwright not installed
-            import sys
-            from pathlib import Path
-
-            # Add backend to path to import tcs_automation module
-            backend_path = Path(__file__).parent.parent.parent.parent
-            if str(backend_path) not in sys.path:
-                sys.path.insert(0, str(backend_path))
-
-            from tcs_automation.tcs_automation import TCSAutomation
-
-            # 定義同步函數來執行 Playwright 操作
-            def run_playwright_automation():
-                """在執行緒中執行同步的 Playwright 操作"""
-                # 建立自動化實例
-                tcs = TCSAutomation()
-
-                # 轉換日期格式為 YYYYMMDD
-                date_str = request.date.strftime("%Y%m%d")
-
-                # 執行自動填寫（使用快速模式以提升性能）
-                tcs.start(headless=True, dry_run=request.dry_run, fast_mode=True)
-                tcs.fill_time_entries(date_str, tcs_entries)
-                
-                # 填寫完畢後截圖
-                screenshot_path = None
-                try:
-                    screenshot_path = tcs.screenshot(frame_only=True, full_page=True)
-                except Exception as e:
-                    # 截圖失敗不影響主要流程，只記錄錯誤
-                    print(f"⚠️  截圖失敗（不影響主要流程）: {e}")
-                
-                # 儲存前預覽（自動確認模式，不需要等待輸入）
-                tcs.preview_before_save(auto_confirm=True)
-                
-                tcs.save()
-                tcs.close()
-                
-                return screenshot_path
+@router.post(
+    "/auto-fill/range",
+    response_model=TCSAutoFillRangeResponse,
+    summary="Automatically fill TCS for a date range",
+    description=(
+        "Fill every date with time entries in a range over one TCS connection, "
+        "returning a result per day. A failed day does not stop the others. "
+        "預設為 dry_run 模式（不會真正儲存）。"
+    ),
+)
+async def auto_fill_tcs_range(
+    request: TCSAutoFillRangeRequest,
+    db: Session = Depends(get_db),
+) -> TCSAutoFillRangeResponse:
+    """
+    一次填寫多天的工時記錄到 TCS 系統
 
-            # 在執行緒池中執行 Playwright 操作
-            # 使用 asyncio.to_thread (Python 3.9+) 或 run_in_executor
-            try:
-                # Python 3.9+ 使用 asyncio.to_thread
-                screenshot_path = await asyncio.to_thread(run_playwright_automation)
-            except AttributeError:
-                # Python 3.8 或更早版本使用 run_in_executor
-                loop = asyncio.get_event_loop()
-                screenshot_path = await loop.run_in_executor(None, run_playwright_automation)
-
-            # 成功訊息
-            if request.dry_run:
-                message = f"[DRY RUN] 已模擬填寫 {len(tcs_entries)} 筆工時記錄（未真正儲存）"
-            else:
-                message = f"成功自動填寫 {len(tcs_entries)} 筆工時記錄到 TCS 系統"
+    只開啟一次 TCS（瀏覽器啟動與導覽只發生一次），再對每個有工時記錄的日期
+    以查詢按鈕重新載入該日並填寫。內容與上次成功同步相同的日期直接略過
+    （force=True 可強制重填），資料驗證失敗、有已知無效的代碼或填寫失敗的日期
+    記錄在該日的結果中，不影響其他日期。
 
-            return TCSAutoFillResponse(
-                success=True,
-                message=message,
-                filled_count=len(tcs_entries),
-                dry_run=request.dry_run,
+    Raises:
+        HTTPException: 開始日期晚於結束日期（400）或範圍內沒有工時記錄（404）
+    """
+    if request.start_date > request.end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="開始日期不能晚於結束日期",
+        )
+
+    range_begin = time.monotonic()
+    results = {}
+    to_fill = []
+    for target_date, tcs_entries in iter_date_range_tcs_entries(
+        db, request.start_date, request.end_date
+    ):
+        total_hours = Decimal(sum(e["hours"] for e in tcs_entries))
+        is_valid, errors = validate_tcs_data(tcs_entries)
+        if not is_valid:
+            results[target_date] = TCSAutoFillDayResult(
+                date=target_date,
+                success=False,
+                message=f"資料驗證失敗: {'; '.join(errors)}",
+                filled_count=0,
                 total_hours=total_hours,
-                screenshot_path=screenshot_path,
             )
+            continue
 
-        except ImportError as e:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Playwright 未安裝或配置錯誤: {str(e)}",
+        fingerprint = compute_fingerprint(tcs_entries)
+        ledger = get_sync_ledger(db, target_date)
+        if not request.force and is_unchanged(ledger, fingerprint):
+            results[target_date] = TCSAutoFillDayResult(
+                date=target_date,
+                success=True,
+                message=f"{target_date} 的工時記錄自上次同步後未變更，略過填寫",
+                filled_count=ledger.synced_entry_count,
+                total_hours=ledger.synced_total_hours,
+                skipped=True,
             )
-        except Exception as playwright_error:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Playwright 執行失敗: {str(playwright_error)}",
+            continue
+
+        invalid = [] if request.force else _known_invalid_codes(db, tcs_entries)
+        if invalid:
+            results[target_date] = TCSAutoFillDayResult(
+                date=target_date,
+                success=False,
+                message=f"TCS 已知無效的代碼: {'; '.join(invalid)}",
+                filled_count=0,
+                total_hours=total_hours,
             )
+            continue
 
-    except HTTPException:
-        # 重新拋出 HTTP 異常
-        raise
+        to_fill.append((target_date, tcs_entries, total_hours, fingerprint))
+
+    if not results and not to_fill:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"找不到 {request.start_date} 到 {request.end_date} 的工時記錄",
+        )
+
+    session_timings = None
+    if to_fill:
+        filled, session_timings = await _fill_tcs_range(request, db, to_fill)
+        results.update((result.date, result) for result in filled)
+        session_timings = {phase: round(ms, 1) for phase, ms in session_timings.items()}
+        session_timings["total"] = round((time.monotonic() - range_begin) * 1000, 1)
+
+    days = [results[target_date] for target_date in sorted(results)]
+    return TCSAutoFillRangeResponse(
+        start_date=request.start_date,
+        end_date=request.end_date,
+        dry_run=request.dry_run,
+        days=days,
+        succeeded=sum(1 for day in days if day.success and not day.skipped),
+        failed=sum(1 for day in days if not day.success),
+        skipped=sum(1 for day in days if day.skipped),
+        timings=session_timings,
+    )
+
+
+@router.post(
+    "/auto-fill/jobs",
+    response_model=TCSAutoFillJob,
+    status_code=status.HTTP_202_ACCEPTED,
+    summary="Submit a background auto-fill job",
+    description=(
+        "Validate the date's entries and fill TCS in a background job. "
+        "Returns the job at once; poll GET /auto-fill/jobs/{job_id} for the result. "
+        "A submission for a date with an active job returns that job."
+    ),
+)
+async def submit_auto_fill_job(
+    request: TCSAutoFillRequest,
+    db: Session = Depends(get_db),
+    session_factory=Depends(get_session_factory),
+) -> TCSAutoFillJob:
+    """
+    提交背景自動填寫工作
+
+    查詢與驗證在提交時完成（錯誤立即以 404 / 400 回傳），填寫在背景執行，
+    同時執行的工作數由 TCS_JOB_WORKERS 限制。同一日期已有執行中的工作時，
+    直接回傳該工作（不會重複啟動瀏覽器）；dry_run 不同時回傳 409。
+    內容未變更的日期直接回傳已完成的工作。
+
+    Raises:
+        HTTPException: 找不到記錄（404）、資料驗證失敗或有已知無效的代碼（400）、
+            同一日期的工作衝突（409）
+    """
+    try:
+        tcs_entries, total_hours, fingerprint = _load_auto_fill_entries(request, db)
     except ValueError as e:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"資料錯誤: {str(e)}",
         )
-    except Exception as e:
+
+    skipped = _skipped_response(request, db, fingerprint)
+    if skipped is None:
+        _reject_known_invalid_codes(request, db, tcs_entries)
+
+    async def run(job):
+        if skipped is not None:
+            return skipped
+        job_db = session_factory()
+        try:
+            return await _fill_tcs(
+                request, job_db, tcs_entries, total_hours, fingerprint, job=job
+            )
+        finally:
+            job_db.close()
+
+    try:
+        job, _ = get_job_manager().submit(
+            request.date, request.dry_run, request.force, run
+        )
+    except TCSJobConflict as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    return job
+
+
+@router.get(
+    "/auto-fill/jobs/{job_id}",
+    response_model=TCSAutoFillJob,
+    summary="Get a background auto-fill job",
+    description=(
+        "Return the status, progress, per-row results and screenshot path of a job."
+    ),
+)
+async def get_auto_fill_job(job_id: str) -> TCSAutoFillJob:
+    """
+    查詢背景自動填寫工作的狀態
+
+    Raises:
+        HTTPException: 找不到工作（不存在或已從保留的紀錄中移除）時回傳 404
+    """
+    return _get_job_or_404(job_id)
+
+
+@router.get(
+    "/sync/dirty",
+    response_model=TCSDirtyDaysResponse,
+    summary="List days that need a TCS sync",
+    description=(
+        "List days whose time entries were never pushed to TCS or changed "
+        "since their last successful push."
+    ),
+)
+def get_dirty_days(
+    start_date: Optional[DateType] = Query(None, description="開始日期（含）"),
+    end_date: Optional[DateType] = Query(None, description="結束日期（含）"),
+    db: Session = Depends(get_db),
+) -> TCSDirtyDaysResponse:
+    """
+    列出需要同步到 TCS 的日期
+
+    Args:
+        start_date: 開始日期（選填）
+        end_date: 結束日期（選填）
+        db: 資料庫 session
+
+    Returns:
+        尚未同步或同步後已變更的日期
+
+    Raises:
+        HTTPException: 當開始日期晚於結束日期時
+    """
+    if start_date and end_date and start_date > end_date:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"自動填寫失敗: {str(e)}",
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="開始日期不能晚於結束日期",
+        )
+
+    days = list_dirty_days(db, start_date, end_date)
+    return TCSDirtyDaysResponse(days=days, count=len(days))
+
+
+@router.get(
+    "/runs",
+    response_model=TCSFillRunsResponse,
+    summary="List auto-fill timing history",
+    description=(
+        "List recent auto-fill runs with per-phase timings and per-phase statistics."
+    ),
+)
+def get_fill_runs(
+    target_date: Optional[DateType] = Query(
+        None, alias="date", description="只列出此日期的紀錄"
+    ),
+    limit: int = Query(50, ge=1, le=500, description="最多筆數"),
+    db: Session = Depends(get_db),
+) -> TCSFillRunsResponse:
+    """
+    列出最近的自動填寫耗時紀錄
+
+    phases 為這些紀錄中各階段的平均、第 95 百分位與最長耗時，
+    用來比較 TCS 或等待邏輯造成的效能退化。
+    """
+    runs = list_fill_runs(db, target_date, limit)
+    return TCSFillRunsResponse(
+        runs=runs,
+        count=len(runs),
+        phases=summarize_phases(runs),
+    )
+
+
+@router.get(
+    "/auto-fill/jobs/{job_id}/events",
+    summary="Stream the progress events of an auto-fill job",
+    description=(
+        "Server-sent events for each step of a job as it finishes: stage changes, "
+        "finished automation phases with their duration, and each validated row. "
+        "The stream ends with a done event. Reconnecting with Last-Event-ID resumes "
+        "after that event."
+    ),
+    responses={200: {"content": {"text/event-stream": {}}}},
+)
+async def stream_auto_fill_job_events(
+    job_id: str,
+    last_event_id: Optional[int] = Header(None, alias="Last-Event-ID"),
+) -> StreamingResponse:
+    """
+    以 server-sent events 串流背景工作的進度
+
+    每個事件的 id 為序號、event 為類型（stage / phase / row / done），
+    data 為事件 JSON（含 elapsed_ms：提交後經過的毫秒數）。
+    已發生的事件會先送出，之後每個新事件發生時立即送出，工作結束後關閉。
+
+    Raises:
+        HTTPException: 找不到工作時回傳 404
+    """
+    job = _get_job_or_404(job_id)
+
+    async def event_stream():
+        async for event in job.follow(-1 if last_event_id is None else last_event_id):
+            data = json.dumps(event, ensure_ascii=False)
+            yield f"id: {event['seq']}\nevent: {event['type']}\ndata: {data}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # 不快取，並關閉反向代理（nginx）的緩衝，讓事件立即送達
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.delete(
+    "/auto-fill/jobs/{job_id}",
+    response_model=TCSAutoFillJob,
+    summary="Cancel an auto-fill job",
+    description="Cancel a queued or running job and close its browser.",
+)
+async def cancel_auto_fill_job(job_id: str) -> TCSAutoFillJob:
+    """
+    取消排隊中或執行中的背景工作
+
+    執行中的瀏覽器會被關閉；儲存前取消不會寫入 TCS，儲存中取消則無法確定
+    TCS 是否已儲存，該日期維持為需要同步。
+
+    Raises:
+        HTTPException: 找不到工作（404）或工作已結束（409）
+    """
+    job = _get_job_or_404(job_id)
+    manager = get_job_manager()
+    if not manager.cancel(job_id):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"工作 {job_id} 已結束（{job.status}）",
         )
+    await manager.wait(job_id)
+    return job
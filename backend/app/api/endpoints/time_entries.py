@@ -2,14 +2,25 @@
 API endpoints for TimeEntry management.
 
 Provides CRUD operations for time entries with advanced querying.
+Mutations commit on the request's session, or through the shared write
+queue (group commit) when TIME_ENTRY_WRITE_QUEUE is enabled. References
+to projects, account groups and work categories are enforced by the
+database's foreign keys.
 """
 
+import base64
+import binascii
+import json
 from datetime import date as DateType
-from typing import List, Optional
+from functools import partial
+from typing import Any, List, Literal, Optional, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from app.api.dependencies import get_db
+from app.api.dependencies import get_db, get_write_queue
+from app.api.integrity import missing_reference
 from app.models.time_entry import TimeEntry
 from app.schemas import (
     TimeEntryCreate,
@@ -17,10 +28,64 @@ from app.schemas import (
     TimeEntryResponse,
     TimeEntryList,
 )
+from app.services.write_queue_service import WriteOp, WriteQueue
 
 router = APIRouter()
 
 
+def _write(db: Session, write_queue: Optional[WriteQueue], op: WriteOp) -> Any:
+    """Run a mutation and commit it, directly or batched by the write queue."""
+    if write_queue is not None:
+        return write_queue.submit(op)
+    result = op(db)
+    db.commit()
+    return result
+
+
+def _write_checked(
+    db: Session, write_queue: Optional[WriteQueue], op: WriteOp, values: dict
+) -> Any:
+    """_write(), turning a foreign-key violation into a 404 for the missing row."""
+    try:
+        return _write(db, write_queue, op)
+    except IntegrityError:
+        db.rollback()
+        error = missing_reference(db, values)
+        if error is None:
+            raise
+        raise error from None
+
+
+def _encode_cursor(entry: TimeEntry) -> str:
+    """Opaque token for the position after entry in (date DESC, display_order, id)."""
+    key = json.dumps(
+        [entry.date.isoformat(), entry.display_order, entry.id], separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> Tuple[DateType, int, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        entry_date, display_order, entry_id = json.loads(raw)
+        return DateType.fromisoformat(entry_date), int(display_order), int(entry_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor",
+        )
+
+
+def _get_time_entry_or_404(db: Session, time_entry_id: int) -> TimeEntry:
+    time_entry = db.query(TimeEntry).filter(TimeEntry.id == time_entry_id).first()
+    if not time_entry:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Time entry with id {time_entry_id} not found",
+        )
+    return time_entry
+
+
 @router.post(
     "/",
     response_model=TimeEntryResponse,
@@ -31,48 +96,22 @@ router = APIRouter()
 def create_time_entry(
     time_entry: TimeEntryCreate,
     db: Session = Depends(get_db),
+    write_queue: Optional[WriteQueue] = Depends(get_write_queue),
 ) -> TimeEntryResponse:
     """Create a new time entry."""
-    # Validate foreign keys exist
-    from app.models.project import Project
-    from app.models.account_group import AccountGroup
-    from app.models.work_category import WorkCategory
-
-    project = db.query(Project).filter(Project.id == time_entry.project_id).first()
-    if not project:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Project with id {time_entry.project_id} not found",
-        )
-
-    # 模組改為選填，只有當提供時才驗證
-    if time_entry.account_group_id is not None:
-        account_group = (
-            db.query(AccountGroup)
-            .filter(AccountGroup.id == time_entry.account_group_id)
-            .first()
-        )
-        if not account_group:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Account group with id {time_entry.account_group_id} not found",
-            )
-
-    work_category = (
-        db.query(WorkCategory)
-        .filter(WorkCategory.id == time_entry.work_category_id)
-        .first()
+    return _write_checked(
+        db,
+        write_queue,
+        partial(_create_time_entry, time_entry=time_entry),
+        time_entry.model_dump(),
     )
-    if not work_category:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Work category with id {time_entry.work_category_id} not found",
-        )
 
-    # Create new time entry
+
+def _create_time_entry(db: Session, time_entry: TimeEntryCreate) -> TimeEntryResponse:
+    # Foreign keys are checked by the insert itself (模組為選填，可為 NULL)
     db_time_entry = TimeEntry(**time_entry.model_dump())
     db.add(db_time_entry)
-    db.commit()
+    db.flush()
     db.refresh(db_time_entry)
 
     return TimeEntryResponse.model_validate(db_time_entry)
@@ -82,19 +121,47 @@ def create_time_entry(
     "/",
     response_model=TimeEntryList,
     summary="List time entries",
-    description="Get time entries with optional filtering by date range and project",
+    description=(
+        "Get time entries with optional filtering by date range and project. "
+        "pagination=offset (default) pages with skip/limit and always returns total; "
+        "pagination=cursor (or passing a cursor) returns next_cursor for the following "
+        "page, ignores skip and only counts total when include_total=true"
+    ),
 )
 def list_time_entries(
     skip: int = 0,
     limit: int = 100,
-    start_date: Optional[DateType] = Query(None, description="Filter by start date (inclusive)"),
-    end_date: Optional[DateType] = Query(None, description="Filter by end date (inclusive)"),
+    pagination: Literal["offset", "cursor"] = Query(
+        "offset", description="Pagination mode"
+    ),
+    cursor: Optional[str] = Query(
+        None, description="next_cursor of the previous page (cursor mode)"
+    ),
+    include_total: bool = Query(
+        False, description="Also count the filtered entries (cursor mode)"
+    ),
+    start_date: Optional[DateType] = Query(
+        None, description="Filter by start date (inclusive)"
+    ),
+    end_date: Optional[DateType] = Query(
+        None, description="Filter by end date (inclusive)"
+    ),
     project_id: Optional[int] = Query(None, description="Filter by project ID"),
-    account_group_id: Optional[int] = Query(None, description="Filter by account group ID"),
-    work_category_id: Optional[int] = Query(None, description="Filter by work category ID"),
+    account_group_id: Optional[int] = Query(
+        None, description="Filter by account group ID"
+    ),
+    work_category_id: Optional[int] = Query(
+        None, description="Filter by work category ID"
+    ),
     db: Session = Depends(get_db),
 ) -> TimeEntryList:
-    """List time entries with pagination and optional filtering."""
+    """
+    List time entries with pagination and optional filtering.
+
+    Cursor mode seeks past the last entry of the previous page on the
+    (date DESC, display_order, id) index instead of skipping rows, so
+    deep pages cost the same as the first one.
+    """
     query = db.query(TimeEntry)
 
     # Apply filters
@@ -109,15 +176,44 @@ def list_time_entries(
     if work_category_id:
         query = query.filter(TimeEntry.work_category_id == work_category_id)
 
-    # Order by date (descending) and display_order
-    query = query.order_by(TimeEntry.date.desc(), TimeEntry.display_order.asc())
+    # Order by date (descending) and display_order; id keeps the order total
+    ordered = query.order_by(
+        TimeEntry.date.desc(), TimeEntry.display_order.asc(), TimeEntry.id.asc()
+    )
+
+    if pagination == "offset" and cursor is None:
+        total = query.count()
+        items = ordered.offset(skip).limit(limit).all()
 
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
+        return TimeEntryList(
+            items=[TimeEntryResponse.model_validate(item) for item in items],
+            total=total,
+        )
+
+    total = query.count() if include_total else None
+    if cursor is not None:
+        after_date, after_order, after_id = _decode_cursor(cursor)
+        # The leading date <= bound lets SQLite seek the index with bound
+        # parameters; a bare OR of the three cases makes it scan from the top
+        ordered = ordered.filter(
+            TimeEntry.date <= after_date,
+            or_(
+                TimeEntry.date < after_date,
+                TimeEntry.display_order > after_order,
+                and_(TimeEntry.display_order == after_order, TimeEntry.id > after_id),
+            ),
+        )
+
+    # One extra row tells whether there is a next page
+    items = ordered.limit(limit + 1).all()
+    next_cursor = (
+        _encode_cursor(items[limit - 1]) if len(items) > limit and limit > 0 else None
+    )
 
     return TimeEntryList(
-        items=[TimeEntryResponse.model_validate(item) for item in items],
+        items=[TimeEntryResponse.model_validate(item) for item in items[:limit]],
         total=total,
+        next_cursor=next_cursor,
     )
 
 
@@ -132,14 +228,7 @@ def get_time_entry(
     db: Session = Depends(get_db),
 ) -> TimeEntryResponse:
     """Get a specific time entry by ID."""
-    time_entry = db.query(TimeEntry).filter(TimeEntry.id == time_entry_id).first()
-    if not time_entry:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Time entry with id {time_entry_id} not found",
-        )
-
-    return TimeEntryResponse.model_validate(time_entry)
+    return TimeEntryResponse.model_validate(_get_time_entry_or_404(db, time_entry_id))
 
 
 @router.patch(
@@ -152,21 +241,34 @@ def update_time_entry(
     time_entry_id: int,
     time_entry_update: TimeEntryUpdate,
     db: Session = Depends(get_db),
+    write_queue: Optional[WriteQueue] = Depends(get_write_queue),
 ) -> TimeEntryResponse:
     """Update an existing time entry."""
-    time_entry = db.query(TimeEntry).filter(TimeEntry.id == time_entry_id).first()
-    if not time_entry:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Time entry with id {time_entry_id} not found",
-        )
+    return _write_checked(
+        db,
+        write_queue,
+        partial(
+            _update_time_entry,
+            time_entry_id=time_entry_id,
+            time_entry_update=time_entry_update,
+        ),
+        time_entry_update.model_dump(exclude_unset=True),
+    )
+
+
+def _update_time_entry(
+    db: Session,
+    time_entry_id: int,
+    time_entry_update: TimeEntryUpdate,
+) -> TimeEntryResponse:
+    time_entry = _get_time_entry_or_404(db, time_entry_id)
 
     # Update only provided fields
     update_data = time_entry_update.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(time_entry, field, value)
 
-    db.commit()
+    db.flush()
     db.refresh(time_entry)
 
     return TimeEntryResponse.model_validate(time_entry)
@@ -181,14 +283,12 @@ def update_time_entry(
 def delete_time_entry(
     time_entry_id: int,
     db: Session = Depends(get_db),
+    write_queue: Optional[WriteQueue] = Depends(get_write_queue),
 ) -> None:
     """Delete a time entry."""
-    time_entry = db.query(TimeEntry).filter(TimeEntry.id == time_entry_id).first()
-    if not time_entry:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Time entry with id {time_entry_id} not found",
-        )
+    _write(db, write_queue, partial(_delete_time_entry, time_entry_id=time_entry_id))
 
-    db.delete(time_entry)
-    db.commit()
+
+def _delete_time_entry(db: Session, time_entry_id: int) -> None:
+    db.delete(_get_time_entry_or_404(db, time_entry_id))
+    db.flush()
@@ -6,9 +6,11 @@ Provides CRUD operations for work categories.
 
 from typing import List
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.api.dependencies import get_db
+from app.api.integrity import still_referenced
 from app.models.work_category import WorkCategory
 from app.schemas import (
     WorkCategoryCreate,
@@ -139,13 +141,21 @@ def delete_work_category(
     work_category_id: int,
     db: Session = Depends(get_db),
 ) -> None:
-    """Delete a work category."""
-    work_category = db.query(WorkCategory).filter(WorkCategory.id == work_category_id).first()
-    if not work_category:
+    """
+    Delete a work category.
+
+    Rows that still reference it (time entries, projects, templates) make
+    the database refuse the delete, which is returned as 409.
+    """
+    try:
+        deleted = db.query(WorkCategory).filter(WorkCategory.id == work_category_id).delete()
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise still_referenced("Work category", work_category_id) from None
+
+    if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Work category with id {work_category_id} not found",
         )
-
-    db.delete(work_category)
-    db.commit()
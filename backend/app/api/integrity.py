@@ -0,0 +1,62 @@
+"""
+HTTP errors for foreign-key violations.
+
+SQLite enforces foreign keys (PRAGMA foreign_keys = ON), so writes no
+longer look up every referenced row first. When a write fails with an
+IntegrityError, these helpers work out which reference caused it and
+build the response the endpoint used to return.
+"""
+
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy.orm import Session
+
+from app.models.account_group import AccountGroup
+from app.models.project import Project
+from app.models.work_category import WorkCategory
+
+# Foreign-key field → (referenced model, name used in error messages),
+# in the order the references are reported
+REFERENCES = {
+    "project_id": (Project, "Project"),
+    "account_group_id": (AccountGroup, "Account group"),
+    "default_account_group_id": (AccountGroup, "Account group"),
+    "work_category_id": (WorkCategory, "Work category"),
+    "default_work_category_id": (WorkCategory, "Work category"),
+}
+
+
+def missing_reference(db: Session, values: Dict) -> Optional[HTTPException]:
+    """
+    Find the first foreign key in values that points to no row.
+
+    Call after rolling back the failed write. Only runs on the error path,
+    so the successful write stays a single statement.
+
+    Args:
+        db: Database session (rolled back)
+        values: Written fields; None values are skipped
+
+    Returns:
+        404 HTTPException naming the missing row, or None if every
+        reference exists (the violation was not a missing reference)
+    """
+    for field, (model, label) in REFERENCES.items():
+        value = values.get(field)
+        if value is None:
+            continue
+        if db.query(model.id).filter(model.id == value).first() is None:
+            return HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"{label} with id {value} not found",
+            )
+    return None
+
+
+def still_referenced(label: str, id: int) -> HTTPException:
+    """409 for a delete refused because other rows still reference the row."""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=f"{label} with id {id} is still in use and cannot be deleted",
+    )
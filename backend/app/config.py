@@ -4,7 +4,7 @@ Configuration management for the time tracking system.
 This module handles loading and validation of configuration from environment variables.
 """
 
-from typing import List
+from typing import List, Literal
 
 from pydantic_settings import BaseSettings
 
@@ -19,6 +19,22 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str = "sqlite:///./data/app.db"
 
+    # SQLite performance profile, applied to every new connection
+    # (SQLITE_PERFORMANCE_PROFILE=False keeps the SQLite defaults)
+    SQLITE_PERFORMANCE_PROFILE: bool = True
+    SQLITE_JOURNAL_MODE: Literal["WAL", "DELETE", "TRUNCATE", "PERSIST", "MEMORY", "OFF"] = "WAL"
+    SQLITE_SYNCHRONOUS: Literal["OFF", "NORMAL", "FULL", "EXTRA"] = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # wait this long for a lock before "database is locked"
+    SQLITE_CACHE_SIZE_KIB: int = 65536  # page cache per connection
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes of the file read through mmap (0 = off)
+    SQLITE_TEMP_STORE: Literal["DEFAULT", "FILE", "MEMORY"] = "MEMORY"
+
+    # Group commit for time-entry mutations: one writer thread commits the
+    # writes arriving within the window together (False = commit per request)
+    TIME_ENTRY_WRITE_QUEUE: bool = False
+    TIME_ENTRY_WRITE_WINDOW_MS: float = 2
+    TIME_ENTRY_WRITE_MAX_BATCH: int = 64
+
     # Application
     APP_NAME: str = "Time Tracking System"
     APP_VERSION: str = "1.0.0"
@@ -44,6 +60,28 @@ class Settings(BaseSettings):
     TCS_TIMEOUT: int = 30000  # milliseconds
     TCS_DRY_RUN_DEFAULT: bool = True  # 預設為安全模式
 
+    # TCS Browser Pool（預先啟動的瀏覽器，0 = 停用，每次冷啟動）
+    TCS_BROWSER_POOL_SIZE: int = 0
+    TCS_BROWSER_POOL_MAX_USES: int = 50  # 使用 N 次後重新啟動瀏覽器
+    TCS_BROWSER_POOL_IDLE_SECONDS: int = 600  # 閒置超過 N 秒關閉瀏覽器
+    TCS_BROWSER_POOL_ACQUIRE_TIMEOUT: int = 120  # 等待可用瀏覽器的秒數
+
+    # TCS 填寫方式：目前只有 browser（Playwright）
+    # tcs_automation.http_client 的代碼查詢協定與 Windows 整合驗證尚未經真實 TCS 確認，
+    # 確認前 API 不使用；設定成其他值（含 http）會在啟動時驗證失敗
+    TCS_FILL_MODE: Literal["browser"] = "browser"
+
+    # TCS 瀏覽器導覽時中止的請求（以逗號分隔，留空表示不攔截）
+    TCS_BLOCKED_RESOURCE_TYPES: str = "image,font,media"  # Playwright resource_type
+    TCS_BLOCKED_URL_PATTERNS: str = ""  # fnmatch 樣式，如 */analytics/*
+
+    # TCS 背景自動填寫工作
+    TCS_JOB_WORKERS: int = 1  # 同時執行的工作數（每個工作使用一個瀏覽器）
+    TCS_JOB_HISTORY: int = 100  # 保留供查詢的已結束工作數
+
+    # TCS 代碼驗證快取（自動填寫時記錄 TCS 回傳的名稱，0 = 停用）
+    TCS_CODE_CACHE_TTL_HOURS: int = 24
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -5,22 +5,136 @@ This module provides database connection setup and session management
 using SQLAlchemy ORM.
 """
 
-from sqlalchemy import create_engine
+from typing import Dict, Optional
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
-from app.config import settings
+from app.config import Settings, settings
+
+
+def sqlite_pragmas(config: Settings = settings) -> Dict[str, object]:
+    """
+    Return the PRAGMAs of the SQLite performance profile.
+
+    busy_timeout comes first so that switching the journal mode already
+    waits for locks held by other connections.
+
+    Args:
+        config: Settings to read the profile from
+
+    Returns:
+        PRAGMA name → value in the order they are applied, empty when
+        SQLITE_PERFORMANCE_PROFILE is off
+    """
+    if not config.SQLITE_PERFORMANCE_PROFILE:
+        return {}
+    return {
+        "busy_timeout": config.SQLITE_BUSY_TIMEOUT_MS,
+        "journal_mode": config.SQLITE_JOURNAL_MODE,
+        "synchronous": config.SQLITE_SYNCHRONOUS,
+        "cache_size": -config.SQLITE_CACHE_SIZE_KIB,  # negative = KiB instead of pages
+        "mmap_size": config.SQLITE_MMAP_SIZE,
+        "temp_store": config.SQLITE_TEMP_STORE,
+    }
+
+
+def apply_sqlite_pragmas(engine: Engine, pragmas: Dict[str, object]):
+    """
+    Run the PRAGMAs on every new DBAPI connection of the engine.
+
+    Per-connection settings (synchronous, cache_size, ...) are lost when a
+    connection closes, so they are set from a connect-event listener
+    rather than once at startup.
+    """
+    if not pragmas:
+        return
+
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def _with_foreign_keys(pragmas: Dict[str, object]) -> Dict[str, object]:
+    """Add PRAGMA foreign_keys = ON, which SQLite needs on every connection to enforce FKs."""
+    return {"foreign_keys": "ON", **pragmas}
+
+
+def create_db_engine(
+    database_url: str,
+    echo: bool = False,
+    pragmas: Optional[Dict[str, object]] = None,
+) -> Engine:
+    """
+    Create an engine; SQLite engines enforce foreign keys and get the
+    performance-profile PRAGMAs.
+
+    Args:
+        database_url: SQLAlchemy database URL
+        echo: Log SQL statements
+        pragmas: PRAGMAs for SQLite connections (defaults to sqlite_pragmas())
+    """
+    is_sqlite = database_url.startswith("sqlite")
+    engine = create_engine(
+        database_url,
+        connect_args={"check_same_thread": False} if is_sqlite else {},
+        echo=echo,
+    )
+    if is_sqlite:
+        apply_sqlite_pragmas(engine, _with_foreign_keys(sqlite_pragmas() if pragmas is None else pragmas))
+    return engine
+
+
+def async_database_url(database_url: str) -> str:
+    """Return the URL with the aiosqlite driver for plain SQLite URLs (others unchanged)."""
+    if database_url.startswith("sqlite:"):
+        return "sqlite+aiosqlite:" + database_url[len("sqlite:"):]
+    return database_url
+
+
+def create_async_db_engine(
+    database_url: str,
+    echo: bool = False,
+    pragmas: Optional[Dict[str, object]] = None,
+) -> AsyncEngine:
+    """
+    Create an async engine for the same database as create_db_engine().
+
+    SQLite runs through aiosqlite, which executes every statement on its own
+    thread, so a slow query or a lock wait does not block the event loop.
+    Connections get the same performance-profile PRAGMAs.
+
+    Args:
+        database_url: SQLAlchemy database URL (sync or async driver)
+        echo: Log SQL statements
+        pragmas: PRAGMAs for SQLite connections (defaults to sqlite_pragmas())
+    """
+    url = async_database_url(database_url)
+    engine = create_async_engine(url, echo=echo)
+    if url.startswith("sqlite"):
+        apply_sqlite_pragmas(engine.sync_engine, _with_foreign_keys(sqlite_pragmas() if pragmas is None else pragmas))
+    return engine
+
 
 # Create SQLAlchemy engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG,
-)
+engine = create_db_engine(settings.DATABASE_URL, echo=settings.DEBUG)
 
 # Create SessionLocal class for database sessions
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and sessions for async def routes. Attributes stay loaded
+# after commit: lazy loads are not possible outside an await.
+async_engine = create_async_db_engine(settings.DATABASE_URL, echo=settings.DEBUG)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 # Create Base class for declarative models
 Base = declarative_base()
 
@@ -69,3 +183,9 @@ def init_db():
     from app import models  # noqa: F401
 
     Base.metadata.create_all(bind=engine)
+
+    # create_all only creates indexes together with their table; add the
+    # ones declared later to tables that already exist
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
@@ -7,8 +7,10 @@ This is the main application file that creates and configures the FastAPI app.
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.dependencies import close_write_queue
 from app.config import settings
-from app.database import init_db
+from app.database import SessionLocal, async_engine, init_db
+from app.services.project_usage_service import ensure_project_usage
 
 # Create FastAPI application
 app = FastAPI(
@@ -37,6 +39,37 @@ async def startup_event():
     """
     init_db()
 
+    # Build the project usage summary for databases created before it existed
+    db = SessionLocal()
+    try:
+        ensure_project_usage(db)
+    finally:
+        db.close()
+
+    # Pre-launch pooled TCS browsers in the background (if enabled)
+    from app.api.endpoints.tcs import warm_up_browser_pool
+
+    try:
+        await warm_up_browser_pool()
+    except ImportError as e:
+        print(f"⚠️  TCS browser pool disabled: {e}")
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """
+    Application shutdown event handler.
+
+    Cancels running auto-fill jobs, then closes pooled TCS browsers, the
+    time-entry write queue and the async database connections.
+    """
+    from app.api.endpoints.tcs import close_browser_pool, close_job_manager
+
+    await close_job_manager()
+    await close_browser_pool()
+    close_write_queue()
+    await async_engine.dispose()
+
 
 @app.get("/")
 async def root():
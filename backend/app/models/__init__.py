@@ -11,6 +11,10 @@ from app.models.time_entry import TimeEntry
 from app.models.work_template import WorkTemplate
 from app.models.setting import Setting
 from app.models.milestone import Milestone
+from app.models.project_usage import ProjectUsage
+from app.models.tcs_sync_ledger import TCSSyncLedger
+from app.models.tcs_fill_run import TCSFillRun
+from app.models.tcs_code_cache import TCSCodeCache
 
 __all__ = [
     "Project",
@@ -20,4 +24,8 @@ __all__ = [
     "WorkTemplate",
     "Setting",
     "Milestone",
+    "ProjectUsage",
+    "TCSSyncLedger",
+    "TCSFillRun",
+    "TCSCodeCache",
 ]
@@ -0,0 +1,284 @@
+"""
+ProjectUsage model for time tracking system.
+
+Project usage is a materialized summary of each project's deductible and
+non-deductible hours. It is kept in step with time_entries inside the same
+transaction, so project statistics read one row instead of re-scanning
+every time entry of the project.
+"""
+
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+from sqlalchemy import (
+    Column,
+    Integer,
+    Numeric,
+    DateTime,
+    ForeignKey,
+    case,
+    event,
+    func,
+    insert,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.models.time_entry import TimeEntry
+from app.models.work_category import WorkCategory
+
+
+class ProjectUsage(Base):
+    """
+    ProjectUsage model storing running hour totals per project.
+
+    Maintained automatically by the session flush hook below:
+    - Creating, updating or deleting a TimeEntry applies the hour delta
+    - Changing WorkCategory.deduct_approved_hours recomputes the affected projects
+
+    Bulk ``query(...).delete()`` / ``update()`` calls bypass the hook; use
+    ``rebuild_project_usage.py`` to rebuild or verify the summary afterwards.
+
+    Attributes:
+        project_id: Primary key, foreign key to projects table
+        deduct_hours: Sum of hours where deduct_approved_hours=True
+        non_deduct_hours: Sum of hours where deduct_approved_hours=False
+        updated_at: Timestamp when totals were last changed
+    """
+
+    __tablename__ = "project_usage"
+
+    # Primary Key
+    project_id = Column(
+        Integer,
+        ForeignKey("projects.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+
+    # Running Totals
+    deduct_hours = Column(Numeric(10, 2), nullable=False, default=0)
+    non_deduct_hours = Column(Numeric(10, 2), nullable=False, default=0)
+
+    # Timestamp
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return (
+            f"<ProjectUsage(project_id={self.project_id}, "
+            f"deduct={self.deduct_hours}, non_deduct={self.non_deduct_hours})>"
+        )
+
+
+def usage_totals_select(project_ids: Optional[Iterable[int]] = None):
+    """
+    Build the full-recompute aggregate of project usage.
+
+    Args:
+        project_ids: Restrict to these projects (None = all projects)
+
+    Returns:
+        SELECT of (project_id, deduct_hours, non_deduct_hours) grouped by project
+    """
+    deduct = WorkCategory.deduct_approved_hours
+    stmt = (
+        select(
+            TimeEntry.project_id,
+            func.sum(case((deduct.is_(True), TimeEntry.hours), else_=0)),
+            func.sum(case((deduct.is_(False), TimeEntry.hours), else_=0)),
+        )
+        .join(WorkCategory, TimeEntry.work_category_id == WorkCategory.id)
+        .group_by(TimeEntry.project_id)
+    )
+    if project_ids is not None:
+        stmt = stmt.where(TimeEntry.project_id.in_(list(project_ids)))
+    return stmt
+
+
+def recompute_usage(session: Session, project_ids: Iterable[int]) -> None:
+    """
+    Overwrite the summary rows of the given projects with a full recompute.
+
+    Args:
+        session: Database session (the caller owns the transaction)
+        project_ids: Projects to recompute
+    """
+    project_ids = set(project_ids)
+    if not project_ids:
+        return
+
+    totals = {
+        project_id: (deduct or 0, non_deduct or 0)
+        for project_id, deduct, non_deduct in session.execute(usage_totals_select(project_ids))
+    }
+    for project_id in project_ids:
+        deduct, non_deduct = totals.get(project_id, (0, 0))
+        _write_usage(session, project_id, Decimal(str(deduct)), Decimal(str(non_deduct)), absolute=True)
+
+
+def _write_usage(
+    session: Session,
+    project_id: int,
+    deduct: Decimal,
+    non_deduct: Decimal,
+    absolute: bool = False,
+) -> None:
+    """Set (absolute=True) or increment the summary row of one project."""
+    table = ProjectUsage.__table__
+    if absolute:
+        values = {"deduct_hours": deduct, "non_deduct_hours": non_deduct}
+    else:
+        values = {
+            "deduct_hours": table.c.deduct_hours + deduct,
+            "non_deduct_hours": table.c.non_deduct_hours + non_deduct,
+        }
+
+    result = session.execute(
+        update(table).where(table.c.project_id == project_id).values(**values)
+    )
+    if result.rowcount == 0:
+        session.execute(
+            insert(table).values(
+                project_id=project_id,
+                deduct_hours=deduct,
+                non_deduct_hours=non_deduct,
+            )
+        )
+
+
+def _previous_values(session: Session, entry: TimeEntry) -> Tuple[int, int, Decimal]:
+    """
+    Return the pre-flush (project_id, work_category_id, hours) of an entry.
+
+    Uses attribute history when the old values were loaded; otherwise the
+    row is read back, which still holds the old values before the flush.
+    """
+    state = inspect(entry)
+    values = []
+    for attr in ("project_id", "work_category_id", "hours"):
+        history = state.attrs[attr].history
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        else:
+            break
+    else:
+        return values[0], values[1], Decimal(str(values[2]))
+
+    project_id, work_category_id, hours = session.execute(
+        select(TimeEntry.project_id, TimeEntry.work_category_id, TimeEntry.hours)
+        .where(TimeEntry.id == state.identity[0])
+    ).one()
+    return project_id, work_category_id, Decimal(str(hours))
+
+
+# session.info key holding the changes collected for the flush in progress
+_CHANGES_KEY = "project_usage_changes"
+
+
+@event.listens_for(Session, "before_flush")
+def _collect_project_usage_changes(session: Session, flush_context, instances) -> None:
+    """
+    Record the hour deltas of pending TimeEntry / WorkCategory changes.
+
+    Collected before the flush, while previous values can still be loaded
+    from the database, and applied by ``_apply_project_usage_changes``.
+    """
+    # Drop anything left by an earlier flush that failed before after_flush
+    session.info.pop(_CHANGES_KEY, None)
+
+    # (project_id, work_category_id, hours delta)
+    deltas = []
+    changed_categories: Set[int] = set()
+
+    for obj in session.new:
+        if isinstance(obj, TimeEntry):
+            deltas.append((obj.project_id, obj.work_category_id, obj.hours))
+
+    for obj in session.deleted:
+        if isinstance(obj, TimeEntry):
+            project_id, work_category_id, hours = _previous_values(session, obj)
+            deltas.append((project_id, work_category_id, -hours))
+        elif isinstance(obj, WorkCategory):
+            changed_categories.add(obj.id)
+
+    for obj in session.dirty:
+        if isinstance(obj, TimeEntry):
+            state = inspect(obj)
+            if not any(
+                state.attrs[attr].history.has_changes()
+                for attr in ("project_id", "work_category_id", "hours")
+            ):
+                continue
+            project_id, work_category_id, hours = _previous_values(session, obj)
+            deltas.append((project_id, work_category_id, -hours))
+            deltas.append((obj.project_id, obj.work_category_id, obj.hours))
+        elif isinstance(obj, WorkCategory):
+            if inspect(obj).attrs.deduct_approved_hours.history.has_changes():
+                changed_categories.add(obj.id)
+
+    if deltas or changed_categories:
+        session.info[_CHANGES_KEY] = (deltas, changed_categories)
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_project_usage_changes(session: Session, flush_context) -> None:
+    """
+    Apply the collected changes to project_usage.
+
+    Runs after the flush has written its rows but inside the same
+    transaction, so the summary commits or rolls back with the entries.
+    """
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if changes is None:
+        return
+    deltas, changed_categories = changes
+
+    # Resolve deduct flags for all categories touched by the deltas
+    category_ids = {work_category_id for _, work_category_id, _ in deltas}
+    deduct_flags: Dict[int, bool] = dict(
+        session.execute(
+            select(WorkCategory.id, WorkCategory.deduct_approved_hours)
+            .where(WorkCategory.id.in_(category_ids))
+        ).all()
+    ) if category_ids else {}
+
+    # Combine deltas per project
+    totals: Dict[int, Tuple[Decimal, Decimal]] = {}
+    for project_id, work_category_id, hours in deltas:
+        if work_category_id not in deduct_flags:
+            # Entries without a valid category never count (matches the inner join)
+            continue
+        hours = Decimal(str(hours))
+        deduct, non_deduct = totals.get(project_id, (Decimal("0"), Decimal("0")))
+        if deduct_flags[work_category_id]:
+            deduct += hours
+        else:
+            non_deduct += hours
+        totals[project_id] = (deduct, non_deduct)
+
+    for project_id, (deduct, non_deduct) in totals.items():
+        _write_usage(session, project_id, deduct, non_deduct)
+
+    # A deduct flag change moves hours between the two totals of every
+    # project that used the category, so those projects are recomputed.
+    if changed_categories:
+        recompute_usage(
+            session,
+            session.execute(
+                select(TimeEntry.project_id)
+                .where(TimeEntry.work_category_id.in_(changed_categories))
+                .distinct()
+            ).scalars(),
+        )
+
+
+@event.listens_for(Session, "after_rollback")
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_project_usage_changes(session: Session, *args) -> None:
+    """Forget collected changes whose flush was rolled back."""
+    session.info.pop(_CHANGES_KEY, None)
@@ -0,0 +1,43 @@
+"""
+TCSCodeCache model for time tracking system.
+
+Caches what TCS answered when a project, module or work category code was
+validated during an auto-fill, so later fills can reject codes that TCS is
+known to refuse without launching a browser.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, String, Boolean, DateTime
+
+from app.database import Base
+
+
+class TCSCodeCache(Base):
+    """
+    TCSCodeCache model recording the last TCS validation of each code.
+
+    Rows are upserted after every auto-fill from the names TCS showed next
+    to the code fields; a row older than the configured TTL is treated as
+    unknown.
+
+    Attributes:
+        field: Code field ("project_code", "account_group" or "work_category")
+        code: Code as entered in TCS
+        name: Name TCS resolved the code to (or its error text)
+        valid: Whether TCS accepted the code
+        checked_at: Timestamp of the validation
+    """
+
+    __tablename__ = "tcs_code_cache"
+
+    # Composite Primary Key
+    field = Column(String(20), primary_key=True)
+    code = Column(String(50), primary_key=True)
+
+    # Last validation
+    name = Column(String(200), nullable=True)
+    valid = Column(Boolean, nullable=False)
+    checked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TCSCodeCache(field='{self.field}', code='{self.code}', valid={self.valid})>"
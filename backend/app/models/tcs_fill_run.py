@@ -0,0 +1,54 @@
+"""
+TCSFillRun model for time tracking system.
+
+Every auto-fill run that reaches TCS is appended to this history with its
+per-phase timings, so slow phases and regressions can be compared across
+runs.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Float, Boolean, Date, DateTime, Text, JSON
+
+from app.database import Base
+
+
+class TCSFillRun(Base):
+    """
+    TCSFillRun model recording one auto-fill run.
+
+    Skipped runs (unchanged days) never reach TCS and are not recorded.
+
+    Attributes:
+        id: Primary key
+        date: Work date that was filled
+        started_at: Timestamp when the fill started
+        dry_run: Whether the run was a dry run
+        success: Whether the run succeeded
+        fill_mode: Fill path that produced the result ("http" or "browser")
+        entry_count: Number of filled entries
+        total_ms: Wall time of the whole fill in milliseconds
+        timings: Per-phase timings in milliseconds, in phase order
+        message: Result or error message
+    """
+
+    __tablename__ = "tcs_fill_runs"
+
+    # Primary Key
+    id = Column(Integer, primary_key=True, autoincrement=True)
+
+    # Run
+    date = Column(Date, nullable=False, index=True)
+    started_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    dry_run = Column(Boolean, nullable=False)
+    success = Column(Boolean, nullable=False)
+    fill_mode = Column(String(20), nullable=True)
+    entry_count = Column(Integer, nullable=False)
+
+    # Timings
+    total_ms = Column(Float, nullable=False)
+    timings = Column(JSON, nullable=False, default=dict)
+
+    message = Column(Text, nullable=True)
+
+    def __repr__(self):
+        return f"<TCSFillRun(id={self.id}, date={self.date}, success={self.success}, total_ms={self.total_ms:.0f})>"
@@ -0,0 +1,53 @@
+"""
+TCSSyncLedger model for time tracking system.
+
+The sync ledger remembers, per date, a fingerprint of the entries that were
+last pushed to TCS. A day whose current fingerprint matches the last
+successful push is unchanged and does not need to be filled again.
+"""
+
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Numeric, Date, DateTime, Text
+
+from app.database import Base
+
+
+class TCSSyncLedger(Base):
+    """
+    TCSSyncLedger model recording TCS pushes per date.
+
+    Only real (non dry-run) auto-fill runs are recorded. The ``synced_*``
+    columns describe the last successful push and are kept when a later
+    attempt fails; the ``last_*`` columns describe the most recent attempt.
+
+    Attributes:
+        date: Primary key, the work date
+        synced_fingerprint: Fingerprint of the entries of the last successful push
+        synced_entry_count: Number of entries in the last successful push
+        synced_total_hours: Total hours of the last successful push
+        synced_at: Timestamp of the last successful push
+        last_fingerprint: Fingerprint of the entries of the most recent attempt
+        last_status: Outcome of the most recent attempt ("success" or "failed")
+        last_message: Result or error message of the most recent attempt
+        last_attempted_at: Timestamp of the most recent attempt
+    """
+
+    __tablename__ = "tcs_sync_ledger"
+
+    # Primary Key
+    date = Column(Date, primary_key=True)
+
+    # Last successful push
+    synced_fingerprint = Column(String(64), nullable=True)
+    synced_entry_count = Column(Integer, nullable=True)
+    synced_total_hours = Column(Numeric(5, 2), nullable=True)
+    synced_at = Column(DateTime, nullable=True)
+
+    # Most recent attempt
+    last_fingerprint = Column(String(64), nullable=False)
+    last_status = Column(String(20), nullable=False)
+    last_message = Column(Text, nullable=True)
+    last_attempted_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f"<TCSSyncLedger(date={self.date}, last_status='{self.last_status}')>"
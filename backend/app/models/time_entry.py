@@ -66,3 +66,13 @@ class TimeEntry(Base):
 
     def __repr__(self):
         return f"<TimeEntry(id={self.id}, date={self.date}, hours={self.hours})>"
+
+
+# Matches the list order (date DESC, display_order, id) so keyset pages of
+# GET /api/time-entries read the next rows straight from the index
+Index(
+    "idx_time_entries_list_order",
+    TimeEntry.date.desc(),
+    TimeEntry.display_order,
+    TimeEntry.id,
+)
@@ -49,6 +49,20 @@ from .tcs import (
     TCSEntryData,
     TCSAutoFillRequest,
     TCSAutoFillResponse,
+    TCSDirtyDay,
+    TCSDirtyDaysResponse,
+    TCSFillRun,
+    TCSPhaseStats,
+    TCSFillRunsResponse,
+    TCSRowResult,
+    TCSAutoFillJob,
+    TCSAutoFillRangeRequest,
+    TCSAutoFillDayResult,
+    TCSAutoFillRangeResponse,
+    TCSPreflightRequest,
+    TCSCodeCheck,
+    TCSPreflightRow,
+    TCSPreflightResponse,
 )
 from .milestone import (
     MilestoneBase,
@@ -97,6 +111,20 @@ __all__ = [
     "TCSEntryData",
     "TCSAutoFillRequest",
     "TCSAutoFillResponse",
+    "TCSDirtyDay",
+    "TCSDirtyDaysResponse",
+    "TCSFillRun",
+    "TCSPhaseStats",
+    "TCSFillRunsResponse",
+    "TCSRowResult",
+    "TCSAutoFillJob",
+    "TCSAutoFillRangeRequest",
+    "TCSAutoFillDayResult",
+    "TCSAutoFillRangeResponse",
+    "TCSPreflightRequest",
+    "TCSCodeCheck",
+    "TCSPreflightRow",
+    "TCSPreflightResponse",
     # Milestone schemas
     "MilestoneBase",
     "MilestoneCreate",
@@ -5,11 +5,11 @@ These schemas define the data validation and serialization for formatting
 time entries into TCS system format for copy-paste operations and automation.
 """
 
-from datetime import date as DateType
+from datetime import date as DateType, datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Literal, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class TCSEntryFormat(BaseModel):
@@ -108,6 +108,10 @@ class TCSAutoFillRequest(BaseModel):
         default=True,
         description="乾運行模式（預設 True，不會真正儲存）",
     )
+    force: bool = Field(
+        default=False,
+        description="即使內容與上次成功同步相同也重新填寫",
+    )
 
 
 class TCSAutoFillResponse(BaseModel):
@@ -119,3 +123,189 @@ class TCSAutoFillResponse(BaseModel):
     dry_run: bool = Field(..., description="是否為乾運行模式")
     total_hours: Optional[Decimal] = Field(None, description="總工時")
     screenshot_path: Optional[str] = Field(None, description="截圖檔案路徑（如果成功截圖）")
+    skipped: bool = Field(default=False, description="內容未變更，略過填寫（未啟動瀏覽器）")
+    fill_mode: Optional[Literal["http", "browser"]] = Field(
+        None,
+        description="實際使用的填寫方式：http（直接送出表單）或 browser（Playwright）；略過時為 None",
+    )
+    timings: Optional[dict[str, float]] = Field(
+        None,
+        description="各階段耗時（毫秒），如 launch、navigation、query、fill、validation、total_check、save",
+    )
+
+
+class TCSDirtyDay(BaseModel):
+    """尚未同步或同步後已變更的日期"""
+
+    date: DateType = Field(..., description="日期")
+    entry_count: int = Field(..., description="目前的記錄數", ge=0)
+    total_hours: Decimal = Field(..., description="目前的總工時", ge=0)
+    status: Literal["never_synced", "changed"] = Field(
+        ...,
+        description="never_synced：從未成功同步；changed：上次成功同步後內容已變更",
+    )
+    last_synced_at: Optional[datetime] = Field(None, description="上次成功同步時間")
+    last_status: Optional[str] = Field(None, description="最近一次同步結果（success / failed）")
+
+
+class TCSDirtyDaysResponse(BaseModel):
+    """需要同步的日期列表"""
+
+    days: list[TCSDirtyDay] = Field(..., description="需要同步的日期（依日期排序）")
+    count: int = Field(..., description="日期數", ge=0)
+
+
+class TCSFillRun(BaseModel):
+    """一次自動填寫的耗時紀錄"""
+
+    id: int = Field(..., description="紀錄 ID")
+    date: DateType = Field(..., description="填寫的日期")
+    started_at: datetime = Field(..., description="開始時間")
+    dry_run: bool = Field(..., description="是否為乾運行模式")
+    success: bool = Field(..., description="是否成功")
+    fill_mode: Optional[str] = Field(None, description="填寫方式（http / browser）")
+    entry_count: int = Field(..., description="填寫筆數", ge=0)
+    total_ms: float = Field(..., description="總耗時（毫秒）")
+    timings: dict[str, float] = Field(..., description="各階段耗時（毫秒）")
+    message: Optional[str] = Field(None, description="執行訊息")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TCSPhaseStats(BaseModel):
+    """單一階段在多次執行中的耗時統計"""
+
+    phase: str = Field(..., description="階段名稱")
+    count: int = Field(..., description="出現次數", ge=0)
+    mean_ms: float = Field(..., description="平均耗時（毫秒）")
+    p95_ms: float = Field(..., description="第 95 百分位耗時（毫秒）")
+    max_ms: float = Field(..., description="最長耗時（毫秒）")
+
+
+class TCSFillRunsResponse(BaseModel):
+    """自動填寫耗時紀錄"""
+
+    runs: list[TCSFillRun] = Field(..., description="耗時紀錄（新到舊）")
+    count: int = Field(..., description="紀錄數", ge=0)
+    phases: list[TCSPhaseStats] = Field(..., description="各階段耗時統計（依第一次出現的順序）")
+
+
+class TCSRowResult(BaseModel):
+    """單一資料行的代碼驗證結果"""
+
+    row: int = Field(..., description="行號（從 0 開始）", ge=0)
+    project_code: str = Field(..., description="專案代碼")
+    valid: bool = Field(..., description="代碼是否全部有效")
+    invalid_fields: list[str] = Field(default_factory=list, description="無效的欄位")
+
+
+class TCSAutoFillJob(BaseModel):
+    """背景自動填寫工作的狀態"""
+
+    job_id: str = Field(..., description="工作 ID")
+    date: DateType = Field(..., description="要填寫的日期")
+    dry_run: bool = Field(..., description="是否為乾運行模式")
+    force: bool = Field(..., description="是否忽略同步紀錄強制重填")
+    status: Literal["queued", "running", "succeeded", "failed", "cancelled"] = Field(
+        ...,
+        description="queued（等待空閒的工作者）、running、succeeded、failed 或 cancelled",
+    )
+    stage: str = Field(
+        ...,
+        description="目前的步驟，如 queued、starting、connecting、filling、screenshot、saving、done",
+    )
+    progress: float = Field(..., description="進度（0 到 1）", ge=0, le=1)
+    submissions: int = Field(..., description="合併到此工作的提交次數（同一日期的重複提交）", ge=1)
+    rows: list[TCSRowResult] = Field(default_factory=list, description="每行的驗證結果（填寫後才有）")
+    screenshot_path: Optional[str] = Field(None, description="截圖檔案路徑")
+    result: Optional[TCSAutoFillResponse] = Field(None, description="成功時的填寫結果")
+    error: Optional[str] = Field(None, description="失敗原因")
+    submitted_at: datetime = Field(..., description="提交時間")
+    started_at: Optional[datetime] = Field(None, description="開始執行時間")
+    finished_at: Optional[datetime] = Field(None, description="結束時間")
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class TCSAutoFillRangeRequest(BaseModel):
+    """一次填寫多天 TCS 的請求"""
+
+    start_date: DateType = Field(..., description="開始日期（含）", examples=["2025-11-24"])
+    end_date: DateType = Field(..., description="結束日期（含）", examples=["2025-11-28"])
+    dry_run: bool = Field(
+        default=True,
+        description="乾運行模式（預設 True，不會真正儲存）",
+    )
+    force: bool = Field(
+        default=False,
+        description="即使內容與上次成功同步相同也重新填寫",
+    )
+
+
+class TCSAutoFillDayResult(BaseModel):
+    """多天填寫中單一天的結果"""
+
+    date: DateType = Field(..., description="日期")
+    success: bool = Field(..., description="是否成功")
+    message: str = Field(..., description="執行訊息或失敗原因")
+    filled_count: int = Field(..., description="已填寫的記錄數", ge=0)
+    total_hours: Optional[Decimal] = Field(None, description="總工時")
+    skipped: bool = Field(default=False, description="內容未變更，略過填寫")
+    fill_mode: Optional[Literal["http", "browser"]] = Field(None, description="實際使用的填寫方式")
+    screenshot_path: Optional[str] = Field(None, description="截圖檔案路徑")
+    rows: list[TCSRowResult] = Field(default_factory=list, description="每行的驗證結果")
+    timings: Optional[dict[str, float]] = Field(None, description="這一天各階段耗時（毫秒）")
+
+
+class TCSAutoFillRangeResponse(BaseModel):
+    """一次填寫多天 TCS 的響應"""
+
+    start_date: DateType = Field(..., description="開始日期")
+    end_date: DateType = Field(..., description="結束日期")
+    dry_run: bool = Field(..., description="是否為乾運行模式")
+    days: list[TCSAutoFillDayResult] = Field(..., description="有工時記錄的每一天（依日期排序）")
+    succeeded: int = Field(..., description="成功填寫的天數（不含略過）", ge=0)
+    failed: int = Field(..., description="失敗的天數", ge=0)
+    skipped: int = Field(..., description="內容未變更而略過的天數", ge=0)
+    timings: Optional[dict[str, float]] = Field(
+        None,
+        description="整個 TCS 連線共用的耗時（毫秒），如 launch、navigation 與 total；未連線時為 None",
+    )
+
+
+class TCSPreflightRequest(BaseModel):
+    """填寫前檢查的請求"""
+
+    date: DateType = Field(..., description="要檢查的日期", examples=["2025-11-24"])
+
+
+class TCSCodeCheck(BaseModel):
+    """單一代碼在快取中的狀態"""
+
+    field: Literal["project_code", "account_group", "work_category"] = Field(..., description="欄位")
+    code: str = Field(..., description="代碼")
+    status: Literal["valid", "invalid", "unknown"] = Field(
+        ...,
+        description="valid / invalid：TCS 上次回覆的結果；unknown：從未驗證或快取已過期",
+    )
+    name: Optional[str] = Field(None, description="TCS 回覆的名稱或錯誤訊息")
+    checked_at: Optional[datetime] = Field(None, description="上次驗證時間")
+
+
+class TCSPreflightRow(BaseModel):
+    """單一資料行的填寫前檢查結果"""
+
+    row: int = Field(..., description="行號（從 0 開始）", ge=0)
+    project_code: str = Field(..., description="專案代碼")
+    codes: list[TCSCodeCheck] = Field(..., description="專案、模組、工作類別代碼的狀態")
+
+
+class TCSPreflightResponse(BaseModel):
+    """填寫前檢查的響應（只查本地資料，不連線 TCS）"""
+
+    date: DateType = Field(..., description="日期")
+    ok: bool = Field(..., description="資料完整且沒有已知無效的代碼")
+    errors: list[str] = Field(default_factory=list, description="資料驗證與已知無效代碼的錯誤訊息")
+    rows: list[TCSPreflightRow] = Field(default_factory=list, description="每行代碼的快取狀態")
+    invalid_count: int = Field(..., description="已知無效的代碼數", ge=0)
+    unknown_count: int = Field(..., description="尚未驗證或已過期的代碼數", ge=0)
@@ -126,7 +126,8 @@ class TimeEntryList(BaseModel):
     """Schema for list of time entries."""
 
     items: list[TimeEntryResponse]
-    total: int = Field(..., description="總數量")
+    total: Optional[int] = Field(None, description="總數量（cursor 分頁時需 include_total=true 才計算）")
+    next_cursor: Optional[str] = Field(None, description="下一頁的 cursor（cursor 分頁，沒有下一頁時為 null）")
 
 
 class TimeEntryDateRange(BaseModel):
@@ -0,0 +1,113 @@
+"""
+Project usage summary service.
+
+Provides rebuild and verification of the materialized project_usage table
+against a full recompute from time_entries.
+"""
+
+from decimal import Decimal
+from typing import Dict, List, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.models.project_usage import ProjectUsage, usage_totals_select
+from app.models.time_entry import TimeEntry
+
+
+def _recomputed_totals(db: Session) -> Dict[int, Tuple[Decimal, Decimal]]:
+    """Full recompute of (deduct_hours, non_deduct_hours) per project."""
+    return {
+        project_id: (Decimal(str(deduct or 0)), Decimal(str(non_deduct or 0)))
+        for project_id, deduct, non_deduct in db.execute(usage_totals_select())
+    }
+
+
+def rebuild_project_usage(db: Session) -> int:
+    """
+    Rebuild the whole project_usage table from time_entries.
+
+    The caller is responsible for committing.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Number of summary rows written
+    """
+    totals = _recomputed_totals(db)
+    table = ProjectUsage.__table__
+
+    db.execute(delete(table))
+    if totals:
+        db.execute(
+            insert(table),
+            [
+                {
+                    "project_id": project_id,
+                    "deduct_hours": deduct,
+                    "non_deduct_hours": non_deduct,
+                }
+                for project_id, (deduct, non_deduct) in totals.items()
+            ],
+        )
+    db.expire_all()
+
+    return len(totals)
+
+
+def verify_project_usage(db: Session) -> List[dict]:
+    """
+    Compare project_usage with a full recompute from time_entries.
+
+    Args:
+        db: Database session
+
+    Returns:
+        List of mismatches, each with project_id, expected and stored totals.
+        An empty list means the summary is consistent.
+    """
+    expected = _recomputed_totals(db)
+    stored = {
+        usage.project_id: (
+            Decimal(str(usage.deduct_hours or 0)),
+            Decimal(str(usage.non_deduct_hours or 0)),
+        )
+        for usage in db.query(ProjectUsage).all()
+    }
+
+    zero = (Decimal("0"), Decimal("0"))
+    mismatches = []
+    for project_id in sorted(set(expected) | set(stored)):
+        expected_totals = expected.get(project_id, zero)
+        stored_totals = stored.get(project_id, zero)
+        if expected_totals != stored_totals:
+            mismatches.append({
+                "project_id": project_id,
+                "expected_deduct_hours": expected_totals[0],
+                "expected_non_deduct_hours": expected_totals[1],
+                "stored_deduct_hours": stored_totals[0],
+                "stored_non_deduct_hours": stored_totals[1],
+            })
+
+    return mismatches
+
+
+def ensure_project_usage(db: Session) -> bool:
+    """
+    Build project_usage on first start of a database that predates it.
+
+    Args:
+        db: Database session
+
+    Returns:
+        True if the summary was rebuilt and committed
+    """
+    if db.query(ProjectUsage).first() is not None:
+        return False
+    if db.query(TimeEntry.id).first() is None:
+        return False
+
+    rebuild_project_usage(db)
+    db.commit()
+    return True
@@ -7,62 +7,32 @@ and approved hours tracking.
 
 from decimal import Decimal
 from typing import List, Optional
-from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from app.models.time_entry import TimeEntry
 from app.models.project import Project
-from app.models.work_category import WorkCategory
+from app.models.project_usage import ProjectUsage
 from app.schemas import ProjectStats
 
 
-def calculate_project_stats(db: Session, project_id: int) -> Optional[ProjectStats]:
+def _build_project_stats(
+    project: Project,
+    used_hours: Decimal,
+    non_deduct_hours: Decimal,
+) -> ProjectStats:
     """
-    Calculate statistics for a specific project.
+    Build ProjectStats from a project and its aggregated hours.
+
+    Shared by the single-project and all-projects paths so both apply
+    the same approved hours, usage rate and warning level rules.
 
     Args:
-        db: Database session
-        project_id: ID of the project to calculate stats for
+        project: Project the hours belong to
+        used_hours: Sum of hours where deduct_approved_hours=True
+        non_deduct_hours: Sum of hours where deduct_approved_hours=False
 
     Returns:
-        ProjectStats schema with calculated metrics, or None if project not found
-
-    Business Rules:
-        - used_hours: Sum of hours where deduct_approved_hours=True
-        - non_deduct_hours: Sum of hours where deduct_approved_hours=False
-        - total_hours: used_hours + non_deduct_hours
-        - usage_rate: (used_hours / approved_hours) * 100
-        - warning_level: none (<80%), warning (80-99%), danger (≥100%)
+        ProjectStats schema with calculated metrics
     """
-    # Get project
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
-        return None
-
-    # Calculate used hours (deduct_approved_hours=True)
-    used_hours_query = (
-        db.query(func.sum(TimeEntry.hours))
-        .join(WorkCategory)
-        .filter(
-            TimeEntry.project_id == project_id,
-            WorkCategory.deduct_approved_hours == True,
-        )
-        .scalar()
-    )
-    used_hours = Decimal(str(used_hours_query or 0))
-
-    # Calculate non-deduct hours (deduct_approved_hours=False)
-    non_deduct_hours_query = (
-        db.query(func.sum(TimeEntry.hours))
-        .join(WorkCategory)
-        .filter(
-            TimeEntry.project_id == project_id,
-            WorkCategory.deduct_approved_hours == False,
-        )
-        .scalar()
-    )
-    non_deduct_hours = Decimal(str(non_deduct_hours_query or 0))
-
     # Calculate total hours
     total_hours = used_hours + non_deduct_hours
 
@@ -105,29 +75,73 @@ def calculate_project_stats(db: Session, project_id: int) -> Optional[ProjectSta
     )
 
 
+def calculate_project_stats(db: Session, project_id: int) -> Optional[ProjectStats]:
+    """
+    Calculate statistics for a specific project.
+
+    Args:
+        db: Database session
+        project_id: ID of the project to calculate stats for
+
+    Returns:
+        ProjectStats schema with calculated metrics, or None if project not found
+
+    Hours are read from the project_usage summary, which is kept in step
+    with time_entries on every flush (see app.models.project_usage).
+
+    Business Rules:
+        - used_hours: Sum of hours where deduct_approved_hours=True
+        - non_deduct_hours: Sum of hours where deduct_approved_hours=False
+        - total_hours: used_hours + non_deduct_hours
+        - usage_rate: (used_hours / approved_hours) * 100
+        - warning_level: none (<80%), warning (80-99%), danger (≥100%)
+    """
+    # Get project together with its materialized usage totals (one row)
+    row = (
+        db.query(Project, ProjectUsage.deduct_hours, ProjectUsage.non_deduct_hours)
+        .outerjoin(ProjectUsage, ProjectUsage.project_id == Project.id)
+        .filter(Project.id == project_id)
+        .first()
+    )
+    if not row:
+        return None
+
+    project, deduct_hours, non_deduct_hours = row
+    used_hours = Decimal(str(deduct_hours or 0))
+    non_deduct_hours = Decimal(str(non_deduct_hours or 0))
+
+    return _build_project_stats(project, used_hours, non_deduct_hours)
+
+
 def calculate_all_project_stats(db: Session) -> List[ProjectStats]:
     """
     Calculate statistics for all active projects.
 
+    Reads the project_usage summary (one row per project, kept in step
+    with time_entries on every flush), so the dashboard is one query that
+    never scans time_entries.
+
     Args:
         db: Database session
 
     Returns:
         List of ProjectStats for all projects with time entries
     """
-    # Get all projects with time entries
-    projects = (
-        db.query(Project)
-        .join(TimeEntry)
+    rows = (
+        db.query(Project, ProjectUsage.deduct_hours, ProjectUsage.non_deduct_hours)
+        .join(ProjectUsage, ProjectUsage.project_id == Project.id)
         .filter(Project.deleted_at.is_(None))
-        .distinct()
+        # A project whose entries were all deleted keeps a zeroed summary row
+        .filter((ProjectUsage.deduct_hours != 0) | (ProjectUsage.non_deduct_hours != 0))
+        .order_by(Project.id)
         .all()
     )
 
-    stats_list = []
-    for project in projects:
-        stats = calculate_project_stats(db, project.id)
-        if stats:
-            stats_list.append(stats)
-
-    return stats_list
+    return [
+        _build_project_stats(
+            project,
+            Decimal(str(deduct_hours or 0)),
+            Decimal(str(non_deduct_hours or 0)),
+        )
+        for project, deduct_hours, non_deduct_hours in rows
+    ]
@@ -0,0 +1,139 @@
+"""
+TCS code cache service.
+
+Remembers what TCS answered for each project, module and work category
+code during auto-fills, and checks a day's entries against those answers
+so codes TCS is known to refuse are rejected before a browser is launched.
+"""
+
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.tcs_code_cache import TCSCodeCache
+from app.schemas import TCSCodeCheck, TCSPreflightRow
+
+# Code fields of an automation entry, in TCS column order
+CODE_FIELDS = ("project_code", "account_group", "work_category")
+
+FIELD_LABELS = {
+    "project_code": "專案代碼",
+    "account_group": "模組代碼",
+    "work_category": "工作類別",
+}
+
+
+def _entry_codes(entry: Dict) -> Dict[str, str]:
+    """Codes an entry fills into TCS (an empty module is filled as A00)."""
+    return {
+        "project_code": entry.get("project_code") or "",
+        "account_group": entry.get("account_group") or "A00",
+        "work_category": entry.get("work_category") or "",
+    }
+
+
+def record_code_validations(
+    db: Session,
+    row_events: Iterable[Dict],
+    checked_at: Optional[datetime] = None,
+) -> int:
+    """
+    Upsert the codes of validated rows into the cache and commit.
+
+    Only definite answers are cached: a resolved name means valid, a name
+    containing 錯誤 means TCS refused the code. An empty name (validation
+    did not finish) is skipped.
+
+    Args:
+        db: Database session
+        row_events: "row" progress events from the automation
+        checked_at: Validation timestamp (defaults to now)
+
+    Returns:
+        Number of cached codes
+    """
+    checked_at = checked_at or datetime.utcnow()
+    answers: Dict[Tuple[str, str], Tuple[str, bool]] = {}
+    for event in row_events:
+        for field in CODE_FIELDS:
+            code, name = event["codes"][field], event["names"][field]
+            if code and name:
+                answers[(field, code)] = (name, "錯誤" not in name)
+    if not answers:
+        return 0
+
+    existing = {
+        (row.field, row.code): row
+        for row in db.query(TCSCodeCache).filter(
+            TCSCodeCache.code.in_({code for _, code in answers})
+        )
+    }
+    for key, (name, valid) in answers.items():
+        row = existing.get(key)
+        if row is None:
+            row = TCSCodeCache(field=key[0], code=key[1])
+            db.add(row)
+        row.name = name
+        row.valid = valid
+        row.checked_at = checked_at
+
+    db.commit()
+    return len(answers)
+
+
+def check_codes(
+    db: Session,
+    tcs_entries: List[Dict],
+    ttl: timedelta,
+    now: Optional[datetime] = None,
+) -> List[TCSPreflightRow]:
+    """
+    Check the codes of a day's entries against the cache in one query.
+
+    Args:
+        db: Database session
+        tcs_entries: Entries in automation format
+        ttl: How long a cached answer stays trusted
+        now: Current time (defaults to now)
+
+    Returns:
+        One row per entry; each code is "valid", "invalid" or "unknown"
+        (never validated, or cached longer ago than ttl)
+    """
+    now = now or datetime.utcnow()
+    codes = [_entry_codes(entry) for entry in tcs_entries]
+    cached = {
+        (row.field, row.code): row
+        for row in db.query(TCSCodeCache).filter(
+            TCSCodeCache.code.in_({code for row in codes for code in row.values() if code})
+        )
+    }
+
+    rows = []
+    for idx, row_codes in enumerate(codes):
+        checks = []
+        for field in CODE_FIELDS:
+            hit = cached.get((field, row_codes[field]))
+            if hit is None or now - hit.checked_at > ttl:
+                checks.append(TCSCodeCheck(field=field, code=row_codes[field], status="unknown"))
+            else:
+                checks.append(TCSCodeCheck(
+                    field=field,
+                    code=row_codes[field],
+                    status="valid" if hit.valid else "invalid",
+                    name=hit.name,
+                    checked_at=hit.checked_at,
+                ))
+        rows.append(TCSPreflightRow(row=idx, project_code=row_codes["project_code"], codes=checks))
+    return rows
+
+
+def describe_invalid_codes(rows: List[TCSPreflightRow]) -> List[str]:
+    """Messages for the codes TCS is known to refuse, e.g. 第 2 筆 工作類別 BAD（錯誤：查無代碼 BAD）."""
+    return [
+        f"第 {row.row + 1} 筆 {FIELD_LABELS[check.field]} {check.code}（{check.name}）"
+        for row in rows
+        for check in row.codes
+        if check.status == "invalid"
+    ]
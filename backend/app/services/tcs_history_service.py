@@ -0,0 +1,117 @@
+"""
+TCS auto-fill history service.
+
+Appends the per-phase timings of every auto-fill run to a local history
+and summarizes them, so slow phases stand out across runs.
+"""
+
+import math
+from datetime import date as DateType, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.tcs_fill_run import TCSFillRun
+from app.schemas import TCSPhaseStats
+
+
+def record_fill_run(
+    db: Session,
+    target_date: DateType,
+    started_at: datetime,
+    dry_run: bool,
+    success: bool,
+    fill_mode: Optional[str],
+    entry_count: int,
+    total_ms: float,
+    timings: Dict[str, float],
+    message: str,
+) -> TCSFillRun:
+    """
+    Append one auto-fill run to the history and commit.
+
+    Args:
+        db: Database session
+        target_date: Work date that was filled
+        started_at: Timestamp when the fill started
+        dry_run: Whether the run was a dry run
+        success: Whether the run succeeded
+        fill_mode: Fill path that produced the result, None if none finished
+        entry_count: Number of filled entries
+        total_ms: Wall time of the whole fill in milliseconds
+        timings: Per-phase timings in milliseconds
+        message: Result or error message
+
+    Returns:
+        The created history row
+    """
+    run = TCSFillRun(
+        date=target_date,
+        started_at=started_at,
+        dry_run=dry_run,
+        success=success,
+        fill_mode=fill_mode,
+        entry_count=entry_count,
+        total_ms=round(total_ms, 1),
+        timings={phase: round(ms, 1) for phase, ms in timings.items()},
+        message=message,
+    )
+    db.add(run)
+    db.commit()
+    db.refresh(run)
+    return run
+
+
+def list_fill_runs(
+    db: Session,
+    target_date: Optional[DateType] = None,
+    limit: int = 50,
+) -> List[TCSFillRun]:
+    """
+    List the most recent auto-fill runs, newest first.
+
+    Args:
+        db: Database session
+        target_date: Only runs for this work date, None for all dates
+        limit: Maximum number of runs
+
+    Returns:
+        History rows, newest first
+    """
+    query = db.query(TCSFillRun)
+    if target_date is not None:
+        query = query.filter(TCSFillRun.date == target_date)
+    return (
+        query.order_by(TCSFillRun.started_at.desc(), TCSFillRun.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def summarize_phases(runs: List[TCSFillRun]) -> List[TCSPhaseStats]:
+    """
+    Summarize the timings of each phase across runs.
+
+    Args:
+        runs: History rows
+
+    Returns:
+        One entry per phase, in the order phases first appear
+    """
+    samples: Dict[str, List[float]] = {}
+    for run in runs:
+        for phase, ms in (run.timings or {}).items():
+            samples.setdefault(phase, []).append(ms)
+
+    stats = []
+    for phase, values in samples.items():
+        ordered = sorted(values)
+        p95 = ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+        stats.append(TCSPhaseStats(
+            phase=phase,
+            count=len(values),
+            mean_ms=round(sum(values) / len(values), 1),
+            p95_ms=p95,
+            max_ms=ordered[-1],
+        ))
+    return stats
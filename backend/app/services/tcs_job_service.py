@@ -0,0 +1,210 @@
+"""
+TCS auto-fill job service.
+
+Runs auto-fill requests as background jobs so the client polls for the
+result instead of holding a request open for the whole browser session.
+At most max_workers jobs run at once, and a submission for a date that
+already has an active job joins that job instead of starting another
+browser. Each job keeps an ordered list of progress events that clients
+can follow while it runs, and a job can be cancelled.
+"""
+
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import date as DateType, datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+
+class TCSJobConflict(Exception):
+    """A job with different options is already active for the date."""
+
+
+class TCSAutoFillJob:
+    """
+    State of one auto-fill job, updated by its worker as it runs.
+
+    status moves from queued to running to succeeded, failed or cancelled;
+    stage and progress describe the step the worker is currently in.
+    events holds every progress event in order, each with a sequence
+    number and the milliseconds elapsed since submission.
+    """
+
+    def __init__(self, target_date: DateType, dry_run: bool, force: bool):
+        self.job_id = uuid.uuid4().hex
+        self.date = target_date
+        self.dry_run = dry_run
+        self.force = force
+        self.status = "queued"
+        self.stage = "queued"
+        self.progress = 0.0
+        self.submissions = 1
+        self.rows: List[Dict] = []
+        self.screenshot_path: Optional[str] = None
+        self.result = None
+        self.error: Optional[str] = None
+        self.submitted_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.events: List[Dict] = []
+        self._begin = time.monotonic()
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def emit(self, event: Dict):
+        """Append a progress event and wake up the clients following the job."""
+        self.events.append({
+            "seq": len(self.events),
+            "elapsed_ms": round((time.monotonic() - self._begin) * 1000, 1),
+            **event,
+        })
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def report(self, stage: str, progress: float):
+        """Record the step the worker has reached."""
+        self.stage = stage
+        self.progress = progress
+        self.emit({"type": "stage", "stage": stage, "progress": progress})
+
+    async def follow(self, after: int = -1) -> AsyncIterator[Dict]:
+        """
+        Yield the events with a sequence number above after, then each new
+        event as it is emitted, until the job has finished.
+        """
+        seq = after + 1
+        while True:
+            changed = self._changed
+            while seq < len(self.events):
+                yield self.events[seq]
+                seq += 1
+            if self.done:
+                return
+            await changed.wait()
+
+
+JobRunner = Callable[[TCSAutoFillJob], Awaitable[object]]
+
+
+class TCSJobManager:
+    """
+    Bounded background runner for auto-fill jobs.
+
+    Jobs run as tasks on the event loop that submitted them, limited by a
+    semaphore. Finished jobs are kept for polling until more than
+    max_finished jobs have finished after them.
+    """
+
+    def __init__(self, max_workers: int = 1, max_finished: int = 100):
+        self.max_workers = max_workers
+        self.max_finished = max_finished
+        self._jobs: "OrderedDict[str, TCSAutoFillJob]" = OrderedDict()
+        self._active: Dict[DateType, TCSAutoFillJob] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def submit(
+        self,
+        target_date: DateType,
+        dry_run: bool,
+        force: bool,
+        run: JobRunner,
+    ) -> Tuple[TCSAutoFillJob, bool]:
+        """
+        Queue a job, or join the active job for the same date.
+
+        Args:
+            target_date: Work date to fill
+            dry_run: Whether the job must not save
+            force: Whether the job ignores the sync ledger
+            run: Coroutine function that performs the fill and returns its result
+
+        Returns:
+            (job, created): created is False when the submission joined an active job
+
+        Raises:
+            TCSJobConflict: When the active job for the date has a different dry_run
+        """
+        active = self._active.get(target_date)
+        if active is not None:
+            if active.dry_run != dry_run:
+                raise TCSJobConflict(
+                    f"{target_date} already has an active "
+                    f"{'dry-run' if active.dry_run else 'save'} job {active.job_id}"
+                )
+            active.submissions += 1
+            return active, False
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+
+        job = TCSAutoFillJob(target_date, dry_run, force)
+        self._jobs[job.job_id] = job
+        self._active[target_date] = job
+        self._tasks[job.job_id] = asyncio.create_task(self._run(job, run))
+        return job, True
+
+    def get(self, job_id: str) -> Optional[TCSAutoFillJob]:
+        """Return a job by id, None if unknown or already evicted."""
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[TCSAutoFillJob]:
+        """Return the retained jobs, newest first."""
+        return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation of a queued or running job.
+
+        Returns:
+            False if the job is unknown or already finished
+        """
+        task = self._tasks.get(job_id)
+        if task is None:
+            return False
+        task.cancel()
+        return True
+
+    async def _run(self, job: TCSAutoFillJob, run: JobRunner):
+        try:
+            async with self._semaphore:
+                job.status = "running"
+                job.started_at = datetime.utcnow()
+                job.report("starting", 0.0)
+                job.result = await run(job)
+            job.status = "succeeded"
+            job.report("done", 1.0)
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            job.error = "job was cancelled"
+        except Exception as e:
+            job.status = "failed"
+            job.error = getattr(e, "detail", None) or str(e)
+        finally:
+            job.finished_at = datetime.utcnow()
+            self._active.pop(job.date, None)
+            self._tasks.pop(job.job_id, None)
+            self._evict()
+            job.emit({"type": "done", "status": job.status, "error": job.error})
+
+    def _evict(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.done]
+        for job_id in finished[: max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+    async def wait(self, job_id: str):
+        """Wait until a job finishes (returns at once for finished jobs)."""
+        task = self._tasks.get(job_id)
+        if task is not None:
+            await asyncio.wait([task])
+
+    async def close(self):
+        """Cancel running jobs and wait for them to stop."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -5,9 +5,12 @@ Provides business logic for formatting time entries into TCS system format
 and automation support.
 """
 
+import hashlib
+import json
 from datetime import date as DateType
 from decimal import Decimal
-from typing import List, Dict
+from itertools import groupby
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from sqlalchemy.orm import Session
 
 from app.models.time_entry import TimeEntry
@@ -17,6 +20,37 @@ from app.models.work_category import WorkCategory
 from app.schemas import TCSFormatResponse, TCSEntryFormat, TCSEntryData
 
 
+def _load_by_id(db: Session, model, ids: Iterable[int]) -> Dict[int, object]:
+    """Load rows of a model by primary key in one query, returned as an id→object map."""
+    ids = {id_ for id_ in ids if id_ is not None}
+    if not ids:
+        return {}
+    return {obj.id: obj for obj in db.query(model).filter(model.id.in_(ids)).all()}
+
+
+def prefetch_related(
+    date_entries: List[TimeEntry],
+    db: Session,
+) -> Tuple[Dict[int, Project], Dict[int, AccountGroup], Dict[int, WorkCategory]]:
+    """
+    Prefetch the Project, AccountGroup and WorkCategory of a list of entries.
+
+    Issues at most one query per model, so formatting a day or a month costs
+    a constant number of queries instead of three per entry.
+
+    Args:
+        date_entries: List of TimeEntry objects
+        db: Database session
+
+    Returns:
+        (projects, account_groups, work_categories) id→object maps
+    """
+    projects = _load_by_id(db, Project, (e.project_id for e in date_entries))
+    account_groups = _load_by_id(db, AccountGroup, (e.account_group_id for e in date_entries))
+    work_categories = _load_by_id(db, WorkCategory, (e.work_category_id for e in date_entries))
+    return projects, account_groups, work_categories
+
+
 def format_date_for_tcs(date_entries: List[TimeEntry], target_date: DateType, db: Session) -> TCSFormatResponse:
     """
     Format time entries for a specific date into TCS format.
@@ -42,16 +76,35 @@ def format_date_for_tcs(date_entries: List[TimeEntry], target_date: DateType, db
 
         (repeat for each entry)
     """
+    # Get related data for all entries up front
+    projects, account_groups, work_categories = prefetch_related(date_entries, db)
+
+    rows = (
+        (
+            entry,
+            projects.get(entry.project_id),
+            account_groups.get(entry.account_group_id),
+            work_categories.get(entry.work_category_id),
+        )
+        for entry in date_entries
+    )
+    return _format_rows_for_tcs(target_date, rows)
+
+
+def _format_rows_for_tcs(
+    target_date: DateType,
+    rows: Iterable[Tuple[TimeEntry, Optional[Project], Optional[AccountGroup], Optional[WorkCategory]]],
+) -> TCSFormatResponse:
+    """
+    Format one day of (entry, project, account_group, work_category) rows.
+
+    Rows missing any related object are skipped.
+    """
     formatted_entries = []
     formatted_lines = [f"日期: {target_date.strftime('%Y/%m/%d')}"]
     total_hours = Decimal("0")
 
-    for entry in date_entries:
-        # Get related data
-        project = db.query(Project).filter(Project.id == entry.project_id).first()
-        account_group = db.query(AccountGroup).filter(AccountGroup.id == entry.account_group_id).first()
-        work_category = db.query(WorkCategory).filter(WorkCategory.id == entry.work_category_id).first()
-
+    for entry, project, account_group, work_category in rows:
         if not all([project, account_group, work_category]):
             continue
 
@@ -94,6 +147,93 @@ def format_date_for_tcs(date_entries: List[TimeEntry], target_date: DateType, db
     )
 
 
+def iter_date_range_formats(
+    db: Session,
+    start_date: DateType,
+    end_date: DateType,
+) -> Iterator[TCSFormatResponse]:
+    """
+    Format every date with time entries in [start_date, end_date].
+
+    Fetches all entries of the range with their related rows in a single
+    ordered query and groups them by date in one streaming pass, so the
+    cost scales with the number of entries rather than the number of days.
+    Dates without entries are not yielded.
+
+    Args:
+        db: Database session
+        start_date: First date of the range (inclusive)
+        end_date: Last date of the range (inclusive)
+
+    Yields:
+        TCSFormatResponse for each date with entries, in date order
+    """
+    rows = (
+        db.query(TimeEntry, Project, AccountGroup, WorkCategory)
+        .outerjoin(Project, Project.id == TimeEntry.project_id)
+        .outerjoin(AccountGroup, AccountGroup.id == TimeEntry.account_group_id)
+        .outerjoin(WorkCategory, WorkCategory.id == TimeEntry.work_category_id)
+        .filter(TimeEntry.date >= start_date, TimeEntry.date <= end_date)
+        .order_by(TimeEntry.date.asc(), TimeEntry.display_order.asc(), TimeEntry.id.asc())
+        .yield_per(500)
+    )
+
+    for entry_date, day_rows in groupby(rows, key=lambda row: row[0].date):
+        yield _format_rows_for_tcs(entry_date, day_rows)
+
+
+def iter_date_range_tcs_entries(
+    db: Session,
+    start_date: DateType,
+    end_date: DateType,
+) -> Iterator[Tuple[DateType, List[Dict]]]:
+    """
+    Convert every date with time entries in [start_date, end_date] to the
+    automation format, from a single ordered query.
+
+    Entries whose project, module or work category no longer exists get a
+    None code, which validate_tcs_data rejects for that day only. A missing
+    module row is kept apart from an entry without a module, which is
+    filled as "A00".
+
+    Args:
+        db: Database session
+        start_date: First date of the range (inclusive)
+        end_date: Last date of the range (inclusive)
+
+    Yields:
+        (date, tcs_entries) for each date with entries, in date order
+    """
+    rows = (
+        db.query(TimeEntry, Project.code, AccountGroup.code, WorkCategory.code)
+        .outerjoin(Project, Project.id == TimeEntry.project_id)
+        .outerjoin(AccountGroup, AccountGroup.id == TimeEntry.account_group_id)
+        .outerjoin(WorkCategory, WorkCategory.id == TimeEntry.work_category_id)
+        .filter(TimeEntry.date >= start_date, TimeEntry.date <= end_date)
+        .order_by(TimeEntry.date.asc(), TimeEntry.display_order.asc(), TimeEntry.id.asc())
+        .yield_per(500)
+    )
+
+    for entry_date, day_rows in groupby(rows, key=lambda row: row[0].date):
+        yield entry_date, [_build_range_tcs_entry(*row) for row in day_rows]
+
+
+def _build_range_tcs_entry(
+    entry: TimeEntry,
+    project_code: Optional[str],
+    account_group_code: Optional[str],
+    work_category_code: Optional[str],
+) -> Dict:
+    """build_tcs_entry for an outer-joined row; a dangling module gets a None code."""
+    tcs_entry = build_tcs_entry(
+        entry, project_code, account_group_code, work_category_code
+    )
+    if entry.account_group_id is not None and account_group_code is None:
+        # 指定的模組已不存在：不可當成未指定模組以 A00 送出
+        tcs_entry["account_group"] = None
+    return tcs_entry
+
+
 def get_date_entries(db: Session, target_date: DateType) -> List[TimeEntry]:
     """
     Get all time entries for a specific date, ordered by display_order.
@@ -108,7 +248,7 @@ def get_date_entries(db: Session, target_date: DateType) -> List[TimeEntry]:
     return (
         db.query(TimeEntry)
         .filter(TimeEntry.date == target_date)
-        .order_by(TimeEntry.display_order.asc())
+        .order_by(TimeEntry.display_order.asc(), TimeEntry.id.asc())
         .all()
     )
 
@@ -129,20 +269,19 @@ def convert_entries_to_tcs_format(date_entries: List[TimeEntry], db: Session) ->
     """
     tcs_entries = []
 
+    # 一次預先載入所有關聯資料（每個 model 最多一次查詢）
+    projects, account_groups, work_categories = prefetch_related(date_entries, db)
+
     for entry in date_entries:
         # 取得關聯資料
-        project = db.query(Project).filter(Project.id == entry.project_id).first()
-        
+        project = projects.get(entry.project_id)
+
         # 模組是選填的，可能為 None
         account_group = None
         if entry.account_group_id:
-            account_group = db.query(AccountGroup).filter(
-                AccountGroup.id == entry.account_group_id
-            ).first()
-        
-        work_category = db.query(WorkCategory).filter(
-            WorkCategory.id == entry.work_category_id
-        ).first()
+            account_group = account_groups.get(entry.account_group_id)
+
+        work_category = work_categories.get(entry.work_category_id)
 
         # 驗證必要資料
         if not project:
@@ -154,25 +293,62 @@ def convert_entries_to_tcs_format(date_entries: List[TimeEntry], db: Session) ->
         if entry.account_group_id and not account_group:
             raise ValueError(f"找不到模組 ID: {entry.account_group_id}")
 
-        # 建立 TCS 格式
-        # 如果沒有指定模組（account_group_id 為 None），預設使用 "A00"
-        account_group_code = account_group.code if account_group else "A00"
-        
-        tcs_entry = {
-            "project_code": project.code,
-            "account_group": account_group_code,
-            "work_category": work_category.code,
-            "hours": float(entry.hours),
-            "description": entry.description or "",
-            "requirement_no": "",  # 目前資料庫沒有這個欄位
-            "progress_rate": 0,  # 目前資料庫沒有這個欄位
-        }
-
-        tcs_entries.append(tcs_entry)
+        tcs_entries.append(build_tcs_entry(
+            entry,
+            project.code,
+            account_group.code if account_group else None,
+            work_category.code,
+        ))
 
     return tcs_entries
 
 
+def build_tcs_entry(
+    entry: TimeEntry,
+    project_code: str,
+    account_group_code: Optional[str],
+    work_category_code: str,
+) -> Dict:
+    """
+    建立單筆 Playwright 格式的記錄
+
+    Args:
+        entry: 時間記錄
+        project_code: 專案代碼
+        account_group_code: 模組代碼（None 表示未指定）
+        work_category_code: 工作類別代碼
+
+    Returns:
+        TCS 自動化腳本需要的單筆記錄
+    """
+    return {
+        "project_code": project_code,
+        # 如果沒有指定模組（account_group_id 為 None），預設使用 "A00"
+        "account_group": account_group_code or "A00",
+        "work_category": work_category_code,
+        "hours": float(entry.hours),
+        "description": entry.description or "",
+        "requirement_no": "",  # 目前資料庫沒有這個欄位
+        "progress_rate": 0,  # 目前資料庫沒有這個欄位
+    }
+
+
+def compute_fingerprint(tcs_entries: List[Dict]) -> str:
+    """
+    計算一天 TCS 記錄的內容指紋
+
+    指紋涵蓋會填入 TCS 的所有欄位與順序，任何欄位變更都會改變指紋。
+
+    Args:
+        tcs_entries: convert_entries_to_tcs_format 的輸出
+
+    Returns:
+        SHA-256 十六進位字串
+    """
+    payload = json.dumps(tcs_entries, ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 def validate_tcs_data(tcs_entries: List[Dict]) -> tuple[bool, List[str]]:
     """
     驗證 TCS 資料是否完整有效
@@ -207,9 +383,9 @@ def validate_tcs_data(tcs_entries: List[Dict]) -> tuple[bool, List[str]]:
         if not entry.get("project_code"):
             errors.append(f"第 {idx} 筆記錄：專案代碼為必填")
 
-        # 模組是選填的，不檢查
-        # if not entry.get("account_group"):
-        #     errors.append(f"第 {idx} 筆記錄：模組為必填")
+        # 模組是選填的（未指定時為 A00），None 表示指定的模組已不存在
+        if "account_group" in entry and entry["account_group"] is None:
+            errors.append(f"第 {idx} 筆記錄：找不到模組")
 
         if not entry.get("work_category"):
             errors.append(f"第 {idx} 筆記錄：工作類別為必填")
@@ -0,0 +1,149 @@
+"""
+TCS sync ledger service.
+
+Tracks which days have been pushed to TCS and whether their entries changed
+since, so unchanged days can be skipped without launching a browser.
+"""
+
+from datetime import date as DateType, datetime
+from decimal import Decimal
+from itertools import groupby
+from typing import List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.models.account_group import AccountGroup
+from app.models.project import Project
+from app.models.tcs_sync_ledger import TCSSyncLedger
+from app.models.time_entry import TimeEntry
+from app.models.work_category import WorkCategory
+from app.schemas import TCSDirtyDay
+from app.services.tcs_service import build_tcs_entry, compute_fingerprint
+
+SYNC_SUCCESS = "success"
+SYNC_FAILED = "failed"
+
+
+def get_sync_ledger(db: Session, target_date: DateType) -> Optional[TCSSyncLedger]:
+    """
+    Get the sync ledger row of a date.
+
+    Args:
+        db: Database session
+        target_date: Work date
+
+    Returns:
+        TCSSyncLedger, or None if the date was never pushed
+    """
+    return db.get(TCSSyncLedger, target_date)
+
+
+def is_unchanged(ledger: Optional[TCSSyncLedger], fingerprint: str) -> bool:
+    """Return True if the last successful push has the same fingerprint."""
+    return ledger is not None and ledger.synced_fingerprint == fingerprint
+
+
+def record_sync_result(
+    db: Session,
+    target_date: DateType,
+    fingerprint: str,
+    success: bool,
+    message: str,
+    entry_count: int,
+    total_hours: Decimal,
+) -> TCSSyncLedger:
+    """
+    Record the outcome of a TCS push and commit.
+
+    A failed attempt keeps the fingerprint of the previous successful push,
+    so the day stays dirty until a push succeeds.
+
+    Args:
+        db: Database session
+        target_date: Work date
+        fingerprint: Fingerprint of the pushed entries
+        success: Whether the push succeeded
+        message: Result or error message
+        entry_count: Number of pushed entries
+        total_hours: Total pushed hours
+
+    Returns:
+        The updated ledger row
+    """
+    now = datetime.utcnow()
+    ledger = db.get(TCSSyncLedger, target_date)
+    if ledger is None:
+        ledger = TCSSyncLedger(date=target_date)
+        db.add(ledger)
+
+    ledger.last_fingerprint = fingerprint
+    ledger.last_status = SYNC_SUCCESS if success else SYNC_FAILED
+    ledger.last_message = message
+    ledger.last_attempted_at = now
+    if success:
+        ledger.synced_fingerprint = fingerprint
+        ledger.synced_entry_count = entry_count
+        ledger.synced_total_hours = total_hours
+        ledger.synced_at = now
+
+    db.commit()
+    db.refresh(ledger)
+    return ledger
+
+
+def list_dirty_days(
+    db: Session,
+    start_date: Optional[DateType] = None,
+    end_date: Optional[DateType] = None,
+) -> List[TCSDirtyDay]:
+    """
+    List days whose entries differ from their last successful TCS push.
+
+    Reads every entry of the range with its codes and ledger row in a single
+    ordered query and fingerprints each day in one pass.
+
+    Args:
+        db: Database session
+        start_date: First date (inclusive), None for no lower bound
+        end_date: Last date (inclusive), None for no upper bound
+
+    Returns:
+        Dirty days in date order; status is "never_synced" or "changed"
+    """
+    query = (
+        db.query(TimeEntry, Project.code, AccountGroup.code, WorkCategory.code, TCSSyncLedger)
+        .outerjoin(Project, Project.id == TimeEntry.project_id)
+        .outerjoin(AccountGroup, AccountGroup.id == TimeEntry.account_group_id)
+        .outerjoin(WorkCategory, WorkCategory.id == TimeEntry.work_category_id)
+        .outerjoin(TCSSyncLedger, TCSSyncLedger.date == TimeEntry.date)
+    )
+    if start_date is not None:
+        query = query.filter(TimeEntry.date >= start_date)
+    if end_date is not None:
+        query = query.filter(TimeEntry.date <= end_date)
+    rows = query.order_by(
+        TimeEntry.date.asc(), TimeEntry.display_order.asc(), TimeEntry.id.asc()
+    ).yield_per(500)
+
+    dirty_days = []
+    for entry_date, day_rows in groupby(rows, key=lambda row: row[0].date):
+        day_rows = list(day_rows)
+        ledger = day_rows[0][4]
+        tcs_entries = [
+            build_tcs_entry(entry, project_code, account_group_code, work_category_code)
+            for entry, project_code, account_group_code, work_category_code, _ in day_rows
+        ]
+        if is_unchanged(ledger, compute_fingerprint(tcs_entries)):
+            continue
+
+        never_synced = ledger is None or ledger.synced_fingerprint is None
+        dirty_days.append(TCSDirtyDay(
+            date=entry_date,
+            entry_count=len(day_rows),
+            total_hours=sum((row[0].hours for row in day_rows), Decimal("0")),
+            status="never_synced" if never_synced else "changed",
+            last_synced_at=ledger.synced_at if ledger else None,
+            last_status=ledger.last_status if ledger else None,
+        ))
+
+    return dirty_days
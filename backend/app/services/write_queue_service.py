@@ -0,0 +1,172 @@
+"""
+Group-commit write queue.
+
+SQLite has a single writer, and every commit pays for a sync to disk.
+Instead of each request committing on its own, mutations are handed to
+one writer thread, which runs the ones that arrive within a short window
+in a single transaction and commits once. Each caller still gets its own
+result or its own exception, as if its mutation had run alone.
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session, sessionmaker
+
+# A mutation: runs against the writer's session, flushes its changes and
+# returns a result that stays valid after the session is closed.
+WriteOp = Callable[[Session], Any]
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Single writer thread that batches mutations into shared commits.
+
+    A batch starts with the first queued mutation and takes every
+    mutation that arrives within window seconds, up to max_batch. The
+    mutations run in order on one session. If one raises, the transaction
+    is rolled back, that caller gets the exception and the rest of the
+    batch is run again without it. If the commit itself fails, the batch
+    falls back to one transaction per mutation. Any other failure (opening
+    the session, rolling back) fails the whole batch; the writer thread
+    keeps serving the next one.
+    """
+
+    # How often a waiting submit() checks that the writer thread is alive
+    LIVENESS_INTERVAL = 1.0
+
+    def __init__(self, session_factory: sessionmaker, window: float = 0.002, max_batch: int = 64):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.writes = 0
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, op: WriteOp) -> Any:
+        """
+        Queue a mutation and wait until its batch is committed.
+
+        Returns:
+            What op returned
+
+        Raises:
+            Whatever op (or its commit) raised
+            RuntimeError: If the queue is closed or the writer thread died
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write queue is closed")
+            if not self._thread.is_alive():
+                raise RuntimeError("Write queue writer thread is not running")
+            self._queue.put((op, future))
+        while True:
+            try:
+                return future.result(timeout=self.LIVENESS_INTERVAL)
+            except FutureTimeoutError:
+                if not self._thread.is_alive() and not future.done():
+                    raise RuntimeError("Write queue writer thread is not running")
+
+    def close(self, timeout: Optional[float] = None):
+        """Commit the mutations already queued, then stop the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    def _next_batch(self) -> Tuple[List[Tuple[WriteOp, Future]], bool]:
+        """Block for the first mutation, then collect the window's worth."""
+        item = self._queue.get()
+        if item is _STOP:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _run(self):
+        stop = False
+        while not stop:
+            batch, stop = self._next_batch()
+            if not batch:
+                continue
+            try:
+                self._commit_batch(batch)
+            except BaseException as e:
+                # Never leave a caller waiting: fail what is still unresolved
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _commit_batch(self, batch: List[Tuple[WriteOp, Future]]):
+        pending = list(batch)
+        while pending:
+            db = self.session_factory()
+            try:
+                results, failed = [], None
+                for idx, (op, _) in enumerate(pending):
+                    try:
+                        results.append(op(db))
+                    except BaseException as e:
+                        failed = (idx, e)
+                        break
+
+                if failed is not None:
+                    db.rollback()
+                    idx, error = failed
+                    pending.pop(idx)[1].set_exception(error)
+                    continue
+
+                try:
+                    db.commit()
+                except BaseException as e:
+                    db.rollback()
+                    if len(pending) == 1:
+                        pending[0][1].set_exception(e)
+                    else:
+                        self._commit_each(pending)
+                    return
+
+                self.batches += 1
+                self.writes += len(pending)
+                for (_, future), result in zip(pending, results):
+                    future.set_result(result)
+                return
+            finally:
+                db.close()
+
+    def _commit_each(self, pending: List[Tuple[WriteOp, Future]]):
+        """Fallback after a failed shared commit: one transaction per mutation."""
+        for op, future in pending:
+            db = self.session_factory()
+            try:
+                result = op(db)
+                db.commit()
+            except BaseException as e:
+                db.rollback()
+                future.set_exception(e)
+            else:
+                self.batches += 1
+                self.writes += 1
+                future.set_result(result)
+            finally:
+                db.close()
@@ -0,0 +1,240 @@
+"""
+Benchmark mixed read/write throughput of SQLite with and without the
+performance profile (WAL, synchronous=NORMAL, busy_timeout, cache_size,
+mmap_size, temp_store).
+
+Reader threads list a week of time entries with their projects, writer
+threads insert an entry and commit, like the thread-pooled endpoints do.
+Each profile runs against a fresh database file for the same duration.
+With --write-queue every profile runs a second time with the writes
+group-committed through the time-entry write queue.
+
+Usage:
+    python benchmark_sqlite.py                          # 4 readers, 2 writers, 5 s
+    python benchmark_sqlite.py --readers 8 --writers 4 --seconds 10
+    python benchmark_sqlite.py --readers 2 --writers 16 --write-queue
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, List
+
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.config import Settings
+from app.database import Base, create_db_engine, sqlite_pragmas
+from app.models import AccountGroup, Project, TimeEntry, WorkCategory
+from app.services.write_queue_service import WriteQueue
+
+START = date(2025, 11, 3)
+DAYS = 20
+
+PROFILES = {
+    "default": {},
+    "tuned": sqlite_pragmas(Settings(SQLITE_PERFORMANCE_PROFILE=True)),
+}
+
+
+def _seed(SessionLocal, entries: int):
+    db = SessionLocal()
+    try:
+        account_group = AccountGroup(code="A00", name="中概全權")
+        work_category = WorkCategory(code="A07", name="其它")
+        projects = [
+            Project(code=f"商2025智{i:03d}", requirement_code=f"R{i}", name=f"專案 {i}")
+            for i in range(10)
+        ]
+        db.add_all([account_group, work_category, *projects])
+        db.flush()
+        db.add_all(
+            [
+                TimeEntry(
+                    date=START + timedelta(days=i % DAYS),
+                    project_id=projects[i % len(projects)].id,
+                    account_group_id=account_group.id,
+                    work_category_id=work_category.id,
+                    hours=Decimal("1.5"),
+                    description=f"工作 {i}",
+                    display_order=i,
+                )
+                for i in range(entries)
+            ]
+        )
+        db.commit()
+        return [p.id for p in projects], account_group.id, work_category.id
+    finally:
+        db.close()
+
+
+def run_profile(
+    pragmas: Dict,
+    readers: int,
+    writers: int,
+    seconds: float,
+    seed_entries: int = 2000,
+    write_queue: bool = False,
+) -> Dict:
+    """
+    Run the mixed workload on a fresh database file with the given PRAGMAs.
+    With write_queue, writes go through a WriteQueue instead of committing
+    one by one.
+
+    Returns:
+        reads, writes, errors ("database is locked" and other OperationalErrors),
+        ops_per_s, and p50 / p95 latency in milliseconds per operation kind
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_db_engine(
+            f"sqlite:///{os.path.join(tmp, 'bench.db')}", pragmas=pragmas
+        )
+        try:
+            Base.metadata.create_all(bind=engine)
+            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+            project_ids, account_group_id, work_category_id = _seed(
+                SessionLocal, seed_entries
+            )
+            queue = WriteQueue(SessionLocal) if write_queue else None
+
+            latencies: Dict[str, List[float]] = {"read": [], "write": []}
+            errors = []
+            lock = threading.Lock()
+            deadline = time.monotonic() + seconds
+
+            def read():
+                start = START + timedelta(days=random.randrange(DAYS - 7))
+                db = SessionLocal()
+                try:
+                    (
+                        db.query(TimeEntry, Project)
+                        .join(Project, Project.id == TimeEntry.project_id)
+                        .filter(
+                            TimeEntry.date >= start,
+                            TimeEntry.date < start + timedelta(days=7),
+                        )
+                        .order_by(TimeEntry.date.desc(), TimeEntry.display_order)
+                        .all()
+                    )
+                finally:
+                    db.close()
+
+            def add_entry(db):
+                db.add(
+                    TimeEntry(
+                        date=START + timedelta(days=random.randrange(DAYS)),
+                        project_id=random.choice(project_ids),
+                        account_group_id=account_group_id,
+                        work_category_id=work_category_id,
+                        hours=Decimal("0.5"),
+                        description="benchmark",
+                    )
+                )
+                db.flush()
+
+            def write():
+                if queue is not None:
+                    queue.submit(add_entry)
+                    return
+                db = SessionLocal()
+                try:
+                    add_entry(db)
+                    db.commit()
+                finally:
+                    db.close()
+
+            def worker(kind, op):
+                while time.monotonic() < deadline:
+                    begin = time.perf_counter()
+                    try:
+                        op()
+                    except OperationalError as e:
+                        with lock:
+                            errors.append(str(e.orig))
+                        continue
+                    elapsed = (time.perf_counter() - begin) * 1000
+                    with lock:
+                        latencies[kind].append(elapsed)
+
+            threads = [
+                threading.Thread(target=worker, args=("read", read))
+                for _ in range(readers)
+            ]
+            threads += [
+                threading.Thread(target=worker, args=("write", write))
+                for _ in range(writers)
+            ]
+            begin = time.monotonic()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            elapsed = time.monotonic() - begin
+            if queue is not None:
+                queue.close()
+        finally:
+            engine.dispose()
+
+    def percentile(values, q):
+        return (
+            statistics.quantiles(values, n=100)[q - 1]
+            if len(values) >= 2
+            else (values or [0])[0]
+        )
+
+    reads, writes = len(latencies["read"]), len(latencies["write"])
+    return {
+        "reads": reads,
+        "writes": writes,
+        "errors": len(errors),
+        "ops_per_s": (reads + writes) / elapsed,
+        "read_p50": percentile(latencies["read"], 50),
+        "read_p95": percentile(latencies["read"], 95),
+        "write_p50": percentile(latencies["write"], 50),
+        "write_p95": percentile(latencies["write"], 95),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite performance profile benchmark")
+    parser.add_argument("--readers", type=int, default=4, help="reader threads")
+    parser.add_argument("--writers", type=int, default=2, help="writer threads")
+    parser.add_argument("--seconds", type=float, default=5, help="duration per profile")
+    parser.add_argument(
+        "--write-queue",
+        action="store_true",
+        help="also run each profile with group commit",
+    )
+    args = parser.parse_args()
+
+    print(
+        f"{args.readers} readers, {args.writers} writers,"
+        f" {args.seconds:g} s per profile"
+    )
+    print("-" * 102)
+    print(
+        f"{'profile':<14} {'ops/s':>9} {'reads':>8} {'writes':>8} {'errors':>7}"
+        f" {'read p50':>9} {'read p95':>9} {'write p50':>10} {'write p95':>10}  (ms)"
+    )
+    runs = [(name, pragmas, False) for name, pragmas in PROFILES.items()]
+    if args.write_queue:
+        runs += [(f"{name}+queue", pragmas, True) for name, pragmas in PROFILES.items()]
+    for name, pragmas, write_queue in runs:
+        r = run_profile(
+            pragmas, args.readers, args.writers, args.seconds, write_queue=write_queue
+        )
+        print(
+            f"{name:<14} {r['ops_per_s']:>9.1f} {r['reads']:>8} {r['writes']:>8}"
+            f" {r['errors']:>7} {r['read_p50']:>9.1f} {r['read_p95']:>9.1f}"
+            f" {r['write_p50']:>10.1f} {r['write_p95']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Rebuild / verify the project_usage summary table.
+
+The project_usage table is maintained incrementally on every time entry
+change. This script checks it against a full recompute from time_entries
+and can rebuild it (e.g. after bulk edits made outside the ORM).
+
+Usage:
+    python rebuild_project_usage.py            # verify only
+    python rebuild_project_usage.py --rebuild  # rebuild, then verify
+"""
+
+import sys
+
+from app.database import SessionLocal, init_db
+from app.services.project_usage_service import (
+    rebuild_project_usage,
+    verify_project_usage,
+)
+
+
+def main(rebuild: bool = False) -> bool:
+    """Verify (and optionally rebuild) project_usage. Returns True if consistent."""
+    init_db()
+    db = SessionLocal()
+    try:
+        if rebuild:
+            count = rebuild_project_usage(db)
+            db.commit()
+            print(f"  ✓ Rebuilt {count} project usage rows")
+
+        mismatches = verify_project_usage(db)
+        if not mismatches:
+            print("✅ project_usage 與 time_entries 一致")
+            return True
+
+        print(f"❌ 發現 {len(mismatches)} 筆不一致：")
+        for item in mismatches:
+            print(
+                f"  project {item['project_id']}: "
+                f"扣抵 {item['stored_deduct_hours']} (應為 {item['expected_deduct_hours']}), "
+                f"不扣抵 {item['stored_non_deduct_hours']} (應為 {item['expected_non_deduct_hours']})"
+            )
+        print("請執行 python rebuild_project_usage.py --rebuild 重建")
+        return False
+
+    except Exception as e:
+        print(f"Error: {e}")
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("專案工時統計表檢查")
+    print("=" * 60)
+    ok = main(rebuild="--rebuild" in sys.argv[1:])
+    print("=" * 60)
+    sys.exit(0 if ok else 1)
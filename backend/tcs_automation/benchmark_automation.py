@@ -0,0 +1,132 @@
+"""
+TCS 自動化端到端效能測試
+以 TCSAutomation 在本機 TCS 替身伺服器上逐日填寫並儲存，回報每行與每日的填寫時間
+
+每種行數各跑 --days 天（同一個瀏覽器）：
+- 每日填寫：fill_time_entries（查詢、準備行數、填寫、等待驗證）
+- 每行填寫：每日填寫時間 / 行數
+- 邊際每行成本：各行數的平均每日填寫時間對行數的線性迴歸斜率（扣除查詢等固定成本）
+- 儲存：save（含 confirm / alert 對話框處理）
+
+使用方式（在 backend 目錄下，需先執行 playwright install chromium）：
+    python -m tcs_automation.benchmark_automation --days 5 --rows 1,5,10 --latency 100
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Dict, List, Sequence
+
+from .benchmark_fill import fixture_days
+from .stand_in import CONFIRM_MODES, TCSStandIn
+from .tcs_automation import TCSAutomation
+
+
+def run_benchmark(
+    tcs_url: str,
+    fixture,
+    fast_mode: bool = True,
+    headless: bool = True,
+) -> List[Dict]:
+    """
+    以同一個 TCSAutomation 依序填寫並儲存 fixture 中的每一天
+
+    Returns:
+        每天的量測結果：date、rows、fill（秒）、save（秒）
+    """
+    tcs = TCSAutomation(tcs_url)
+    try:
+        tcs.start(headless=headless, dry_run=False, fast_mode=fast_mode)
+        results = []
+        for date_str, entries in fixture:
+            begin = time.perf_counter()
+            tcs.fill_time_entries(date_str, entries)
+            filled = time.perf_counter()
+            tcs.save()
+            saved = time.perf_counter()
+            results.append({
+                'date': date_str,
+                'rows': len(entries),
+                'fill': filled - begin,
+                'save': saved - filled,
+            })
+        return results
+    finally:
+        tcs.close()
+
+
+def summarize(results: List[Dict]) -> Dict:
+    """彙總同一行數的量測結果（毫秒）"""
+    fills = [r['fill'] * 1000 for r in results]
+    saves = [r['save'] * 1000 for r in results]
+    rows = results[0]['rows']
+    return {
+        'rows': rows,
+        'days': len(results),
+        'fill_mean': statistics.mean(fills),
+        'fill_max': max(fills),
+        'per_row': statistics.mean(fills) / rows,
+        'save_mean': statistics.mean(saves),
+        'day_mean': statistics.mean(f + s for f, s in zip(fills, saves)),
+    }
+
+
+def marginal_row_cost(summaries: Sequence[Dict]) -> float:
+    """每多一行增加的平均填寫時間（毫秒），需要至少兩種行數"""
+    slope, _ = statistics.linear_regression(
+        [s['rows'] for s in summaries], [s['fill_mean'] for s in summaries]
+    )
+    return slope
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TCS 自動化端到端效能測試")
+    parser.add_argument("--days", type=int, default=5, help="每種行數填寫的天數")
+    parser.add_argument("--rows", default="1,5,10", help="每天行數，以逗號分隔")
+    parser.add_argument("--latency", type=float, default=100, help="代碼驗證延遲（毫秒）")
+    parser.add_argument("--confirm", choices=CONFIRM_MODES, default="non_today", help="儲存前的 confirm 對話框")
+    parser.add_argument("--no-alert", action="store_true", help="儲存後不顯示 alert")
+    parser.add_argument("--slow", action="store_true", help="使用非快速模式（固定等待）")
+    parser.add_argument("--headed", action="store_true", help="顯示瀏覽器視窗")
+    args = parser.parse_args()
+
+    row_counts = [int(value) for value in args.rows.split(",")]
+    print(f"代碼驗證延遲 {args.latency:g} ms，confirm={args.confirm}，"
+          f"alert={'off' if args.no_alert else 'on'}，{'非快速' if args.slow else '快速'}模式")
+    print("-" * 80)
+    print(f"{'行數':>4} {'天數':>4} {'每日填寫':>10} {'最慢':>10} {'每行填寫':>10} {'儲存':>10} {'每日合計':>10}  (ms)")
+
+    summaries = []
+    with TCSStandIn(
+        validation_latency=args.latency / 1000,
+        confirm_on_save=args.confirm,
+        alert_on_save=not args.no_alert,
+    ) as stand_in:
+        for idx, rows in enumerate(row_counts):
+            # 每種行數使用不同的日期，避免讀到上一輪儲存的資料
+            start = date(2025, 11, 3) + timedelta(days=idx * args.days)
+            fixture = fixture_days(args.days, rows, start=start)
+            # 填寫過程的逐筆輸出會干擾計時結果，先收起來
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = run_benchmark(
+                    stand_in.tcs_url, fixture, fast_mode=not args.slow, headless=not args.headed
+                )
+            summary = summarize(results)
+            summaries.append(summary)
+            print(
+                f"{rows:>4} {summary['days']:>4} {summary['fill_mean']:>10.1f} {summary['fill_max']:>10.1f}"
+                f" {summary['per_row']:>10.1f} {summary['save_mean']:>10.1f} {summary['day_mean']:>10.1f}"
+            )
+
+    if len(set(row_counts)) >= 2:
+        print("-" * 80)
+        print(f"邊際每行成本: {marginal_row_cost(summaries):.1f} ms")
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("TCS 自動化端到端效能測試")
+    print("=" * 80)
+    main()
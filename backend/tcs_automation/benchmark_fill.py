@@ -0,0 +1,132 @@
+"""
+TCS 填寫效能比較：HTTP 客戶端 vs Playwright
+在本機 TCS 替身伺服器上，以相同的測試資料分別用兩種方式填寫並儲存，比較每日耗時與吞吐量
+
+使用方式（在 backend 目錄下）：
+    python -m tcs_automation.benchmark_fill --days 10 --rows 6
+    python -m tcs_automation.benchmark_fill --skip-browser   # 沒有安裝 Chromium 時
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import statistics
+import time
+from datetime import date, timedelta
+from typing import Callable, Dict, List, Tuple
+
+from .http_client import TCSHttpSession
+from .stand_in import TCSStandIn
+from .tcs_automation import AsyncTCSAutomation
+
+
+def fixture_days(days: int, rows: int, start: date = date(2025, 11, 3)) -> List[Tuple[str, List[Dict]]]:
+    """產生測試資料：days 天、每天 rows 筆，專案代碼在天與天之間重複"""
+    fixture = []
+    for day in range(days):
+        entries = [
+            {
+                'project_code': f"商2025智{(day + row) % 4:03d}",
+                'account_group': "A00",
+                'work_category': f"A0{row % 3 + 1}",
+                'requirement_no': f"R{row}" if row % 2 else "",
+                'hours': 1.5 if row % 2 else 1.0,
+                'description': f"第 {day + 1} 天第 {row + 1} 項工作\n- [x] 完成",
+                'progress_rate': 0,
+            }
+            for row in range(rows)
+        ]
+        fixture.append(((start + timedelta(days=day)).strftime("%Y%m%d"), entries))
+    return fixture
+
+
+async def _timed_days(fill_day: Callable, fixture) -> List[float]:
+    durations = []
+    for date_str, entries in fixture:
+        begin = time.perf_counter()
+        await fill_day(date_str, entries)
+        durations.append(time.perf_counter() - begin)
+    return durations
+
+
+async def run_http(tcs_url: str, fixture) -> List[float]:
+    """HTTP 客戶端：每天一個客戶端（共用連線池），查詢、驗證並儲存"""
+    session = TCSHttpSession(tcs_url)
+
+    async def fill_day(date_str, entries):
+        tcs = session.client()
+        try:
+            await tcs.start(dry_run=False)
+            await tcs.fill_time_entries(date_str, entries)
+            await tcs.save()
+        finally:
+            await tcs.close()
+
+    try:
+        return await _timed_days(fill_day, fixture)
+    finally:
+        await session.close()
+
+
+async def run_browser(tcs_url: str, fixture) -> List[float]:
+    """Playwright：同一個瀏覽器依序填寫並儲存每一天（不含瀏覽器啟動時間）"""
+    tcs = AsyncTCSAutomation(tcs_url)
+    await tcs.start(headless=True, dry_run=False, fast_mode=True)
+
+    async def fill_day(date_str, entries):
+        await tcs.fill_time_entries(date_str, entries)
+        await tcs.save()
+
+    try:
+        return await _timed_days(fill_day, fixture)
+    finally:
+        await tcs.close()
+
+
+def _report(name: str, durations: List[float], rows: int):
+    total = sum(durations)
+    print(
+        f"{name:<10} 每日平均 {statistics.mean(durations) * 1000:8.1f} ms"
+        f"  中位數 {statistics.median(durations) * 1000:8.1f} ms"
+        f"  每筆 {statistics.mean(durations) / rows * 1000:7.1f} ms"
+        f"  吞吐量 {len(durations) / total * 60:8.1f} 天/分鐘"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="比較 HTTP 客戶端與 Playwright 的 TCS 填寫效能")
+    parser.add_argument("--days", type=int, default=10, help="填寫天數")
+    parser.add_argument("--rows", type=int, default=6, help="每天筆數")
+    parser.add_argument("--skip-browser", action="store_true", help="只測 HTTP 客戶端")
+    args = parser.parse_args()
+
+    fixture = fixture_days(args.days, args.rows)
+    with TCSStandIn() as stand_in:
+        print(f"TCS 替身伺服器: {stand_in.tcs_url}")
+        print(f"測試資料: {args.days} 天 × {args.rows} 筆")
+        print("-" * 80)
+
+        # 填寫過程的逐筆輸出會干擾計時結果，先收起來
+        with contextlib.redirect_stdout(io.StringIO()):
+            http_durations = asyncio.run(run_http(stand_in.tcs_url, fixture))
+        _report("HTTP", http_durations, args.rows)
+
+        if args.skip_browser:
+            return
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                browser_durations = asyncio.run(run_browser(stand_in.tcs_url, fixture))
+        except Exception as e:
+            print(f"Playwright   無法執行（請先執行 playwright install chromium）: {e}")
+            return
+        _report("Playwright", browser_durations, args.rows)
+        print("-" * 80)
+        speedup = statistics.mean(browser_durations) / statistics.mean(http_durations)
+        print(f"HTTP 客戶端每日耗時為 Playwright 的 1/{speedup:.1f}")
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("TCS 填寫效能比較")
+    print("=" * 80)
+    main()
@@ -0,0 +1,101 @@
+"""
+TCS 導覽效能比較：中止不需要的資源 vs 全部載入
+在本機 TCS 替身伺服器上（靜態資源加上延遲），以相同的資料分別在兩種請求路由規則下
+啟動瀏覽器、導覽到 TCS 並查詢日期，比較 navigation 與 query 階段的耗時
+
+每一輪都重新啟動瀏覽器（導覽是冷啟動的成本），兩種規則交錯執行以抵銷暖機的影響。
+
+使用方式（在 backend 目錄下，需先執行 playwright install chromium）：
+    python -m tcs_automation.benchmark_navigation --runs 5 --asset-latency 100
+"""
+import argparse
+import contextlib
+import io
+import statistics
+from typing import Dict, List
+
+from .benchmark_fill import fixture_days
+from .stand_in import TCSStandIn
+from .tcs_automation import RequestPolicy, TCSAutomation
+
+# 比較的請求路由規則：名稱 → 建立 RequestPolicy 的函式（每輪重新建立以分開計數）
+POLICIES = {
+    "all": lambda: RequestPolicy(abort_types=()),
+    "blocked": RequestPolicy,
+}
+
+
+def run_navigation(tcs_url: str, policy: RequestPolicy, headless: bool = True) -> Dict:
+    """
+    啟動瀏覽器、導覽到 TCS 並以乾運行模式填寫一筆（不儲存）
+
+    Returns:
+        launch、navigation、query（毫秒）與 aborted、stubbed（請求數）
+    """
+    (date_str, entries), = fixture_days(1, 1)
+    tcs = TCSAutomation(tcs_url)
+    try:
+        tcs.start(headless=headless, dry_run=True, request_policy=policy)
+        tcs.fill_time_entries(date_str, entries)
+        return {
+            'launch': tcs.timings['launch'],
+            'navigation': tcs.timings['navigation'],
+            'query': tcs.timings['query'],
+            'aborted': policy.aborted,
+            'stubbed': policy.stubbed,
+        }
+    finally:
+        tcs.close()
+
+
+def run_benchmark(tcs_url: str, runs: int, headless: bool = True) -> Dict[str, List[Dict]]:
+    """兩種規則交錯各執行 runs 輪，回傳 規則名稱 → 每輪的量測結果"""
+    results = {name: [] for name in POLICIES}
+    for _ in range(runs):
+        for name, make_policy in POLICIES.items():
+            results[name].append(run_navigation(tcs_url, make_policy(), headless=headless))
+    return results
+
+
+def summarize(results: List[Dict]) -> Dict:
+    """彙總同一規則的量測結果（毫秒，中位數）"""
+    return {
+        phase: statistics.median(r[phase] for r in results)
+        for phase in ('launch', 'navigation', 'query', 'aborted', 'stubbed')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TCS 導覽效能比較（中止不需要的資源）")
+    parser.add_argument("--runs", type=int, default=5, help="每種規則執行的輪數")
+    parser.add_argument("--asset-latency", type=float, default=100, help="樣式表、圖片、字型的回應延遲（毫秒）")
+    parser.add_argument("--headed", action="store_true", help="顯示瀏覽器視窗")
+    args = parser.parse_args()
+
+    print(f"靜態資源延遲 {args.asset_latency:g} ms，每種規則 {args.runs} 輪（中位數）")
+    print("-" * 80)
+    print(f"{'規則':<8} {'啟動':>10} {'導覽':>10} {'查詢':>10} {'中止請求':>8}  (ms)")
+
+    with TCSStandIn(asset_latency=args.asset_latency / 1000) as stand_in:
+        # 填寫過程的逐筆輸出會干擾計時結果，先收起來
+        with contextlib.redirect_stdout(io.StringIO()):
+            results = run_benchmark(stand_in.tcs_url, args.runs, headless=not args.headed)
+
+    summaries = {name: summarize(runs) for name, runs in results.items()}
+    for name, summary in summaries.items():
+        print(
+            f"{name:<8} {summary['launch']:>10.1f} {summary['navigation']:>10.1f}"
+            f" {summary['query']:>10.1f} {summary['aborted']:>8.0f}"
+        )
+
+    print("-" * 80)
+    for phase in ('navigation', 'query'):
+        saved = summaries['all'][phase] - summaries['blocked'][phase]
+        print(f"{phase} 節省: {saved:.1f} ms")
+
+
+if __name__ == "__main__":
+    print("=" * 80)
+    print("TCS 導覽效能比較")
+    print("=" * 80)
+    main()
@@ -0,0 +1,276 @@
+"""
+TCS 瀏覽器池
+預先啟動並載入 TCS mainFrame 的 Chromium，讓自動填寫直接借用，省去冷啟動與首次導覽
+
+所有瀏覽器都使用 playwright.async_api，在同一個 event loop 上執行，
+借用時不會佔用額外的執行緒。
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List, Optional
+
+from playwright.async_api import async_playwright
+
+from .tcs_automation import AsyncTCSAutomation, RequestPolicy, safe_print
+
+
+class BrowserPoolTimeout(Exception):
+    """等待可用瀏覽器逾時"""
+
+
+class _PooledBrowser:
+    """
+    池中的單一瀏覽器
+
+    持有 playwright、browser、context 與已載入 TCS 的 page。
+    """
+
+    def __init__(self, pool: "TCSBrowserPool", slot_id: int):
+        self.pool = pool
+        self.slot_id = slot_id
+        self.playwright = None
+        self.browser = None
+        self.context = None
+        self.page = None
+        self.frame = None
+        self.uses = 0
+        self.launches = 0
+        self.last_used = time.monotonic()
+        # 同一瀏覽器的啟動、借用、重新載入與回收依序執行
+        self.lock = asyncio.Lock()
+
+    @property
+    def is_launched(self) -> bool:
+        return self.browser is not None
+
+    async def launch(self):
+        """啟動瀏覽器並載入 TCS 首頁"""
+        self.playwright = await async_playwright().start()
+        self.browser = await self.playwright.chromium.launch(headless=self.pool.headless)
+        self.context = await self.browser.new_context()
+        await self.pool.request_policy.install(self.context)
+        self.page = await self.context.new_page()
+        self.page.set_default_timeout(self.pool.timeout)
+        self.uses = 0
+        self.launches += 1
+        await self.load()
+        safe_print(f"✅ [pool #{self.slot_id}] 已預先載入 TCS")
+
+    async def load(self):
+        """導覽到 TCS 首頁並取得 mainFrame"""
+        await self.page.goto(self.pool.tcs_url, timeout=self.pool.timeout)
+        await self.page.wait_for_load_state('networkidle')
+        frame = self.page.frame(name='mainFrame')
+        if not frame:
+            raise Exception('找不到 mainFrame，請確認 TCS 系統已正確載入')
+        self.frame = frame
+
+    def is_healthy(self) -> bool:
+        """健康檢查：瀏覽器連線中、頁面未關閉且 mainFrame 存在"""
+        try:
+            return (
+                self.browser is not None
+                and self.browser.is_connected()
+                and self.page is not None
+                and not self.page.is_closed()
+                and self.page.frame(name='mainFrame') is not None
+            )
+        except Exception:
+            return False
+
+    async def shutdown(self):
+        """關閉瀏覽器（忽略關閉時的錯誤）"""
+        for resource, method in (
+            (self.context, "close"),
+            (self.browser, "close"),
+            (self.playwright, "stop"),
+        ):
+            if resource is None:
+                continue
+            try:
+                await getattr(resource, method)()
+            except Exception:
+                pass
+        self.playwright = self.browser = self.context = self.page = self.frame = None
+
+    async def prepare(self):
+        """借出前確認瀏覽器可用：超過使用次數則回收，不健康則重新啟動"""
+        if self.is_launched and self.uses >= self.pool.max_uses:
+            safe_print(f"[pool #{self.slot_id}] 已使用 {self.uses} 次，回收瀏覽器")
+            await self.shutdown()
+        if self.is_launched and not self.is_healthy():
+            safe_print(f"⚠️  [pool #{self.slot_id}] 健康檢查失敗，重新啟動瀏覽器")
+            await self.shutdown()
+        if not self.is_launched:
+            await self.launch()
+
+    async def run(
+        self,
+        fn: Callable[[AsyncTCSAutomation], Awaitable[Any]],
+        dry_run: bool,
+        fast_mode: bool,
+    ) -> Any:
+        """借出已載入的 mainFrame 執行 fn"""
+        async with self.lock:
+            await self.prepare()
+            tcs = AsyncTCSAutomation(self.pool.tcs_url)
+            tcs.attach(self.page, self.frame, dry_run=dry_run, fast_mode=fast_mode)
+            try:
+                return await fn(tcs)
+            finally:
+                await tcs.close()
+                self.uses += 1
+                self.last_used = time.monotonic()
+
+    async def reset(self):
+        """歸還後重新載入 TCS 首頁，讓下一次借用拿到乾淨的 mainFrame"""
+        async with self.lock:
+            if not self.is_launched:
+                return
+            if self.uses >= self.pool.max_uses:
+                await self.shutdown()
+                return
+            try:
+                await self.load()
+            except Exception as e:
+                safe_print(f"⚠️  [pool #{self.slot_id}] 重新載入失敗，關閉瀏覽器: {e}")
+                await self.shutdown()
+
+    async def safe_prepare(self):
+        """預先啟動（失敗時只記錄，借用時會重試）"""
+        async with self.lock:
+            try:
+                await self.prepare()
+            except Exception as e:
+                safe_print(f"⚠️  [pool #{self.slot_id}] 預先啟動失敗（借用時會重試）: {e}")
+                await self.shutdown()
+
+    async def evict_if_idle(self, idle_seconds: float):
+        """閒置超過 idle_seconds 則關閉瀏覽器"""
+        if self.lock.locked():
+            return
+        async with self.lock:
+            if self.is_launched and time.monotonic() - self.last_used >= idle_seconds:
+                safe_print(f"[pool #{self.slot_id}] 閒置逾時，關閉瀏覽器")
+                await self.shutdown()
+
+
+class TCSBrowserPool:
+    """
+    大小固定的 TCS 瀏覽器池
+
+    - 預先啟動：warm_up() 在背景啟動所有瀏覽器並載入 TCS
+    - 健康檢查：每次借出前確認瀏覽器與 mainFrame 仍可用
+    - 使用次數回收：同一瀏覽器使用 max_uses 次後重新啟動
+    - 閒置回收：超過 idle_seconds 未使用的瀏覽器會被關閉，下次借用時再啟動
+    - 請求路由：每個瀏覽器的 context 套用 request_policy（預設中止圖片、字型與多媒體）
+
+    必須在 event loop 中使用（warm_up / run / close 都是 coroutine）。
+
+    Example:
+        pool = TCSBrowserPool(size=1)
+        await pool.warm_up()
+        await pool.run(lambda tcs: tcs.fill_time_entries("20251124", entries), dry_run=True)
+        await pool.close()
+    """
+
+    def __init__(
+        self,
+        tcs_url: str = "http://cfcgpap01/tcs/",
+        size: int = 1,
+        headless: bool = True,
+        max_uses: int = 50,
+        idle_seconds: float = 600,
+        acquire_timeout: float = 120,
+        timeout: int = 30000,
+        request_policy: Optional[RequestPolicy] = None,
+    ):
+        if size < 1:
+            raise ValueError("size 必須大於 0")
+        self.tcs_url = tcs_url
+        self.headless = headless
+        self.max_uses = max_uses
+        self.idle_seconds = idle_seconds
+        self.acquire_timeout = acquire_timeout
+        self.timeout = timeout
+        # 每個瀏覽器的 context 共用的請求路由規則（None 使用 RequestPolicy 預設規則）
+        self.request_policy = request_policy or RequestPolicy()
+
+        self._slots: List[_PooledBrowser] = [_PooledBrowser(self, i) for i in range(size)]
+        self._free: "asyncio.Queue[_PooledBrowser]" = asyncio.Queue()
+        for slot in self._slots:
+            self._free.put_nowait(slot)
+
+        self._closed = False
+        self._tasks: set = set()
+        self._janitor: Optional[asyncio.Task] = None
+
+    @property
+    def size(self) -> int:
+        return len(self._slots)
+
+    def _spawn(self, coro) -> asyncio.Task:
+        """建立背景工作並保留參照，關閉時一併等待"""
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    def _ensure_janitor(self):
+        if self._janitor is None and self.idle_seconds and self.idle_seconds > 0:
+            self._janitor = asyncio.ensure_future(self._evict_idle_loop())
+
+    async def warm_up(self):
+        """在背景預先啟動所有瀏覽器（不等待完成）"""
+        self._ensure_janitor()
+        for slot in self._slots:
+            self._spawn(slot.safe_prepare())
+
+    async def run(
+        self,
+        fn: Callable[[AsyncTCSAutomation], Awaitable[Any]],
+        dry_run: bool = True,
+        fast_mode: bool = True,
+    ) -> Any:
+        """
+        借用一個已載入 TCS 的瀏覽器執行 await fn(tcs)
+
+        fn 收到已 attach 好 mainFrame 的 AsyncTCSAutomation，不需要呼叫 start()。
+
+        Raises:
+            BrowserPoolTimeout: 等待 acquire_timeout 秒仍沒有可用瀏覽器
+        """
+        if self._closed:
+            raise RuntimeError("瀏覽器池已關閉")
+        self._ensure_janitor()
+        try:
+            slot = await asyncio.wait_for(self._free.get(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            raise BrowserPoolTimeout(f"等待 {self.acquire_timeout} 秒仍無可用的 TCS 瀏覽器")
+
+        try:
+            return await slot.run(fn, dry_run, fast_mode)
+        finally:
+            # 重新載入在背景執行，不延遲這次回應；下一次借用會等它完成
+            self._spawn(slot.reset())
+            self._free.put_nowait(slot)
+
+    async def _evict_idle_loop(self):
+        interval = max(1.0, self.idle_seconds / 2)
+        while not self._closed:
+            await asyncio.sleep(interval)
+            for slot in self._slots:
+                await slot.evict_if_idle(self.idle_seconds)
+
+    async def close(self):
+        """關閉所有瀏覽器與背景工作"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._janitor is not None:
+            self._janitor.cancel()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        for slot in self._slots:
+            async with slot.lock:
+                await slot.shutdown()
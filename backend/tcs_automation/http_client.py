@@ -0,0 +1,563 @@
+"""
+TCS HTTP 客戶端
+不啟動瀏覽器，直接以 HTTP 重現日誌輸入頁（TCSInput.aspx）送出的請求：
+查詢（btmQuery 表單回傳）、代碼查詢（onblur 呼叫的 execServerFunction）與儲存（btnSave 表單回傳）
+
+表單內容與瀏覽器送出的相同：
+    - 頁面上所有欄位（含 __VIEWSTATE 等隱藏欄位與 SYSDT）從上一個回應取得後原樣送回
+    - 每行欄位以重複的名稱（txtPROJ_CD、txtIS_CHK_MODULE、txtMODULE_CD、txtWORK_ITEM_CD、
+      txtWORK_CATG_CD、txtREQ_CD、txtWORK_HR、txtWROK_DESC、txtPRGRS_RATE）依行的順序送出
+    - 隱藏的 txtWORK_CATG_CD 與 txtIS_CHK_MODULE 填入 getITEMNAME 與 getPROJNAME 查詢的結果，
+      與 onblur 後頁面上的值相同
+
+未經真實 TCS 驗證：execServerFunction 定義在頁面引用的外部 script 中，
+查詢的網址與參數名稱（lookup_path、Method、Param）是假設值，
+只有方法名稱、參數順序、分隔符號（strPrefix）與 XML 元素名稱取自頁面。
+Windows 整合驗證也尚未接上（可由 auth 傳入）。確認與真實 TCS 一致前，API 端點不使用此客戶端。
+
+介面與 AsyncTCSAutomation 相同（start / fill_time_entries / preview_before_save /
+save / screenshot / close），可直接替換；瀏覽器自動化仍是驗證過的備援路徑。
+"""
+
+import asyncio
+import json
+import re
+import xml.etree.ElementTree as ET
+from html.parser import HTMLParser
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urljoin
+
+import httpx
+
+from .tcs_automation import (
+    PhaseTimings,
+    emit_event,
+    load_selectors,
+    row_event,
+    row_validation_result,
+    safe_print,
+    tcs_row_values,
+)
+
+# execServerFunction 的網址（相對於 mainFrame，假設值，未經真實 TCS 驗證）
+DEFAULT_LOOKUP_PATH = "ServerFunction.aspx"
+PARAM_SEPARATOR = "&^&"  # 頁面的 strPrefix
+
+# 每行送出的欄位（selectors.json 鍵），依頁面上的順序
+_ROW_FIELDS = (
+    "project_code",
+    "is_check_module",
+    "module_code",
+    "work_item_code",
+    "work_category_code",
+    "requirement_no",
+    "work_hours",
+    "work_description",
+    "progress_rate",
+)
+
+# 代碼欄位：(tcs_row_values 鍵, selectors.json 欄位鍵)，onblur 時轉為大寫
+_CODE_FIELDS = (
+    ("project_code", "project_code"),
+    ("account_group", "module_code"),
+    ("work_category", "work_item_code"),
+)
+
+# 其餘欄位：(tcs_row_values 鍵, selectors.json 欄位鍵)
+_VALUE_FIELDS = (
+    ("requirement_no", "requirement_no"),
+    ("hours", "work_hours"),
+    ("description", "work_description"),
+    ("progress_rate", "progress_rate"),
+)
+
+# 頁面在查無代碼時顯示於名稱 span 的訊息（setProjName / setModuleName / setItemName）
+_PROJECT_ERROR = "(專案輸入錯誤!)"
+_MODULE_ERROR = "(模組輸入錯誤!)"
+_WORK_ITEM_ERROR = "(工作類別輸入錯誤!)"
+
+# 頁面 script 中的儲存結果：var strMSG = "...";（不為空時以 alert 顯示）
+_MESSAGE_PATTERN = re.compile(r'var\s+strMSG\s*=\s*("(?:[^"\\]|\\.)*")')
+
+
+class TCSHttpError(Exception):
+    """TCS 回應不符預期或拒絕儲存"""
+
+
+class _TCSPage(HTMLParser):
+    """
+    解析 TCS 回應頁面
+
+    Attributes:
+        frames: frame name → src
+        form_action: 第一個 form 的 action（None 表示頁面沒有表單）
+        fields: form 中會送出的欄位 (name, value)，依頁面順序（不含按鈕，名稱可重複）
+        buttons: submit 按鈕 name → value
+        spans: span id → 文字內容
+        alerts: 頁面 script 中 strMSG 的訊息
+        encoding: 回應的編碼（送出表單與查詢時使用相同編碼）
+    """
+
+    def __init__(self, text: str, encoding: str = "utf-8"):
+        super().__init__(convert_charrefs=True)
+        self.frames: Dict[str, str] = {}
+        self.form_action: Optional[str] = None
+        self.fields: List[Tuple[str, str]] = []
+        self.buttons: Dict[str, str] = {}
+        self.spans: Dict[str, str] = {}
+        self.alerts: List[str] = []
+        self.encoding = encoding
+        self._in_form = False
+        self._in_template = False
+        self._span_id: Optional[str] = None
+        self._textarea: Optional[List[str]] = None
+        self._in_script = False
+        self.feed(text)
+        self.close()
+
+    def handle_starttag(self, tag, attrs):
+        attrs = {name: value or "" for name, value in attrs}
+        if tag == "frame" and "name" in attrs:
+            self.frames[attrs["name"]] = attrs.get("src", "")
+        elif tag == "form" and self.form_action is None:
+            self.form_action = attrs.get("action", "")
+            self._in_form = True
+        elif tag == "template":
+            self._in_template = True
+        elif tag == "script":
+            self._in_script = True
+        elif tag == "span" and "id" in attrs:
+            self._span_id = attrs["id"]
+            self.spans[self._span_id] = ""
+        elif self._in_form and not self._in_template and tag in ("input", "textarea"):
+            name = attrs.get("name")
+            if not name:
+                return
+            input_type = attrs.get("type", "text").lower()
+            if tag == "textarea":
+                self.fields.append((name, ""))
+                self._textarea = []
+            elif input_type == "submit":
+                self.buttons[name] = attrs.get("value", "")
+            elif input_type in ("checkbox", "radio"):
+                if "checked" in attrs:
+                    self.fields.append((name, attrs.get("value", "on")))
+            elif input_type not in ("image", "button", "reset", "file"):
+                self.fields.append((name, attrs.get("value", "")))
+
+    def handle_endtag(self, tag):
+        if tag == "form":
+            self._in_form = False
+        elif tag == "template":
+            self._in_template = False
+        elif tag == "script":
+            self._in_script = False
+        elif tag == "span":
+            self._span_id = None
+        elif tag == "textarea" and self._textarea is not None:
+            # 與瀏覽器相同：去除開頭的一個換行
+            value = "".join(self._textarea)
+            if value.startswith("\n"):
+                value = value[1:]
+            self.fields[-1] = (self.fields[-1][0], value)
+            self._textarea = None
+
+    def handle_data(self, data):
+        if self._textarea is not None:
+            self._textarea.append(data)
+        elif self._in_script:
+            for match in _MESSAGE_PATTERN.finditer(data):
+                try:
+                    message = json.loads(match.group(1))
+                except ValueError:
+                    message = match.group(1)[1:-1]
+                if message:
+                    self.alerts.append(message)
+        elif self._span_id is not None:
+            self.spans[self._span_id] += data
+
+    def count(self, name: str) -> int:
+        """名稱為 name 的欄位數（每行欄位名稱重複，即行數）"""
+        return sum(1 for field, _ in self.fields if field == name)
+
+
+def _parse_lookup(content: bytes) -> Dict[str, str]:
+    """execServerFunction 回傳的 XML：元素名稱 → 文字；無法解析時視為查無資料"""
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError:
+        return {}
+    return {el.tag: (el.text or "").strip() for el in root.iter() if el is not root}
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """共用連線池的 transport：個別客戶端關閉時不關閉底層連線池"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self):
+        pass
+
+
+class TCSHttpClient:
+    """
+    以 HTTP 填寫 TCS 日誌輸入表單
+
+    每個客戶端有自己的 cookie（TCS session），連線可由 TCSHttpSession 共用。
+
+    Example:
+        tcs = TCSHttpClient("http://cfcgpap01/tcs/")
+        await tcs.start(dry_run=True)
+        results = await tcs.fill_time_entries("20251124", entries)
+        await tcs.save()
+        await tcs.close()
+    """
+
+    def __init__(
+        self,
+        tcs_url: str = "http://cfcgpap01/tcs/",
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+        timeout: float = 30.0,
+        lookup_path: str = DEFAULT_LOOKUP_PATH,
+        auth: Optional[httpx.Auth] = None,
+        max_concurrent_validations: int = 8,
+    ):
+        self.tcs_url = tcs_url
+        self.lookup_path = lookup_path
+        self.dry_run = False
+        self.selectors = load_selectors()
+        self.http = httpx.AsyncClient(
+            transport=transport, timeout=timeout, auth=auth, follow_redirects=True
+        )
+        self._validation_slots = asyncio.Semaphore(max_concurrent_validations)
+        self._main_url: Optional[str] = None
+        self._page: Optional[_TCSPage] = None
+        self._pending: Optional[Tuple[str, List[Dict[str, str]]]] = None
+        self.on_event: Optional[Callable[[Dict], None]] = (
+            None  # 進度事件（見 emit_event）
+        )
+        self.timings = PhaseTimings(on_phase=self._phase_done)  # 各階段耗時（毫秒）
+
+    async def start(
+        self, headless: bool = True, dry_run: bool = False, fast_mode: bool = True
+    ):
+        """
+        載入 TCS 首頁與 mainFrame 表單
+
+        headless 與 fast_mode 只為了與 AsyncTCSAutomation.start() 相容，沒有作用。
+        """
+        self.dry_run = dry_run
+        safe_print(f"正在連接 TCS 系統（HTTP）: {self.tcs_url}")
+        with self.timings.phase("navigation"):
+            frameset = await self._request("GET", self.tcs_url)
+            main_src = frameset.frames.get("mainFrame")
+            if main_src is None:
+                raise TCSHttpError("找不到 mainFrame，請確認 TCS 系統已正確載入")
+
+            self._main_url = urljoin(self.tcs_url, main_src)
+            self._page = await self._request("GET", self._main_url, require_form=True)
+        safe_print("✅ 成功連接 TCS 系統（HTTP）")
+        if dry_run:
+            safe_print("⚠️  DRY RUN 模式：不會真正儲存資料")
+
+    async def fill_time_entries(self, date: str, entries: List[Dict]) -> List[Dict]:
+        """
+        查詢日期、查詢代碼名稱並準備儲存的表單內容
+
+        相同的查詢只送出一次，不同的查詢並行送出。
+
+        Args:
+            date: 日期，格式 YYYYMMDD
+            entries: 工時記錄列表（與 AsyncTCSAutomation.fill_time_entries 相同）
+
+        Returns:
+            List[Dict]: 每行的驗證結果（row, project_code, valid, invalid_fields）
+        """
+        if self._page is None:
+            raise TCSHttpError("尚未連接 TCS，請先呼叫 start()")
+
+        # 1. 查詢日期（與點擊查詢按鈕相同的表單回傳）
+        safe_print(f"查詢日期 {date} 的資料...")
+        with self.timings.phase("query"):
+            self._page = await self._postback(
+                {self.selectors["date_input"]: date}, "query_button"
+            )
+
+        # 2. 查詢代碼名稱（onblur 的 execServerFunction）
+        rows = [self._row_fields(tcs_row_values(entry)) for entry in entries]
+        with self.timings.phase("validation"):
+            lookups = await self._lookup_all(rows)
+        results = []
+        for idx, (entry, row) in enumerate(zip(entries, rows)):
+            names = self._apply_lookups(row, lookups)
+            results.append(row_validation_result(idx, entry, *names))
+            emit_event(self.on_event, row_event(results[-1], entry, *names))
+
+        # 3. 準備儲存的欄位：畫面上多出來的舊資料行以空白送出（checkData 與 TCS 都會略過空白行）
+        blank = dict.fromkeys(_ROW_FIELDS, "")
+        rows += [blank] * max(
+            0, self._page.count(self.selectors["project_code"]) - len(rows)
+        )
+        self._pending = (date, rows)
+
+        safe_print(f"✅ 已準備 {len(entries)} 筆工時記錄")
+        return results
+
+    async def preview_before_save(self, auto_confirm: bool = False):
+        """列出即將送出的筆數（HTTP 模式沒有畫面可預覽，不等待確認）"""
+        if self._pending is None:
+            return
+        if self.dry_run:
+            safe_print("⚠️  DRY RUN 模式：將不會真正儲存")
+
+    async def save(self) -> List[str]:
+        """
+        送出儲存（與點擊儲存按鈕相同的表單回傳）
+
+        Returns:
+            List[str]: TCS 回應的訊息（strMSG 與 spanMSG）
+
+        Raises:
+            TCSHttpError: 尚未填寫，或 TCS 回應包含「失敗」或「錯誤」
+        """
+        if self.dry_run:
+            safe_print("⚠️  DRY RUN 模式：跳過儲存")
+            return []
+        if self._pending is None:
+            raise TCSHttpError("尚未填寫工時，請先呼叫 fill_time_entries()")
+
+        safe_print("送出儲存...")
+        date, rows = self._pending
+        with self.timings.phase("save"):
+            self._page = await self._postback(
+                {self.selectors["date_input"]: date}, "save_button", rows=rows
+            )
+        self._pending = None
+
+        messages = list(self._page.alerts)
+        span_message = self._page.spans.get("spanMSG", "").strip()
+        if span_message and span_message not in messages:
+            messages.append(span_message)
+        for message in messages:
+            safe_print(f"📢 TCS 訊息: {message}")
+
+        if any("失敗" in message or "錯誤" in message for message in messages):
+            raise TCSHttpError("；".join(messages))
+        return messages
+
+    async def screenshot(
+        self,
+        path: Optional[str] = None,
+        full_page: bool = True,
+        frame_only: bool = False,
+    ):
+        """HTTP 模式沒有畫面，不截圖（回傳 None）"""
+        return None
+
+    async def close(self):
+        """關閉客戶端（共用的連線池由 TCSHttpSession 關閉）"""
+        await self.http.aclose()
+
+    def _phase_done(self, name: str, ms: float):
+        emit_event(self.on_event, {"type": "phase", "phase": name, "ms": round(ms, 1)})
+
+    @staticmethod
+    def _row_fields(values: Dict[str, str]) -> Dict[str, str]:
+        """tcs_row_values 的結果 → 每行欄位（selectors.json 鍵），代碼與 onblur 後相同轉為大寫"""
+        row = dict.fromkeys(_ROW_FIELDS, "")
+        for value_key, field_key in _CODE_FIELDS:
+            row[field_key] = values[value_key].upper()
+        for value_key, field_key in _VALUE_FIELDS:
+            row[field_key] = values[value_key]
+        return row
+
+    @staticmethod
+    def _row_lookups(row: Dict[str, str]) -> List[Tuple[str, Tuple[str, ...]]]:
+        """一行 onblur 送出的查詢 (方法, 參數)；代碼空白時頁面不送出查詢"""
+        project = row["project_code"]
+        lookups = [
+            ("getPROJNAME", (project,)),
+            ("getMODULENAME", (row["module_code"], project)),
+            ("getITEMNAME", (row["work_item_code"], project)),
+        ]
+        return [(method, params) for method, params in lookups if params[0]]
+
+    @classmethod
+    def _apply_lookups(
+        cls, row: Dict[str, str], lookups: Dict[Tuple, Dict[str, str]]
+    ) -> Tuple[str, str, str]:
+        """
+        依查詢結果設定該行的隱藏欄位，回傳頁面名稱 span 的內容（專案、模組、工作項目）
+
+        與 setProjName / setModuleName / setItemName 相同：
+        txtIS_CHK_MODULE 取自 getPROJNAME，txtWORK_CATG_CD 取自 getITEMNAME，
+        代碼不為空但查無名稱時顯示錯誤訊息（模組只在 IS_CHK_MODULE 為 Y 或專案為 GA 時檢查）。
+        """
+        empty: Dict[str, str] = {}
+        project = row["project_code"]
+        project_xml = lookups.get(("getPROJNAME", (project,)), empty)
+        module_xml = lookups.get(
+            ("getMODULENAME", (row["module_code"], project)), empty
+        )
+        item_xml = lookups.get(("getITEMNAME", (row["work_item_code"], project)), empty)
+
+        row["is_check_module"] = project_xml.get("IS_CHK_MODULE", "")
+        row["work_category_code"] = item_xml.get("WORK_CATG_CD", "")
+
+        project_name = project_xml.get("PROJ_NME", "")
+        if project and not project_name:
+            project_name = _PROJECT_ERROR
+        module_name = module_xml.get("MODULE_NME", "")
+        if (
+            row["module_code"]
+            and not module_name
+            and (project == "GA" or row["is_check_module"] == "Y")
+        ):
+            module_name = _MODULE_ERROR
+        item_name = item_xml.get("WORK_ITEM_NME", "")
+        if row["work_item_code"] and not item_name:
+            item_name = _WORK_ITEM_ERROR
+        return project_name, module_name, item_name
+
+    async def _request(
+        self, method: str, url: str, require_form: bool = False, **kwargs
+    ) -> _TCSPage:
+        try:
+            response = await self.http.request(method, url, **kwargs)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            raise TCSHttpError(f"TCS 請求失敗: {method} {url}: {e}") from e
+
+        page = _TCSPage(response.text, response.encoding or "utf-8")
+        if require_form and page.form_action is None:
+            raise TCSHttpError(f"TCS 回應不是工時表單: {url}")
+        return page
+
+    def _encode(self, fields: List[Tuple[str, str]]) -> str:
+        # 以頁面的編碼送出；無法編碼的字元與瀏覽器相同改為 &#NNNN;
+        return urlencode(
+            fields, encoding=self._page.encoding, errors="xmlcharrefreplace"
+        )
+
+    async def _postback(
+        self,
+        values: Dict[str, str],
+        button_key: str,
+        rows: Optional[List[Dict[str, str]]] = None,
+    ) -> _TCSPage:
+        """
+        以目前頁面的所有欄位送出表單，模擬點擊 button_key 按鈕
+
+        Args:
+            values: 取代頁面上同名欄位的值（如日期）
+            button_key: selectors.json 的按鈕鍵
+            rows: 取代頁面上每行欄位的內容；None 表示原樣送回
+        """
+        button = self.selectors[button_key]
+        if button not in self._page.buttons:
+            raise TCSHttpError(f"TCS 表單缺少按鈕 #{button}")
+
+        row_names = {self.selectors[key] for key in _ROW_FIELDS}
+        fields, rows_placed = [], rows is None
+        for name, value in self._page.fields:
+            if rows is not None and name in row_names:
+                # 每行欄位名稱重複，依行的順序送出（與瀏覽器送出的順序相同）
+                if not rows_placed:
+                    fields += [
+                        (self.selectors[key], row[key])
+                        for row in rows
+                        for key in _ROW_FIELDS
+                    ]
+                    rows_placed = True
+                continue
+            fields.append((name, values.get(name, value)))
+        if not rows_placed:
+            raise TCSHttpError("TCS 表單缺少工時明細欄位")
+        fields.append((button, self._page.buttons[button]))
+
+        action = urljoin(self._main_url, self._page.form_action)
+        return await self._request(
+            "POST",
+            action,
+            require_form=True,
+            content=self._encode(fields),
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+
+    async def _lookup_all(
+        self, rows: List[Dict[str, str]]
+    ) -> Dict[Tuple, Dict[str, str]]:
+        """並行送出所有不重複的查詢，回傳 (方法, 參數) → XML 元素名稱與值"""
+        keys = sorted({lookup for row in rows for lookup in self._row_lookups(row)})
+        lookup_url = urljoin(self._main_url, self.lookup_path)
+
+        async def lookup(method: str, params: Tuple[str, ...]) -> Dict[str, str]:
+            query = self._encode(
+                [("Method", method), ("Param", PARAM_SEPARATOR.join(params))]
+            )
+            async with self._validation_slots:
+                try:
+                    response = await self.http.get(f"{lookup_url}?{query}")
+                    response.raise_for_status()
+                except httpx.HTTPError as e:
+                    raise TCSHttpError(
+                        f"TCS 代碼查詢失敗: {method} {params[0]}: {e}"
+                    ) from e
+                return _parse_lookup(response.content)
+
+        results = await asyncio.gather(*(lookup(*key) for key in keys))
+        return dict(zip(keys, results))
+
+
+class TCSHttpSession:
+    """
+    共用連線池的 TCS HTTP 工作階段
+
+    所有 client() 建立的客戶端共用同一個 keep-alive 連線池，
+    各自保有 cookie，互不干擾。
+
+    Example:
+        session = TCSHttpSession("http://cfcgpap01/tcs/")
+        tcs = session.client()
+        ...
+        await session.close()
+    """
+
+    def __init__(
+        self,
+        tcs_url: str = "http://cfcgpap01/tcs/",
+        max_connections: int = 10,
+        timeout: float = 30.0,
+        lookup_path: str = DEFAULT_LOOKUP_PATH,
+        auth: Optional[httpx.Auth] = None,
+    ):
+        self.tcs_url = tcs_url
+        self.timeout = timeout
+        self.lookup_path = lookup_path
+        self.auth = auth
+        self.max_connections = max_connections
+        self._transport = httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+
+    def client(self) -> TCSHttpClient:
+        """建立使用共用連線池的客戶端"""
+        return TCSHttpClient(
+            self.tcs_url,
+            transport=_SharedTransport(self._transport),
+            timeout=self.timeout,
+            lookup_path=self.lookup_path,
+            auth=self.auth,
+            max_concurrent_validations=self.max_connections,
+        )
+
+    async def close(self):
+        """關閉共用連線池"""
+        await self._transport.aclose()
@@ -0,0 +1,834 @@
+"""
+本機 TCS 替身伺服器
+依照真實 TCS 的日誌輸入頁（TCSInput.aspx）模擬 frameset 與 mainFrame 表單，
+供 HTTP 客戶端與 Playwright 自動化在不連接真實 TCS 的情況下測試與比較效能
+
+與真實頁面相同的部分：
+    - 表單 form1 回傳至 TCSInput.aspx，隱藏欄位 __VIEWSTATE、__VIEWSTATEGENERATOR、__EVENTVALIDATION
+    - 每行欄位名稱重複、不帶行號（txtPROJ_CD、txtMODULE_CD、……），id 帶行號（txtPROJ_CD0）；
+      工作說明 textarea 的 id 都是 txtWROK_DESC；每行有隱藏的 txtWORK_CATG_CD 與 txtIS_CHK_MODULE
+    - onblur 以 execServerFunction 同步查詢 getPROJNAME / getMODULENAME / getITEMNAME，
+      回傳 XML（PROJ_NME、IS_CHK_MODULE、MODULE_NME、WORK_ITEM_NME、WORK_CATG_CD）；
+      setProjName 在專案名稱改變時清空模組、工作項目與 txtWORK_CATG_CD
+    - 儲存前 checkData 略過專案代碼與工時都空白的行；儲存結果以 strMSG 顯示 alert
+
+execServerFunction 定義在頁面引用的外部 script 中，真實的請求網址與參數名稱未知；
+替身伺服器以 GET SERVER_FUNCTION_PATH?Method=<方法>&Param=<參數以 &^& 串接> 模擬（未經真實 TCS 驗證）。
+
+請求流程（與 TCSHttpClient 對應）：
+    GET  /tcs/                       frameset（topFrame + mainFrame）
+    GET  /tcs/TCSInput.aspx          mainFrame 日誌輸入表單
+    POST /tcs/TCSInput.aspx          表單回傳：btmQuery 查詢日期、btnLeft / btnRight
+                                     前後一天、btnSave 儲存
+    GET  /tcs/ServerFunction.aspx    execServerFunction 代碼查詢，回傳 XML
+    GET  /tcs/styles/、images/、fonts/  頁面引用的樣式表、圖片與字型（自動化用不到）
+
+可設定代碼查詢的延遲（validation_latency）、靜態資源的延遲（asset_latency）
+與儲存時的對話框行為（confirm_on_save、alert_on_save），
+用來量測自動化在不同 TCS 回應速度下的表現。
+
+使用方式：
+    with TCSStandIn(validation_latency=0.2) as stand_in:
+        tcs = AsyncTCSAutomation(stand_in.tcs_url)
+
+    python -m tcs_automation.stand_in --port 8765 --latency 200
+"""
+
+import datetime
+import html
+import json
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+from .tcs_automation import load_selectors
+
+VIEWSTATE_FIELD = "__VIEWSTATE"
+MAIN_FRAME_PATH = "TCSInput.aspx"
+# execServerFunction 的網址與參數名稱（假設值，未經真實 TCS 驗證）
+SERVER_FUNCTION_PATH = "ServerFunction.aspx"
+PARAM_SEPARATOR = "&^&"  # 頁面的 strPrefix
+DEFAULT_ROW_COUNT = 5
+
+# 頁面引用的靜態資源：路徑（/tcs/ 之下）→ (Content-Type, 內容)
+_ASSETS = {
+    "styles/site.css": (
+        "text/css",
+        b"@font-face { font-family: TCS; src: url(../fonts/tcs.woff); }\n"
+        b"body { font-family: TCS, sans-serif;"
+        b" background: url(../images/background.png); }\n",
+    ),
+    "images/logo.png": (
+        "image/png",
+        bytes.fromhex(
+            "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+            "1f15c4890000000b49444154789c6360000200000500017a5eab3f"
+            "0000000049454e44ae426082"
+        ),
+    ),
+    "fonts/tcs.woff": ("font/woff", b"wOFF"),
+}
+_ASSETS["images/background.png"] = _ASSETS["images/logo.png"]
+_ASSETS["images/banner.png"] = _ASSETS["images/logo.png"]
+
+_ASSET_TAGS = (
+    '<link rel="stylesheet" href="styles/site.css">'
+    '<img src="images/logo.png" alt="TCS"><img src="images/banner.png" alt="">'
+)
+
+# 儲存前的 confirm 對話框：非當日資料才詢問（與真實頁面相同）/ 每次都詢問 / 不詢問
+CONFIRM_MODES = ("non_today", "always", "never")
+
+# execServerFunction 支援的查詢方法
+LOOKUP_METHODS = ("getPROJNAME", "getMODULENAME", "getITEMNAME", "getCheckData")
+
+# 每行送出的欄位（selectors.json 鍵），依頁面上的順序
+_ROW_FIELDS = (
+    "project_code",
+    "is_check_module",
+    "module_code",
+    "work_item_code",
+    "work_category_code",
+    "requirement_no",
+    "work_hours",
+    "work_description",
+    "progress_rate",
+)
+
+# 儲存的欄位（txtIS_CHK_MODULE 由專案決定，不儲存）
+_SAVED_FIELDS = tuple(key for key in _ROW_FIELDS if key != "is_check_module")
+
+# 頁面 script：依真實 TCSInput.aspx 的函式改寫（document.all 改為 getElementById / getElementsByName）
+_MAIN_FRAME_SCRIPT = """
+var strPrefix = "&^&";
+var strMSG = __MSG__;
+const SERVER_FUNCTION_URL = '__SERVER_FUNCTION__';
+const CONFIRM_MODE = '__CONFIRM__';
+
+if (strMSG != "") {
+    alert(strMSG);
+}
+
+function byId(id) { return document.getElementById(id); }
+function byName(name) { return document.getElementsByName(name); }
+function getFocus(objThis) {}
+function getBlur(objThis) {}
+
+function delete_onclick(objDel) {
+    toDelLine(objDel);
+    countTotal();
+}
+
+function toDelLine(objDel) {
+    const row = objDel.closest('tr');
+    row.querySelectorAll('input, textarea').forEach((el) => { el.value = ''; });
+    row.querySelectorAll('span').forEach((el) => { el.innerText = ''; });
+    row.style.display = 'none';
+}
+
+function cleatAllItem() {
+    byId('lblACTL_HR').innerText = "0";
+    byId('spanMSG').innerHTML = "";
+    const names = ['txtPROJ_CD', 'txtMODULE_CD', 'txtWORK_ITEM_CD', 'txtWORK_CATG_CD',
+        'txtREQ_CD', 'txtWORK_HR', 'txtWROK_DESC', 'txtPRGRS_RATE', 'txtIS_CHK_MODULE'];
+    names.forEach((name) => {
+        byName(name).forEach((el) => { el.value = ""; });
+    });
+    byName('txtPROJ_CD').forEach((el) => {
+        const strPosi = el.id.substr(10);
+        byId('spanPROJ_NME' + strPosi).innerText = "";
+        byId('spanMODULE_NME' + strPosi).innerText = "";
+        byId('spanWORK_ITEM_NME' + strPosi).innerText = "";
+    });
+}
+
+function countTotal() {
+    const objPROJCD = byName('txtPROJ_CD');
+    const objWORKHR = byName('txtWORK_HR');
+    let dblTotalHR = 0;
+    for (let cnt = 0; cnt < objPROJCD.length; cnt++) {
+        const strPosi = objPROJCD[cnt].id.substr(10);
+        const strWORKHR = objWORKHR[cnt].value;
+        if (byId('spanPROJ_NME' + strPosi).innerText != "" && strWORKHR != "") {
+            dblTotalHR = Math.round((dblTotalHR + parseFloat(strWORKHR)) * 100) / 100;
+        }
+    }
+    byId('lblACTL_HR').innerText = String(dblTotalHR);
+}
+
+function WORK_HR_OnBlur(strRow, objThis) {
+    const WORK_HR = byId('txtWORK_HR' + strRow).value;
+    if (WORK_HR != "" && isNaN(Number(WORK_HR))) {
+        alert('[實際工時] 請輸入數字!!');
+        return;
+    }
+    countTotal();
+}
+
+function PRGRS_RATE_OnBlur(strRow, objThis) {
+    const PRGRS_RATE = byId('txtPRGRS_RATE' + strRow).value;
+    if (PRGRS_RATE != "" && isNaN(Number(PRGRS_RATE))) {
+        alert('[完成 %] 請輸入數字!!');
+    }
+}
+
+function PROJ_CD_OnBlur(strRow, objThis) {
+    objThis.value = objThis.value.toUpperCase();
+    queryFieldData(strRow, 'getPROJNAME');
+}
+
+function MODULE_CD_OnBlur(strRow, objThis) {
+    objThis.value = objThis.value.toUpperCase();
+    queryFieldData(strRow, 'getMODULENAME');
+}
+
+function WORK_ITEM_CD_OnBlur(strRow, objThis) {
+    objThis.value = objThis.value.toUpperCase();
+    queryFieldData(strRow, 'getITEMNAME');
+}
+
+// 同步 HTTP 請求（與 TCS 的 execServerFunction 相同，onblur 返回時名稱已更新）
+function execServerFunction(strExecMethod, arrItem) {
+    const xhr = new XMLHttpRequest();
+    xhr.open('GET', SERVER_FUNCTION_URL + '?Method=' + encodeURIComponent(strExecMethod)
+        + '&Param=' + encodeURIComponent(arrItem.join(strPrefix)), false);
+    xhr.send();
+    return xhr.responseText;
+}
+
+function parseXML(strXML) {
+    return new DOMParser().parseFromString(strXML, 'text/xml');
+}
+
+function getValueFromXML(objXML, strTag) {
+    const el = objXML.getElementsByTagName(strTag)[0];
+    return el ? el.textContent : "";
+}
+
+function queryFieldData(strRow, strExecMethod) {
+    let arrItem;
+    let strKeyValue = "";
+    let objXML = null;
+    switch (strExecMethod) {
+        case "getPROJNAME":
+            strKeyValue = byId('txtPROJ_CD' + strRow).value;
+            arrItem = [strKeyValue];
+            break;
+        case "getMODULENAME":
+            strKeyValue = byId('txtMODULE_CD' + strRow).value;
+            arrItem = [strKeyValue, byId('txtPROJ_CD' + strRow).value];
+            break;
+        case "getITEMNAME":
+            strKeyValue = byId('txtWORK_ITEM_CD' + strRow).value;
+            arrItem = [strKeyValue, byId('txtPROJ_CD' + strRow).value];
+            break;
+        case "getCheckData":
+            strKeyValue = strRow[0];
+            arrItem = [strRow[0], strRow[1], strRow[2]];
+            break;
+    }
+    if (strKeyValue != "") {
+        objXML = parseXML(execServerFunction(strExecMethod, arrItem));
+    }
+    switch (strExecMethod) {
+        case "getPROJNAME":
+            return setProjName(strRow, objXML, strKeyValue);
+        case "getMODULENAME":
+            return setModuleName(
+                strRow, objXML, byId('txtPROJ_CD' + strRow).value, strKeyValue,
+                byId('txtIS_CHK_MODULE' + strRow).value);
+        case "getITEMNAME":
+            return setItemName(strRow, objXML, strKeyValue);
+        case "getCheckData":
+            return getCheckDataResult(objXML);
+    }
+}
+
+function getCheckDataResult(objXML) {
+    if (objXML == null) {
+        return ["", "", ""];
+    }
+    return [getValueFromXML(objXML, "PROJ_NME"), getValueFromXML(objXML, "MODULE_NME"),
+        getValueFromXML(objXML, "WORK_ITEM_NME")];
+}
+
+function setItemName(strRow, objXML, KeyValue) {
+    const strITEM_NME = objXML != null ? getValueFromXML(objXML, "WORK_ITEM_NME") : "";
+    const strWORK_CATG_CD =
+        objXML != null ? getValueFromXML(objXML, "WORK_CATG_CD") : "";
+    byId('spanWORK_ITEM_NME' + strRow).innerHTML = strITEM_NME;
+    byId('txtWORK_CATG_CD' + strRow).value = strWORK_CATG_CD;
+    if (KeyValue != '' && strITEM_NME == '') {
+        byId('spanWORK_ITEM_NME' + strRow).innerHTML =
+            "<font color='red'><b>(工作類別輸入錯誤!)<b></font>";
+        return false;
+    }
+}
+
+function setModuleName(strRow, objXML, strPROJ_CD, KeyValue, strPROJ_IS_CHK_MODULE) {
+    const strMODULE_NME = objXML != null ? getValueFromXML(objXML, "MODULE_NME") : "";
+    byId('spanMODULE_NME' + strRow).innerHTML = strMODULE_NME;
+    if (strPROJ_CD == 'GA' || strPROJ_IS_CHK_MODULE == 'Y') {
+        if (KeyValue != '' && strMODULE_NME == '') {
+            byId('spanMODULE_NME' + strRow).innerHTML =
+                "<font color='red'><b>(模組輸入錯誤!)<b></font>";
+        }
+    }
+}
+
+function setProjName(strRow, objXML, KeyValue) {
+    const strOrgValue = byId('spanPROJ_NME' + strRow).innerText;
+    let strPROJ_NME = objXML != null ? getValueFromXML(objXML, "PROJ_NME") : "";
+    const strIS_CHK_MODULE =
+        objXML != null ? getValueFromXML(objXML, "IS_CHK_MODULE") : "";
+    if (KeyValue != '' && strPROJ_NME == '') {
+        strPROJ_NME = "<font color='red'><b>(專案輸入錯誤!)<b></font>";
+    }
+    byId('spanPROJ_NME' + strRow).innerHTML = strPROJ_NME;
+    byId('txtIS_CHK_MODULE' + strRow).value = strIS_CHK_MODULE;
+    // 變更專案代碼時清除 [模組]、[工作類別]
+    if (strOrgValue != strPROJ_NME) {
+        byId('txtWORK_CATG_CD' + strRow).value = "";
+        byId('txtWORK_ITEM_CD' + strRow).value = "";
+        byId('spanWORK_ITEM_NME' + strRow).innerText = "";
+        byId('txtMODULE_CD' + strRow).value = "";
+        byId('spanMODULE_NME' + strRow).innerText = "";
+    }
+}
+
+function addRow() {
+    const tblInput = byId('tblInput');
+    // 真實頁面以 tblInput.rows.length（含標題列）編號，新增的第一行 id 為 6；
+    // 替身伺服器維持連續的行號，與瀏覽器自動化以行號組出欄位 id 的方式一致
+    const MaxRow = tblInput.rows.length - 1;
+    tblInput.tBodies[0].insertAdjacentHTML('beforeend',
+        byId('rowTemplate').innerHTML.replace(/__N__/g, String(MaxRow)));
+}
+
+function checkData() {
+    const txtDate = byId('txtDate').value;
+    if (txtDate == "") {
+        alert("請輸入日期!!");
+        return false;
+    }
+    const isToday = byId('SYSDT').value == txtDate;
+    if (CONFIRM_MODE == 'always' || (CONFIRM_MODE == 'non_today' && !isToday)) {
+        if (confirm("是否要儲存非當日資料?") == false) {
+            return false;
+        }
+    }
+
+    let msg = "";
+    const objProjCD = byName('txtPROJ_CD');
+    const objIsChkModule = byName('txtIS_CHK_MODULE');
+    const objItemCD = byName('txtWORK_ITEM_CD');
+    const objWorkHR = byName('txtWORK_HR');
+    const objModuleCD = byName('txtMODULE_CD');
+    const objWorkDesc = byName('txtWROK_DESC');
+    for (let i = 0; i < objProjCD.length; i++) {
+        let msg_tmp = "";
+        if (objProjCD[i].value == "" && objWorkHR[i].value == "") {
+            continue;
+        }
+        const checkResult = queryFieldData(
+            [objProjCD[i].value, objModuleCD[i].value, objItemCD[i].value],
+            "getCheckData");
+        if (objProjCD[i].value == "" || checkResult[0] == "") {
+            msg_tmp += "專案名稱,";
+        }
+        if (objItemCD[i].value == "" || checkResult[2] == "") {
+            msg_tmp += "工作類別,";
+        }
+        if (objWorkHR[i].value == "") {
+            msg_tmp += "實際工時,";
+        }
+        if (objIsChkModule[i].value == "Y") {
+            if (objModuleCD[i].value == "" || checkResult[1] == "") {
+                msg_tmp += "模組,";
+            }
+            if (objWorkDesc[i].value == "") {
+                msg_tmp += "工作說明,";
+            }
+        }
+        if (msg_tmp != "") {
+            msg += "請輸入第" + (i + 1) + "筆: " + msg_tmp + "\\n";
+        }
+    }
+    if (parseFloat(byId('lblACTL_HR').innerText) > 18) {
+        msg += "實際總工時不得超過18小時，請確認\\n";
+    }
+    if (msg != "") {
+        alert("資料輸入不完整:\\n" + msg);
+        return false;
+    }
+    return true;
+}
+"""
+
+
+class TCSStandIn:
+    """
+    本機 TCS 替身伺服器（在背景執行緒中執行）
+
+    Attributes:
+        rows_by_date: 已儲存的工時，日期（YYYYMMDD）→ 每行欄位值（selectors.json 鍵）
+        invalid_codes: 查詢時視為不存在的代碼
+        validation_latency: 每個代碼查詢（execServerFunction）的回應延遲（秒）
+        asset_latency: 每個靜態資源（樣式表、圖片、字型）的回應延遲（秒）
+        confirm_on_save: 儲存前的 confirm 對話框（CONFIRM_MODES 之一）
+        alert_on_save: 儲存後是否以 alert 顯示結果（strMSG）
+        requests: 收到的請求紀錄（method, path）
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        invalid_codes: Optional[Iterable[str]] = None,
+        validation_latency: float = 0.0,
+        asset_latency: float = 0.0,
+        confirm_on_save: str = "non_today",
+        alert_on_save: bool = True,
+    ):
+        if confirm_on_save not in CONFIRM_MODES:
+            raise ValueError(f"confirm_on_save 必須是 {', '.join(CONFIRM_MODES)} 之一")
+        self.selectors = load_selectors()
+        self.rows_by_date: Dict[str, List[Dict[str, str]]] = {}
+        self.invalid_codes = set(invalid_codes or ())
+        self.validation_latency = validation_latency
+        self.asset_latency = asset_latency
+        self.confirm_on_save = confirm_on_save
+        self.alert_on_save = alert_on_save
+        self.requests: List[tuple] = []
+        self._viewstates: set = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def tcs_url(self) -> str:
+        """TCS 首頁（frameset）網址"""
+        return f"{self.base_url}/tcs/"
+
+    def start(self) -> "TCSStandIn":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "TCSStandIn":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def count_requests(self, method: str, path: str) -> int:
+        """計算指定 method 與路徑（不含查詢字串）的請求數"""
+        return sum(
+            1 for m, p in self.requests if m == method and urlsplit(p).path == path
+        )
+
+    # ---- 代碼查詢 ----
+
+    def _name(self, prefix: str, code: str) -> str:
+        return "" if not code or code in self.invalid_codes else f"{prefix} {code}"
+
+    def lookup(self, method: str, params: List[str]) -> Dict[str, str]:
+        """
+        execServerFunction 的查詢結果
+
+        Args:
+            method: LOOKUP_METHODS 之一
+            params: 與頁面 arrItem 相同的參數：
+                getPROJNAME [專案]、getMODULENAME [模組, 專案]、
+                getITEMNAME [工作項目, 專案]、getCheckData [專案, 模組, 工作項目]
+
+        Returns:
+            XML 元素名稱 → 值；查無代碼時不含該代碼的元素
+        """
+        params = list(params) + [""] * 3
+        if method == "getPROJNAME":
+            name = self._name("專案", params[0])
+            return {"PROJ_NME": name, "IS_CHK_MODULE": "Y"} if name else {}
+        if method == "getMODULENAME":
+            name = (
+                self._name("模組", params[0]) if self._name("專案", params[1]) else ""
+            )
+            return {"MODULE_NME": name} if name else {}
+        if method == "getITEMNAME":
+            name = (
+                self._name("工作類別", params[0])
+                if self._name("專案", params[1])
+                else ""
+            )
+            return (
+                {"WORK_ITEM_NME": name, "WORK_CATG_CD": params[0][:1]} if name else {}
+            )
+        if method == "getCheckData":
+            values = {
+                "PROJ_NME": self._name("專案", params[0]),
+                "MODULE_NME": self._name("模組", params[1]),
+                "WORK_ITEM_NME": self._name("工作類別", params[2]),
+            }
+            return {key: value for key, value in values.items() if value}
+        raise ValueError(f"未知的查詢方法: {method}")
+
+    @staticmethod
+    def render_xml(values: Dict[str, str]) -> str:
+        return (
+            '<?xml version="1.0" encoding="utf-8"?><ROOT>'
+            + "".join(
+                f"<{tag}>{escape(value)}</{tag}>" for tag, value in values.items()
+            )
+            + "</ROOT>"
+        )
+
+    # ---- 頁面與資料 ----
+
+    def _issue_viewstate(self) -> str:
+        token = secrets.token_hex(16)
+        with self._lock:
+            self._viewstates.add(token)
+        return token
+
+    def _row_inputs(self, idx, row: Dict[str, str]) -> str:
+        """一行欄位（與真實頁面相同：name 重複不帶行號，id 帶行號，工作說明 id 固定）"""
+        s = self.selectors
+        project_code = row.get("project_code", "")
+        project = self.lookup("getPROJNAME", [project_code])
+        row = {"is_check_module": project.get("IS_CHK_MODULE", ""), **row}
+        value = {key: html.escape(row.get(key, "")) for key in _ROW_FIELDS}
+        module = self.lookup(
+            "getMODULENAME", [row.get("module_code", ""), project_code]
+        )
+        item = self.lookup("getITEMNAME", [row.get("work_item_code", ""), project_code])
+
+        def code(key, span_key, on_blur, name):
+            return (
+                f'<input name="{s[key]}" onblur="{on_blur}(&quot;{idx}&quot;,this);"'
+                f' id="{s[key]}{idx}" type="text" value="{value[key]}" maxlength="20"'
+                ' size="10" onfocus="getFocus(this)">'
+                f'<br><span id="{s[span_key]}{idx}">{html.escape(name)}</span>'
+            )
+
+        def text(key, size, on_blur="getBlur(this)", style=""):
+            return (
+                f'<input name="{s[key]}" id="{s[key]}{idx}" type="text"'
+                f' value="{value[key]}" size="{size}"'
+                f' onblur="{on_blur}" onfocus="getFocus(this)"{style}>'
+            )
+
+        is_check_module = text("is_check_module", 1, style=' style="display:none"')
+        category_key = s["work_category_code"]
+        category = (
+            f'<input name="{category_key}" id="{category_key}{idx}" type="hidden"'
+            f' value="{value["work_category_code"]}">'
+        )
+        project_code_input = code(
+            "project_code",
+            "project_name_span",
+            "PROJ_CD_OnBlur",
+            project.get("PROJ_NME", ""),
+        )
+        module_code_input = code(
+            "module_code",
+            "module_name_span",
+            "MODULE_CD_OnBlur",
+            module.get("MODULE_NME", ""),
+        )
+        work_item_code_input = code(
+            "work_item_code",
+            "work_item_name_span",
+            "WORK_ITEM_CD_OnBlur",
+            item.get("WORK_ITEM_NME", ""),
+        )
+        hours_input = text("work_hours", 4, f"WORK_HR_OnBlur(&quot;{idx}&quot;,this)")
+        progress_input = text(
+            "progress_rate", 4, f"PRGRS_RATE_OnBlur(&quot;{idx}&quot;,this)"
+        )
+        description_key = s["work_description"]
+        return (
+            '<tr height="50" valign="top" class="tr_detail">'
+            f"<td>{project_code_input}{is_check_module}</td>"
+            f"<td>{module_code_input}</td>"
+            f"<td>{work_item_code_input}{category}</td>"
+            f"<td>{text('requirement_no', 18)}</td>"
+            f"<td>{hours_input}</td>"
+            f'<td><textarea name="{description_key}" id="{description_key}"'
+            ' cols="40" rows="5" onblur="getBlur(this)" onfocus="getFocus(this)">'
+            f'{value["work_description"]}</textarea></td>'
+            f"<td>{progress_input}</td>"
+            '<td align="center"><img src="images/logo.png" alt="刪除本行" name="imgDelete"'
+            ' onclick="delete_onclick(this)"></td>'
+            "</tr>"
+        )
+
+    def render_frameset(self) -> str:
+        return (
+            "<html><head><title>TCS 工時系統</title></head>"
+            '<frameset rows="40,*">'
+            '<frame name="topFrame" src="top.html">'
+            f'<frame name="mainFrame" src="{MAIN_FRAME_PATH}">'
+            "</frameset></html>"
+        )
+
+    def render_main_frame(
+        self, date: str = "", message: str = "", alert: str = ""
+    ) -> str:
+        """mainFrame 日誌輸入表單：已儲存的資料行補滿 DEFAULT_ROW_COUNT 行"""
+        s = self.selectors
+        rows = list(self.rows_by_date.get(date, []))
+        rows += [{}] * max(0, DEFAULT_ROW_COUNT - len(rows))
+        total = sum(float(row.get("work_hours") or 0) for row in rows)
+        script = (
+            _MAIN_FRAME_SCRIPT.replace(
+                "__MSG__",
+                json.dumps(alert if self.alert_on_save else "", ensure_ascii=False),
+            )
+            .replace("__SERVER_FUNCTION__", SERVER_FUNCTION_PATH)
+            .replace("__CONFIRM__", self.confirm_on_save)
+        )
+        return (
+            '<html><head><meta charset="utf-8"><title>日誌輸入</title></head><body>'
+            f'{_ASSET_TAGS}<form name="form1" method="post"'
+            f' action="./{MAIN_FRAME_PATH}" id="form1">'
+            f'<input type="hidden" name="{VIEWSTATE_FIELD}" id="{VIEWSTATE_FIELD}"'
+            f' value="{self._issue_viewstate()}">'
+            '<input type="hidden" name="__VIEWSTATEGENERATOR"'
+            ' id="__VIEWSTATEGENERATOR" value="C571F7F9">'
+            '<input type="hidden" name="__EVENTVALIDATION" id="__EVENTVALIDATION"'
+            f' value="{secrets.token_hex(16)}">'
+            f'<input type="submit" name="{s["save_button"]}" value="儲存"'
+            f' onclick="return checkData();" id="{s["save_button"]}">'
+            '<input type="button" onclick="cleatAllItem()" value="清除">'
+            '<input type="image" name="btnLeft" id="btnLeft" src="images/logo.png">'
+            f'<input name="{s["date_input"]}" type="text" value="{html.escape(date)}"'
+            f' maxlength="8" id="{s["date_input"]}">'
+            '<input type="image" name="btnRight" id="btnRight" src="images/logo.png">'
+            f'<input type="submit" name="{s["query_button"]}" value="查詢"'
+            f' id="{s["query_button"]}">'
+            f'<span id="spanMSG">{html.escape(message)}</span>'
+            f'實際工作時數：<span id="{s["actual_hours_label"]}">{total:g}</span>'
+            '<table id="tblInput"><tbody><tr>'
+            "<th>專案名稱</th><th>模組</th><th>工作類別</th><th>需求單號</th>"
+            "<th>實際工時</th><th>工作說明</th><th>完成%</th><th>刪除</th></tr>"
+            + "".join(self._row_inputs(idx, row) for idx, row in enumerate(rows))
+            + "</tbody></table>"
+            f'<template id="rowTemplate">{self._row_inputs("__N__", {})}</template>'
+            f'<img id="{s["add_row_button"]}" alt="新增一列" src="images/logo.png"'
+            ' onclick="addRow()">新增一列'
+            '<div id="CommonHidden" style="display: none">'
+            f'<input name="SYSDT" type="text" value="{datetime.date.today():%Y%m%d}"'
+            ' id="SYSDT">系統日期</div>'
+            "</form>"
+            f"<script>{script}</script></body></html>"
+        )
+
+    def _check_row(
+        self, idx: int, row: Dict[str, str], is_check_module: str
+    ) -> Optional[str]:
+        """檢查一行（與頁面 checkData 相同，另外核對隱藏欄位），回傳錯誤訊息或 None"""
+        project = self.lookup("getPROJNAME", [row["project_code"]])
+        item = self.lookup("getITEMNAME", [row["work_item_code"], row["project_code"]])
+        module = self.lookup("getMODULENAME", [row["module_code"], row["project_code"]])
+        missing = []
+        if not project:
+            missing.append("專案名稱")
+        if not item:
+            missing.append("工作類別")
+        if not row["work_hours"]:
+            missing.append("實際工時")
+        if is_check_module == "Y":
+            if not module:
+                missing.append("模組")
+            if not row["work_description"]:
+                missing.append("工作說明")
+        if project and is_check_module != project["IS_CHK_MODULE"]:
+            missing.append("模組檢核註記")
+        if item and row["work_category_code"] != item["WORK_CATG_CD"]:
+            missing.append("工作類別代碼")
+        if missing:
+            return f"第 {idx + 1} 筆 {'、'.join(missing)} 錯誤"
+        return None
+
+    def handle_postback(self, form: Dict[str, List[str]]) -> tuple:
+        """
+        處理 mainFrame 表單回傳
+
+        每行欄位以重複的名稱依行的順序送出；checkData 會略過的空白行（專案代碼與工時都空白）不儲存。
+
+        Returns:
+            (HTTP 狀態碼, 頁面 HTML)
+        """
+        s = self.selectors
+        viewstate = form.get(VIEWSTATE_FIELD, [""])[0]
+        with self._lock:
+            known = viewstate in self._viewstates
+        if not known:
+            return 400, "<html><body>Invalid viewstate</body></html>"
+
+        date = form.get(s["date_input"], [""])[0].strip()
+        for button, days in (("btnLeft", -1), ("btnRight", 1)):
+            if f"{button}.x" in form:
+                day = datetime.datetime.strptime(date, "%Y%m%d") + datetime.timedelta(
+                    days=days
+                )
+                return 200, self.render_main_frame(f"{day:%Y%m%d}")
+        if s["save_button"] not in form:
+            return 200, self.render_main_frame(date)
+
+        columns = {key: form.get(s[key], []) for key in _ROW_FIELDS}
+        row_count = len(columns["project_code"])
+        if any(len(values) != row_count for values in columns.values()):
+            return 400, "<html><body>Row fields do not line up</body></html>"
+
+        rows, errors = [], []
+        for idx in range(row_count):
+            row = {key: columns[key][idx].strip() for key in _SAVED_FIELDS}
+            if not row["project_code"] and not row["work_hours"]:
+                continue
+            error = self._check_row(idx, row, columns["is_check_module"][idx].strip())
+            if error:
+                errors.append(error)
+            rows.append(row)
+
+        if errors:
+            message = "儲存失敗：" + "；".join(errors)
+            return 200, self.render_main_frame(date, message=message, alert=message)
+
+        self.rows_by_date[date] = rows
+        return 200, self.render_main_frame(date, message="儲存成功", alert="儲存成功")
+
+    def _handler_class(self):
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = (
+                True  # 標頭與內容分兩次寫出，避免 keep-alive 連線延遲 40ms
+            )
+
+            def log_message(self, format, *args):
+                pass  # 不輸出存取紀錄
+
+            def _send(self, status_code: int, body, content_type: str = "text/html"):
+                if isinstance(body, bytes):
+                    data = body
+                else:
+                    data = body.encode("utf-8")
+                    content_type += "; charset=utf-8"
+                self.send_response(status_code)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                stand_in.requests.append(("GET", self.path))
+                url = urlsplit(self.path)
+                if url.path in ("/tcs", "/tcs/"):
+                    self._send(200, stand_in.render_frameset())
+                elif url.path == "/tcs/top.html":
+                    self._send(
+                        200, f"<html><body>{_ASSET_TAGS}TCS 工時系統</body></html>"
+                    )
+                elif url.path.removeprefix("/tcs/") in _ASSETS:
+                    if stand_in.asset_latency > 0:
+                        time.sleep(stand_in.asset_latency)
+                    content_type, data = _ASSETS[url.path.removeprefix("/tcs/")]
+                    self._send(200, data, content_type)
+                elif url.path == f"/tcs/{MAIN_FRAME_PATH}":
+                    self._send(200, stand_in.render_main_frame())
+                elif url.path == f"/tcs/{SERVER_FUNCTION_PATH}":
+                    query = parse_qs(url.query, keep_blank_values=True)
+                    method = query.get("Method", [""])[0]
+                    if method not in LOOKUP_METHODS:
+                        self._send(400, "unknown method", "text/plain")
+                        return
+                    if stand_in.validation_latency > 0:
+                        time.sleep(stand_in.validation_latency)
+                    params = query.get("Param", [""])[0].split(PARAM_SEPARATOR)
+                    self._send(
+                        200,
+                        stand_in.render_xml(stand_in.lookup(method, params)),
+                        "text/xml",
+                    )
+                else:
+                    self._send(404, "<html><body>Not Found</body></html>")
+
+            def do_POST(self):
+                stand_in.requests.append(("POST", self.path))
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8")
+                if url.path != f"/tcs/{MAIN_FRAME_PATH}":
+                    self._send(404, "<html><body>Not Found</body></html>")
+                    return
+                status_code, page = stand_in.handle_postback(
+                    parse_qs(body, keep_blank_values=True)
+                )
+                self._send(status_code, page)
+
+        return Handler
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="本機 TCS 替身伺服器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0, help="代碼查詢延遲（毫秒）")
+    parser.add_argument(
+        "--asset-latency",
+        type=float,
+        default=0,
+        help="樣式表、圖片、字型的回應延遲（毫秒）",
+    )
+    parser.add_argument(
+        "--confirm",
+        choices=CONFIRM_MODES,
+        default="non_today",
+        help="儲存前的 confirm 對話框",
+    )
+    parser.add_argument("--no-alert", action="store_true", help="儲存後不顯示 alert")
+    args = parser.parse_args()
+
+    stand_in = TCSStandIn(
+        args.host,
+        args.port,
+        validation_latency=args.latency / 1000,
+        asset_latency=args.asset_latency / 1000,
+        confirm_on_save=args.confirm,
+        alert_on_save=not args.no_alert,
+    ).start()
+    print(f"TCS 替身伺服器: {stand_in.tcs_url}（Ctrl+C 結束）")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stand_in.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,12 +2,16 @@
 TCS 工時系統自動填寫腳本
 使用 Playwright 自動化填寫工時記錄
 """
+import asyncio
+import contextlib
+import fnmatch
 import json
 import sys
+import threading
 import time
 from pathlib import Path
-from typing import List, Dict, Optional
-from playwright.sync_api import sync_playwright, Page, Frame, Browser, Playwright
+from typing import Callable, Iterable, List, Dict, Optional
+from playwright.async_api import async_playwright, Page, Frame, Browser, Playwright, Route
 
 # 嘗試設定終端編碼為 UTF-8（如果支援）
 def _setup_terminal_encoding():
@@ -122,8 +126,406 @@ def safe_print(*args, **kwargs):
                 print(text_only, **kwargs)
 
 
-class TCSAutomation:
-    """TCS 自動填寫類別"""
+# 批次填寫：一次 evaluate 設定所有行的欄位並觸發 onblur 驗證
+# 回傳找不到欄位的行索引
+_BULK_FILL_SCRIPT = """
+({ ids, rows }) => {
+    const missing = [];
+    const descriptions = document.querySelectorAll(`[id="${ids.work_description}"]`);
+    const setValue = (el, value) => {
+        el.value = value;
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+    };
+    const blur = (el) => el.dispatchEvent(new FocusEvent('blur'));
+
+    rows.forEach((row, idx) => {
+        const field = (key) => document.getElementById(ids[key] + idx);
+        const project = field('project_code');
+        const module = field('module_code');
+        const workItem = field('work_item_code');
+        const hours = field('work_hours');
+        const progress = field('progress_rate');
+        const description = descriptions[idx];
+        if (!project || !module || !workItem || !hours || !progress || !description) {
+            missing.push(idx);
+            return;
+        }
+
+        setValue(project, row.project_code);
+        blur(project);
+        setValue(module, row.account_group);
+        blur(module);
+        setValue(workItem, row.work_category);
+        blur(workItem);
+
+        const requirement = field('requirement_no');
+        if (row.requirement_no && requirement) {
+            setValue(requirement, row.requirement_no);
+        }
+        setValue(hours, row.hours);
+        setValue(description, row.description);
+        setValue(progress, row.progress_rate);
+    });
+    return missing;
+}
+"""
+
+# 計算目前行數（以專案代碼欄位 txtPROJ_CD<n> 為準）
+_ROW_COUNT_SCRIPT = """
+(prefix) => Array.from(document.querySelectorAll(`[id^="${prefix}"]`))
+    .filter((el) => /^\\d+$/.test(el.id.slice(prefix.length))).length
+"""
+
+# 一次點擊「新增一列」count 次
+_ADD_ROWS_SCRIPT = """
+({ buttonId, count }) => {
+    const button = document.getElementById(buttonId);
+    if (!button) {
+        return false;
+    }
+    for (let i = 0; i < count; i++) {
+        button.click();
+    }
+    return true;
+}
+"""
+
+# 一次讀取所有行目前的欄位值
+_READ_ROWS_SCRIPT = """
+(ids) => {
+    const descriptions = document.querySelectorAll(`[id="${ids.work_description}"]`);
+    const rows = [];
+    for (let idx = 0; ; idx++) {
+        const project = document.getElementById(ids.project_code + idx);
+        if (!project) {
+            break;
+        }
+        const value = (key) => {
+            const el = document.getElementById(ids[key] + idx);
+            return el ? el.value : '';
+        };
+        rows.push({
+            project_code: project.value,
+            account_group: value('module_code'),
+            work_category: value('work_item_code'),
+            requirement_no: value('requirement_no'),
+            hours: value('work_hours'),
+            description: descriptions[idx] ? descriptions[idx].value : '',
+            progress_rate: value('progress_rate'),
+        });
+    }
+    return rows;
+}
+"""
+
+# 套用差異：設定欄位值；需要驗證的欄位先清空名稱 span 再觸發 onblur
+# 回傳找不到欄位的變更索引
+_APPLY_CHANGES_SCRIPT = """
+(changes) => {
+    const failed = [];
+    changes.forEach((change, i) => {
+        const el = change.nth === null
+            ? document.getElementById(change.id)
+            : document.querySelectorAll(`[id="${change.id}"]`)[change.nth];
+        if (!el) {
+            failed.push(i);
+            return;
+        }
+        const span = change.span ? document.getElementById(change.span) : null;
+        if (span) {
+            span.textContent = '';
+        }
+        el.value = change.value;
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        if (change.span) {
+            el.dispatchEvent(new FocusEvent('blur'));
+        }
+    });
+    return failed;
+}
+"""
+
+# 等待指定行的所有名稱 span（span*_NME）都有內容
+_VALIDATION_DONE_SCRIPT = """
+({ spans, rows }) => rows.every((idx) => spans.every((span) => {
+    const el = document.getElementById(span + idx);
+    return el && el.textContent.trim() !== '';
+}))
+"""
+
+# 一次取回所有行的驗證結果
+_COLLECT_VALIDATION_SCRIPT = """
+({ spans, count }) => Array.from({ length: count }, (_, idx) => spans.map((span) => {
+    const el = document.getElementById(span + idx);
+    return el ? el.textContent.trim() : '';
+}))
+"""
+
+
+# 差異填寫的欄位：(selectors.json 欄位鍵, 驗證結果 span 鍵)
+_DIFF_FIELDS = {
+    'project_code': ('project_code', 'project_name_span'),
+    'account_group': ('module_code', 'module_name_span'),
+    'work_category': ('work_item_code', 'work_item_name_span'),
+    'requirement_no': ('requirement_no', None),
+    'hours': ('work_hours', None),
+    'description': ('work_description', None),
+    'progress_rate': ('progress_rate', None),
+}
+
+# 修改代碼時必須一併重送的欄位：TCS 的 setProjName 在專案名稱改變時會清空模組、
+# 工作項目與 txtWORK_CATG_CD；工作項目的 txtWORK_CATG_CD 依專案與模組查詢
+_DEPENDENT_FIELDS = {
+    'project_code': ('account_group', 'work_category'),
+    'account_group': ('work_category',),
+}
+
+
+class PhaseTimings(dict):
+    """
+    各階段耗時（毫秒，以 time.monotonic 量測），依開始順序排列
+
+    同名階段會累加（例如批次填寫失敗後改用逐欄位重填）。
+    on_phase 在每個階段結束時以 (名稱, 這一次的耗時) 呼叫。
+    """
+
+    def __init__(self, on_phase: Optional[Callable[[str, float], None]] = None):
+        super().__init__()
+        self.on_phase = on_phase
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """量測 with 區塊的耗時並記錄為 name 階段（區塊拋出例外時也會記錄）"""
+        begin = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(name, (time.monotonic() - begin) * 1000)
+
+    def add(self, name: str, ms: float):
+        self[name] = self.get(name, 0.0) + ms
+        if self.on_phase is not None:
+            self.on_phase(name, ms)
+
+
+def emit_event(on_event: Optional[Callable[[Dict], None]], event: Dict):
+    """
+    將進度事件交給 on_event（未設定時不做任何事）
+
+    事件格式：
+    - {'type': 'phase', 'phase': 名稱, 'ms': 耗時}：一個階段結束（如 query、fill、save）
+    - {'type': 'row', 'row', 'project_code', 'project_name', 'valid', 'invalid_fields', 'codes', 'names'}：
+      一行驗證完成；codes 與 names 以 project_code / account_group / work_category 為鍵，
+      分別是填入的代碼與 TCS 回傳的名稱
+
+    on_event 拋出的例外只記錄，不影響填寫。
+    """
+    if on_event is None:
+        return
+    try:
+        on_event(event)
+    except Exception as e:
+        safe_print(f"⚠️  進度事件處理失敗（不影響填寫）: {e}")
+
+
+def row_event(result: Dict, entry: Dict, proj_name: str, module_name: str, work_item_name: str) -> Dict:
+    """由 row_validation_result 的結果與 TCS 回傳的名稱建立 row 進度事件"""
+    return {
+        'type': 'row',
+        **result,
+        'project_name': proj_name,
+        'codes': {
+            'project_code': entry['project_code'],
+            'account_group': entry.get('account_group') or "A00",
+            'work_category': entry['work_category'],
+        },
+        'names': {
+            'project_code': proj_name,
+            'account_group': module_name,
+            'work_category': work_item_name,
+        },
+    }
+
+
+# 自動化用不到的資源類型（Playwright 的 request.resource_type），預設直接中止
+DEFAULT_ABORT_RESOURCE_TYPES = ("image", "font", "media")
+
+# 以空內容回應時的 Content-Type
+_STUB_CONTENT_TYPES = {
+    "stylesheet": "text/css",
+    "script": "application/javascript",
+}
+
+
+class RequestPolicy:
+    """
+    導覽時的請求路由規則：中止（abort）或以空內容回應（stub）不需要的請求
+
+    依資源類型（request.resource_type）或 URL 樣式（fnmatch 萬用字元）比對，
+    URL 樣式優先。stub 適用於頁面會等待載入完成的資源（如樣式表、追蹤腳本），
+    以 200 空內容回應，不會觸發 onerror。沒有任何規則時不攔截請求。
+
+    預設只中止圖片、字型與多媒體；樣式表照常載入，讓截圖與畫面一致。
+    """
+
+    def __init__(
+        self,
+        abort_types: Iterable[str] = DEFAULT_ABORT_RESOURCE_TYPES,
+        stub_types: Iterable[str] = (),
+        abort_urls: Iterable[str] = (),
+        stub_urls: Iterable[str] = (),
+    ):
+        self.abort_types = frozenset(abort_types)
+        self.stub_types = frozenset(stub_types)
+        self.abort_urls = tuple(abort_urls)
+        self.stub_urls = tuple(stub_urls)
+        self.aborted = 0  # 已中止的請求數
+        self.stubbed = 0  # 已以空內容回應的請求數
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.abort_types or self.stub_types or self.abort_urls or self.stub_urls)
+
+    def action(self, resource_type: str, url: str) -> Optional[str]:
+        """回傳 'abort'、'stub'，或 None（照常送出）"""
+        if any(fnmatch.fnmatchcase(url, pattern) for pattern in self.abort_urls):
+            return 'abort'
+        if any(fnmatch.fnmatchcase(url, pattern) for pattern in self.stub_urls):
+            return 'stub'
+        if resource_type in self.abort_types:
+            return 'abort'
+        if resource_type in self.stub_types:
+            return 'stub'
+        return None
+
+    async def handle(self, route: Route):
+        """page.route / context.route 的處理函式"""
+        request = route.request
+        action = self.action(request.resource_type, request.url)
+        if action == 'abort':
+            self.aborted += 1
+            await route.abort('blockedbyclient')
+        elif action == 'stub':
+            self.stubbed += 1
+            await route.fulfill(
+                status=200,
+                body='',
+                content_type=_STUB_CONTENT_TYPES.get(request.resource_type, 'text/plain'),
+            )
+        else:
+            await route.continue_()
+
+    async def install(self, target):
+        """在 Page 或 BrowserContext 上攔截所有請求（沒有規則時不做任何事）"""
+        if self.enabled:
+            await target.route("**/*", self.handle)
+
+
+def load_selectors() -> Dict[str, str]:
+    """載入 selectors.json（TCS 表單欄位 id）"""
+    selectors_path = Path(__file__).parent / "selectors.json"
+    with open(selectors_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def tcs_row_values(entry: Dict) -> Dict[str, str]:
+    """將一筆工時記錄轉為要填入 TCS 欄位的字串值"""
+    return {
+        'project_code': entry['project_code'],
+        'account_group': entry.get('account_group') or "A00",
+        'work_category': entry['work_category'],
+        'requirement_no': entry.get('requirement_no') or "",
+        'hours': str(entry['hours']),
+        'description': entry['description'],
+        'progress_rate': str(entry.get('progress_rate', '0')),
+    }
+
+
+def _normalize_field(field: str, value) -> str:
+    """比較用的欄位值：去除空白、統一換行，數字欄位以數值比較（7.5 == 7.50）"""
+    text = "" if value is None else str(value).replace('\r\n', '\n').strip()
+    if field in ('hours', 'progress_rate') and text:
+        try:
+            return f"{float(text):g}"
+        except ValueError:
+            return text
+    return text
+
+
+def plan_row_changes(current_rows: List[Dict], entries: List[Dict]) -> List[Dict]:
+    """
+    比較 TCS 畫面上的行與要填入的記錄，列出需要修改的欄位
+
+    Args:
+        current_rows: _READ_ROWS_SCRIPT 讀到的每行欄位值
+        entries: 要填入的工時記錄
+
+    Returns:
+        變更列表，每項包含 row、field、value，依欄位順序排列；
+        專案代碼改變時一併重送模組與工作項目，模組改變時一併重送工作項目（見 _DEPENDENT_FIELDS）；
+        超出記錄數的舊資料行會將非空欄位清空（value 為空字串），
+        TCS 的 checkData 會略過專案代碼與工時都空白的行
+    """
+    changes = []
+    for idx, entry in enumerate(entries):
+        current = current_rows[idx] if idx < len(current_rows) else {}
+        values = tcs_row_values(entry)
+        changed = {
+            field for field, value in values.items()
+            if _normalize_field(field, current.get(field)) != _normalize_field(field, value)
+        }
+        for field in list(changed):
+            changed.update(_DEPENDENT_FIELDS.get(field, ()))
+        changes.extend(
+            {'row': idx, 'field': field, 'value': value}
+            for field, value in values.items() if field in changed
+        )
+
+    for idx in range(len(entries), len(current_rows)):
+        for field in _DIFF_FIELDS:
+            if _normalize_field(field, current_rows[idx].get(field)):
+                changes.append({'row': idx, 'field': field, 'value': ''})
+
+    return changes
+
+
+def row_validation_result(row_idx: int, entry: Dict, proj_name: str, module_name: str, work_item_name: str) -> Dict:
+    """
+    依代碼驗證回傳的名稱判斷該行驗證結果，並對無效欄位輸出警告
+
+    名稱為空或包含「錯誤」視為無效。
+
+    Returns:
+        Dict: row、project_code、valid、invalid_fields
+    """
+    account_group_code = entry.get('account_group') or "A00"
+    invalid_fields = []
+    if not proj_name or '錯誤' in proj_name:
+        safe_print(f"  ⚠️  警告: 專案代碼 {entry['project_code']} 可能無效")
+        invalid_fields.append('project_code')
+    if not module_name or '錯誤' in module_name:
+        safe_print(f"  ⚠️  警告: 模組代碼 {account_group_code} 可能無效")
+        invalid_fields.append('account_group')
+    if not work_item_name or '錯誤' in work_item_name:
+        safe_print(f"  ⚠️  警告: 工作類別 {entry['work_category']} 可能無效")
+        invalid_fields.append('work_category')
+    return {
+        'row': row_idx,
+        'project_code': entry['project_code'],
+        'valid': not invalid_fields,
+        'invalid_fields': invalid_fields,
+    }
+
+
+class AsyncTCSAutomation:
+    """
+    TCS 自動填寫類別（asyncio 版本）
+
+    使用 playwright.async_api，所有等待都不會阻塞 event loop，
+    可以直接在 FastAPI 端點中 await。
+    """
 
     def __init__(self, tcs_url: str = "http://cfcgpap01/tcs/"):
         self.tcs_url = tcs_url
@@ -133,13 +535,23 @@ class TCSAutomation:
         self.playwright: Optional[Playwright] = None
         self.dry_run = False
         self.fast_mode = True  # 預設啟用快速模式
+        self.bulk_fill = True  # 快速模式下以單次 evaluate 批次填寫，失敗時退回逐欄位填寫
+        self.diff_fill = True  # 快速模式下只修改與 TCS 現有資料不同的欄位（不清除重填）
+        self._owns_browser = True  # attach() 借用的瀏覽器由外部（如 browser pool）負責關閉
+        self.on_event: Optional[Callable[[Dict], None]] = None  # 進度事件（見 emit_event）
+        self.timings = PhaseTimings(on_phase=self._phase_done)  # 各階段耗時（毫秒）
+        self.request_policy = RequestPolicy()  # 導覽時中止不需要的資源（見 RequestPolicy）
 
         # 載入選擇器配置
-        selectors_path = Path(__file__).parent / "selectors.json"
-        with open(selectors_path, 'r', encoding='utf-8') as f:
-            self.selectors = json.load(f)
+        self.selectors = load_selectors()
 
-    def start(self, headless: bool = False, dry_run: bool = False, fast_mode: bool = True):
+    async def start(
+        self,
+        headless: bool = False,
+        dry_run: bool = False,
+        fast_mode: bool = True,
+        request_policy: Optional[RequestPolicy] = None,
+    ):
         """
         啟動瀏覽器
 
@@ -147,32 +559,39 @@ class TCSAutomation:
             headless: 是否使用無頭模式
             dry_run: 乾運行模式（不會真正儲存）
             fast_mode: 快速模式（預設 True，移除 slow_mo 和減少等待時間）
+            request_policy: 請求路由規則（預設使用 self.request_policy；
+                RequestPolicy(abort_types=()) 表示不攔截）
         """
         self.dry_run = dry_run
         self.fast_mode = fast_mode
-        self.playwright = sync_playwright().start()
+        if request_policy is not None:
+            self.request_policy = request_policy
+        with self.timings.phase('launch'):
+            self.playwright = await async_playwright().start()
 
-        # 使用 Chromium，支援 Windows 整合驗證
-        browser_options = {
-            "headless": headless,
-        }
-        
-        # 只在非快速模式下使用 slow_mo（用於調試）
-        if not fast_mode:
-            browser_options["slow_mo"] = 300
-        
-        self.browser = self.playwright.chromium.launch(**browser_options)
+            # 使用 Chromium，支援 Windows 整合驗證
+            browser_options = {
+                "headless": headless,
+            }
+
+            # 只在非快速模式下使用 slow_mo（用於調試）
+            if not fast_mode:
+                browser_options["slow_mo"] = 300
 
-        # 建立新的頁面
-        self.page = self.browser.new_page()
+            self.browser = await self.playwright.chromium.launch(**browser_options)
+
+            # 建立新的頁面，在導覽前安裝請求路由（圖片、字型等不再下載，networkidle 更快到達）
+            self.page = await self.browser.new_page()
+            await self.request_policy.install(self.page)
 
         # 前往 TCS 首頁
         safe_print(f"正在連接 TCS 系統: {self.tcs_url}")
-        self.page.goto(self.tcs_url, timeout=30000)
-        self.page.wait_for_load_state('networkidle')
+        with self.timings.phase('navigation'):
+            await self.page.goto(self.tcs_url, timeout=30000)
+            await self.page.wait_for_load_state('networkidle')
 
-        # 切換到 mainFrame（工時輸入的 frame）
-        main_frame = self.page.frame(name='mainFrame')
+            # 切換到 mainFrame（工時輸入的 frame）
+            main_frame = self.page.frame(name='mainFrame')
         if not main_frame:
             raise Exception('找不到 mainFrame，請確認 TCS 系統已正確載入')
 
@@ -182,7 +601,28 @@ class TCSAutomation:
         if dry_run:
             safe_print("⚠️  DRY RUN 模式：不會真正儲存資料")
 
-    def fill_time_entries(self, date: str, entries: List[Dict]):
+    def attach(self, page: Page, frame: Frame, dry_run: bool = False, fast_mode: bool = True):
+        """
+        使用已載入 TCS 的頁面（不啟動新瀏覽器）
+
+        供 browser pool 使用：頁面與瀏覽器由呼叫端持有，close() 不會關閉它們。
+
+        Args:
+            page: 已開啟 TCS 首頁的 Page
+            frame: 該頁面的 mainFrame
+            dry_run: 乾運行模式（不會真正儲存）
+            fast_mode: 快速模式
+        """
+        self.page = page
+        self.frame = frame
+        self.dry_run = dry_run
+        self.fast_mode = fast_mode
+        self._owns_browser = False
+
+        if dry_run:
+            safe_print("⚠️  DRY RUN 模式：不會真正儲存資料")
+
+    async def fill_time_entries(self, date: str, entries: List[Dict]):
         """
         填寫多筆工時記錄
 
@@ -196,100 +636,275 @@ class TCSAutomation:
                 - description: 工作說明
                 - requirement_no: 需求單號（選填）
                 - progress_rate: 完成百分比（選填，預設 0）
+
+        Returns:
+            List[Dict]: 每行的驗證結果（row, project_code, valid, invalid_fields）；
+            各階段耗時記錄在 self.timings
         """
         if not self.frame:
             raise Exception("瀏覽器未啟動，請先呼叫 start()")
 
-        # 1. 填入日期
-        self._fill_date(date)
+        with self.timings.phase('query'):
+            # 1. 填入日期
+            await self._fill_date(date)
 
-        # 2. 點擊查詢按鈕（載入該日期的資料）
-        safe_print(f"查詢日期 {date} 的資料...")
-        query_button = self.frame.locator(f'#{self.selectors["query_button"]}')
-        query_button.click()
-        
-        # 智能等待查詢完成
-        if self.fast_mode:
+            # 2. 點擊查詢按鈕（載入該日期的資料）
+            safe_print(f"查詢日期 {date} 的資料...")
+            query_button = self.frame.locator(f'#{self.selectors["query_button"]}')
+            await query_button.click()
+
+            # 智能等待查詢完成
+            if self.fast_mode:
+                try:
+                    # 等待 frame 載入完成或等待查詢結果出現
+                    await self.frame.wait_for_load_state('networkidle', timeout=3000)
+                except Exception:
+                    # 如果等待失敗，使用較短的固定等待
+                    await asyncio.sleep(0.5)
+            else:
+                await asyncio.sleep(1)  # 非快速模式：使用原始等待時間
+
+        # 3. 差異模式讀取現有資料；否則清除現有資料
+        current_rows = None
+        if self.fast_mode and self.diff_fill:
+            with self.timings.phase('read_rows'):
+                current_rows = await self._read_current_rows()
+        if current_rows is None:
+            with self.timings.phase('clear'):
+                await self._clear_existing_data()
+
+        # 4. 準備足夠的行數（預設 5 行）
+        with self.timings.phase('add_rows'):
+            await self._ensure_rows(len(entries))
+
+        # 5. 填寫工時記錄
+        if current_rows is not None:
+            row_results = await self._fill_entries_diff(entries, current_rows)
+        elif self.fast_mode and self.bulk_fill:
+            row_results = await self._fill_entries_bulk(entries)
+        else:
+            row_results = await self._fill_entries_per_field(entries)
+
+        safe_print(f"✅ 已填寫 {len(entries)} 筆工時記錄")
+
+        # 6. 等待所有 AJAX 驗證完成
+        safe_print("⏳ 等待所有欄位驗證完成...")
+        with self.timings.phase('total_check'):
+            if self.fast_mode:
+                # 快速模式：各欄位驗證已逐一等待完成，只需等待總工時更新
+                expected_total = sum(float(entry['hours']) for entry in entries)
+                await self._wait_for_total_hours(expected_total)
+            else:
+                await asyncio.sleep(1)  # 非快速模式：確保所有 onblur 事件和 AJAX 請求都完成
+
+            # 7. 驗證總工時
+            await self._validate_total_hours()
+
+        return row_results
+
+    async def _ensure_rows(self, row_count: int):
+        """
+        新增行直到至少有 row_count 行（TCS 預設 5 行）
+
+        快速模式先計算缺少的行數，在一次 evaluate 中全部新增，
+        最後只確認一次行數；不足時再逐行新增補齊。
+        """
+        if row_count <= 5:
+            return
+
+        if not self.fast_mode:
+            for idx in range(5, row_count):
+                await self._add_new_row()
+                await asyncio.sleep(0.3)
+            return
+
+        prefix = self.selectors["project_code"]
+        try:
+            existing = await self.frame.evaluate(_ROW_COUNT_SCRIPT, prefix)
+        except Exception:
+            existing = 5
+        missing = row_count - existing
+        if missing <= 0:
+            return
+
+        try:
+            added = await self.frame.evaluate(
+                _ADD_ROWS_SCRIPT,
+                {'buttonId': self.selectors["add_row_button"], 'count': missing},
+            )
+        except Exception:
+            added = False
+        if added:
+            safe_print(f"新增 {missing} 列")
+            await self._wait_for_row(row_count - 1)
             try:
-                # 等待 frame 載入完成或等待查詢結果出現
-                self.frame.wait_for_load_state('networkidle', timeout=3000)
+                existing = await self.frame.evaluate(_ROW_COUNT_SCRIPT, prefix)
             except Exception:
-                # 如果等待失敗，使用較短的固定等待
-                time.sleep(0.5)
-        else:
-            time.sleep(1)  # 非快速模式：使用原始等待時間
+                existing = row_count  # 無法確認時信任已出現的最後一行
+
+        # 批次新增未完成（例如按鈕會重新載入頁面）：逐行補齊
+        for idx in range(existing, row_count):
+            await self._add_new_row()
+            await self._wait_for_row(idx)
+
+    async def _fill_entries_per_field(self, entries: List[Dict], row_indexes: Optional[List[int]] = None) -> List[Dict]:
+        """逐欄位填寫（每個欄位一次 Playwright 操作）"""
+        results = []
+        for idx in (range(len(entries)) if row_indexes is None else row_indexes):
+            safe_print(f"填寫第 {idx + 1} 筆記錄...")
+            results.append(await self._fill_single_entry(idx, entries[idx]))
+            if not self.fast_mode:
+                await asyncio.sleep(0.5)  # 非快速模式：每筆之間稍微延遲
+        return results
+
+    async def _fill_entries_bulk(self, entries: List[Dict]) -> List[Dict]:
+        """
+        批次填寫：一次 evaluate 填入所有行並觸發驗證，再一次 evaluate 取回驗證結果
+
+        找不到欄位或驗證未在時限內完成的行，改用逐欄位方式重新填寫。
+        """
+        rows = [tcs_row_values(entry) for entry in entries]
+        try:
+            with self.timings.phase('fill'):
+                missing = await self.frame.evaluate(_BULK_FILL_SCRIPT, {'ids': self.selectors, 'rows': rows})
+        except Exception as e:
+            safe_print(f"⚠️  批次填寫失敗，改用逐欄位填寫: {e}")
+            return await self._fill_entries_per_field(entries)
+
+        validating = [idx for idx in range(len(entries)) if idx not in missing]
+        return await self._collect_row_results(entries, validating, missing)
+
+    async def _collect_row_results(self, entries: List[Dict], validating: List[int], missing: List[int]) -> List[Dict]:
+        """
+        等待 validating 行的驗證完成，再一次 evaluate 取回所有行的驗證結果
+
+        missing 行（找不到欄位）與驗證未在時限內完成的行，改用逐欄位方式重新填寫。
+        """
+        spans = [
+            self.selectors["project_name_span"],
+            self.selectors["module_name_span"],
+            self.selectors["work_item_name_span"],
+        ]
+        with self.timings.phase('validation'):
+            if validating:
+                try:
+                    await self.frame.wait_for_function(
+                        _VALIDATION_DONE_SCRIPT,
+                        arg={'spans': spans, 'rows': validating},
+                        timeout=2000 + 100 * len(validating),
+                    )
+                except Exception:
+                    pass  # 逾時：未完成驗證的行稍後逐欄位重填
 
-        # 3. 清除現有資料（如果需要）
-        self._clear_existing_data()
+            names = await self.frame.evaluate(_COLLECT_VALIDATION_SCRIPT, {'spans': spans, 'count': len(entries)})
 
-        # 4. 逐筆填寫工時記錄
+        results = {}
+        retry = []
         for idx, entry in enumerate(entries):
-            if idx >= 5:
-                # 如果超過 5 筆，需要新增行
-                self._add_new_row()
-                # 快速模式：減少等待時間
-                wait_time = 0.1 if self.fast_mode else 0.3
-                time.sleep(wait_time)
+            if idx in missing or not all(names[idx]):
+                retry.append(idx)
+                continue
+            results[idx] = self._report_row_validation(idx, entry, *names[idx])
+            safe_print(f"  ✓ 第 {idx + 1} 筆: {entry['project_code']} - {entry['hours']}h")
 
-            safe_print(f"填寫第 {idx + 1} 筆記錄...")
-            self._fill_single_entry(idx, entry)
-            # 快速模式：減少記錄間延遲
-            wait_time = 0.1 if self.fast_mode else 0.5
-            time.sleep(wait_time)  # 每筆之間稍微延遲
+        if retry:
+            safe_print(f"⚠️  {len(retry)} 筆未完成批次驗證，改用逐欄位填寫")
+            for result in await self._fill_entries_per_field(entries, retry):
+                results[result['row']] = result
 
-        safe_print(f"✅ 已填寫 {len(entries)} 筆工時記錄")
+        return [results[idx] for idx in range(len(entries))]
 
-        # 5. 等待所有 AJAX 驗證完成
-        safe_print("⏳ 等待所有欄位驗證完成...")
-        if self.fast_mode:
-            # 快速模式：使用較短的等待時間
-            time.sleep(0.3)
+    async def _read_current_rows(self) -> Optional[List[Dict]]:
+        """一次 evaluate 讀取目前 TCS 畫面上所有行的欄位值（失敗時回傳 None）"""
+        try:
+            return await self.frame.evaluate(_READ_ROWS_SCRIPT, self.selectors)
+        except Exception as e:
+            safe_print(f"⚠️  無法讀取現有資料，改為清除後重新填寫: {e}")
+            return None
+
+    async def _fill_entries_diff(self, entries: List[Dict], current_rows: List[Dict]) -> List[Dict]:
+        """
+        差異填寫：只修改與目前畫面不同的欄位
+
+        需要驗證的代碼欄位會先清空對應的名稱 span 再觸發 onblur，
+        只等待這些行的驗證；多出來的舊資料行會被清空。
+        """
+        changes = plan_row_changes(current_rows, entries)
+        if not changes:
+            safe_print("✅ TCS 上的資料與本地相同，無需修改")
         else:
-            time.sleep(1)  # 非快速模式：確保所有 onblur 事件和 AJAX 請求都完成
+            safe_print(f"差異填寫：修改 {len(changes)} 個欄位")
 
-        # 6. 驗證總工時
-        self._validate_total_hours()
+        payload = []
+        for change in changes:
+            field_key, span_key = _DIFF_FIELDS[change['field']]
+            removing = change['row'] >= len(entries)
+            payload.append({
+                'id': self.selectors[field_key] + ('' if field_key == 'work_description' else str(change['row'])),
+                'nth': change['row'] if field_key == 'work_description' else None,
+                'span': None if removing or span_key is None else f"{self.selectors[span_key]}{change['row']}",
+                'value': change['value'],
+            })
 
-    def _fill_date(self, date: str):
+        try:
+            with self.timings.phase('fill'):
+                failed = await self.frame.evaluate(_APPLY_CHANGES_SCRIPT, payload) if payload else []
+        except Exception as e:
+            safe_print(f"⚠️  差異填寫失敗，改用逐欄位填寫: {e}")
+            await self._clear_existing_data()
+            return await self._fill_entries_per_field(entries)
+
+        missing = sorted({changes[i]['row'] for i in failed if changes[i]['row'] < len(entries)})
+        validating = sorted({
+            change['row'] for change, item in zip(changes, payload)
+            if item['span'] and change['row'] not in missing
+        })
+        return await self._collect_row_results(entries, validating, missing)
+
+    def _report_row_validation(self, row_idx: int, entry: Dict, proj_name: str, module_name: str, work_item_name: str) -> Dict:
+        """依名稱 span 內容判斷該行驗證結果，並對無效欄位輸出警告"""
+        result = row_validation_result(row_idx, entry, proj_name, module_name, work_item_name)
+        emit_event(self.on_event, row_event(result, entry, proj_name, module_name, work_item_name))
+        return result
+
+    def _phase_done(self, name: str, ms: float):
+        emit_event(self.on_event, {'type': 'phase', 'phase': name, 'ms': round(ms, 1)})
+
+    async def _fill_date(self, date: str):
         """填入日期"""
         date_input = f'#{self.selectors["date_input"]}'
-        self.frame.fill(date_input, date)
+        await self.frame.fill(date_input, date)
         safe_print(f"✅ 填入日期: {date}")
 
-    def _clear_existing_data(self):
+    async def _clear_existing_data(self):
         """清除現有資料"""
         try:
             clear_button = self.frame.locator(self.selectors["clear_button"])
-            if clear_button.count() > 0:
-                clear_button.click()
+            if await clear_button.count() > 0:
+                await clear_button.click()
                 
                 # 智能等待資料清除完成
                 if self.fast_mode:
                     try:
-                        # 等待第一筆專案代碼變為空（最多等待 1 秒）
-                        first_proj = self.frame.locator('#txtPROJ_CD0')
-                        start_time = time.time()
-                        while time.time() - start_time < 1.0:
-                            try:
-                                value = first_proj.input_value()
-                                if not value or value.strip() == "":
-                                    break
-                            except Exception:
-                                pass
-                            time.sleep(0.1)
-                        # 額外等待 0.1 秒確保清除完成
-                        time.sleep(0.1)
+                        # 等待第一筆專案代碼變為空（最多等待 1 秒），清空的瞬間即繼續
+                        await self.frame.wait_for_function(
+                            """(selector) => {
+                                const input = document.querySelector(selector);
+                                return !input || input.value.trim() === '';
+                            }""",
+                            arg=f'#{self.selectors["project_code"]}0',
+                            timeout=1000,
+                        )
                     except Exception:
-                        # 如果等待失敗，使用較短的固定等待
-                        time.sleep(0.2)
+                        pass  # 逾時：欄位可能本來就有預設值，繼續填寫
                 else:
-                    time.sleep(0.5)  # 非快速模式：使用原始等待時間
+                    await asyncio.sleep(0.5)  # 非快速模式：使用原始等待時間
                 
                 safe_print("清除現有資料")
         except Exception:
             pass  # 沒有清除按鈕或資料，忽略
 
-    def _fill_single_entry(self, row_idx: int, entry: Dict):
+    async def _fill_single_entry(self, row_idx: int, entry: Dict):
         """
         填寫單筆工時記錄
 
@@ -297,129 +912,156 @@ class TCSAutomation:
             row_idx: 行索引（從 0 開始）
             entry: 工時記錄資料
                 - account_group: 模組代碼，如果為空則預設填入 "A00"
+
+        Returns:
+            Dict: 該行的驗證結果
+
+        耗時記錄為 row<n>.validation（等待 AJAX 驗證）與 row<n>.fields（其餘欄位操作）。
         """
+        validation_phase = f'row{row_idx}.validation'
+        row_begin = time.monotonic()
+        validation_before = self.timings.get(validation_phase, 0.0)
+
         # 專案代碼
         proj_input = f'#{self.selectors["project_code"]}{row_idx}'
-        self.frame.fill(proj_input, entry['project_code'])
-        self.frame.locator(proj_input).blur()  # 觸發 onblur 事件
+        await self.frame.fill(proj_input, entry['project_code'])
+        await self.frame.locator(proj_input).blur()  # 觸發 onblur 事件
 
         # 智能等待專案名稱驗證完成
-        proj_name_span = self.frame.locator(f'#{self.selectors["project_name_span"]}{row_idx}')
-        is_valid = self._wait_for_ajax_validation(proj_name_span, timeout=2000)
-        
-        # 驗證專案名稱是否正確載入
-        proj_name = proj_name_span.text_content()
-        if not proj_name or '錯誤' in proj_name:
-            safe_print(f"  ⚠️  警告: 專案代碼 {entry['project_code']} 可能無效")
+        proj_name_span = f'#{self.selectors["project_name_span"]}{row_idx}'
+        with self.timings.phase(validation_phase):
+            await self._wait_for_ajax_validation(proj_name_span, timeout=2000)
+
+            # 讀取專案名稱（驗證結果在最後統一判斷）
+            proj_name = await self.frame.locator(proj_name_span).text_content()
 
         # 模組（如果為空則預設填入 "A00"）
         account_group_code = entry.get('account_group') or "A00"
         module_input = f'#{self.selectors["module_code"]}{row_idx}'
-        self.frame.fill(module_input, account_group_code)
-        self.frame.locator(module_input).blur()
+        await self.frame.fill(module_input, account_group_code)
+        await self.frame.locator(module_input).blur()
         
         # 智能等待模組名稱驗證完成
-        module_name_span = self.frame.locator(f'#{self.selectors["module_name_span"]}{row_idx}')
-        self._wait_for_ajax_validation(module_name_span, timeout=2000)
+        module_name_span = f'#{self.selectors["module_name_span"]}{row_idx}'
+        with self.timings.phase(validation_phase):
+            await self._wait_for_ajax_validation(module_name_span, timeout=2000)
 
-        # 驗證模組名稱
-        module_name = module_name_span.text_content()
-        if not module_name or '錯誤' in module_name:
-            safe_print(f"  ⚠️  警告: 模組代碼 {account_group_code} 可能無效")
+            # 讀取模組名稱
+            module_name = await self.frame.locator(module_name_span).text_content()
 
         # 工作類別
         work_item_input = f'#{self.selectors["work_item_code"]}{row_idx}'
-        self.frame.fill(work_item_input, entry['work_category'])
-        self.frame.locator(work_item_input).blur()
+        await self.frame.fill(work_item_input, entry['work_category'])
+        await self.frame.locator(work_item_input).blur()
         
         # 智能等待工作類別名稱驗證完成
-        work_item_name_span = self.frame.locator(f'#{self.selectors["work_item_name_span"]}{row_idx}')
-        self._wait_for_ajax_validation(work_item_name_span, timeout=2000)
+        work_item_name_span = f'#{self.selectors["work_item_name_span"]}{row_idx}'
+        with self.timings.phase(validation_phase):
+            await self._wait_for_ajax_validation(work_item_name_span, timeout=2000)
 
-        # 驗證工作類別名稱
-        work_item_name = work_item_name_span.text_content()
-        if not work_item_name or '錯誤' in work_item_name:
-            safe_print(f"  ⚠️  警告: 工作類別 {entry['work_category']} 可能無效")
+            # 讀取工作類別名稱
+            work_item_name = await self.frame.locator(work_item_name_span).text_content()
 
         # 需求單號（選填）
         if entry.get('requirement_no'):
             req_input = f'#{self.selectors["requirement_no"]}{row_idx}'
-            self.frame.fill(req_input, entry['requirement_no'])
+            await self.frame.fill(req_input, entry['requirement_no'])
 
         # 實際工時
         hours_input = f'#{self.selectors["work_hours"]}{row_idx}'
-        self.frame.fill(hours_input, str(entry['hours']))
+        await self.frame.fill(hours_input, str(entry['hours']))
 
         # 工作說明
         # 注意：所有 textarea 都用同樣的 ID，需要用 nth 選擇
         desc_textarea = self.frame.locator(f'#{self.selectors["work_description"]}').nth(row_idx)
-        desc_textarea.fill(entry['description'])
+        await desc_textarea.fill(entry['description'])
 
         # 完成百分比（選填）
         progress_input = f'#{self.selectors["progress_rate"]}{row_idx}'
         progress_rate = str(entry.get('progress_rate', '0'))
-        self.frame.fill(progress_input, progress_rate)
+        await self.frame.fill(progress_input, progress_rate)
 
+        row_ms = (time.monotonic() - row_begin) * 1000
+        validation_ms = self.timings.get(validation_phase, 0.0) - validation_before
+        self.timings.add(f'row{row_idx}.fields', row_ms - validation_ms)
+
+        result = self._report_row_validation(row_idx, entry, proj_name, module_name, work_item_name)
         safe_print(f"  ✓ 第 {row_idx + 1} 筆: {entry['project_code']} - {entry['hours']}h")
+        return result
 
-    def _add_new_row(self):
+    async def _add_new_row(self):
         """新增一行"""
         add_button = self.frame.locator(f'#{self.selectors["add_row_button"]}')
-        add_button.click()
+        await add_button.click()
         safe_print("新增一列")
 
-    def _wait_for_ajax_validation(self, element_locator, timeout: int = 2000, error_keyword: str = "錯誤"):
+    async def _wait_for_row(self, row_idx: int, timeout: int = 2000):
+        """等待第 row_idx 行的專案代碼欄位出現（新增行後使用）"""
+        try:
+            await self.frame.wait_for_selector(
+                f'#{self.selectors["project_code"]}{row_idx}',
+                state='attached',
+                timeout=timeout,
+            )
+        except Exception:
+            pass  # 逾時：交給後續 fill 的自動等待處理
+
+    async def _wait_for_ajax_validation(self, span_selector: str, timeout: int = 2000, error_keyword: str = "錯誤"):
         """
-        智能等待 AJAX 驗證完成
-        
+        等待 AJAX 驗證完成
+
+        以 wait_for_function 監看顯示驗證結果的 span，內容一出現就立即返回，
+        不需要輪詢。
+
         Args:
-            element_locator: 要等待的元素 locator（通常是顯示驗證結果的 span）
+            span_selector: 顯示驗證結果的 span 選擇器（如 #spanPROJ_NME0）
             timeout: 超時時間（毫秒），預設 2000ms
             error_keyword: 錯誤關鍵字，預設 "錯誤"
-        
+
         Returns:
-            bool: 是否驗證成功（非空且非錯誤）
+            bool: 是否驗證成功（非空且非錯誤）；逾時視為成功，由呼叫端再檢查內容
         """
         if not self.fast_mode:
             # 非快速模式：使用固定等待
-            time.sleep(0.4)
+            await asyncio.sleep(0.4)
             return True
-        
+
         try:
-            # 快速模式：智能等待元素內容改變
-            # 等待元素文字內容非空且不包含錯誤關鍵字
-            start_time = time.time()
-            max_wait = timeout / 1000.0  # 轉換為秒
-            
-            while time.time() - start_time < max_wait:
-                try:
-                    text = element_locator.text_content()
-                    if text and text.strip() != "":
-                        # 檢查是否為錯誤訊息
-                        if error_keyword not in text:
-                            return True
-                        else:
-                            # 是錯誤訊息，但已經有內容了，可以返回
-                            return False
-                except Exception:
-                    pass
-                
-                # 短暫等待後重試
-                time.sleep(0.1)
-            
-            # 超時：回退到固定等待
-            time.sleep(0.2)
-            return True
+            handle = await self.frame.wait_for_function(
+                """(selector) => {
+                    const span = document.querySelector(selector);
+                    const text = span ? span.textContent.trim() : '';
+                    return text !== '' ? text : null;
+                }""",
+                arg=span_selector,
+                timeout=timeout,
+            )
+            text = await handle.json_value()
+            return error_keyword not in text
         except Exception:
-            # 發生錯誤：回退到固定等待
-            time.sleep(0.3)
+            # 逾時或 frame 已重新載入：不阻擋填寫流程
             return True
 
-    def _validate_total_hours(self):
+    async def _wait_for_total_hours(self, expected_total: float, timeout: int = 1000):
+        """等待總工時標籤更新為預期值（逾時則直接繼續，由 _validate_total_hours 回報）"""
+        try:
+            await self.frame.wait_for_function(
+                """([selector, expected]) => {
+                    const label = document.querySelector(selector);
+                    const value = label ? parseFloat(label.textContent) : NaN;
+                    return Math.abs(value - expected) < 0.001;
+                }""",
+                arg=[f'#{self.selectors["actual_hours_label"]}', expected_total],
+                timeout=timeout,
+            )
+        except Exception:
+            pass
+
+    async def _validate_total_hours(self):
         """驗證總工時"""
         try:
             total_hours_label = self.frame.locator(f'#{self.selectors["actual_hours_label"]}')
-            total_hours = total_hours_label.text_content()
+            total_hours = await total_hours_label.text_content()
             safe_print(f"📊 總工時: {total_hours} 小時")
 
             total_float = float(total_hours)
@@ -428,131 +1070,136 @@ class TCSAutomation:
         except Exception as e:
             safe_print(f"無法驗證總工時: {e}")
 
-    def preview_before_save(self, auto_confirm: bool = False):
+    async def preview_before_save(self, auto_confirm: bool = False):
         """
         儲存前預覽（讓使用者確認）
         
         Args:
             auto_confirm: 是否自動確認（不需要等待輸入），預設 False
         """
-        safe_print("\n" + "=" * 50)
-        safe_print("請確認填寫的資料是否正確")
-        safe_print("=" * 50)
-        
-        if self.dry_run:
-            safe_print("⚠️  DRY RUN 模式：將不會真正儲存")
-            # 快速模式：減少等待時間
-            wait_time = 0.2 if self.fast_mode else 1.0
-            time.sleep(wait_time)
-        else:
-            if auto_confirm:
-                safe_print("✅ 自動確認：繼續儲存")
-                wait_time = 0.2 if self.fast_mode else 0.5
-                time.sleep(wait_time)
+        with self.timings.phase('preview'):
+            safe_print("\n" + "=" * 50)
+            safe_print("請確認填寫的資料是否正確")
+            safe_print("=" * 50)
+
+            if self.dry_run:
+                safe_print("⚠️  DRY RUN 模式：將不會真正儲存")
+                # 快速模式：減少等待時間
+                wait_time = 0.2 if self.fast_mode else 1.0
+                await asyncio.sleep(wait_time)
             else:
-                safe_print("按 Enter 繼續儲存，或 Ctrl+C 取消")
-                input()
+                if auto_confirm:
+                    safe_print("✅ 自動確認：繼續儲存")
+                    wait_time = 0.2 if self.fast_mode else 0.5
+                    await asyncio.sleep(wait_time)
+                else:
+                    safe_print("按 Enter 繼續儲存，或 Ctrl+C 取消")
+                    await asyncio.to_thread(input)
 
-    def save(self):
+    async def save(self):
         """點擊儲存按鈕"""
-        if self.dry_run:
-            safe_print("⚠️  DRY RUN 模式：跳過儲存")
-            return
+        with self.timings.phase('save'):
+            if self.dry_run:
+                safe_print("⚠️  DRY RUN 模式：跳過儲存")
+                return
 
-        # 儲存前驗證：確認至少有一筆資料已填入
-        safe_print("🔍 驗證資料是否已正確填入...")
-        try:
-            # 檢查第一筆專案代碼是否有值
-            first_proj = self.frame.locator('#txtPROJ_CD0')
-            if first_proj.count() > 0:
-                proj_value = first_proj.input_value()
-                if not proj_value or proj_value.strip() == "":
-                    safe_print("⚠️  警告: 第一筆專案代碼為空，可能資料未正確填入")
-                else:
-                    safe_print(f"   ✓ 第一筆專案代碼: {proj_value}")
-            
-            # 檢查總工時
+            # 儲存前驗證：確認至少有一筆資料已填入
+            safe_print("🔍 驗證資料是否已正確填入...")
             try:
-                total_hours = self.frame.locator('#lblACTL_HR').text_content()
-                if total_hours and float(total_hours) > 0:
-                    safe_print(f"   ✓ 總工時: {total_hours} 小時")
-                else:
-                    safe_print("⚠️  警告: 總工時為 0，可能資料未正確填入")
-            except Exception:
-                pass
-        except Exception as e:
-            safe_print(f"⚠️  驗證過程中的警告: {e}")
+                # 檢查第一筆專案代碼是否有值
+                first_proj = self.frame.locator('#txtPROJ_CD0')
+                if await first_proj.count() > 0:
+                    proj_value = await first_proj.input_value()
+                    if not proj_value or proj_value.strip() == "":
+                        safe_print("⚠️  警告: 第一筆專案代碼為空，可能資料未正確填入")
+                    else:
+                        safe_print(f"   ✓ 第一筆專案代碼: {proj_value}")
 
-        # 等待一下確保所有欄位都已正確填入
-        wait_time = 0.2 if self.fast_mode else 0.5
-        time.sleep(wait_time)
+                # 檢查總工時
+                try:
+                    total_hours = await self.frame.locator('#lblACTL_HR').text_content()
+                    if total_hours and float(total_hours) > 0:
+                        safe_print(f"   ✓ 總工時: {total_hours} 小時")
+                    else:
+                        safe_print("⚠️  警告: 總工時為 0，可能資料未正確填入")
+                except Exception:
+                    pass
+            except Exception as e:
+                safe_print(f"⚠️  驗證過程中的警告: {e}")
 
-        # 在點擊前設定 dialog 監聽器（處理 confirm 和 alert）
-        dialog_messages = []
-        
-        def handle_dialog(dialog):
-            message = dialog.message
-            dialog_messages.append(message)
-            safe_print(f"📢 TCS 訊息: {message}")
-            
-            # 如果是 confirm（非當日資料確認），自動接受
-            if dialog.type == 'confirm':
-                safe_print("   ✓ 自動確認非當日資料儲存")
-                dialog.accept()
-            else:
-                # alert 或其他類型的 dialog
-                dialog.accept()
+            # 等待一下確保所有欄位都已正確填入
+            wait_time = 0.2 if self.fast_mode else 0.5
+            await asyncio.sleep(wait_time)
 
-        # 設定 dialog 監聽器（必須在點擊前設定）
-        self.page.on('dialog', handle_dialog)
+            # 在點擊前設定 dialog 監聽器（處理 confirm 和 alert）
+            dialog_messages = []
 
-        # 點擊儲存按鈕
-        safe_print("🖱️  點擊儲存按鈕...")
-        save_button = self.frame.locator(f'#{self.selectors["save_button"]}')
-        
-        # 確保按鈕可見且可點擊
-        save_button.wait_for(state='visible', timeout=3000)
-        save_button.click()
+            async def handle_dialog(dialog):
+                message = dialog.message
+                dialog_messages.append(message)
+                safe_print(f"📢 TCS 訊息: {message}")
 
-        # 等待表單提交和可能的 dialog
-        try:
-            # 快速模式：減少初始等待時間
-            if self.fast_mode:
-                time.sleep(0.3)  # 短暫等待 dialog 出現
-            else:
-                time.sleep(1)
-            
-            # 等待頁面導航或重新載入（如果是表單提交）
-            try:
-                # 快速模式：使用較短的 timeout
-                timeout = 3000 if self.fast_mode else 5000
-                self.frame.wait_for_load_state('networkidle', timeout=timeout)
-                safe_print("✅ 頁面已重新載入")
-            except Exception:
-                # 如果沒有導航，至少等待一下讓表單提交完成
-                wait_time = 1.0 if self.fast_mode else 2.0
-                time.sleep(wait_time)
-            
-            # 檢查是否有錯誤訊息顯示在頁面上
+                # 如果是 confirm（非當日資料確認），自動接受
+                if dialog.type == 'confirm':
+                    safe_print("   ✓ 自動確認非當日資料儲存")
+                    await dialog.accept()
+                else:
+                    # alert 或其他類型的 dialog
+                    await dialog.accept()
+
+            # 設定 dialog 監聽器（必須在點擊前設定）
+            self.page.on('dialog', handle_dialog)
+
+            # 點擊儲存按鈕
+            safe_print("🖱️  點擊儲存按鈕...")
+            save_button = self.frame.locator(f'#{self.selectors["save_button"]}')
+
+            # 確保按鈕可見且可點擊
+            await save_button.wait_for(state='visible', timeout=3000)
+            await save_button.click()
+
+            # 等待表單提交和可能的 dialog
             try:
-                msg_span = self.frame.locator('#spanMSG')
-                if msg_span.count() > 0:
-                    msg_text = msg_span.text_content()
-                    if msg_text and msg_text.strip():
-                        safe_print(f"📋 TCS 系統訊息: {msg_text}")
-            except Exception:
-                pass
-            
-            if dialog_messages:
-                safe_print(f"✅ 已處理 {len(dialog_messages)} 個對話框")
-            else:
-                safe_print("✅ 已點擊儲存按鈕")
-                
-        except Exception as e:
-            safe_print(f"⚠️  儲存過程中的警告: {e}")
-            # 即使有警告，也繼續執行
+                # 快速模式：減少初始等待時間
+                if self.fast_mode:
+                    await asyncio.sleep(0.3)  # 短暫等待 dialog 出現
+                else:
+                    await asyncio.sleep(1)
 
-    def screenshot(self, path: Optional[str] = None, full_page: bool = True, frame_only: bool = False):
+                # 等待頁面導航或重新載入（如果是表單提交）
+                try:
+                    # 快速模式：使用較短的 timeout
+                    timeout = 3000 if self.fast_mode else 5000
+                    await self.frame.wait_for_load_state('networkidle', timeout=timeout)
+                    safe_print("✅ 頁面已重新載入")
+                except Exception:
+                    # 如果沒有導航，至少等待一下讓表單提交完成
+                    wait_time = 1.0 if self.fast_mode else 2.0
+                    await asyncio.sleep(wait_time)
+
+                # 檢查是否有錯誤訊息顯示在頁面上
+                try:
+                    msg_span = self.frame.locator('#spanMSG')
+                    if await msg_span.count() > 0:
+                        msg_text = await msg_span.text_content()
+                        if msg_text and msg_text.strip():
+                            safe_print(f"📋 TCS 系統訊息: {msg_text}")
+                except Exception:
+                    pass
+
+                if dialog_messages:
+                    safe_print(f"✅ 已處理 {len(dialog_messages)} 個對話框")
+                else:
+                    safe_print("✅ 已點擊儲存按鈕")
+
+            except Exception as e:
+                safe_print(f"⚠️  儲存過程中的警告: {e}")
+                # 即使有警告，也繼續執行
+            finally:
+                # 移除監聽器，避免重複使用同一頁面時累積
+                self.page.remove_listener('dialog', handle_dialog)
+
+    async def screenshot(self, path: Optional[str] = None, full_page: bool = True, frame_only: bool = False):
         """
         截取 TCS 畫面
         
@@ -564,91 +1211,182 @@ class TCSAutomation:
         Returns:
             str: 截圖檔案路徑
         """
-        if not self.page:
-            raise Exception("瀏覽器未啟動，請先呼叫 start()")
-        
-        # 如果沒有指定路徑，自動產生檔名
-        if path is None:
-            from datetime import datetime
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_dir = Path(__file__).parent.parent / "screenshots"
-            screenshot_dir.mkdir(exist_ok=True)
-            path = str(screenshot_dir / f"tcs_screenshot_{timestamp}.png")
-        
-        # 確保目錄存在
-        screenshot_path = Path(path)
-        screenshot_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        try:
-            if frame_only and self.frame:
-                # 只截取 frame（mainFrame）
-                # 注意：Locator.screenshot() 不支援 full_page 參數
-                # 所以我們只能截取可見區域，或使用其他方法
-                frame_body = self.frame.locator('body')
-                
-                if full_page:
-                    # 嘗試截取完整 frame：先滾動到頂部，然後截取
-                    # 由於 locator.screenshot() 不支援 full_page，我們使用替代方案
-                    # 先取得 frame 的完整高度，然後滾動並截取
-                    try:
-                        # 取得 frame 的完整高度
-                        total_height = self.frame.evaluate("""
-                            () => Math.max(
-                                document.documentElement.scrollHeight,
-                                document.body.scrollHeight,
-                                document.documentElement.offsetHeight,
-                                document.body.offsetHeight
-                            )
-                        """)
-                        
-                        # 取得 viewport 高度
-                        viewport_height = self.frame.evaluate("() => window.innerHeight")
-                        
-                        # 如果內容超過 viewport，需要滾動截圖
-                        if total_height > viewport_height:
-                            # 滾動到頂部
-                            self.frame.evaluate("() => window.scrollTo(0, 0)")
-                            # 截取可見區域（這是目前 locator.screenshot() 的限制）
-                            frame_body.screenshot(path=path)
-                            screenshot_type = "frame 畫面（可見區域，完整內容需手動滾動）"
-                        else:
-                            # 內容在 viewport 內，直接截取
-                            frame_body.screenshot(path=path)
-                            screenshot_type = "frame 畫面（完整內容）"
-                    except Exception:
-                        # 如果滾動失敗，至少截取可見區域
-                        frame_body.screenshot(path=path)
+        with self.timings.phase('screenshot'):
+            if not self.page:
+                raise Exception("瀏覽器未啟動，請先呼叫 start()")
+
+            # 如果沒有指定路徑，自動產生檔名
+            if path is None:
+                from datetime import datetime
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                screenshot_dir = Path(__file__).parent.parent / "screenshots"
+                screenshot_dir.mkdir(exist_ok=True)
+                path = str(screenshot_dir / f"tcs_screenshot_{timestamp}.png")
+
+            # 確保目錄存在
+            screenshot_path = Path(path)
+            screenshot_path.parent.mkdir(parents=True, exist_ok=True)
+
+            try:
+                if frame_only and self.frame:
+                    # 只截取 frame（mainFrame）
+                    # 注意：Locator.screenshot() 不支援 full_page 參數
+                    # 所以我們只能截取可見區域，或使用其他方法
+                    frame_body = self.frame.locator('body')
+
+                    if full_page:
+                        # 嘗試截取完整 frame：先滾動到頂部，然後截取
+                        # 由於 locator.screenshot() 不支援 full_page，我們使用替代方案
+                        # 先取得 frame 的完整高度，然後滾動並截取
+                        try:
+                            # 取得 frame 的完整高度
+                            total_height = await self.frame.evaluate("""
+                                () => Math.max(
+                                    document.documentElement.scrollHeight,
+                                    document.body.scrollHeight,
+                                    document.documentElement.offsetHeight,
+                                    document.body.offsetHeight
+                                )
+                            """)
+
+                            # 取得 viewport 高度
+                            viewport_height = await self.frame.evaluate("() => window.innerHeight")
+
+                            # 如果內容超過 viewport，需要滾動截圖
+                            if total_height > viewport_height:
+                                # 滾動到頂部
+                                await self.frame.evaluate("() => window.scrollTo(0, 0)")
+                                # 截取可見區域（這是目前 locator.screenshot() 的限制）
+                                await frame_body.screenshot(path=path)
+                                screenshot_type = "frame 畫面（可見區域，完整內容需手動滾動）"
+                            else:
+                                # 內容在 viewport 內，直接截取
+                                await frame_body.screenshot(path=path)
+                                screenshot_type = "frame 畫面（完整內容）"
+                        except Exception:
+                            # 如果滾動失敗，至少截取可見區域
+                            await frame_body.screenshot(path=path)
+                            screenshot_type = "frame 畫面（可見區域）"
+                    else:
+                        # 只截取可見區域
+                        await frame_body.screenshot(path=path)
                         screenshot_type = "frame 畫面（可見區域）"
                 else:
-                    # 只截取可見區域
-                    frame_body.screenshot(path=path)
-                    screenshot_type = "frame 畫面（可見區域）"
-            else:
-                # 截取整個頁面
-                self.page.screenshot(path=path, full_page=full_page)
-                screenshot_type = "完整頁面"
-            
-            # 轉換為絕對路徑以便顯示
-            abs_path = Path(path).resolve()
-            safe_print(f"📸 已截取 {screenshot_type}")
-            safe_print(f"   檔案路徑: {abs_path}")
-            
-            return str(abs_path)
-        except Exception as e:
-            safe_print(f"❌ 截圖失敗: {e}")
-            import traceback
-            traceback.print_exc()
-            raise
+                    # 截取整個頁面
+                    await self.page.screenshot(path=path, full_page=full_page)
+                    screenshot_type = "完整頁面"
 
-    def close(self):
+                # 轉換為絕對路徑以便顯示
+                abs_path = Path(path).resolve()
+                safe_print(f"📸 已截取 {screenshot_type}")
+                safe_print(f"   檔案路徑: {abs_path}")
+
+                return str(abs_path)
+            except Exception as e:
+                safe_print(f"❌ 截圖失敗: {e}")
+                import traceback
+                traceback.print_exc()
+                raise
+
+    async def close(self):
         """關閉瀏覽器"""
+        if not self._owns_browser:
+            # 借用的頁面交還給持有者（browser pool）
+            self.page = None
+            self.frame = None
+            return
         if self.browser:
-            self.browser.close()
+            await self.browser.close()
         if self.playwright:
-            self.playwright.stop()
+            await self.playwright.stop()
         safe_print("✅ 已關閉瀏覽器")
 
 
+class TCSAutomation:
+    """
+    TCS 自動填寫類別（同步版本）
+
+    供命令列腳本使用，內部在專屬執行緒的 event loop 上執行 AsyncTCSAutomation，
+    兩者的填寫邏輯完全相同。因為 loop 在另一條執行緒上，
+    在已執行中的 event loop 內呼叫也不會出錯，但每次呼叫會阻塞呼叫端的 loop
+    直到完成，async 程式碼請直接使用 AsyncTCSAutomation。
+    """
+
+    def __init__(self, tcs_url: str = "http://cfcgpap01/tcs/"):
+        self._automation = AsyncTCSAutomation(tcs_url)
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="tcs-automation", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self, coro):
+        """在專屬 loop 上執行 coroutine 並等待結果（例外會原樣拋出）"""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    @property
+    def tcs_url(self) -> str:
+        return self._automation.tcs_url
+
+    @property
+    def dry_run(self) -> bool:
+        return self._automation.dry_run
+
+    @property
+    def fast_mode(self) -> bool:
+        return self._automation.fast_mode
+
+    @property
+    def selectors(self) -> Dict:
+        return self._automation.selectors
+
+    @property
+    def timings(self) -> "PhaseTimings":
+        """各階段耗時（毫秒）"""
+        return self._automation.timings
+
+    @property
+    def request_policy(self) -> RequestPolicy:
+        return self._automation.request_policy
+
+    def start(
+        self,
+        headless: bool = False,
+        dry_run: bool = False,
+        fast_mode: bool = True,
+        request_policy: Optional[RequestPolicy] = None,
+    ):
+        """啟動瀏覽器（參數同 AsyncTCSAutomation.start）"""
+        self._run(self._automation.start(
+            headless=headless, dry_run=dry_run, fast_mode=fast_mode, request_policy=request_policy
+        ))
+
+    def fill_time_entries(self, date: str, entries: List[Dict]) -> List[Dict]:
+        """填寫多筆工時記錄（參數與回傳值同 AsyncTCSAutomation.fill_time_entries）"""
+        return self._run(self._automation.fill_time_entries(date, entries))
+
+    def preview_before_save(self, auto_confirm: bool = False):
+        """儲存前預覽"""
+        self._run(self._automation.preview_before_save(auto_confirm=auto_confirm))
+
+    def save(self):
+        """點擊儲存按鈕"""
+        self._run(self._automation.save())
+
+    def screenshot(self, path: Optional[str] = None, full_page: bool = True, frame_only: bool = False):
+        """截取 TCS 畫面，回傳截圖檔案路徑"""
+        return self._run(self._automation.screenshot(path=path, full_page=full_page, frame_only=frame_only))
+
+    def close(self):
+        """關閉瀏覽器"""
+        try:
+            self._run(self._automation.close())
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+
+
 def main():
     """測試用主程式"""
     # 範例資料
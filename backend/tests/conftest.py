@@ -10,7 +10,7 @@ from datetime import datetime, timezone
 from typing import Generator
 
 import pytest
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import Session, sessionmaker
 
 # Add parent directory to path for imports
@@ -79,6 +79,39 @@ def db(db_session) -> Generator[Session, None, None]:
     yield db_session
 
 
+class QueryCounter:
+    """Collect SQL statements executed on an engine."""
+
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def reset(self):
+        self.statements.clear()
+
+
+@pytest.fixture(scope="function")
+def query_counter(db_engine) -> Generator[QueryCounter, None, None]:
+    """
+    Count SQL statements executed on the test engine.
+
+    Used by query-budget tests to assert that an operation issues a
+    constant number of queries regardless of data size.
+    """
+    counter = QueryCounter()
+    event.listen(db_engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(db_engine, "before_cursor_execute", counter)
+
+
 # ============================================================================
 # Time & Timezone Fixtures
 # ============================================================================
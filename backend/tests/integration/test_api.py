@@ -4,17 +4,19 @@ Integration tests for API endpoints.
 Tests the full API stack including routes, services, and database.
 """
 
+import json
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime
 from decimal import Decimal
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 
 # Import app and database
 from app.main import app
-from app.database import Base
-from app.api.dependencies import get_db
+from app.database import Base, create_db_engine
+from app.api.dependencies import get_db, get_write_queue
+from app.services.write_queue_service import WriteQueue
 
 # Import all models to ensure they're registered with Base
 from app.models import (
@@ -24,17 +26,15 @@ from app.models import (
     TimeEntry,
     WorkTemplate,
     Setting,
+    ProjectUsage,
 )
 
 
 # Test database URL
 SQLALCHEMY_TEST_DATABASE_URL = "sqlite:///./test.db"
 
-# Create test engine
-test_engine = create_engine(
-    SQLALCHEMY_TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False}
-)
+# Create test engine (foreign keys enforced like the application engine)
+test_engine = create_db_engine(SQLALCHEMY_TEST_DATABASE_URL, pragmas={})
 
 # Create test session
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
@@ -79,6 +79,7 @@ def clean_database(db):
     yield
     # Clean up all tables in reverse order to avoid foreign key constraints
     db.query(TimeEntry).delete()
+    db.query(ProjectUsage).delete()
     db.query(Project).delete()
     db.query(WorkCategory).delete()
     db.query(AccountGroup).delete()
@@ -185,6 +186,30 @@ class TestAccountGroupAPI:
 
         response = client.delete(f"/api/account-groups/{ag.id}")
         assert response.status_code == 204
+        assert client.delete(f"/api/account-groups/{ag.id}").status_code == 404
+
+    def test_delete_account_group_in_use(self, client, db):
+        """Deleting an account group used by a time entry is refused (409)."""
+        ag = AccountGroup(code="A00", name="中概全權")
+        wc = WorkCategory(code="A07", name="其它")
+        proj = Project(code="P1", requirement_code="R1", name="Test")
+        db.add_all([ag, wc, proj])
+        db.commit()
+        db.add(TimeEntry(
+            date=date(2025, 11, 14),
+            project_id=proj.id,
+            account_group_id=ag.id,
+            work_category_id=wc.id,
+            hours=Decimal("7.5"),
+            description="Test",
+        ))
+        db.commit()
+
+        response = client.delete(f"/api/account-groups/{ag.id}")
+        assert response.status_code == 409
+        assert "still in use" in response.json()["detail"]
+        assert db.query(TimeEntry).filter(TimeEntry.account_group_id == ag.id).count() == 1
+        assert client.get(f"/api/account-groups/{ag.id}").status_code == 200
 
 
 class TestProjectAPI:
@@ -439,6 +464,66 @@ class TestTimeEntryAPI:
             },
         )
         assert response.status_code == 404
+        assert response.json()["detail"] == "Project with id 99999 not found"
+
+    def test_create_time_entry_invalid_references(self, client, db):
+        """Missing account group / work category map to the same 404 responses."""
+        wc = WorkCategory(code="A07", name="Test")
+        proj = Project(code="P1", requirement_code="R1", name="Test")
+        db.add_all([wc, proj])
+        db.commit()
+        payload = {
+            "date": "2025-11-14",
+            "project_id": proj.id,
+            "work_category_id": wc.id,
+            "hours": 1,
+            "description": "Test",
+        }
+
+        response = client.post("/api/time-entries/", json={**payload, "account_group_id": 99999})
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Account group with id 99999 not found"
+
+        response = client.post("/api/time-entries/", json={**payload, "work_category_id": 99999})
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Work category with id 99999 not found"
+
+        entry_id = client.post("/api/time-entries/", json=payload).json()["id"]
+        response = client.patch(f"/api/time-entries/{entry_id}", json={"project_id": 99999})
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Project with id 99999 not found"
+        assert db.query(TimeEntry).count() == 1
+
+    def test_create_time_entry_does_not_preselect_references(self, client, db):
+        """The insert relies on the foreign keys instead of looking up each reference."""
+        from sqlalchemy import event
+
+        wc = WorkCategory(code="A07", name="Test")
+        proj = Project(code="P1", requirement_code="R1", name="Test")
+        db.add_all([wc, proj])
+        db.commit()
+        payload = {
+            "date": "2025-11-14",
+            "project_id": proj.id,
+            "work_category_id": wc.id,
+            "hours": 1,
+            "description": "Test",
+        }
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(test_engine, "before_cursor_execute", record)
+        try:
+            response = client.post("/api/time-entries/", json=payload)
+        finally:
+            event.remove(test_engine, "before_cursor_execute", record)
+
+        assert response.status_code == 201
+        before_insert = statements[:next(i for i, s in enumerate(statements) if s.startswith("INSERT INTO time_entries"))]
+        assert [s for s in before_insert if "FROM projects" in s or "FROM work_categories" in s] == []
 
     def test_list_time_entries_by_date_range(self, client, db):
         """Test listing time entries with date range filter."""
@@ -477,6 +562,82 @@ class TestTimeEntryAPI:
         data = response.json()
         assert data["total"] == 1
 
+    def _add_entries(self, db, count):
+        """Entries over 4 days with repeated display_order values."""
+        wc = WorkCategory(code="A07", name="Test")
+        proj = Project(code="P1", requirement_code="R1", name="Test")
+        db.add_all([wc, proj])
+        db.commit()
+        db.add_all([
+            TimeEntry(
+                date=date(2025, 11, 10 + i % 4),
+                project_id=proj.id,
+                work_category_id=wc.id,
+                hours=Decimal("1.0"),
+                description=f"Entry {i}",
+                display_order=i % 3,
+            )
+            for i in range(count)
+        ])
+        db.commit()
+        return proj
+
+    def test_list_time_entries_cursor_pagination(self, client, db):
+        """Cursor pages cover every entry once, in the same order as skip/limit."""
+        self._add_entries(db, 23)
+        expected = [e["id"] for e in client.get("/api/time-entries/?limit=100").json()["items"]]
+
+        ids, cursor, pages = [], None, 0
+        while True:
+            params = {"pagination": "cursor", "limit": 5}
+            if cursor:
+                params["cursor"] = cursor
+            data = client.get("/api/time-entries/", params=params).json()
+            assert data["total"] is None
+            ids += [e["id"] for e in data["items"]]
+            pages += 1
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+        assert ids == expected
+        assert len(ids) == 23
+        assert pages == 5
+
+    def test_list_time_entries_cursor_with_filter_and_total(self, client, db):
+        """Filters apply to cursor pages; total is only counted on request."""
+        self._add_entries(db, 12)
+
+        data = client.get(
+            "/api/time-entries/",
+            params={"pagination": "cursor", "limit": 2, "start_date": "2025-11-12", "include_total": True},
+        ).json()
+        assert data["total"] == 6
+        assert len(data["items"]) == 2
+        assert all(e["date"] >= "2025-11-12" for e in data["items"])
+
+        data = client.get(
+            "/api/time-entries/",
+            params={"cursor": data["next_cursor"], "limit": 10, "start_date": "2025-11-12"},
+        ).json()
+        assert len(data["items"]) == 4
+        assert data["next_cursor"] is None
+
+    def test_list_time_entries_offset_mode_unchanged(self, client, db):
+        """skip/limit still returns total and no cursor."""
+        self._add_entries(db, 7)
+
+        data = client.get("/api/time-entries/?skip=5&limit=5").json()
+        assert data["total"] == 7
+        assert len(data["items"]) == 2
+        assert data["next_cursor"] is None
+
+    def test_list_time_entries_invalid_cursor(self, client):
+        """A malformed cursor is rejected with 400."""
+        response = client.get("/api/time-entries/?cursor=not-a-cursor")
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
     def test_get_time_entry(self, client, db):
         """Test getting specific time entry."""
         ag = AccountGroup(code="A00", name="Test")
@@ -554,6 +715,65 @@ class TestTimeEntryAPI:
         assert response.status_code == 204
 
 
+@pytest.fixture
+def write_queue():
+    """Route time-entry mutations through a group-commit write queue."""
+    write_queue = WriteQueue(TestingSessionLocal, window=0.05)
+    app.dependency_overrides[get_write_queue] = lambda: write_queue
+    yield write_queue
+    app.dependency_overrides.pop(get_write_queue, None)
+    write_queue.close()
+
+
+class TestTimeEntryWriteQueueAPI:
+    """Test TimeEntry mutations with the write queue enabled."""
+
+    def _setup(self, db):
+        ag = AccountGroup(code="A00", name="中概全權")
+        wc = WorkCategory(code="A07", name="其它")
+        proj = Project(code="P1", requirement_code="R1", name="Test")
+        db.add_all([ag, wc, proj])
+        db.commit()
+        return {
+            "date": "2025-11-14",
+            "project_id": proj.id,
+            "account_group_id": ag.id,
+            "work_category_id": wc.id,
+            "hours": 1.5,
+            "description": "Test",
+        }
+
+    def test_create_update_delete(self, client, db, write_queue):
+        """Each mutation returns the same response as without the queue."""
+        payload = self._setup(db)
+
+        response = client.post("/api/time-entries/", json=payload)
+        assert response.status_code == 201
+        entry_id = response.json()["id"]
+
+        response = client.patch(f"/api/time-entries/{entry_id}", json={"hours": 2.0})
+        assert response.status_code == 200
+        assert float(response.json()["hours"]) == 2.0
+
+        assert client.delete(f"/api/time-entries/{entry_id}").status_code == 204
+        assert client.get(f"/api/time-entries/{entry_id}").status_code == 404
+        assert write_queue.writes == 3
+
+    def test_errors_are_returned_per_request(self, client, db, write_queue):
+        """A failing mutation gets its own error; the others in its batch commit."""
+        payload = self._setup(db)
+        requests = [payload, {**payload, "project_id": 99999}, {**payload, "description": "Second"}]
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            responses = list(pool.map(lambda body: client.post("/api/time-entries/", json=body), requests))
+
+        assert [r.status_code for r in responses] == [201, 404, 201]
+        assert "Project with id 99999 not found" in responses[1].json()["detail"]
+        assert db.query(TimeEntry).count() == 2
+        assert client.patch("/api/time-entries/99999", json={"hours": 1}).status_code == 404
+        assert client.delete("/api/time-entries/99999").status_code == 404
+
+
 class TestStatsAPI:
     """Test Statistics API endpoints."""
 
@@ -737,3 +957,49 @@ class TestTCSAPI:
         assert data["end_date"] == "2025/11/15"
         assert len(data["daily_formats"]) == 2
         assert float(data["total_hours"]) == 7.5
+
+    def test_stream_date_range(self, client, db):
+        """Test streaming a date range as text and NDJSON."""
+        ag = AccountGroup(code="A00", name="Test")
+        wc = WorkCategory(code="A07", name="Test")
+        proj = Project(code="P1", requirement_code="R1", name="Test")
+        db.add_all([ag, wc, proj])
+        db.commit()
+
+        for day, hours in [(14, "4.0"), (17, "3.5"), (18, "7.5")]:
+            db.add(
+                TimeEntry(
+                    date=date(2025, 11, day),
+                    project_id=proj.id,
+                    account_group_id=ag.id,
+                    work_category_id=wc.id,
+                    hours=Decimal(hours),
+                    description=f"Day {day}",
+                )
+            )
+        db.commit()
+
+        payload = {"start_date": "2025-11-01", "end_date": "2025-11-30"}
+        buffered = client.post("/api/tcs/format/range", json=payload).json()
+
+        response = client.post("/api/tcs/format/range/stream", json=payload)
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert response.text == buffered["formatted_text"]
+
+        response = client.post(
+            "/api/tcs/format/range/stream?format=ndjson",
+            json=payload,
+        )
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert lines == buffered["daily_formats"]
+
+    def test_stream_empty_date_range(self, client):
+        """Test streaming an empty range returns 404."""
+        response = client.post(
+            "/api/tcs/format/range/stream",
+            json={"start_date": "2030-01-01", "end_date": "2030-12-31"},
+        )
+        assert response.status_code == 404
@@ -0,0 +1,126 @@
+"""
+整合測試：里程碑 API（AsyncSession + aiosqlite）
+"""
+import asyncio
+import sqlite3
+import time
+
+import httpx
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import sessionmaker
+
+from app.api.dependencies import get_async_db
+from app.database import Base, create_async_db_engine, create_db_engine
+from app.main import app
+from app.models import Project
+
+# 鎖等待要發生在 busy handler 中，所以使用 rollback journal（WAL 下讀取不會被寫鎖擋住）
+PRAGMAS = {"busy_timeout": 5000}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """暫存資料庫檔案：同步引擎建表並建立一個專案"""
+    path = tmp_path / "milestones.db"
+    engine = create_db_engine(f"sqlite:///{path}", pragmas=PRAGMAS)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    db.add(Project(id=1, code="商2025智001", requirement_code="R1", name="專案一"))
+    db.commit()
+    db.close()
+    engine.dispose()
+    return path
+
+
+@pytest.fixture
+async def async_client(db_path):
+    """get_async_db 改用暫存資料庫的 async 引擎"""
+    engine = create_async_db_engine(f"sqlite:///{db_path}", pragmas=PRAGMAS)
+    SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with SessionLocal() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+    app.dependency_overrides.pop(get_async_db, None)
+    await engine.dispose()
+
+
+MILESTONE = {"name": "需求訪談", "start_date": "2025-11-03", "end_date": "2025-11-14"}
+
+
+@pytest.mark.integration
+class TestMilestonesAPI:
+    """測試里程碑 CRUD"""
+
+    async def test_create_and_list(self, async_client):
+        """建立後依開始日期列出"""
+        later = {**MILESTONE, "name": "系統分析 SA", "start_date": "2025-11-17", "end_date": "2025-11-28"}
+        assert (await async_client.post("/api/projects/1/milestones/", json=later)).status_code == 201
+        response = await async_client.post("/api/projects/1/milestones/", json=MILESTONE)
+        assert response.status_code == 201
+        assert response.json()["project_id"] == 1
+
+        response = await async_client.get("/api/projects/1/milestones/")
+        assert response.status_code == 200
+        assert [m["name"] for m in response.json()] == ["需求訪談", "系統分析 SA"]
+
+    async def test_unknown_project(self, async_client):
+        """專案不存在回傳 404"""
+        response = await async_client.post("/api/projects/99/milestones/", json=MILESTONE)
+        assert response.status_code == 404
+        assert (await async_client.get("/api/projects/99/milestones/")).status_code == 404
+
+    async def test_get_update_delete(self, async_client):
+        """取得、更新（含日期檢查）與刪除"""
+        created = (await async_client.post("/api/projects/1/milestones/", json=MILESTONE)).json()
+        url = f"/api/milestones/{created['id']}"
+
+        assert (await async_client.get(url)).json()["name"] == "需求訪談"
+
+        response = await async_client.patch(url, json={"name": "需求訪談二", "end_date": "2025-11-21"})
+        assert response.status_code == 200
+        assert response.json()["name"] == "需求訪談二"
+        assert response.json()["end_date"] == "2025-11-21"
+
+        response = await async_client.patch(url, json={"end_date": "2025-11-01"})
+        assert response.status_code == 400
+
+        assert (await async_client.delete(url)).status_code == 204
+        assert (await async_client.get(url)).status_code == 404
+        assert (await async_client.delete(url)).status_code == 404
+
+
+@pytest.mark.integration
+@pytest.mark.slow
+async def test_slow_query_does_not_stall_other_requests(async_client, db_path):
+    """
+    另一個連線持有排他鎖時，里程碑查詢在 driver 執行緒上等待鎖，
+    event loop 仍能立即回應其他請求；釋放鎖後查詢正常完成
+    """
+    lock = sqlite3.connect(db_path, isolation_level=None)
+    lock.execute("BEGIN EXCLUSIVE")
+    try:
+        slow = asyncio.create_task(async_client.get("/api/projects/1/milestones/"))
+        await asyncio.sleep(0.2)
+        assert not slow.done()
+
+        begin = time.perf_counter()
+        for _ in range(5):
+            assert (await async_client.get("/health")).status_code == 200
+        elapsed = time.perf_counter() - begin
+
+        assert not slow.done()
+        assert elapsed < 0.5
+    finally:
+        lock.execute("COMMIT")
+        lock.close()
+
+    response = await asyncio.wait_for(slow, timeout=5)
+    assert response.status_code == 200
+    assert response.json() == []
@@ -2,31 +2,70 @@
 整合測試：TCS 自動填寫 API 端點
 使用 Mock 完全模擬 Playwright，絕不連接真實 TCS 系統
 """
+
+import asyncio
 import pytest
 from datetime import date
 from decimal import Decimal
 from unittest.mock import patch, Mock, MagicMock
 from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from app.main import app
+from app.database import Base
+from app.api.dependencies import get_db, get_session_factory
+from app.models import AccountGroup, Project, TCSSyncLedger, TimeEntry, WorkCategory
 from tests.mocks.tcs_mock import (
     get_standard_test_data,
     create_mock_db_session,
-    create_mock_tcs_automation,
+    create_mock_async_tcs_automation,
+    create_reporting_async_tcs_automation,
     get_expected_tcs_entries,
 )
 
 client = TestClient(app)
 
 
+@pytest.fixture(autouse=True)
+def session_factory():
+    """每個測試使用獨立的 in-memory 資料庫（StaticPool 讓 TestClient 執行緒共用連線）"""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_session_factory] = lambda: SessionLocal
+    yield SessionLocal
+    app.dependency_overrides.pop(get_session_factory, None)
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    engine.dispose()
+
+
 @pytest.mark.mock
 class TestTCSAutoFillAPI:
     """測試 TCS 自動填寫 API（完全使用 Mock）"""
 
-    @patch('app.api.endpoints.tcs.get_date_entries')
-    @patch('app.api.endpoints.tcs.convert_entries_to_tcs_format')
-    @patch('app.api.endpoints.tcs.validate_tcs_data')
-    @patch('tcs_automation.tcs_automation.TCSAutomation')
+    @patch("app.api.endpoints.tcs.get_date_entries")
+    @patch("app.api.endpoints.tcs.convert_entries_to_tcs_format")
+    @patch("app.api.endpoints.tcs.validate_tcs_data")
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
     def test_auto_fill_success_dry_run(
         self,
         mock_tcs_class,
@@ -48,8 +87,8 @@ class TestTCSAutoFillAPI:
         # Mock 資料驗證
         mock_validate.return_value = (True, [])
 
-        # Mock TCSAutomation
-        mock_tcs_instance = create_mock_tcs_automation()
+        # Mock AsyncTCSAutomation
+        mock_tcs_instance = create_mock_async_tcs_automation()
         mock_tcs_class.return_value = mock_tcs_instance
 
         # 發送請求（預設 dry_run=True）
@@ -67,16 +106,18 @@ class TestTCSAutoFillAPI:
         assert "DRY RUN" in data["message"]
         assert data["total_hours"] == "7.5"
 
-        # 驗證 TCSAutomation 被正確呼叫
-        mock_tcs_instance.start.assert_called_once_with(headless=True, dry_run=True)
-        mock_tcs_instance.fill_time_entries.assert_called_once()
-        mock_tcs_instance.save.assert_called_once()
-        mock_tcs_instance.close.assert_called_once()
+        # 驗證 AsyncTCSAutomation 被正確 await
+        mock_tcs_instance.start.assert_awaited_once_with(
+            headless=True, dry_run=True, fast_mode=True
+        )
+        mock_tcs_instance.fill_time_entries.assert_awaited_once()
+        mock_tcs_instance.save.assert_awaited_once()
+        mock_tcs_instance.close.assert_awaited_once()
 
-    @patch('app.api.endpoints.tcs.get_date_entries')
-    @patch('app.api.endpoints.tcs.convert_entries_to_tcs_format')
-    @patch('app.api.endpoints.tcs.validate_tcs_data')
-    @patch('tcs_automation.tcs_automation.TCSAutomation')
+    @patch("app.api.endpoints.tcs.get_date_entries")
+    @patch("app.api.endpoints.tcs.convert_entries_to_tcs_format")
+    @patch("app.api.endpoints.tcs.validate_tcs_data")
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
     def test_auto_fill_success_real_mode(
         self,
         mock_tcs_class,
@@ -93,7 +134,7 @@ class TestTCSAutoFillAPI:
         mock_convert.return_value = expected_entries
         mock_validate.return_value = (True, [])
 
-        mock_tcs_instance = create_mock_tcs_automation()
+        mock_tcs_instance = create_mock_async_tcs_automation()
         mock_tcs_class.return_value = mock_tcs_instance
 
         # 發送請求（明確指定 dry_run=False）
@@ -111,10 +152,12 @@ class TestTCSAutoFillAPI:
         assert "成功自動填寫" in data["message"]
 
         # 驗證 dry_run=False 被傳遞
-        mock_tcs_instance.start.assert_called_once_with(headless=True, dry_run=False)
-        mock_tcs_instance.preview_before_save.assert_called_once()
+        mock_tcs_instance.start.assert_awaited_once_with(
+            headless=True, dry_run=False, fast_mode=True
+        )
+        mock_tcs_instance.preview_before_save.assert_awaited_once()
 
-    @patch('app.api.endpoints.tcs.get_date_entries')
+    @patch("app.api.endpoints.tcs.get_date_entries")
     def test_auto_fill_no_entries_found(self, mock_get_entries):
         """測試找不到工時記錄"""
         mock_get_entries.return_value = []
@@ -127,9 +170,9 @@ class TestTCSAutoFillAPI:
         assert response.status_code == 404
         assert "找不到" in response.json()["detail"]
 
-    @patch('app.api.endpoints.tcs.get_date_entries')
-    @patch('app.api.endpoints.tcs.convert_entries_to_tcs_format')
-    @patch('app.api.endpoints.tcs.validate_tcs_data')
+    @patch("app.api.endpoints.tcs.get_date_entries")
+    @patch("app.api.endpoints.tcs.convert_entries_to_tcs_format")
+    @patch("app.api.endpoints.tcs.validate_tcs_data")
     def test_auto_fill_validation_failed(
         self,
         mock_validate,
@@ -152,10 +195,10 @@ class TestTCSAutoFillAPI:
         assert response.status_code == 400
         assert "資料驗證失敗" in response.json()["detail"]
 
-    @patch('app.api.endpoints.tcs.get_date_entries')
-    @patch('app.api.endpoints.tcs.convert_entries_to_tcs_format')
-    @patch('app.api.endpoints.tcs.validate_tcs_data')
-    @patch('tcs_automation.tcs_automation.TCSAutomation')
+    @patch("app.api.endpoints.tcs.get_date_entries")
+    @patch("app.api.endpoints.tcs.convert_entries_to_tcs_format")
+    @patch("app.api.endpoints.tcs.validate_tcs_data")
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
     def test_auto_fill_playwright_error(
         self,
         mock_tcs_class,
@@ -170,7 +213,7 @@ class TestTCSAutoFillAPI:
         mock_validate.return_value = (True, [])
 
         # Mock Playwright 拋出錯誤
-        mock_tcs_instance = create_mock_tcs_automation()
+        mock_tcs_instance = create_mock_async_tcs_automation()
         mock_tcs_instance.start.side_effect = Exception("無法連接瀏覽器")
         mock_tcs_class.return_value = mock_tcs_instance
 
@@ -181,9 +224,11 @@ class TestTCSAutoFillAPI:
 
         assert response.status_code == 500
         assert "Playwright 執行失敗" in response.json()["detail"]
+        # 啟動失敗也要關閉瀏覽器
+        mock_tcs_instance.close.assert_awaited_once()
 
-    @patch('app.api.endpoints.tcs.get_date_entries')
-    @patch('app.api.endpoints.tcs.convert_entries_to_tcs_format')
+    @patch("app.api.endpoints.tcs.get_date_entries")
+    @patch("app.api.endpoints.tcs.convert_entries_to_tcs_format")
     def test_auto_fill_data_conversion_error(
         self,
         mock_convert,
@@ -204,10 +249,10 @@ class TestTCSAutoFillAPI:
         assert response.status_code == 400
         assert "資料錯誤" in response.json()["detail"]
 
-    @patch('app.api.endpoints.tcs.get_date_entries')
-    @patch('app.api.endpoints.tcs.convert_entries_to_tcs_format')
-    @patch('app.api.endpoints.tcs.validate_tcs_data')
-    @patch('tcs_automation.tcs_automation.TCSAutomation')
+    @patch("app.api.endpoints.tcs.get_date_entries")
+    @patch("app.api.endpoints.tcs.convert_entries_to_tcs_format")
+    @patch("app.api.endpoints.tcs.validate_tcs_data")
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
     def test_auto_fill_correct_date_format(
         self,
         mock_tcs_class,
@@ -223,7 +268,7 @@ class TestTCSAutoFillAPI:
         mock_convert.return_value = expected_entries
         mock_validate.return_value = (True, [])
 
-        mock_tcs_instance = create_mock_tcs_automation()
+        mock_tcs_instance = create_mock_async_tcs_automation()
         mock_tcs_class.return_value = mock_tcs_instance
 
         response = client.post(
@@ -249,10 +294,10 @@ class TestTCSAutoFillSafety:
         request = TCSAutoFillRequest(date=date(2025, 11, 24))
         assert request.dry_run is True
 
-    @patch('app.api.endpoints.tcs.get_date_entries')
-    @patch('app.api.endpoints.tcs.convert_entries_to_tcs_format')
-    @patch('app.api.endpoints.tcs.validate_tcs_data')
-    @patch('tcs_automation.tcs_automation.TCSAutomation')
+    @patch("app.api.endpoints.tcs.get_date_entries")
+    @patch("app.api.endpoints.tcs.convert_entries_to_tcs_format")
+    @patch("app.api.endpoints.tcs.validate_tcs_data")
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
     def test_no_real_tcs_connection_in_tests(
         self,
         mock_tcs_class,
@@ -266,7 +311,7 @@ class TestTCSAutoFillSafety:
         mock_convert.return_value = get_expected_tcs_entries()
         mock_validate.return_value = (True, [])
 
-        mock_tcs_instance = create_mock_tcs_automation()
+        mock_tcs_instance = create_mock_async_tcs_automation()
         mock_tcs_class.return_value = mock_tcs_instance
 
         # 執行測試
@@ -275,10 +320,748 @@ class TestTCSAutoFillSafety:
             json={"date": "2025-11-24", "dry_run": False},
         )
 
-        # 驗證使用的是 Mock，不是真實的 TCSAutomation
+        # 驗證使用的是 Mock，不是真實的 AsyncTCSAutomation
         assert response.status_code == 200
         assert mock_tcs_class.called
         assert isinstance(mock_tcs_instance, Mock)
 
         # 確認沒有任何真實的網路請求
         # 因為所有操作都是 Mock，不會有實際的瀏覽器啟動或網路連接
+
+
+def _seed_day(SessionLocal, target_date=date(2025, 11, 24)):
+    """建立一天兩筆工時記錄，回傳第一筆的 id"""
+    db = SessionLocal()
+    try:
+        account_group = AccountGroup(code="A00", name="中概全權")
+        work_category = WorkCategory(code="A07", name="其它")
+        project = Project(
+            code="商2025智001", requirement_code="R1", name="語音質檢系統"
+        )
+        db.add_all([account_group, work_category, project])
+        db.flush()
+        entries = [
+            TimeEntry(
+                date=target_date,
+                project_id=project.id,
+                account_group_id=account_group.id,
+                work_category_id=work_category.id,
+                hours=Decimal(hours),
+                description=description,
+                display_order=idx,
+            )
+            for idx, (hours, description) in enumerate(
+                [("4.0", "系統開發"), ("3.5", "單元測試")]
+            )
+        ]
+        db.add_all(entries)
+        db.commit()
+        return entries[0].id
+    finally:
+        db.close()
+
+
+@pytest.mark.mock
+class TestTCSSyncLedger:
+    """測試同步紀錄：未變更的日期略過填寫"""
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_unchanged_day_is_skipped(self, mock_tcs_class, session_factory):
+        """成功同步後再次同步相同內容，不啟動瀏覽器並回傳上次結果"""
+        _seed_day(session_factory)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+
+        first = client.post(
+            "/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False}
+        )
+        assert first.status_code == 200
+        assert first.json()["skipped"] is False
+        assert mock_tcs_class.call_count == 1
+
+        second = client.post(
+            "/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False}
+        )
+        assert second.status_code == 200
+        data = second.json()
+        assert data["skipped"] is True
+        assert data["filled_count"] == 2
+        assert data["total_hours"] == "7.50"
+        assert mock_tcs_class.call_count == 1
+
+        # force 強制重新填寫
+        forced = client.post(
+            "/api/tcs/auto-fill",
+            json={"date": "2025-11-24", "dry_run": False, "force": True},
+        )
+        assert forced.json()["skipped"] is False
+        assert mock_tcs_class.call_count == 2
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_changed_day_is_filled_again(self, mock_tcs_class, session_factory):
+        """同步後修改內容，下次同步會重新填寫"""
+        entry_id = _seed_day(session_factory)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+        client.post("/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False})
+
+        db = session_factory()
+        db.get(TimeEntry, entry_id).description = "系統開發（修正）"
+        db.commit()
+        db.close()
+
+        response = client.post(
+            "/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False}
+        )
+        assert response.json()["skipped"] is False
+        assert mock_tcs_class.call_count == 2
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_dry_run_is_not_recorded(self, mock_tcs_class, session_factory):
+        """dry_run 不寫入同步紀錄"""
+        _seed_day(session_factory)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+
+        client.post("/api/tcs/auto-fill", json={"date": "2025-11-24"})
+
+        db = session_factory()
+        assert db.query(TCSSyncLedger).count() == 0
+        db.close()
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_failed_push_is_recorded_and_stays_dirty(
+        self, mock_tcs_class, session_factory
+    ):
+        """同步失敗記錄結果，日期仍列為需要同步"""
+        _seed_day(session_factory)
+        mock_tcs_instance = create_mock_async_tcs_automation()
+        mock_tcs_instance.save.side_effect = Exception("儲存失敗")
+        mock_tcs_class.return_value = mock_tcs_instance
+
+        response = client.post(
+            "/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False}
+        )
+        assert response.status_code == 500
+
+        db = session_factory()
+        ledger = db.get(TCSSyncLedger, date(2025, 11, 24))
+        assert ledger.last_status == "failed"
+        assert ledger.synced_fingerprint is None
+        db.close()
+
+        dirty = client.get("/api/tcs/sync/dirty").json()
+        assert dirty["count"] == 1
+        assert dirty["days"][0]["status"] == "never_synced"
+        assert dirty["days"][0]["last_status"] == "failed"
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_dirty_days_endpoint(self, mock_tcs_class, session_factory):
+        """同步後的日期不再列出，修改後列為 changed"""
+        entry_id = _seed_day(session_factory)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+
+        assert client.get("/api/tcs/sync/dirty").json()["count"] == 1
+        client.post("/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False})
+        assert client.get("/api/tcs/sync/dirty").json()["count"] == 0
+
+        db = session_factory()
+        db.get(TimeEntry, entry_id).hours = Decimal("5.0")
+        db.commit()
+        db.close()
+
+        data = client.get(
+            "/api/tcs/sync/dirty",
+            params={"start_date": "2025-11-01", "end_date": "2025-11-30"},
+        ).json()
+        assert data["count"] == 1
+        assert data["days"][0]["date"] == "2025-11-24"
+        assert data["days"][0]["status"] == "changed"
+        assert data["days"][0]["total_hours"] == "8.50"
+
+    def test_dirty_days_invalid_range(self):
+        """開始日期晚於結束日期"""
+        response = client.get(
+            "/api/tcs/sync/dirty",
+            params={"start_date": "2025-12-01", "end_date": "2025-11-01"},
+        )
+        assert response.status_code == 400
+
+
+@pytest.mark.mock
+class TestTCSFillTimings:
+    """測試各階段耗時回傳與耗時紀錄"""
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_response_includes_phase_timings(self, mock_tcs_class, session_factory):
+        """回應包含自動化各階段耗時與總耗時，並寫入耗時紀錄"""
+        _seed_day(session_factory)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+
+        response = client.post("/api/tcs/auto-fill", json={"date": "2025-11-24"})
+
+        timings = response.json()["timings"]
+        assert list(timings)[:3] == ["launch", "navigation", "query"]
+        assert timings["save"] == 500.0
+        assert timings["total"] >= 0
+
+        runs = client.get("/api/tcs/runs").json()
+        assert runs["count"] == 1
+        run = runs["runs"][0]
+        assert run["date"] == "2025-11-24"
+        assert run["success"] is True
+        assert run["dry_run"] is True
+        assert run["fill_mode"] == "browser"
+        assert run["timings"] == timings
+        assert [p["phase"] for p in runs["phases"]][-1] == "total"
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_failed_run_is_recorded(self, mock_tcs_class, session_factory):
+        """失敗的執行也記錄到耗時紀錄"""
+        _seed_day(session_factory)
+        mock_tcs_instance = create_mock_async_tcs_automation()
+        mock_tcs_instance.save.side_effect = Exception("儲存逾時")
+        mock_tcs_class.return_value = mock_tcs_instance
+
+        response = client.post(
+            "/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False}
+        )
+        assert response.status_code == 500
+
+        runs = client.get("/api/tcs/runs", params={"date": "2025-11-24"}).json()
+        assert runs["count"] == 1
+        assert runs["runs"][0]["success"] is False
+        assert runs["runs"][0]["message"] == "儲存逾時"
+        assert "total" in runs["runs"][0]["timings"]
+
+        assert (
+            client.get("/api/tcs/runs", params={"date": "2025-11-25"}).json()["count"]
+            == 0
+        )
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_skipped_run_is_not_recorded(self, mock_tcs_class, session_factory):
+        """內容未變更而略過的執行不記錄耗時"""
+        _seed_day(session_factory)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+        client.post("/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False})
+
+        skipped = client.post(
+            "/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False}
+        )
+
+        assert skipped.json()["timings"] is None
+        assert client.get("/api/tcs/runs").json()["count"] == 1
+
+
+@pytest.fixture
+def job_manager():
+    """每個測試使用新的背景工作管理器"""
+    from app.services.tcs_job_service import TCSJobManager
+
+    manager = TCSJobManager(max_workers=1)
+    with patch("app.api.endpoints.tcs.get_job_manager", return_value=manager):
+        yield manager
+
+
+@pytest.fixture
+async def async_client():
+    """在同一個 event loop 上送出請求，背景工作在請求之間持續執行"""
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as ac:
+        yield ac
+
+
+@pytest.mark.mock
+class TestTCSAutoFillJobs:
+    """測試背景自動填寫工作"""
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    async def test_job_result_is_polled(
+        self, mock_tcs_class, job_manager, async_client, session_factory
+    ):
+        """提交後立即回傳工作 ID，完成後可查詢進度、每行結果與截圖"""
+        _seed_day(session_factory)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation(
+            screenshot_path="shot.png"
+        )
+
+        submitted = await async_client.post(
+            "/api/tcs/auto-fill/jobs", json={"date": "2025-11-24", "dry_run": False}
+        )
+        assert submitted.status_code == 202
+        job = submitted.json()
+        assert job["status"] == "queued"
+        assert job["result"] is None
+
+        await job_manager.wait(job["job_id"])
+        data = (
+            await async_client.get(f"/api/tcs/auto-fill/jobs/{job['job_id']}")
+        ).json()
+        assert data["status"] == "succeeded"
+        assert (data["stage"], data["progress"]) == ("done", 1.0)
+        assert [row["row"] for row in data["rows"]] == [0, 1]
+        assert all(row["valid"] for row in data["rows"])
+        assert data["screenshot_path"] == "shot.png"
+        assert data["result"]["filled_count"] == 2
+        assert data["result"]["fill_mode"] == "browser"
+
+        # 背景工作使用自己的 session 寫入同步紀錄
+        db = session_factory()
+        assert db.get(TCSSyncLedger, date(2025, 11, 24)).last_status == "success"
+        db.close()
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    async def test_same_date_submissions_coalesce(
+        self, mock_tcs_class, job_manager, async_client, session_factory
+    ):
+        """同一日期的重複提交合併為一個工作，只啟動一次瀏覽器"""
+        _seed_day(session_factory)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+        # 瀏覽器啟動到放行為止，讓後續提交遇到執行中的工作
+        launched = asyncio.Event()
+
+        async def start(**kwargs):
+            await launched.wait()
+
+        mock_tcs_class.return_value.start.side_effect = start
+
+        first = (
+            await async_client.post(
+                "/api/tcs/auto-fill/jobs", json={"date": "2025-11-24"}
+            )
+        ).json()
+        second = (
+            await async_client.post(
+                "/api/tcs/auto-fill/jobs", json={"date": "2025-11-24"}
+            )
+        ).json()
+        conflict = await async_client.post(
+            "/api/tcs/auto-fill/jobs", json={"date": "2025-11-24", "dry_run": False}
+        )
+        running = (
+            await async_client.get(f"/api/tcs/auto-fill/jobs/{first['job_id']}")
+        ).json()
+
+        assert second["job_id"] == first["job_id"]
+        assert second["submissions"] == 2
+        assert conflict.status_code == 409
+        assert (running["status"], running["stage"]) == ("running", "connecting")
+
+        launched.set()
+        await job_manager.wait(first["job_id"])
+        mock_tcs_class.return_value.start.assert_awaited_once()
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    async def test_failed_job_reports_error(
+        self, mock_tcs_class, job_manager, async_client, session_factory
+    ):
+        _seed_day(session_factory)
+        mock_tcs_instance = create_mock_async_tcs_automation()
+        mock_tcs_instance.save.side_effect = Exception("儲存逾時")
+        mock_tcs_class.return_value = mock_tcs_instance
+
+        job = (
+            await async_client.post(
+                "/api/tcs/auto-fill/jobs", json={"date": "2025-11-24"}
+            )
+        ).json()
+        await job_manager.wait(job["job_id"])
+
+        data = (
+            await async_client.get(f"/api/tcs/auto-fill/jobs/{job['job_id']}")
+        ).json()
+        assert data["status"] == "failed"
+        assert data["stage"] == "saving"
+        assert data["error"] == "Playwright 執行失敗: 儲存逾時"
+        assert len(data["rows"]) == 2
+
+    async def test_invalid_submission_fails_at_once(self, job_manager, async_client):
+        """沒有工時記錄的日期在提交時就回傳 404，不建立工作"""
+        response = await async_client.post(
+            "/api/tcs/auto-fill/jobs", json={"date": "2025-11-24"}
+        )
+
+        assert response.status_code == 404
+        assert job_manager.list() == []
+
+    async def test_unknown_job(self, job_manager, async_client):
+        response = await async_client.get("/api/tcs/auto-fill/jobs/missing")
+        assert response.status_code == 404
+
+
+def _seed_days(SessionLocal, days, blank_description_day=None):
+    """建立多天各一筆工時記錄；blank_description_day 的工作說明留白（資料驗證失敗）"""
+    db = SessionLocal()
+    try:
+        account_group = AccountGroup(code="A00", name="中概全權")
+        work_category = WorkCategory(code="A07", name="其它")
+        project = Project(
+            code="商2025智001", requirement_code="R1", name="語音質檢系統"
+        )
+        db.add_all([account_group, work_category, project])
+        db.flush()
+        db.add_all(
+            [
+                TimeEntry(
+                    date=day,
+                    project_id=project.id,
+                    account_group_id=account_group.id,
+                    work_category_id=work_category.id,
+                    hours=Decimal("7.5"),
+                    description=(
+                        "" if day == blank_description_day else f"{day} 系統開發"
+                    ),
+                )
+                for day in days
+            ]
+        )
+        db.commit()
+    finally:
+        db.close()
+
+
+WEEK = [date(2025, 11, 24), date(2025, 11, 25), date(2025, 11, 27)]
+WEEK_RANGE = {"start_date": "2025-11-24", "end_date": "2025-11-28"}
+
+
+@pytest.mark.mock
+class TestTCSAutoFillRange:
+    """測試一次連線填寫多天"""
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_days_share_one_browser(self, mock_tcs_class, session_factory):
+        """瀏覽器只啟動一次，每個有記錄的日期依序重新查詢並填寫"""
+        _seed_days(session_factory, WEEK)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+
+        response = client.post(
+            "/api/tcs/auto-fill/range", json={**WEEK_RANGE, "dry_run": False}
+        )
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [day["date"] for day in data["days"]] == [
+            "2025-11-24",
+            "2025-11-25",
+            "2025-11-27",
+        ]
+        assert (data["succeeded"], data["failed"], data["skipped"]) == (3, 0, 0)
+        assert all(day["fill_mode"] == "browser" for day in data["days"])
+        assert data["days"][0]["rows"][0]["valid"] is True
+        assert data["timings"]["launch"] == 800.0
+        assert "total" in data["timings"]
+
+        mock_tcs = mock_tcs_class.return_value
+        mock_tcs.start.assert_awaited_once()
+        mock_tcs.close.assert_awaited_once()
+        assert [c.args[0] for c in mock_tcs.fill_time_entries.await_args_list] == [
+            "20251124",
+            "20251125",
+            "20251127",
+        ]
+        assert mock_tcs.save.await_count == 3
+
+        # 每天各有一筆同步紀錄與耗時紀錄
+        assert client.get("/api/tcs/sync/dirty").json()["count"] == 0
+        assert client.get("/api/tcs/runs").json()["count"] == 3
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_failed_day_does_not_stop_others(self, mock_tcs_class, session_factory):
+        """一天儲存失敗，其餘日期繼續填寫"""
+        _seed_days(session_factory, WEEK)
+        mock_tcs = create_mock_async_tcs_automation()
+        mock_tcs.save.side_effect = [None, Exception("儲存逾時"), None]
+        mock_tcs_class.return_value = mock_tcs
+
+        data = client.post(
+            "/api/tcs/auto-fill/range", json={**WEEK_RANGE, "dry_run": False}
+        ).json()
+
+        assert [day["success"] for day in data["days"]] == [True, False, True]
+        assert data["days"][1]["message"] == "Playwright 執行失敗: 儲存逾時"
+        assert (data["succeeded"], data["failed"]) == (2, 1)
+
+        dirty = client.get("/api/tcs/sync/dirty").json()
+        assert [day["date"] for day in dirty["days"]] == ["2025-11-25"]
+        assert dirty["days"][0]["last_status"] == "failed"
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_unchanged_and_invalid_days_are_not_filled(
+        self, mock_tcs_class, session_factory
+    ):
+        """內容未變更的日期略過，資料驗證失敗的日期回報錯誤，兩者都不填寫"""
+        _seed_days(session_factory, WEEK, blank_description_day=date(2025, 11, 27))
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+        client.post("/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False})
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+
+        data = client.post(
+            "/api/tcs/auto-fill/range", json={**WEEK_RANGE, "dry_run": False}
+        ).json()
+
+        assert [(day["success"], day["skipped"]) for day in data["days"]] == [
+            (True, True),
+            (True, False),
+            (False, False),
+        ]
+        assert "工作說明為必填" in data["days"][2]["message"]
+        assert (data["succeeded"], data["failed"], data["skipped"]) == (1, 1, 1)
+        fill_calls = mock_tcs_class.return_value.fill_time_entries.await_args_list
+        assert [c.args[0] for c in fill_calls] == ["20251125"]
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_all_days_skipped_does_not_launch_browser(
+        self, mock_tcs_class, session_factory
+    ):
+        _seed_days(session_factory, WEEK[:1])
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+        client.post("/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False})
+
+        data = client.post(
+            "/api/tcs/auto-fill/range", json={**WEEK_RANGE, "dry_run": False}
+        ).json()
+
+        assert data["skipped"] == 1
+        assert data["timings"] is None
+        assert mock_tcs_class.call_count == 1
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_browser_launch_failure_fails_every_day(
+        self, mock_tcs_class, session_factory
+    ):
+        _seed_days(session_factory, WEEK)
+        mock_tcs = create_mock_async_tcs_automation()
+        mock_tcs.start.side_effect = Exception("無法連接 TCS")
+        mock_tcs_class.return_value = mock_tcs
+
+        data = client.post("/api/tcs/auto-fill/range", json=WEEK_RANGE).json()
+
+        assert data["failed"] == 3
+        assert all(
+            day["message"] == "Playwright 執行失敗: 無法連接 TCS"
+            for day in data["days"]
+        )
+        assert client.get("/api/tcs/runs").json()["count"] == 3
+
+    def test_invalid_range(self):
+        response = client.post(
+            "/api/tcs/auto-fill/range",
+            json={"start_date": "2025-11-28", "end_date": "2025-11-24"},
+        )
+        assert response.status_code == 400
+
+    def test_empty_range(self):
+        response = client.post("/api/tcs/auto-fill/range", json=WEEK_RANGE)
+        assert response.status_code == 404
+
+
+def _parse_sse(text):
+    """解析 server-sent events 串流為 (id, event, data) 列表"""
+    import json
+
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return events
+
+
+@pytest.mark.mock
+class TestTCSAutoFillJobEvents:
+    """測試背景工作的進度事件串流與取消"""
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    async def test_events_stream_each_step(
+        self, mock_tcs_class, job_manager, async_client, session_factory
+    ):
+        """填寫的每個階段與每行驗證依序串流，最後是 done 事件"""
+        _seed_day(session_factory)
+        mock_tcs_class.return_value = create_reporting_async_tcs_automation()
+
+        job = (
+            await async_client.post(
+                "/api/tcs/auto-fill/jobs", json={"date": "2025-11-24", "dry_run": False}
+            )
+        ).json()
+        response = await async_client.get(
+            f"/api/tcs/auto-fill/jobs/{job['job_id']}/events"
+        )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _parse_sse(response.text)
+        assert [seq for seq, _, _ in events] == list(range(len(events)))
+        steps = [
+            data.get("stage") or data.get("phase") or kind for _, kind, data in events
+        ]
+        assert steps == [
+            "starting",
+            "connecting",
+            "filling",
+            "query",
+            "validation",
+            "row",
+            "row",
+            "screenshot",
+            "saving",
+            "save",
+            "recording",
+            "done",
+            "done",
+        ]
+        rows = [data for _, kind, data in events if kind == "row"]
+        assert rows[0]["project_name"] == "專案 商2025智001"
+        assert events[-1][2]["status"] == "succeeded"
+        assert all(data["elapsed_ms"] >= 0 for _, _, data in events)
+
+        # Last-Event-ID 從下一個事件續接
+        resumed = await async_client.get(
+            f"/api/tcs/auto-fill/jobs/{job['job_id']}/events",
+            headers={"Last-Event-ID": str(events[-3][0])},
+        )
+        assert _parse_sse(resumed.text) == events[-2:]
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    async def test_cancel_running_job(
+        self, mock_tcs_class, job_manager, async_client, session_factory
+    ):
+        """取消執行中的工作會關閉瀏覽器，日期維持為需要同步"""
+        _seed_day(session_factory)
+        mock_tcs = create_mock_async_tcs_automation()
+        never = asyncio.Event()
+
+        async def stuck_fill(date_str, entries):
+            await never.wait()
+
+        mock_tcs.fill_time_entries.side_effect = stuck_fill
+        mock_tcs_class.return_value = mock_tcs
+
+        job = (
+            await async_client.post(
+                "/api/tcs/auto-fill/jobs", json={"date": "2025-11-24", "dry_run": False}
+            )
+        ).json()
+        await asyncio.sleep(0.01)
+
+        cancelled = await async_client.delete(
+            f"/api/tcs/auto-fill/jobs/{job['job_id']}"
+        )
+        assert cancelled.status_code == 200
+        assert cancelled.json()["status"] == "cancelled"
+        assert cancelled.json()["stage"] == "filling"
+        mock_tcs.close.assert_awaited_once()
+        mock_tcs.save.assert_not_awaited()
+
+        again = await async_client.delete(f"/api/tcs/auto-fill/jobs/{job['job_id']}")
+        assert again.status_code == 409
+        dirty = (await async_client.get("/api/tcs/sync/dirty")).json()
+        assert dirty["count"] == 1
+
+    async def test_events_of_unknown_job(self, job_manager, async_client):
+        response = await async_client.get("/api/tcs/auto-fill/jobs/missing/events")
+        assert response.status_code == 404
+
+
+@pytest.mark.mock
+class TestTCSCodeCache:
+    """測試代碼快取與填寫前檢查"""
+
+    def _cache_bad_work_category(self, session_factory):
+        """乾運行填寫一次，讓 TCS 回覆 A07 無效並寫入快取"""
+        _seed_day(session_factory)
+        with patch(
+            "tcs_automation.tcs_automation.AsyncTCSAutomation"
+        ) as mock_tcs_class:
+            mock_tcs_class.return_value = create_reporting_async_tcs_automation({"A07"})
+            response = client.post("/api/tcs/auto-fill", json={"date": "2025-11-24"})
+        assert response.json()["success"] is True
+
+    def test_preflight_before_any_fill(self, session_factory):
+        """從未填寫過的代碼為 unknown，不影響 ok"""
+        _seed_day(session_factory)
+
+        data = client.post("/api/tcs/preflight", json={"date": "2025-11-24"}).json()
+
+        assert data["ok"] is True
+        assert (data["invalid_count"], data["unknown_count"]) == (0, 6)
+        assert [check["field"] for check in data["rows"][0]["codes"]] == [
+            "project_code",
+            "account_group",
+            "work_category",
+        ]
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_fill_caches_codes_for_preflight(self, mock_tcs_class, session_factory):
+        """填寫時 TCS 回覆的代碼驗證結果寫入快取，填寫前檢查直接回報"""
+        self._cache_bad_work_category(session_factory)
+
+        data = client.post("/api/tcs/preflight", json={"date": "2025-11-24"}).json()
+
+        assert data["ok"] is False
+        assert (data["invalid_count"], data["unknown_count"]) == (2, 0)
+        project, _, work_category = data["rows"][0]["codes"]
+        assert (project["status"], project["name"]) == ("valid", "專案 商2025智001")
+        assert (work_category["status"], work_category["name"]) == (
+            "invalid",
+            "(工作類別輸入錯誤!)",
+        )
+        assert data["errors"][0] == "第 1 筆 工作類別 A07（(工作類別輸入錯誤!)）"
+        # 只查本地資料庫，不連線 TCS
+        mock_tcs_class.assert_not_called()
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    def test_known_invalid_code_is_rejected_before_launch(
+        self, mock_tcs_class, session_factory
+    ):
+        """已知無效的代碼直接回傳 400，不啟動瀏覽器；force=True 照常填寫"""
+        self._cache_bad_work_category(session_factory)
+        mock_tcs_class.return_value = create_mock_async_tcs_automation()
+
+        response = client.post(
+            "/api/tcs/auto-fill", json={"date": "2025-11-24", "dry_run": False}
+        )
+
+        assert response.status_code == 400
+        assert "TCS 已知無效的代碼" in response.json()["detail"]
+        mock_tcs_class.assert_not_called()
+
+        forced = client.post(
+            "/api/tcs/auto-fill", json={"date": "2025-11-24", "force": True}
+        )
+        assert forced.status_code == 200
+
+    def test_cache_can_be_disabled(self, session_factory):
+        """TCS_CODE_CACHE_TTL_HOURS=0 時不寫入也不檢查快取"""
+        with patch("app.api.endpoints.tcs.settings.TCS_CODE_CACHE_TTL_HOURS", 0):
+            self._cache_bad_work_category(session_factory)
+            data = client.post("/api/tcs/preflight", json={"date": "2025-11-24"}).json()
+
+        assert data["ok"] is True
+        assert data["rows"] == []
+
+    @patch("tcs_automation.tcs_automation.AsyncTCSAutomation")
+    async def test_job_and_range_reject_known_invalid_codes(
+        self, mock_tcs_class, job_manager, async_client, session_factory
+    ):
+        self._cache_bad_work_category(session_factory)
+
+        job = await async_client.post(
+            "/api/tcs/auto-fill/jobs", json={"date": "2025-11-24", "dry_run": False}
+        )
+        assert job.status_code == 400
+        assert job_manager.list() == []
+
+        data = (
+            await async_client.post(
+                "/api/tcs/auto-fill/range",
+                json={
+                    "start_date": "2025-11-24",
+                    "end_date": "2025-11-24",
+                    "dry_run": False,
+                },
+            )
+        ).json()
+        assert data["failed"] == 1
+        assert data["days"][0]["message"].startswith("TCS 已知無效的代碼")
+        assert data["timings"] is None
+        mock_tcs_class.assert_not_called()
@@ -0,0 +1,62 @@
+"""
+端到端測試：TCSAutomation 在本機 TCS 替身伺服器上填寫並儲存
+需要 Chromium（playwright install chromium），沒有時略過
+"""
+from datetime import date
+
+import pytest
+
+from tcs_automation.benchmark_automation import run_benchmark, summarize
+from tcs_automation.benchmark_fill import fixture_days
+from tcs_automation.stand_in import TCSStandIn
+
+
+@pytest.fixture(scope="module")
+def chromium():
+    from playwright.sync_api import sync_playwright
+
+    try:
+        with sync_playwright() as playwright:
+            playwright.chromium.launch().close()
+    except Exception as e:
+        pytest.skip(f"Chromium 無法啟動: {e}")
+
+
+@pytest.mark.slow
+class TestTCSAutomationEndToEnd:
+    """以真實瀏覽器驅動替身伺服器，確認自動化流程與效能量測可執行"""
+
+    def test_fill_and_save_days(self, chromium):
+        """快速模式填寫兩天（第二天超過預設 5 行），替身伺服器收到所有記錄"""
+        fixture = fixture_days(1, 3) + fixture_days(1, 7, start=date(2025, 11, 4))
+
+        with TCSStandIn(validation_latency=0.05) as stand_in:
+            results = run_benchmark(stand_in.tcs_url, fixture)
+
+            for date_str, entries in fixture:
+                saved = stand_in.rows_by_date[date_str]
+                assert [row["project_code"] for row in saved] == [e["project_code"] for e in entries]
+                assert [row["work_description"] for row in saved] == [e["description"] for e in entries]
+
+        summary = summarize(results[1:])
+        assert summary['rows'] == 7
+        assert summary['fill_mean'] > 0
+
+
+@pytest.mark.slow
+class TestTCSNavigationBenchmark:
+    """以真實瀏覽器比較中止不需要的資源前後的導覽耗時"""
+
+    def test_blocked_resources_are_not_downloaded(self, chromium):
+        from tcs_automation.benchmark_navigation import run_benchmark, summarize
+
+        with TCSStandIn(asset_latency=0.2) as stand_in:
+            results = run_benchmark(stand_in.tcs_url, runs=1)
+            images = stand_in.count_requests("GET", "/tcs/images/logo.png")
+
+        blocked, loaded = summarize(results["blocked"]), summarize(results["all"])
+        assert blocked["aborted"] > 0
+        assert loaded["aborted"] == 0
+        # 只有全部載入的那一輪下載圖片
+        assert images >= 1
+        assert blocked["navigation"] < loaded["navigation"]
@@ -4,7 +4,7 @@ Mock utilities for TCS automation testing.
 """
 from datetime import date
 from decimal import Decimal
-from unittest.mock import MagicMock, Mock
+from unittest.mock import AsyncMock, MagicMock, Mock
 from typing import List
 
 from app.models.time_entry import TimeEntry
@@ -130,12 +130,16 @@ def create_mock_db_session(test_data: dict = None) -> Mock:
     def mock_query(model):
         query_mock = Mock()
         
-        if model == Project:
-            query_mock.filter.return_value.first.return_value = test_data["project"]
-        elif model == AccountGroup:
-            query_mock.filter.return_value.first.return_value = test_data["account_group"]
-        elif model == WorkCategory:
-            query_mock.filter.return_value.first.return_value = test_data["work_category"]
+        related = {
+            Project: test_data["project"],
+            AccountGroup: test_data["account_group"],
+            WorkCategory: test_data["work_category"],
+        }
+        if model in related:
+            obj = related[model]
+            query_mock.filter.return_value.first.return_value = obj
+            # 支援批次預先載入（filter(id.in_(...)).all()）
+            query_mock.filter.return_value.all.return_value = [obj] if obj else []
         elif model == TimeEntry:
             # 支援鏈式呼叫
             filter_mock = Mock()
@@ -164,6 +168,85 @@ def create_mock_tcs_automation():
     return mock_tcs
 
 
+def create_mock_async_tcs_automation(screenshot_path: str = None):
+    """
+    建立模擬 AsyncTCSAutomation 實例（所有方法皆為 coroutine）
+
+    Args:
+        screenshot_path: screenshot() 回傳的路徑
+
+    Returns:
+        Mock AsyncTCSAutomation instance
+    """
+    mock_tcs = Mock()
+    mock_tcs.start = AsyncMock()
+    mock_tcs.fill_time_entries = AsyncMock(side_effect=lambda date, entries: [
+        {'row': idx, 'project_code': entry['project_code'], 'valid': True, 'invalid_fields': []}
+        for idx, entry in enumerate(entries)
+    ])
+    mock_tcs.screenshot = AsyncMock(return_value=screenshot_path)
+    mock_tcs.preview_before_save = AsyncMock()
+    mock_tcs.save = AsyncMock()
+    mock_tcs.close = AsyncMock()
+    mock_tcs.timings = {
+        "launch": 800.0,
+        "navigation": 400.0,
+        "query": 150.0,
+        "fill": 20.0,
+        "validation": 300.0,
+        "total_check": 10.0,
+        "screenshot": 100.0,
+        "preview": 200.0,
+        "save": 500.0,
+    }
+    return mock_tcs
+
+
+def create_reporting_async_tcs_automation(invalid_codes=()):
+    """
+    建立模擬 AsyncTCSAutomation，填寫與儲存時和真實自動化一樣送出進度事件
+
+    填寫送出 query、validation 階段事件與每行的 row 事件（TCS 回傳的名稱），
+    儲存送出 save 階段事件。
+
+    Args:
+        invalid_codes: TCS 視為無效的工作類別代碼（名稱顯示錯誤訊息）
+
+    Returns:
+        Mock AsyncTCSAutomation instance
+    """
+    from tcs_automation.tcs_automation import (
+        emit_event,
+        row_event,
+        row_validation_result,
+    )
+
+    mock_tcs = create_mock_async_tcs_automation()
+    mock_tcs.on_event = None
+
+    async def fill_time_entries(date, entries):
+        emit_event(mock_tcs.on_event, {'type': 'phase', 'phase': 'query', 'ms': 150.0})
+        emit_event(
+            mock_tcs.on_event, {'type': 'phase', 'phase': 'validation', 'ms': 300.0}
+        )
+        results = []
+        for idx, entry in enumerate(entries):
+            work_item_name = "其它"
+            if entry['work_category'] in invalid_codes:
+                work_item_name = "(工作類別輸入錯誤!)"
+            names = (f"專案 {entry['project_code']}", "中概全權", work_item_name)
+            results.append(row_validation_result(idx, entry, *names))
+            emit_event(mock_tcs.on_event, row_event(results[-1], entry, *names))
+        return results
+
+    async def save():
+        emit_event(mock_tcs.on_event, {'type': 'phase', 'phase': 'save', 'ms': 500.0})
+
+    mock_tcs.fill_time_entries.side_effect = fill_time_entries
+    mock_tcs.save.side_effect = save
+    return mock_tcs
+
+
 def get_expected_tcs_entries() -> List[dict]:
     """
     取得預期的 TCS 格式資料（對應 standard_test_data）
@@ -0,0 +1,81 @@
+"""
+單元測試：SQLite 效能設定（PRAGMA）
+"""
+import pytest
+from sqlalchemy import text
+
+from app.config import Settings
+from app.database import create_db_engine, sqlite_pragmas
+
+
+def _read_pragmas(engine):
+    with engine.connect() as conn:
+        return {
+            name: conn.execute(text(f"PRAGMA {name}")).scalar()
+            for name in ("journal_mode", "synchronous", "busy_timeout", "cache_size", "mmap_size", "temp_store")
+        }
+
+
+@pytest.mark.unit
+class TestSQLitePerformanceProfile:
+    """測試每條連線建立時套用的 PRAGMA"""
+
+    def test_profile_is_applied_to_every_connection(self, tmp_path):
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}")
+        try:
+            first = _read_pragmas(engine)
+            # 新的連線同樣套用（cache_size 等設定不會保存在資料庫檔案中）
+            engine.dispose()
+            second = _read_pragmas(engine)
+        finally:
+            engine.dispose()
+
+        assert first == second == {
+            "journal_mode": "wal",
+            "synchronous": 1,  # NORMAL
+            "busy_timeout": 5000,
+            "cache_size": -65536,
+            "mmap_size": 268435456,
+            "temp_store": 2,  # MEMORY
+        }
+
+    def test_profile_follows_settings(self):
+        pragmas = sqlite_pragmas(Settings(
+            SQLITE_JOURNAL_MODE="DELETE", SQLITE_SYNCHRONOUS="FULL", SQLITE_CACHE_SIZE_KIB=2048,
+        ))
+
+        assert list(pragmas)[0] == "busy_timeout"
+        assert (pragmas["journal_mode"], pragmas["synchronous"], pragmas["cache_size"]) == ("DELETE", "FULL", -2048)
+        assert sqlite_pragmas(Settings(SQLITE_PERFORMANCE_PROFILE=False)) == {}
+
+    def test_disabled_profile_keeps_sqlite_defaults(self, tmp_path):
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}", pragmas={})
+        try:
+            assert _read_pragmas(engine)["journal_mode"] == "delete"
+        finally:
+            engine.dispose()
+
+    def test_foreign_keys_are_enforced_without_profile(self, tmp_path):
+        engine = create_db_engine(f"sqlite:///{tmp_path / 'app.db'}", pragmas={})
+        try:
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA foreign_keys")).scalar() == 1
+        finally:
+            engine.dispose()
+
+    def test_invalid_journal_mode_is_rejected(self):
+        with pytest.raises(ValueError):
+            Settings(SQLITE_JOURNAL_MODE="FAST")
+
+
+@pytest.mark.slow
+class TestSQLiteBenchmark:
+    """測試 benchmark_sqlite 可執行（極短時間）"""
+
+    def test_mixed_workload_runs_without_lock_errors(self):
+        from benchmark_sqlite import PROFILES, run_profile
+
+        result = run_profile(PROFILES["tuned"], readers=2, writers=2, seconds=0.3, seed_entries=50)
+
+        assert result["reads"] > 0 and result["writes"] > 0
+        assert result["errors"] == 0
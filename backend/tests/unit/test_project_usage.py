@@ -0,0 +1,203 @@
+"""
+Unit tests for the project_usage summary table.
+
+Tests incremental maintenance on time entry / work category changes and
+the rebuild / verify helpers.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from app.models import Project, ProjectUsage, TimeEntry, WorkCategory
+from app.services.project_usage_service import (
+    ensure_project_usage,
+    rebuild_project_usage,
+    verify_project_usage,
+)
+from app.services.stats_service import calculate_project_stats
+
+
+@pytest.fixture
+def usage_data(db_session):
+    """Create two projects and one deductible / non-deductible category."""
+    projects = [
+        Project(code="P1", requirement_code="R1", name="Project 1", approved_man_days=Decimal("10")),
+        Project(code="P2", requirement_code="R2", name="Project 2"),
+    ]
+    deduct = WorkCategory(code="A07", name="其它", deduct_approved_hours=True)
+    non_deduct = WorkCategory(code="A08", name="商模", deduct_approved_hours=False)
+    db_session.add_all(projects + [deduct, non_deduct])
+    db_session.commit()
+    return {"projects": projects, "deduct": deduct, "non_deduct": non_deduct}
+
+
+def _add_entry(db, project, category, hours):
+    entry = TimeEntry(
+        date=date(2025, 11, 24),
+        project_id=project.id,
+        work_category_id=category.id,
+        hours=Decimal(hours),
+        description="測試",
+    )
+    db.add(entry)
+    db.commit()
+    return entry
+
+
+def _usage(db, project):
+    usage = db.get(ProjectUsage, project.id, populate_existing=True)
+    return usage.deduct_hours, usage.non_deduct_hours
+
+
+@pytest.mark.unit
+class TestProjectUsageMaintenance:
+    """Test incremental maintenance of project_usage."""
+
+    def test_create_entries(self, db_session, usage_data):
+        """Creating entries adds hours to the matching total."""
+        p1 = usage_data["projects"][0]
+        _add_entry(db_session, p1, usage_data["deduct"], "4.0")
+        _add_entry(db_session, p1, usage_data["non_deduct"], "1.5")
+
+        assert _usage(db_session, p1) == (Decimal("4.0"), Decimal("1.5"))
+        assert verify_project_usage(db_session) == []
+
+    def test_update_entry_hours_project_and_category(self, db_session, usage_data):
+        """Updating hours, project or category moves hours between totals."""
+        p1, p2 = usage_data["projects"]
+        entry = _add_entry(db_session, p1, usage_data["deduct"], "4.0")
+
+        entry.hours = Decimal("6.0")
+        db_session.commit()
+        assert _usage(db_session, p1) == (Decimal("6.0"), Decimal("0"))
+
+        entry.work_category_id = usage_data["non_deduct"].id
+        db_session.commit()
+        assert _usage(db_session, p1) == (Decimal("0"), Decimal("6.0"))
+
+        entry.project_id = p2.id
+        db_session.commit()
+        assert _usage(db_session, p1) == (Decimal("0"), Decimal("0"))
+        assert _usage(db_session, p2) == (Decimal("0"), Decimal("6.0"))
+        assert verify_project_usage(db_session) == []
+
+    def test_delete_entry(self, db_session, usage_data):
+        """Deleting an entry (even an expired one) subtracts its hours."""
+        p1 = usage_data["projects"][0]
+        keep = _add_entry(db_session, p1, usage_data["deduct"], "3.0")
+        remove = _add_entry(db_session, p1, usage_data["deduct"], "2.5")
+
+        db_session.delete(remove)
+        db_session.commit()
+
+        assert _usage(db_session, p1) == (Decimal("3.0"), Decimal("0"))
+        assert keep.id is not None
+        assert verify_project_usage(db_session) == []
+
+    def test_rollback_discards_summary_change(self, db_session, usage_data):
+        """The summary shares the transaction of the entry change."""
+        p1 = usage_data["projects"][0]
+        _add_entry(db_session, p1, usage_data["deduct"], "3.0")
+
+        db_session.add(TimeEntry(
+            date=date(2025, 11, 25),
+            project_id=p1.id,
+            work_category_id=usage_data["deduct"].id,
+            hours=Decimal("5.0"),
+            description="rollback",
+        ))
+        db_session.flush()
+        db_session.rollback()
+
+        assert _usage(db_session, p1) == (Decimal("3.0"), Decimal("0"))
+
+    def test_failed_flush_leaves_no_pending_changes(self, db_session, usage_data):
+        """Deltas of a failed flush are not applied by a later unrelated commit."""
+        p1 = usage_data["projects"][0]
+        _add_entry(db_session, p1, usage_data["deduct"], "3.0")
+
+        # Valid ids, but the missing description fails the INSERT itself
+        db_session.add(TimeEntry(
+            date=date(2025, 11, 25),
+            project_id=p1.id,
+            work_category_id=usage_data["deduct"].id,
+            hours=Decimal("5.0"),
+            description=None,
+        ))
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+        db_session.rollback()
+
+        p1.name = "Renamed"
+        db_session.commit()
+
+        assert _usage(db_session, p1) == (Decimal("3.0"), Decimal("0"))
+        assert verify_project_usage(db_session) == []
+
+    def test_category_deduct_flag_change_recomputes(self, db_session, usage_data):
+        """Flipping deduct_approved_hours recomputes affected projects."""
+        p1, p2 = usage_data["projects"]
+        _add_entry(db_session, p1, usage_data["deduct"], "4.0")
+        _add_entry(db_session, p2, usage_data["deduct"], "2.0")
+        _add_entry(db_session, p1, usage_data["non_deduct"], "1.0")
+
+        usage_data["deduct"].deduct_approved_hours = False
+        db_session.commit()
+
+        assert _usage(db_session, p1) == (Decimal("0"), Decimal("5.0"))
+        assert _usage(db_session, p2) == (Decimal("0"), Decimal("2.0"))
+        assert verify_project_usage(db_session) == []
+
+
+@pytest.mark.unit
+class TestProjectUsageRebuild:
+    """Test rebuild / verify helpers."""
+
+    def test_verify_detects_drift_and_rebuild_fixes_it(self, db_session, usage_data):
+        """Bulk edits bypass the hooks; verify reports it and rebuild repairs it."""
+        p1 = usage_data["projects"][0]
+        _add_entry(db_session, p1, usage_data["deduct"], "4.0")
+        db_session.query(TimeEntry).update({TimeEntry.hours: Decimal("7.5")})
+        db_session.commit()
+
+        mismatches = verify_project_usage(db_session)
+        assert len(mismatches) == 1
+        assert mismatches[0]["project_id"] == p1.id
+        assert mismatches[0]["expected_deduct_hours"] == Decimal("7.5")
+        assert mismatches[0]["stored_deduct_hours"] == Decimal("4.0")
+
+        assert rebuild_project_usage(db_session) == 1
+        db_session.commit()
+        assert verify_project_usage(db_session) == []
+        assert _usage(db_session, p1) == (Decimal("7.5"), Decimal("0"))
+
+    def test_ensure_builds_missing_summary(self, db_session, usage_data):
+        """A database without summary rows is rebuilt on startup."""
+        p1 = usage_data["projects"][0]
+        _add_entry(db_session, p1, usage_data["deduct"], "4.0")
+        db_session.query(ProjectUsage).delete()
+        db_session.commit()
+
+        assert ensure_project_usage(db_session) is True
+        assert ensure_project_usage(db_session) is False
+        assert _usage(db_session, p1) == (Decimal("4.0"), Decimal("0"))
+
+
+@pytest.mark.unit
+def test_project_stats_reads_single_row(db_session, usage_data, query_counter):
+    """calculate_project_stats costs one query however many entries exist."""
+    p1 = usage_data["projects"][0]
+    for _ in range(20):
+        _add_entry(db_session, p1, usage_data["deduct"], "1.5")
+    project_id = p1.id
+    db_session.expire_all()
+    query_counter.reset()
+
+    stats = calculate_project_stats(db_session, project_id)
+
+    assert query_counter.count == 1
+    assert stats.used_hours == Decimal("30")
+    assert stats.usage_rate == Decimal("40.0")
@@ -0,0 +1,100 @@
+"""
+Unit tests for the statistics service.
+
+Tests the set-based project statistics engine and its query budget.
+"""
+
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import AccountGroup, Project, TimeEntry, WorkCategory
+from app.services.stats_service import (
+    calculate_all_project_stats,
+    calculate_project_stats,
+)
+
+
+def _seed_projects(db, project_count: int, approved_man_days=Decimal("2")):
+    """Create projects with one deductible and one non-deductible entry each."""
+    account_group = AccountGroup(code="A00", name="中概全權")
+    deduct = WorkCategory(code="A07", name="其它", deduct_approved_hours=True)
+    non_deduct = WorkCategory(code="A08", name="商模", deduct_approved_hours=False)
+    db.add_all([account_group, deduct, non_deduct])
+    db.commit()
+
+    for idx in range(project_count):
+        project = Project(
+            code=f"P{idx:03d}",
+            requirement_code=f"R{idx:03d}",
+            name=f"Project {idx}",
+            approved_man_days=approved_man_days,
+        )
+        db.add(project)
+        db.flush()
+        db.add_all([
+            TimeEntry(
+                date=date(2025, 11, 24),
+                project_id=project.id,
+                account_group_id=account_group.id,
+                work_category_id=deduct.id,
+                hours=Decimal("12.5") + idx,
+                description="扣抵",
+            ),
+            TimeEntry(
+                date=date(2025, 11, 24),
+                project_id=project.id,
+                account_group_id=account_group.id,
+                work_category_id=non_deduct.id,
+                hours=Decimal("2.5"),
+                description="不扣抵",
+            ),
+        ])
+    db.commit()
+
+
+@pytest.mark.unit
+class TestCalculateAllProjectStats:
+    """Test the all-projects statistics engine."""
+
+    def test_matches_single_project_stats(self, db_session):
+        """All-projects output equals per-project output, including warning levels."""
+        _seed_projects(db_session, 5)
+
+        all_stats = calculate_all_project_stats(db_session)
+
+        assert len(all_stats) == 5
+        for stats in all_stats:
+            assert stats == calculate_project_stats(db_session, stats.project_id)
+        # 12.5h .. 14.5h of 15h -> warning, 15.5h and above -> danger
+        assert [s.warning_level for s in all_stats] == [
+            "warning", "warning", "warning", "danger", "danger",
+        ]
+        assert all_stats[0].used_hours == Decimal("12.5")
+        assert all_stats[0].non_deduct_hours == Decimal("2.5")
+        assert all_stats[0].total_hours == Decimal("15")
+
+    def test_excludes_deleted_and_unused_projects(self, db_session):
+        """Soft-deleted projects and projects without entries are skipped."""
+        _seed_projects(db_session, 2)
+        db_session.add(Project(code="EMPTY", requirement_code="R", name="No entries"))
+        deleted = db_session.query(Project).filter(Project.code == "P000").one()
+        deleted.deleted_at = deleted.created_at
+        db_session.commit()
+
+        all_stats = calculate_all_project_stats(db_session)
+
+        assert [s.project_code for s in all_stats] == ["P001"]
+
+    @pytest.mark.parametrize("project_count", [1, 10, 50])
+    def test_query_count_is_constant(self, db_session, query_counter, project_count):
+        """The dashboard costs one query however many projects there are."""
+        _seed_projects(db_session, project_count)
+        db_session.expire_all()
+        query_counter.reset()
+
+        all_stats = calculate_all_project_stats(db_session)
+
+        assert len(all_stats) == project_count
+        assert query_counter.count == 1
@@ -5,6 +5,7 @@
 import pytest
 from datetime import date
 from decimal import Decimal
+from unittest.mock import AsyncMock, MagicMock, patch
 
 from app.services.tcs_service import (
     convert_entries_to_tcs_format,
@@ -209,3 +210,615 @@ class TestTCSSelectors:
 
         for selector in required_selectors:
             assert selector in selectors, f"缺少選擇器: {selector}"
+
+
+def _fake_frame(span_text: str = "語音質檢系統"):
+    """建立假 mainFrame：所有 I/O 方法皆為 coroutine，wait_for_function 立即回傳 span 內容"""
+    frame = MagicMock()
+    frame.fill = AsyncMock()
+    frame.wait_for_load_state = AsyncMock()
+    frame.wait_for_selector = AsyncMock()
+    handle = MagicMock()
+    handle.json_value = AsyncMock(return_value=span_text)
+    frame.wait_for_function = AsyncMock(return_value=handle)
+
+    locator = MagicMock()
+    for method in ("click", "blur", "fill", "count", "input_value"):
+        setattr(locator, method, AsyncMock(return_value=0))
+    locator.text_content = AsyncMock(return_value=span_text)
+    locator.nth.return_value = locator
+    frame.locator.return_value = locator
+    return frame
+
+
+def _automation(frame, diff_fill: bool = False):
+    """建立掛上假 frame 的 AsyncTCSAutomation（dry run、快速模式）"""
+    from tcs_automation.tcs_automation import AsyncTCSAutomation
+
+    tcs = AsyncTCSAutomation()
+    tcs.attach(MagicMock(), frame, dry_run=True, fast_mode=True)
+    tcs.diff_fill = diff_fill
+    return tcs
+
+
+@pytest.mark.mock
+class TestAsyncTCSAutomationWaits:
+    """測試快速模式以事件等待取代固定 sleep"""
+
+    async def test_fill_has_no_fixed_sleeps(self):
+        """填寫 7 筆（含新增行）不呼叫任何 asyncio.sleep"""
+        frame = _fake_frame()
+        tcs = _automation(frame)
+        tcs.bulk_fill = False
+        frame.evaluate = AsyncMock(side_effect=[5, True, 7])
+        entries = get_expected_tcs_entries() * 4
+
+        with patch(
+            "tcs_automation.tcs_automation.asyncio.sleep", new=AsyncMock()
+        ) as sleep:
+            await tcs.fill_time_entries("20251124", entries[:7])
+
+        sleep.assert_not_awaited()
+        # 每筆 3 個驗證欄位 + 總工時
+        assert frame.wait_for_function.await_count == 7 * 3 + 1
+        # 第 6、7 筆所需的行一次新增
+        assert frame.evaluate.await_args_list[1].args[1]["count"] == 2
+
+    async def test_validation_waits_on_name_span(self):
+        """驗證等待監看對應的名稱 span，內容含錯誤時回傳 False"""
+        frame = _fake_frame("專案代碼錯誤")
+        tcs = _automation(frame)
+
+        assert await tcs._wait_for_ajax_validation("#spanPROJ_NME0") is False
+        assert frame.wait_for_function.await_args.kwargs["arg"] == "#spanPROJ_NME0"
+
+    async def test_validation_timeout_does_not_block(self):
+        """逾時不拋出例外，交由呼叫端檢查內容"""
+        frame = _fake_frame()
+        frame.wait_for_function.side_effect = Exception("Timeout 2000ms exceeded")
+        tcs = _automation(frame)
+
+        assert await tcs._wait_for_ajax_validation("#spanPROJ_NME0") is True
+
+
+@pytest.mark.mock
+class TestAsyncTCSAutomationBulkFill:
+    """測試以單次 evaluate 批次填寫"""
+
+    async def test_bulk_fill_uses_two_evaluates(self):
+        """所有行一次填入、一次取回驗證結果，不逐欄位 fill"""
+        frame = _fake_frame()
+        entries = get_expected_tcs_entries()
+        frame.evaluate = AsyncMock(side_effect=[
+            [],
+            [["語音質檢系統", "共用模組", "其它"], ["語音質檢系統", "模組錯誤", "其它"]],
+        ])
+        tcs = _automation(frame)
+
+        results = await tcs.fill_time_entries("20251124", entries)
+
+        assert frame.evaluate.await_count == 2
+        fill_args = frame.evaluate.await_args_list[0].args[1]
+        assert [row["project_code"] for row in fill_args["rows"]] == [
+            e["project_code"] for e in entries
+        ]
+        assert all(isinstance(row["hours"], str) for row in fill_args["rows"])
+        # 只有日期使用 frame.fill
+        assert frame.fill.await_count == 1
+        assert results == [
+            {
+                "row": 0,
+                "project_code": entries[0]["project_code"],
+                "valid": True,
+                "invalid_fields": [],
+            },
+            {
+                "row": 1,
+                "project_code": entries[1]["project_code"],
+                "valid": False,
+                "invalid_fields": ["account_group"],
+            },
+        ]
+
+    async def test_unvalidated_rows_fall_back_to_per_field(self):
+        """找不到欄位或驗證未完成的行改用逐欄位填寫"""
+        frame = _fake_frame()
+        entries = get_expected_tcs_entries()
+        frame.evaluate = AsyncMock(side_effect=[
+            [1],
+            [["語音質檢系統", "共用模組", "其它"], ["", "", ""]],
+        ])
+        tcs = _automation(frame)
+
+        results = await tcs.fill_time_entries("20251124", entries)
+
+        filled = [c.args[0] for c in frame.fill.await_args_list]
+        assert "#txtPROJ_CD1" in filled
+        assert "#txtPROJ_CD0" not in filled
+        assert [r["row"] for r in results] == [0, 1]
+        assert all(r["valid"] for r in results)
+
+    async def test_evaluate_error_falls_back_to_per_field(self):
+        """批次 evaluate 失敗時全部改用逐欄位填寫"""
+        frame = _fake_frame()
+        entries = get_expected_tcs_entries()
+        frame.evaluate = AsyncMock(
+            side_effect=Exception("Execution context was destroyed")
+        )
+        tcs = _automation(frame)
+
+        results = await tcs.fill_time_entries("20251124", entries)
+
+        filled = [c.args[0] for c in frame.fill.await_args_list]
+        assert "#txtPROJ_CD0" in filled and "#txtPROJ_CD1" in filled
+        assert len(results) == 2
+
+
+@pytest.mark.mock
+class TestAsyncTCSAutomationRowSizing:
+    """測試一次新增所需的行數"""
+
+    async def test_adds_missing_rows_in_one_evaluate(self):
+        """12 筆只需一次新增 7 列，並只確認一次最後一行"""
+        frame = _fake_frame()
+        frame.evaluate = AsyncMock(side_effect=[5, True, 12])
+        tcs = _automation(frame)
+
+        await tcs._ensure_rows(12)
+
+        add_call = frame.evaluate.await_args_list[1]
+        assert add_call.args[1] == {"buttonId": "btnAddLine", "count": 7}
+        waited_rows = [c.args[0] for c in frame.wait_for_selector.await_args_list]
+        assert waited_rows == ["#txtPROJ_CD11"]
+        frame.locator.return_value.click.assert_not_awaited()
+
+    async def test_existing_rows_are_reused(self):
+        """已有足夠行數時不新增"""
+        frame = _fake_frame()
+        frame.evaluate = AsyncMock(return_value=8)
+        tcs = _automation(frame)
+
+        await tcs._ensure_rows(8)
+
+        assert frame.evaluate.await_count == 1
+        frame.wait_for_selector.assert_not_awaited()
+
+    async def test_falls_back_to_single_clicks(self):
+        """批次新增後行數仍不足時逐行補齊"""
+        frame = _fake_frame()
+        frame.evaluate = AsyncMock(side_effect=[5, True, 6])
+        tcs = _automation(frame)
+
+        await tcs._ensure_rows(8)
+
+        assert frame.locator.return_value.click.await_count == 2
+        waited_rows = [c.args[0] for c in frame.wait_for_selector.await_args_list]
+        assert waited_rows == ["#txtPROJ_CD7", "#txtPROJ_CD6", "#txtPROJ_CD7"]
+
+    async def test_short_days_skip_row_sizing(self):
+        """5 筆以內不需要任何操作"""
+        frame = _fake_frame()
+        frame.evaluate = AsyncMock()
+        tcs = _automation(frame)
+
+        await tcs._ensure_rows(5)
+
+        frame.evaluate.assert_not_awaited()
+
+
+def _tcs_row(entry):
+    """模擬 TCS 畫面上已填好 entry 的一行"""
+    from tcs_automation.tcs_automation import tcs_row_values
+
+    return tcs_row_values(entry)
+
+
+@pytest.mark.unit
+class TestPlanRowChanges:
+    """測試差異填寫的變更規劃"""
+
+    def test_identical_rows_need_no_changes(self):
+        """內容相同（數字格式、換行不同）時不需要修改"""
+        from tcs_automation.tcs_automation import plan_row_changes
+
+        entries = get_expected_tcs_entries()
+        current = [_tcs_row(e) for e in entries]
+        current[0]["hours"] = "4.00"
+        current[1]["description"] = (
+            entries[1]["description"].replace("\n", "\r\n") + " "
+        )
+
+        assert plan_row_changes(current, entries) == []
+
+    def test_only_changed_fields_are_listed(self):
+        """只列出不同的欄位"""
+        from tcs_automation.tcs_automation import plan_row_changes
+
+        entries = get_expected_tcs_entries()
+        current = [_tcs_row(e) for e in entries]
+        current[1]["description"] = "舊的說明"
+
+        assert plan_row_changes(current, entries) == [
+            {"row": 1, "field": "description", "value": entries[1]["description"]},
+        ]
+
+    def test_project_change_resends_module_and_work_item(self):
+        """只改專案代碼時，TCS 會清空模組與工作項目，必須一併重送"""
+        from tcs_automation.tcs_automation import plan_row_changes
+
+        entries = get_expected_tcs_entries()
+        current = [_tcs_row(e) for e in entries]
+        current[0]["project_code"] = "商2024智009"
+
+        assert plan_row_changes(current, entries) == [
+            {"row": 0, "field": "project_code", "value": "商2025智001"},
+            {"row": 0, "field": "account_group", "value": "A00"},
+            {"row": 0, "field": "work_category", "value": "A07"},
+        ]
+
+    def test_module_change_resends_work_item(self):
+        """只改模組時一併重送工作項目（txtWORK_CATG_CD 依工作項目查詢）"""
+        from tcs_automation.tcs_automation import plan_row_changes
+
+        entries = get_expected_tcs_entries()
+        current = [_tcs_row(e) for e in entries]
+        current[1]["account_group"] = "B01"
+
+        assert plan_row_changes(current, entries) == [
+            {"row": 1, "field": "account_group", "value": "A00"},
+            {"row": 1, "field": "work_category", "value": "A07"},
+        ]
+
+    def test_new_rows_are_filled_completely(self):
+        """畫面上沒有的行填入所有非空欄位"""
+        from tcs_automation.tcs_automation import plan_row_changes
+
+        entries = get_expected_tcs_entries()
+        changes = plan_row_changes([_tcs_row(entries[0])], entries)
+
+        assert {c["row"] for c in changes} == {1}
+        assert {c["field"] for c in changes} == {
+            "project_code",
+            "account_group",
+            "work_category",
+            "hours",
+            "description",
+            "progress_rate",
+        }
+
+    def test_extra_rows_are_blanked(self):
+        """多出來的舊資料行清空非空欄位"""
+        from tcs_automation.tcs_automation import plan_row_changes
+
+        entries = get_expected_tcs_entries()
+        stale = dict.fromkeys(_tcs_row(entries[0]), "")
+        stale.update(project_code="舊專案", hours="1")
+        current = [_tcs_row(e) for e in entries] + [stale]
+
+        assert plan_row_changes(current, entries) == [
+            {"row": 2, "field": "project_code", "value": ""},
+            {"row": 2, "field": "hours", "value": ""},
+        ]
+
+
+@pytest.mark.mock
+class TestAsyncTCSAutomationDiffFill:
+    """測試差異填寫只修改不同的欄位"""
+
+    async def test_one_description_costs_one_field_update(self):
+        """只改一筆說明：一次欄位更新、不清除、不等待驗證"""
+        frame = _fake_frame()
+        entries = get_expected_tcs_entries()
+        current = [_tcs_row(e) for e in entries]
+        current[1]["description"] = "舊的說明"
+        names = [["語音質檢系統", "中概全權", "其它"]] * 2
+        frame.evaluate = AsyncMock(side_effect=[current, [], names])
+        tcs = _automation(frame, diff_fill=True)
+
+        results = await tcs.fill_time_entries("20251124", entries)
+
+        applied = frame.evaluate.await_args_list[1].args[1]
+        assert applied == [
+            {
+                "id": "txtWROK_DESC",
+                "nth": 1,
+                "span": None,
+                "value": entries[1]["description"],
+            }
+        ]
+        # 只有總工時等待，沒有驗證等待；只點擊查詢按鈕（沒有清除）
+        assert frame.wait_for_function.await_count == 1
+        assert frame.locator.return_value.click.await_count == 1
+        assert frame.fill.await_count == 1
+        assert all(r["valid"] for r in results)
+
+    async def test_code_change_waits_for_that_row(self):
+        """修改專案代碼時重送模組與工作項目、清空名稱 span，並只等待該行驗證"""
+        frame = _fake_frame()
+        entries = get_expected_tcs_entries()
+        current = [_tcs_row(e) for e in entries]
+        current[0]["project_code"] = "商2025智999"
+        names = [["語音質檢系統", "中概全權", "其它"]] * 2
+        frame.evaluate = AsyncMock(side_effect=[current, [], names])
+        tcs = _automation(frame, diff_fill=True)
+
+        await tcs.fill_time_entries("20251124", entries)
+
+        applied = frame.evaluate.await_args_list[1].args[1]
+        assert applied == [
+            {
+                "id": "txtPROJ_CD0",
+                "nth": None,
+                "span": "spanPROJ_NME0",
+                "value": entries[0]["project_code"],
+            },
+            {
+                "id": "txtMODULE_CD0",
+                "nth": None,
+                "span": "spanMODULE_NME0",
+                "value": entries[0]["account_group"],
+            },
+            {
+                "id": "txtWORK_ITEM_CD0",
+                "nth": None,
+                "span": "spanWORK_ITEM_NME0",
+                "value": entries[0]["work_category"],
+            },
+        ]
+        validation_wait = frame.wait_for_function.await_args_list[0]
+        assert validation_wait.kwargs["arg"]["rows"] == [0]
+
+    async def test_unreadable_form_falls_back_to_clear_and_fill(self):
+        """無法讀取現有資料時清除後批次填寫"""
+        frame = _fake_frame()
+        entries = get_expected_tcs_entries()
+        names = [["語音質檢系統", "中概全權", "其它"]] * 2
+        frame.evaluate = AsyncMock(side_effect=[Exception("frame detached"), [], names])
+        frame.locator.return_value.count = AsyncMock(return_value=1)
+        tcs = _automation(frame, diff_fill=True)
+
+        results = await tcs.fill_time_entries("20251124", entries)
+
+        # 查詢 + 清除
+        assert frame.locator.return_value.click.await_count == 2
+        bulk_rows = frame.evaluate.await_args_list[1].args[1]["rows"]
+        assert len(bulk_rows) == 2
+        assert len(results) == 2
+
+
+def _sync_wrapper():
+    """建立 TCSAutomation，內部的 AsyncTCSAutomation 換成 AsyncMock"""
+    from tcs_automation.tcs_automation import TCSAutomation
+
+    tcs = TCSAutomation()
+    tcs._automation = MagicMock()
+    tcs._automation.fill_time_entries = AsyncMock(return_value=[{"success": True}])
+    tcs._automation.save = AsyncMock(side_effect=RuntimeError("儲存失敗"))
+    tcs._automation.close = AsyncMock()
+    return tcs
+
+
+@pytest.mark.mock
+class TestTCSAutomationSyncWrapper:
+    """測試同步包裝在一般程式與執行中的 event loop 內皆可呼叫"""
+
+    def test_runs_from_sync_code(self):
+        """一般同步程式呼叫：回傳結果、例外原樣拋出，close 後停止專屬執行緒"""
+        tcs = _sync_wrapper()
+
+        assert tcs.fill_time_entries("20251124", []) == [{"success": True}]
+        with pytest.raises(RuntimeError, match="儲存失敗"):
+            tcs.save()
+        tcs.close()
+
+        tcs._automation.close.assert_awaited_once()
+        assert not tcs._thread.is_alive()
+        assert tcs._loop.is_closed()
+
+    async def test_runs_inside_running_loop(self):
+        """在執行中的 event loop 內呼叫不會拋出 RuntimeError"""
+        tcs = _sync_wrapper()
+        try:
+            assert tcs.fill_time_entries("20251124", []) == [{"success": True}]
+        finally:
+            tcs.close()
+
+        tcs._automation.fill_time_entries.assert_awaited_once_with("20251124", [])
+        assert not tcs._thread.is_alive()
+
+
+@pytest.mark.mock
+class TestPhaseTimings:
+    """測試各階段耗時記錄"""
+
+    def test_phase_accumulates_and_records_on_error(self):
+        """同名階段累加；區塊拋出例外時仍記錄耗時"""
+        from tcs_automation.tcs_automation import PhaseTimings
+
+        timings = PhaseTimings()
+        with timings.phase("fill"):
+            pass
+        timings.add("fill", 5.0)
+        with pytest.raises(RuntimeError):
+            with timings.phase("save"):
+                raise RuntimeError("儲存失敗")
+
+        assert list(timings) == ["fill", "save"]
+        assert timings["fill"] >= 5.0
+        assert timings["save"] >= 0
+
+    async def test_bulk_fill_records_phases(self):
+        """批次填寫記錄查詢、清除、新增行、填寫、驗證與總工時檢查"""
+        from tcs_automation.tcs_automation import AsyncTCSAutomation
+
+        frame = _fake_frame()
+        frame.evaluate = AsyncMock(side_effect=[
+            [],
+            [["語音質檢系統", "共用模組", "其它"], ["語音質檢系統", "共用模組", "其它"]],
+        ])
+        tcs = AsyncTCSAutomation()
+        tcs.attach(MagicMock(), frame, dry_run=True, fast_mode=True)
+        tcs.diff_fill = False
+
+        await tcs.fill_time_entries("20251124", get_expected_tcs_entries())
+
+        assert list(tcs.timings) == [
+            "query",
+            "clear",
+            "add_rows",
+            "fill",
+            "validation",
+            "total_check",
+        ]
+        assert all(ms >= 0 for ms in tcs.timings.values())
+
+    async def test_per_field_fill_records_each_row(self):
+        """逐欄位填寫分別記錄每行的欄位操作與驗證等待"""
+        from tcs_automation.tcs_automation import AsyncTCSAutomation
+
+        tcs = AsyncTCSAutomation()
+        tcs.attach(MagicMock(), _fake_frame(), dry_run=True, fast_mode=True)
+        tcs.diff_fill = False
+        tcs.bulk_fill = False
+
+        await tcs.fill_time_entries("20251124", get_expected_tcs_entries())
+
+        for row in (0, 1):
+            assert f"row{row}.fields" in tcs.timings
+            assert f"row{row}.validation" in tcs.timings
+        assert "fill" not in tcs.timings
+
+
+@pytest.mark.mock
+class TestProgressEvents:
+    """測試填寫過程的進度事件"""
+
+    async def test_phases_and_rows_are_emitted(self):
+        """每個階段結束與每行驗證完成時送出事件"""
+        from tcs_automation.tcs_automation import AsyncTCSAutomation
+
+        frame = _fake_frame()
+        frame.evaluate = AsyncMock(side_effect=[
+            [],
+            [["語音質檢系統", "共用模組", "其它"], ["錯誤：查無代碼", "共用模組", "其它"]],
+        ])
+        tcs = AsyncTCSAutomation()
+        tcs.attach(MagicMock(), frame, dry_run=True, fast_mode=True)
+        tcs.diff_fill = False
+        events = []
+        tcs.on_event = events.append
+
+        await tcs.fill_time_entries("20251124", get_expected_tcs_entries())
+
+        phases = [e['phase'] for e in events if e['type'] == 'phase']
+        assert phases == list(tcs.timings)
+        rows = [e for e in events if e['type'] == 'row']
+        assert [(e['row'], e['valid'], e['project_name']) for e in rows] == [
+            (0, True, "語音質檢系統"),
+            (1, False, "錯誤：查無代碼"),
+        ]
+        # 各行在驗證階段結束後、總工時檢查前送出
+        kinds = [e.get('phase', e['type']) for e in events]
+        assert (
+            kinds.index("validation") < kinds.index("row") < kinds.index("total_check")
+        )
+
+    async def test_failing_listener_does_not_break_fill(self):
+        from tcs_automation.tcs_automation import AsyncTCSAutomation
+
+        tcs = AsyncTCSAutomation()
+        tcs.attach(MagicMock(), _fake_frame(), dry_run=True, fast_mode=True)
+        tcs.diff_fill = False
+        tcs.bulk_fill = False
+        tcs.on_event = MagicMock(side_effect=RuntimeError("前端已斷線"))
+
+        results = await tcs.fill_time_entries("20251124", get_expected_tcs_entries())
+
+        assert len(results) == 2
+        assert tcs.on_event.call_count > 2
+
+
+@pytest.mark.mock
+class TestRequestPolicy:
+    """測試導覽時的請求路由規則"""
+
+    def test_action_by_type_and_url(self):
+        """URL 樣式優先於資源類型；預設只中止圖片、字型與多媒體"""
+        from tcs_automation.tcs_automation import RequestPolicy
+
+        default = RequestPolicy()
+        assert default.action("image", "http://tcs/images/logo.png") == "abort"
+        assert default.action("font", "http://tcs/fonts/tcs.woff") == "abort"
+        assert default.action("stylesheet", "http://tcs/styles/site.css") is None
+        assert default.action("document", "http://tcs/TimeSheet.aspx") is None
+        assert default.action("fetch", "http://tcs/ValidateCode.aspx?code=A07") is None
+
+        policy = RequestPolicy(
+            abort_types=(), stub_types=("stylesheet",),
+            abort_urls=("*/analytics/*",), stub_urls=("*/ads.js",),
+        )
+        assert policy.action("script", "http://tcs/analytics/track.js") == "abort"
+        assert policy.action("script", "http://tcs/ads.js") == "stub"
+        assert policy.action("stylesheet", "http://tcs/styles/site.css") == "stub"
+        assert policy.action("image", "http://tcs/images/logo.png") is None
+
+    async def test_handle_aborts_stubs_and_continues(self):
+        from tcs_automation.tcs_automation import RequestPolicy
+
+        def route(resource_type, url):
+            route = MagicMock()
+            route.request.resource_type = resource_type
+            route.request.url = url
+            route.abort, route.fulfill, route.continue_ = (
+                AsyncMock(),
+                AsyncMock(),
+                AsyncMock(),
+            )
+            return route
+
+        policy = RequestPolicy(stub_types=("stylesheet",))
+        image, css, page = (
+            route("image", "http://tcs/a.png"),
+            route("stylesheet", "http://tcs/a.css"),
+            route("document", "http://tcs/"),
+        )
+        for r in (image, css, page):
+            await policy.handle(r)
+
+        image.abort.assert_awaited_once_with("blockedbyclient")
+        css.fulfill.assert_awaited_once_with(
+            status=200, body="", content_type="text/css"
+        )
+        page.continue_.assert_awaited_once()
+        assert (policy.aborted, policy.stubbed) == (1, 1)
+
+    async def test_start_routes_before_navigation(self):
+        """start() 在導覽前安裝路由；沒有規則時不攔截"""
+        from tcs_automation.tcs_automation import AsyncTCSAutomation, RequestPolicy
+
+        async def start(policy=None):
+            order = []
+            page = MagicMock()
+            page.route = AsyncMock(side_effect=lambda *args: order.append("route"))
+            page.goto = AsyncMock(
+                side_effect=lambda *args, **kwargs: order.append("goto")
+            )
+            page.wait_for_load_state = AsyncMock()
+            playwright = MagicMock()
+            playwright.chromium.launch = AsyncMock(
+                return_value=MagicMock(new_page=AsyncMock(return_value=page))
+            )
+            with patch(
+                "tcs_automation.tcs_automation.async_playwright"
+            ) as async_playwright:
+                async_playwright.return_value.start = AsyncMock(return_value=playwright)
+                tcs = AsyncTCSAutomation("http://tcs.local/")
+                await tcs.start(headless=True, request_policy=policy)
+            return order, page
+
+        order, page = await start()
+        assert order == ["route", "goto"]
+        assert page.route.await_args.args[0] == "**/*"
+
+        order, _ = await start(RequestPolicy(abort_types=()))
+        assert order == ["goto"]
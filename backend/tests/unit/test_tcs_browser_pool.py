@@ -0,0 +1,218 @@
+"""
+單元測試：TCS 瀏覽器池
+以假的 async_playwright 取代真實瀏覽器，驗證重複使用、回收與逾時行為
+"""
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from tcs_automation.browser_pool import BrowserPoolTimeout, TCSBrowserPool
+
+
+def _fake_browser(index: int) -> MagicMock:
+    """建立假 browser：page.frame('mainFrame') 永遠存在，I/O 方法皆為 coroutine"""
+    page = MagicMock(name=f"page{index}")
+    page.goto = AsyncMock()
+    page.wait_for_load_state = AsyncMock()
+    page.is_closed.return_value = False
+
+    context = MagicMock(name=f"context{index}")
+    context.new_page = AsyncMock(return_value=page)
+    context.route = AsyncMock()
+    context.close = AsyncMock()
+
+    browser = MagicMock(name=f"browser{index}")
+    browser.new_context = AsyncMock(return_value=context)
+    browser.close = AsyncMock()
+    browser.is_connected.return_value = True
+    browser.page = page
+    return browser
+
+
+@pytest.fixture
+def fake_playwright():
+    """每次 launch 都回傳新的假 browser"""
+    browsers = []
+
+    async def launch(**kwargs):
+        browsers.append(_fake_browser(len(browsers)))
+        return browsers[-1]
+
+    playwright = MagicMock()
+    playwright.chromium.launch = AsyncMock(side_effect=launch)
+    playwright.stop = AsyncMock()
+    with patch("tcs_automation.browser_pool.async_playwright") as async_playwright:
+        async_playwright.return_value.start = AsyncMock(return_value=playwright)
+        yield browsers
+
+
+def _make_pool(**kwargs):
+    kwargs.setdefault("idle_seconds", 0)
+    return TCSBrowserPool(tcs_url="http://tcs.local/", **kwargs)
+
+
+async def _noop(tcs):
+    return None
+
+
+@pytest.mark.mock
+class TestTCSBrowserPool:
+    """測試瀏覽器池的生命週期管理"""
+
+    async def test_reuses_warm_browser(self, fake_playwright):
+        """多次借用只啟動一次瀏覽器，且 fn 拿到已 attach 的 mainFrame"""
+        pool = _make_pool(size=1)
+
+        async def get_frame(tcs):
+            return tcs.frame
+
+        try:
+            await pool.warm_up()
+            frames = [await pool.run(get_frame) for _ in range(3)]
+        finally:
+            await pool.close()
+
+        assert len(fake_playwright) == 1
+        page = fake_playwright[0].page
+        assert all(frame is page.frame.return_value for frame in frames)
+        # 每次歸還後重新載入 TCS 首頁
+        assert page.goto.await_count == 4
+
+    async def test_attached_automation_does_not_close_browser(self, fake_playwright):
+        """借用期間的 tcs.close() 不會關閉池中的瀏覽器"""
+        pool = _make_pool(size=1)
+
+        async def close_tcs(tcs):
+            await tcs.close()
+
+        try:
+            await pool.run(close_tcs)
+            browser = fake_playwright[0]
+            browser.close.assert_not_awaited()
+        finally:
+            await pool.close()
+        browser.close.assert_awaited()
+
+    async def test_recycles_after_max_uses(self, fake_playwright):
+        """使用 max_uses 次後重新啟動瀏覽器"""
+        pool = _make_pool(size=1, max_uses=2)
+        try:
+            for _ in range(5):
+                await pool.run(_noop)
+        finally:
+            await pool.close()
+
+        assert len(fake_playwright) == 3
+        fake_playwright[0].close.assert_awaited()
+        fake_playwright[1].close.assert_awaited()
+
+    async def test_relaunches_unhealthy_browser(self, fake_playwright):
+        """瀏覽器斷線後下次借用會重新啟動"""
+        pool = _make_pool(size=1)
+        try:
+            await pool.run(_noop)
+            fake_playwright[0].is_connected.return_value = False
+            await pool.run(_noop)
+        finally:
+            await pool.close()
+
+        assert len(fake_playwright) == 2
+
+    async def test_error_in_fn_returns_browser_to_pool(self, fake_playwright):
+        """fn 拋出例外時例外往上傳，瀏覽器仍歸還到池中"""
+        pool = _make_pool(size=1, acquire_timeout=1)
+
+        async def fail(tcs):
+            raise RuntimeError("填寫失敗")
+
+        async def ok(tcs):
+            return "ok"
+
+        try:
+            with pytest.raises(RuntimeError, match="填寫失敗"):
+                await pool.run(fail)
+            assert await pool.run(ok) == "ok"
+        finally:
+            await pool.close()
+
+        assert len(fake_playwright) == 1
+
+    async def test_idle_browser_is_evicted(self, fake_playwright):
+        """閒置超過 idle_seconds 的瀏覽器會被關閉"""
+        pool = _make_pool(size=1)
+        try:
+            await pool.run(_noop)
+            slot = pool._slots[0]
+            await asyncio.sleep(0)  # 讓背景的重新載入完成
+            await slot.evict_if_idle(0)
+            fake_playwright[0].close.assert_awaited()
+            assert not slot.is_launched
+
+            await pool.run(_noop)
+        finally:
+            await pool.close()
+
+        assert len(fake_playwright) == 2
+
+    async def test_concurrent_runs_share_pool(self, fake_playwright):
+        """並行借用時各自拿到不同的瀏覽器"""
+        pool = _make_pool(size=2)
+        in_use = []
+
+        async def hold(tcs):
+            in_use.append(tcs.page)
+            await asyncio.sleep(0.01)
+            return tcs.page
+
+        try:
+            pages = await asyncio.gather(pool.run(hold), pool.run(hold))
+        finally:
+            await pool.close()
+
+        assert len(fake_playwright) == 2
+        assert pages[0] is not pages[1]
+
+    async def test_acquire_timeout(self, fake_playwright):
+        """所有瀏覽器都在使用中時等待逾時"""
+        pool = _make_pool(size=1, acquire_timeout=0.1)
+        release = asyncio.Event()
+        started = asyncio.Event()
+
+        async def hold(tcs):
+            started.set()
+            await release.wait()
+
+        holder = asyncio.ensure_future(pool.run(hold))
+        try:
+            await asyncio.wait_for(started.wait(), 5)
+            begin = time.monotonic()
+            with pytest.raises(BrowserPoolTimeout):
+                await pool.run(_noop)
+            assert time.monotonic() - begin < 2
+        finally:
+            release.set()
+            await holder
+            await pool.close()
+
+    async def test_closed_pool_rejects_runs(self, fake_playwright):
+        """關閉後不再接受借用"""
+        pool = _make_pool(size=1)
+        await pool.close()
+        with pytest.raises(RuntimeError):
+            await pool.run(_noop)
+
+    async def test_request_policy_is_installed_on_context(self, fake_playwright):
+        """每個瀏覽器的 context 在載入 TCS 前安裝請求路由"""
+        from tcs_automation.tcs_automation import RequestPolicy
+
+        policy = RequestPolicy(abort_urls=("*/analytics/*",))
+        pool = _make_pool(size=1, request_policy=policy)
+        try:
+            await pool.run(_noop)
+        finally:
+            await pool.close()
+
+        context = fake_playwright[0].new_context.return_value
+        context.route.assert_awaited_once_with("**/*", policy.handle)
@@ -0,0 +1,102 @@
+"""
+單元測試：TCS 代碼快取服務（使用 in-memory SQLite）
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import TCSCodeCache
+from app.services.tcs_code_cache_service import (
+    check_codes,
+    describe_invalid_codes,
+    record_code_validations,
+)
+
+NOW = datetime(2025, 11, 24, 9, 0)
+TTL = timedelta(hours=24)
+
+
+def _row_event(project_code="商2025智001", work_category="A07",
+               work_category_name="工作類別 A07", project_name="專案 商2025智001"):
+    return {
+        "type": "row",
+        "codes": {"project_code": project_code, "account_group": "A00", "work_category": work_category},
+        "names": {"project_code": project_name, "account_group": "模組 A00",
+                  "work_category": work_category_name},
+    }
+
+
+def _entry(work_category="A07", account_group="A00"):
+    return {"project_code": "商2025智001", "account_group": account_group, "work_category": work_category}
+
+
+def _statuses(rows):
+    return [[check.status for check in row.codes] for row in rows]
+
+
+@pytest.mark.unit
+class TestRecordCodeValidations:
+    """測試寫入代碼驗證結果"""
+
+    def test_records_valid_and_invalid_codes(self, db_session):
+        count = record_code_validations(db_session, [
+            _row_event(),
+            _row_event(work_category="BAD", work_category_name="錯誤：查無代碼 BAD"),
+        ], checked_at=NOW)
+
+        assert count == 4
+        bad = db_session.get(TCSCodeCache, ("work_category", "BAD"))
+        assert (bad.valid, bad.name) == (False, "錯誤：查無代碼 BAD")
+        assert db_session.get(TCSCodeCache, ("project_code", "商2025智001")).valid is True
+
+    def test_upsert_replaces_previous_answer(self, db_session):
+        """代碼在 TCS 新增後，下一次的驗證結果覆蓋快取"""
+        record_code_validations(
+            db_session, [_row_event(work_category_name="錯誤：查無代碼 A07")], checked_at=NOW
+        )
+        later = NOW + timedelta(hours=1)
+        record_code_validations(db_session, [_row_event()], checked_at=later)
+
+        cached = db_session.get(TCSCodeCache, ("work_category", "A07"))
+        assert (cached.valid, cached.checked_at) == (True, later)
+        assert db_session.query(TCSCodeCache).count() == 3
+
+    def test_unfinished_validation_is_not_cached(self, db_session):
+        """名稱為空（驗證未完成）時不寫入"""
+        assert record_code_validations(db_session, [_row_event(work_category_name="")]) == 2
+        assert db_session.get(TCSCodeCache, ("work_category", "A07")) is None
+
+
+@pytest.mark.unit
+class TestCheckCodes:
+    """測試以快取檢查一天的代碼"""
+
+    def test_statuses(self, db_session):
+        record_code_validations(db_session, [
+            _row_event(),
+            _row_event(work_category="BAD", work_category_name="錯誤：查無代碼 BAD"),
+        ], checked_at=NOW)
+
+        rows = check_codes(db_session, [_entry(), _entry("BAD"), _entry("A08")], TTL, now=NOW)
+
+        assert _statuses(rows) == [
+            ["valid", "valid", "valid"],
+            ["valid", "valid", "invalid"],
+            ["valid", "valid", "unknown"],
+        ]
+        assert rows[0].codes[2].name == "工作類別 A07"
+        assert describe_invalid_codes(rows) == ["第 2 筆 工作類別 BAD（錯誤：查無代碼 BAD）"]
+
+    def test_expired_answers_are_unknown(self, db_session):
+        record_code_validations(db_session, [_row_event()], checked_at=NOW)
+
+        rows = check_codes(db_session, [_entry()], TTL, now=NOW + TTL + timedelta(seconds=1))
+
+        assert _statuses(rows) == [["unknown", "unknown", "unknown"]]
+
+    def test_empty_module_is_checked_as_a00(self, db_session):
+        record_code_validations(db_session, [_row_event()], checked_at=NOW)
+
+        rows = check_codes(db_session, [_entry(account_group=None)], TTL, now=NOW)
+
+        assert (rows[0].codes[1].code, rows[0].codes[1].status) == ("A00", "valid")
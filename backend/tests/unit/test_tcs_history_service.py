@@ -0,0 +1,65 @@
+"""
+單元測試：TCS 自動填寫耗時紀錄服務（使用 in-memory SQLite）
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.services.tcs_history_service import list_fill_runs, record_fill_run, summarize_phases
+
+
+def _record(db_session, target_date, minutes, timings, success=True):
+    return record_fill_run(
+        db_session,
+        target_date,
+        started_at=datetime(2025, 11, 24, 9) + timedelta(minutes=minutes),
+        dry_run=False,
+        success=success,
+        fill_mode="browser",
+        entry_count=2,
+        total_ms=sum(timings.values()),
+        timings=timings,
+        message="ok" if success else "failed",
+    )
+
+
+@pytest.mark.unit
+class TestTCSHistoryService:
+    """測試耗時紀錄的寫入、查詢與統計"""
+
+    def test_record_rounds_timings(self, db_session):
+        run = _record(db_session, date(2025, 11, 24), 0, {"query": 150.04, "save": 499.96})
+
+        assert run.id is not None
+        assert run.timings == {"query": 150.0, "save": 500.0}
+        assert run.total_ms == 650.0
+
+    def test_list_newest_first_with_filter(self, db_session):
+        _record(db_session, date(2025, 11, 24), 0, {"query": 100.0})
+        _record(db_session, date(2025, 11, 25), 1, {"query": 110.0})
+        _record(db_session, date(2025, 11, 24), 2, {"query": 120.0}, success=False)
+
+        runs = list_fill_runs(db_session)
+        assert [run.timings["query"] for run in runs] == [120.0, 110.0, 100.0]
+        assert [run.timings["query"] for run in list_fill_runs(db_session, limit=1)] == [120.0]
+        assert [run.date for run in list_fill_runs(db_session, date(2025, 11, 24))] == [
+            date(2025, 11, 24),
+            date(2025, 11, 24),
+        ]
+
+    def test_summarize_phases(self, db_session):
+        for minutes, query_ms in enumerate(range(10, 210, 10)):
+            timings = {"query": float(query_ms)}
+            if minutes == 0:
+                timings["clear"] = 50.0
+            _record(db_session, date(2025, 11, 24), minutes, timings)
+
+        stats = summarize_phases(list_fill_runs(db_session))
+
+        assert [s.phase for s in stats] == ["query", "clear"]
+        query = stats[0]
+        assert query.count == 20
+        assert query.mean_ms == 105.0
+        assert query.p95_ms == 190.0
+        assert query.max_ms == 200.0
+        assert stats[1].count == 1
@@ -0,0 +1,214 @@
+"""
+單元測試：TCS HTTP 客戶端
+在本機 TCS 替身伺服器上驗證查詢、代碼查詢與儲存的請求，不連接真實 TCS
+"""
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+from tcs_automation.http_client import TCSHttpClient, TCSHttpError, TCSHttpSession
+from tcs_automation.stand_in import MAIN_FRAME_PATH, SERVER_FUNCTION_PATH, TCSStandIn
+
+
+@pytest.fixture
+def stand_in():
+    with TCSStandIn(invalid_codes={"BAD"}) as server:
+        yield server
+
+
+def _entries():
+    return [
+        {
+            'project_code': "商2025智001",
+            'account_group': "A00",
+            'work_category': "A07",
+            'requirement_no': "R1",
+            'hours': 4.0,
+            'description': "系統開發\n- [x] API",
+            'progress_rate': 50,
+        },
+        {
+            'project_code': "商2025智001",
+            'account_group': "",
+            'work_category': "A07",
+            'hours': 3.5,
+            'description': "單元測試",
+        },
+    ]
+
+
+async def _fill(tcs_url, entries, date_str="20251124", dry_run=False, save=True, client=None):
+    tcs = client or TCSHttpClient(tcs_url)
+    try:
+        await tcs.start(dry_run=dry_run)
+        results = await tcs.fill_time_entries(date_str, entries)
+        messages = await tcs.save() if save else None
+        return results, messages
+    finally:
+        await tcs.close()
+
+
+@pytest.mark.mock
+class TestTCSHttpClient:
+    """測試 HTTP 客戶端重現 mainFrame 的表單請求"""
+
+    async def test_fill_and_save(self, stand_in):
+        """查詢、驗證並儲存，替身伺服器收到每行的欄位與查詢得到的工作類別代碼"""
+        results, messages = await _fill(stand_in.tcs_url, _entries())
+
+        assert [r['valid'] for r in results] == [True, True]
+        assert messages == ["儲存成功"]
+        saved = stand_in.rows_by_date["20251124"]
+        assert len(saved) == 2
+        assert saved[0] == {
+            'project_code': "商2025智001",
+            'module_code': "A00",
+            'work_item_code': "A07",
+            'work_category_code': "A",
+            'requirement_no': "R1",
+            'work_hours': "4.0",
+            'work_description': "系統開發\n- [x] API",
+            'progress_rate': "50",
+        }
+        # 空白的模組預設為 A00
+        assert saved[1]['module_code'] == "A00"
+        assert saved[1]['work_description'] == "單元測試"
+
+    async def test_records_phase_timings(self, stand_in):
+        """記錄連線、查詢、驗證與儲存的耗時"""
+        tcs = TCSHttpClient(stand_in.tcs_url)
+        try:
+            await tcs.start()
+            await tcs.fill_time_entries("20251124", _entries())
+            await tcs.save()
+        finally:
+            await tcs.close()
+
+        assert list(tcs.timings) == ["navigation", "query", "validation", "save"]
+
+    async def test_emits_progress_events(self, stand_in):
+        """每個階段結束與每行驗證完成時送出事件，事件包含 TCS 回傳的專案名稱"""
+        entries = _entries()
+        entries[1]['work_category'] = "BAD"
+        events = []
+        tcs = TCSHttpClient(stand_in.tcs_url)
+        tcs.on_event = events.append
+        try:
+            await tcs.start(dry_run=True)
+            await tcs.fill_time_entries("20251124", entries)
+        finally:
+            await tcs.close()
+
+        assert [e.get('phase', e['type']) for e in events] == ["navigation", "query", "validation", "row", "row"]
+        assert events[3]['project_name'] == "專案 商2025智001"
+        assert events[4]['invalid_fields'] == ['work_category']
+
+    async def test_codes_validated_once(self, stand_in):
+        """重複的代碼只送出一次查詢，參數與頁面 onblur 的 arrItem 相同"""
+        await _fill(stand_in.tcs_url, _entries(), save=False)
+
+        lookups = [
+            parse_qs(urlsplit(path).query) for method, path in stand_in.requests
+            if urlsplit(path).path == f"/tcs/{SERVER_FUNCTION_PATH}"
+        ]
+        assert sorted((q["Method"][0], q["Param"][0]) for q in lookups) == [
+            ("getITEMNAME", "A07&^&商2025智001"),
+            ("getMODULENAME", "A00&^&商2025智001"),
+            ("getPROJNAME", "商2025智001"),
+        ]
+
+    async def test_posts_repeated_row_fields(self, stand_in):
+        """儲存時每行欄位以重複名稱依行的順序送出，包含隱藏的工作類別代碼與模組檢核註記"""
+        entries = _entries()
+        entries[1]['project_code'] = "商2025智002"
+        entries[1]['work_category'] = "b01"
+        forms = []
+        original = stand_in.handle_postback
+
+        def record(form):
+            forms.append(form)
+            return original(form)
+
+        with patch.object(stand_in, "handle_postback", side_effect=record):
+            await _fill(stand_in.tcs_url, entries)
+
+        form = forms[-1]
+        assert form["txtPROJ_CD"] == ["商2025智001", "商2025智002", "", "", ""]
+        assert form["txtIS_CHK_MODULE"] == ["Y", "Y", "", "", ""]
+        assert form["txtMODULE_CD"] == ["A00", "A00", "", "", ""]
+        assert form["txtWORK_ITEM_CD"] == ["A07", "B01", "", "", ""]
+        assert form["txtWORK_CATG_CD"] == ["A", "B", "", "", ""]
+        assert form["txtWROK_DESC"] == ["系統開發\n- [x] API", "單元測試", "", "", ""]
+        assert form["txtDate"] == ["20251124"]
+        assert {"__VIEWSTATE", "__VIEWSTATEGENERATOR", "__EVENTVALIDATION", "SYSDT", "btnSave"} <= set(form)
+        assert not any(name.startswith("txtPROJ_CD") and name != "txtPROJ_CD" for name in form)
+        assert stand_in.rows_by_date["20251124"][1]['work_item_code'] == "B01"
+
+    async def test_dry_run_does_not_save(self, stand_in):
+        """dry_run 只查詢與驗證，不送出儲存"""
+        results, messages = await _fill(stand_in.tcs_url, _entries(), dry_run=True)
+
+        assert len(results) == 2
+        assert messages == []
+        assert stand_in.rows_by_date == {}
+        assert stand_in.count_requests("POST", f"/tcs/{MAIN_FRAME_PATH}") == 1
+
+    async def test_stale_rows_are_cleared(self, stand_in):
+        """TCS 上多出來的舊資料行以空白送出，儲存後只剩本次的記錄"""
+        await _fill(stand_in.tcs_url, _entries() * 3)
+        assert len(stand_in.rows_by_date["20251124"]) == 6
+
+        await _fill(stand_in.tcs_url, _entries()[:1])
+        assert len(stand_in.rows_by_date["20251124"]) == 1
+
+    async def test_invalid_code_is_reported(self, stand_in):
+        """無效代碼回報在驗證結果中，TCS 拒絕儲存時拋出 TCSHttpError"""
+        entries = _entries()
+        entries[1]['work_category'] = "BAD"
+
+        tcs = TCSHttpClient(stand_in.tcs_url)
+        try:
+            await tcs.start()
+            results = await tcs.fill_time_entries("20251124", entries)
+            assert results[1] == {
+                'row': 1,
+                'project_code': "商2025智001",
+                'valid': False,
+                'invalid_fields': ['work_category'],
+            }
+            with pytest.raises(TCSHttpError, match="儲存失敗"):
+                await tcs.save()
+        finally:
+            await tcs.close()
+
+        assert "20251124" not in stand_in.rows_by_date
+
+    async def test_missing_main_frame(self, stand_in):
+        """首頁沒有 mainFrame 時拋出 TCSHttpError"""
+        tcs = TCSHttpClient(f"{stand_in.base_url}/tcs/top.html")
+        try:
+            with pytest.raises(TCSHttpError, match="mainFrame"):
+                await tcs.start()
+        finally:
+            await tcs.close()
+
+    async def test_fill_requires_start(self):
+        """未呼叫 start() 就填寫時拋出 TCSHttpError"""
+        tcs = TCSHttpClient("http://tcs.local/")
+        try:
+            with pytest.raises(TCSHttpError):
+                await tcs.fill_time_entries("20251124", _entries())
+        finally:
+            await tcs.close()
+
+    async def test_session_clients_share_pool(self, stand_in):
+        """同一個 session 的客戶端關閉後，連線池仍可供下一個客戶端使用"""
+        session = TCSHttpSession(stand_in.tcs_url)
+        try:
+            for date_str in ("20251124", "20251125"):
+                await _fill(stand_in.tcs_url, _entries(), date_str, client=session.client())
+        finally:
+            await session.close()
+
+        assert set(stand_in.rows_by_date) == {"20251124", "20251125"}
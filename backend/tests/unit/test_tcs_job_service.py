@@ -0,0 +1,181 @@
+"""
+單元測試：TCS 背景自動填寫工作
+"""
+import asyncio
+from datetime import date
+
+import pytest
+
+from app.services.tcs_job_service import TCSJobConflict, TCSJobManager
+
+DAY = date(2025, 11, 24)
+
+
+def _blocking_runner(release: asyncio.Event, calls: list, result="ok"):
+    async def run(job):
+        calls.append(job.date)
+        job.report("filling", 0.3)
+        await release.wait()
+        return result
+
+    return run
+
+
+@pytest.mark.unit
+class TestTCSJobManager:
+    """測試工作的執行、合併與工作者數量限制"""
+
+    async def test_job_runs_to_completion(self):
+        manager = TCSJobManager()
+        release, calls = asyncio.Event(), []
+
+        job, created = manager.submit(DAY, True, False, _blocking_runner(release, calls))
+        assert created is True
+        assert job.status == "queued"
+
+        await asyncio.sleep(0)
+        assert job.status == "running"
+        assert (job.stage, job.progress) == ("filling", 0.3)
+
+        release.set()
+        await manager.wait(job.job_id)
+        assert job.status == "succeeded"
+        assert (job.stage, job.progress) == ("done", 1.0)
+        assert job.result == "ok"
+        assert job.finished_at >= job.started_at
+        assert manager.get(job.job_id) is job
+
+    async def test_same_date_coalesces(self):
+        """同一日期的重複提交合併到執行中的工作"""
+        manager = TCSJobManager(max_workers=2)
+        release, calls = asyncio.Event(), []
+        run = _blocking_runner(release, calls)
+
+        first, _ = manager.submit(DAY, True, False, run)
+        second, created = manager.submit(DAY, True, True, run)
+
+        assert created is False
+        assert second is first
+        assert first.submissions == 2
+        release.set()
+        await manager.wait(first.job_id)
+        assert calls == [DAY]
+
+        # 工作結束後再提交會建立新的工作
+        third, created = manager.submit(DAY, True, False, run)
+        assert created is True
+        assert third is not first
+        await manager.wait(third.job_id)
+
+    async def test_conflicting_dry_run_is_rejected(self):
+        """同一日期執行中的工作 dry_run 不同時拒絕提交"""
+        manager = TCSJobManager()
+        release, calls = asyncio.Event(), []
+        job, _ = manager.submit(DAY, True, False, _blocking_runner(release, calls))
+
+        with pytest.raises(TCSJobConflict, match=job.job_id):
+            manager.submit(DAY, False, False, _blocking_runner(release, calls))
+
+        release.set()
+        await manager.wait(job.job_id)
+
+    async def test_workers_are_bounded(self):
+        """超過工作者數量的工作排隊等待"""
+        manager = TCSJobManager(max_workers=1)
+        release, calls = asyncio.Event(), []
+        run = _blocking_runner(release, calls)
+
+        first, _ = manager.submit(date(2025, 11, 24), True, False, run)
+        second, _ = manager.submit(date(2025, 11, 25), True, False, run)
+        await asyncio.sleep(0)
+
+        assert first.status == "running"
+        assert second.status == "queued"
+        assert len(calls) == 1
+
+        release.set()
+        await manager.wait(second.job_id)
+        assert [first.status, second.status] == ["succeeded", "succeeded"]
+
+    async def test_failure_is_recorded(self):
+        manager = TCSJobManager()
+
+        class Failure(Exception):
+            detail = "Playwright 執行失敗: 逾時"
+
+        async def run(job):
+            raise Failure()
+
+        job, _ = manager.submit(DAY, True, False, run)
+        await manager.wait(job.job_id)
+
+        assert job.status == "failed"
+        assert job.error == "Playwright 執行失敗: 逾時"
+        assert job.result is None
+
+    async def test_finished_jobs_are_evicted(self):
+        """只保留最近 max_finished 個已結束的工作"""
+        manager = TCSJobManager(max_workers=3, max_finished=2)
+
+        async def run(job):
+            return None
+
+        jobs = [manager.submit(date(2025, 11, day), True, False, run)[0] for day in (24, 25, 26)]
+        for job in jobs:
+            await manager.wait(job.job_id)
+
+        assert manager.get(jobs[0].job_id) is None
+        assert [job.date.day for job in manager.list()] == [26, 25]
+
+    async def test_close_cancels_running_jobs(self):
+        manager = TCSJobManager()
+        job, _ = manager.submit(DAY, True, False, _blocking_runner(asyncio.Event(), []))
+        await asyncio.sleep(0)
+
+        await manager.close()
+
+        assert job.status == "cancelled"
+        assert job.error == "job was cancelled"
+
+    async def test_events_are_followed_in_order(self):
+        """事件依序號送出，工作結束時以 done 事件收尾；可從指定序號之後續接"""
+        manager = TCSJobManager()
+        release, calls = asyncio.Event(), []
+        job, _ = manager.submit(DAY, True, False, _blocking_runner(release, calls))
+
+        async def collect(after=-1):
+            return [event async for event in job.follow(after)]
+
+        follower = asyncio.create_task(collect())
+        await asyncio.sleep(0)
+        job.emit({"type": "phase", "phase": "query", "ms": 12.5})
+        release.set()
+        events = await follower
+
+        assert [e["seq"] for e in events] == list(range(len(events)))
+        assert [e.get("stage", e["type"]) for e in events] == [
+            "starting", "filling", "phase", "done", "done"
+        ]
+        assert events[-1] == {**events[-1], "type": "done", "status": "succeeded", "error": None}
+        assert all(a["elapsed_ms"] <= b["elapsed_ms"] for a, b in zip(events, events[1:]))
+        assert await collect(after=2) == events[3:]
+
+    async def test_cancel_running_and_queued_jobs(self):
+        manager = TCSJobManager(max_workers=1)
+        release, calls = asyncio.Event(), []
+        running, _ = manager.submit(date(2025, 11, 24), True, False, _blocking_runner(release, calls))
+        queued, _ = manager.submit(date(2025, 11, 25), True, False, _blocking_runner(release, calls))
+        await asyncio.sleep(0)
+
+        assert manager.cancel(queued.job_id) is True
+        assert manager.cancel(running.job_id) is True
+        await manager.wait(running.job_id)
+        await manager.wait(queued.job_id)
+
+        assert [running.status, queued.status] == ["cancelled", "cancelled"]
+        assert calls == [date(2025, 11, 24)]
+        assert running.events[-1]["status"] == "cancelled"
+        # 已結束的工作無法再取消，同一日期可以重新提交
+        assert manager.cancel(running.job_id) is False
+        assert manager.submit(date(2025, 11, 24), True, False, _blocking_runner(release, calls))[1] is True
+        await manager.close()
@@ -0,0 +1,165 @@
+"""
+單元測試：TCS 格式化服務（使用 in-memory SQLite）
+驗證輸出內容與查詢次數預算
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import AccountGroup, Project, TimeEntry, WorkCategory
+from app.services.tcs_service import (
+    convert_entries_to_tcs_format,
+    format_date_for_tcs,
+    get_date_entries,
+    iter_date_range_formats,
+    iter_date_range_tcs_entries,
+    validate_tcs_data,
+)
+
+
+def _seed_entries(db, entry_count: int, target_date: date = date(2025, 11, 24)):
+    """建立多個專案的工時記錄（第一筆不指定模組）"""
+    account_group = AccountGroup(code="O18", name="數據智能應用科")
+    work_category = WorkCategory(code="A07", name="其它", deduct_approved_hours=True)
+    db.add_all([account_group, work_category])
+    db.flush()
+
+    for idx in range(entry_count):
+        project = Project(code=f"商2025智{idx:03d}", requirement_code=f"R{idx}", name=f"專案{idx}")
+        db.add(project)
+        db.flush()
+        db.add(TimeEntry(
+            date=target_date,
+            project_id=project.id,
+            account_group_id=None if idx == 0 else account_group.id,
+            work_category_id=work_category.id,
+            hours=Decimal("0.5"),
+            description=f"工作 {idx}",
+            display_order=idx,
+        ))
+    db.commit()
+
+
+@pytest.mark.unit
+class TestTCSServiceQueryBudget:
+    """測試 TCS 格式化不會因記錄數增加而產生 N+1 查詢"""
+
+    @pytest.mark.parametrize("entry_count", [1, 10, 40])
+    def test_format_date_query_budget(self, db_session, query_counter, entry_count):
+        """格式化一天的記錄最多 3 次關聯查詢"""
+        _seed_entries(db_session, entry_count)
+        entries = get_date_entries(db_session, date(2025, 11, 24))
+        query_counter.reset()
+
+        result = format_date_for_tcs(entries, date(2025, 11, 24), db_session)
+
+        assert query_counter.count <= 3
+        # 未指定模組的記錄在格式化文字中略過（維持原行為）
+        assert len(result.entries) == entry_count - 1
+        assert result.total_hours == Decimal("0.5") * (entry_count - 1)
+
+    @pytest.mark.parametrize("entry_count", [1, 10, 40])
+    def test_convert_entries_query_budget(self, db_session, query_counter, entry_count):
+        """轉換為 Playwright 格式最多 3 次關聯查詢"""
+        _seed_entries(db_session, entry_count)
+        entries = get_date_entries(db_session, date(2025, 11, 24))
+        query_counter.reset()
+
+        result = convert_entries_to_tcs_format(entries, db_session)
+
+        assert query_counter.count <= 3
+        assert len(result) == entry_count
+        # 未指定模組時預設為 A00
+        assert result[0]["account_group"] == "A00"
+        assert all(e["account_group"] == "O18" for e in result[1:])
+
+    def test_convert_missing_work_category_raises(self, db_session):
+        """找不到工作類別時仍拋出 ValueError"""
+        _seed_entries(db_session, 2)
+        entries = get_date_entries(db_session, date(2025, 11, 24))
+        db_session.expunge_all()  # 只修改記憶體中的物件，不寫回資料庫
+        entries[1].work_category_id = 999
+
+        with pytest.raises(ValueError, match="找不到工作類別"):
+            convert_entries_to_tcs_format(entries, db_session)
+
+
+@pytest.mark.unit
+class TestDateRangeFormats:
+    """測試日期區間一次查詢的格式化"""
+
+    def test_matches_per_day_formatting(self, db_session):
+        """區間結果與逐日 format_date_for_tcs 相同"""
+        _seed_entries(db_session, 3, date(2025, 11, 24))
+        db_session.add(TimeEntry(
+            date=date(2025, 11, 26),
+            project_id=1,
+            account_group_id=1,
+            work_category_id=1,
+            hours=Decimal("7.5"),
+            description="週三",
+        ))
+        db_session.commit()
+
+        results = list(iter_date_range_formats(db_session, date(2025, 11, 1), date(2025, 11, 30)))
+
+        assert [r.date for r in results] == ["2025/11/24", "2025/11/26"]
+        for result, day in zip(results, [date(2025, 11, 24), date(2025, 11, 26)]):
+            expected = format_date_for_tcs(get_date_entries(db_session, day), day, db_session)
+            assert result == expected
+
+    def test_year_range_costs_one_query(self, db_session, query_counter):
+        """一整年的區間只發出一次查詢"""
+        _seed_entries(db_session, 5, date(2025, 3, 3))
+        query_counter.reset()
+
+        results = list(iter_date_range_formats(db_session, date(2025, 1, 1), date(2025, 12, 31)))
+
+        assert len(results) == 1
+        assert query_counter.count == 1
+
+    def test_tcs_entries_match_per_day_conversion(self, db_session, query_counter):
+        """區間的自動填寫格式與逐日 convert_entries_to_tcs_format 相同，且只發出一次查詢"""
+        _seed_entries(db_session, 3, date(2025, 11, 24))
+        db_session.add(TimeEntry(
+            date=date(2025, 11, 26),
+            project_id=2,
+            account_group_id=1,
+            work_category_id=1,
+            hours=Decimal("7.5"),
+            description="週三",
+        ))
+        db_session.commit()
+        query_counter.reset()
+
+        days = list(iter_date_range_tcs_entries(db_session, date(2025, 11, 1), date(2025, 11, 30)))
+
+        assert query_counter.count == 1
+        assert [day for day, _ in days] == [date(2025, 11, 24), date(2025, 11, 26)]
+        for day, tcs_entries in days:
+            assert tcs_entries == convert_entries_to_tcs_format(get_date_entries(db_session, day), db_session)
+
+    def test_missing_module_fails_that_day(self, db_session):
+        """指定的模組已不存在時不當成 A00，該日驗證失敗；未指定模組仍為 A00"""
+        _seed_entries(db_session, 2, date(2025, 11, 24))
+        db_session.add(TimeEntry(
+            date=date(2025, 11, 26),
+            project_id=1,
+            account_group_id=99,
+            work_category_id=1,
+            hours=Decimal("7.5"),
+            description="模組已刪除",
+        ))
+        db_session.commit()
+
+        start, end = date(2025, 11, 1), date(2025, 11, 30)
+        days = dict(iter_date_range_tcs_entries(db_session, start, end))
+
+        assert days[date(2025, 11, 24)][0]["account_group"] == "A00"
+        assert validate_tcs_data(days[date(2025, 11, 24)]) == (True, [])
+        assert days[date(2025, 11, 26)][0]["account_group"] is None
+        assert validate_tcs_data(days[date(2025, 11, 26)]) == (
+            False,
+            ["第 1 筆記錄：找不到模組"],
+        )
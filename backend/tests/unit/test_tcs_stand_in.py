@@ -0,0 +1,127 @@
+"""
+單元測試：本機 TCS 替身伺服器與效能測試彙總
+"""
+import time
+from urllib.parse import urlencode
+
+import httpx
+import pytest
+
+from tcs_automation.benchmark_automation import marginal_row_cost, summarize
+from tcs_automation.stand_in import MAIN_FRAME_PATH, SERVER_FUNCTION_PATH, TCSStandIn
+
+
+@pytest.mark.mock
+class TestTCSStandIn:
+    """測試替身伺服器的頁面與可設定行為"""
+
+    def test_main_frame_matches_tcs_input(self):
+        """mainFrame 與真實 TCSInput.aspx 相同：id 帶行號、name 重複，每行有隱藏欄位"""
+        with TCSStandIn() as stand_in:
+            frameset = httpx.get(stand_in.tcs_url).text
+            page = httpx.get(f"{stand_in.tcs_url}{MAIN_FRAME_PATH}").text
+
+        assert 'name="mainFrame"' in frameset
+        assert 'action="./TCSInput.aspx"' in page
+        for element_id in ("txtPROJ_CD0", "spanPROJ_NME0", "txtWORK_HR4", "btnAddLine", "lblACTL_HR", "btnSave"):
+            assert f'id="{element_id}"' in page
+        assert "txtPROJ_CD5" not in page
+        for name in ("txtPROJ_CD", "txtIS_CHK_MODULE", "txtWORK_CATG_CD", "txtWROK_DESC"):
+            # 5 行加上新增一列的範本
+            assert page.count(f'name="{name}"') == 6
+        assert 'name="txtPROJ_CD0"' not in page
+
+    def test_lookup_latency(self):
+        """execServerFunction 查詢依設定延遲回應 XML，查無代碼時不含名稱"""
+        with TCSStandIn(validation_latency=0.2, invalid_codes={"BAD"}) as stand_in:
+            url = f"{stand_in.tcs_url}{SERVER_FUNCTION_PATH}"
+            begin = time.perf_counter()
+            project = httpx.get(url, params={"Method": "getPROJNAME", "Param": "P001"}).text
+            elapsed = time.perf_counter() - begin
+            item = httpx.get(url, params={"Method": "getITEMNAME", "Param": "A07&^&P001"}).text
+            error = httpx.get(url, params={"Method": "getITEMNAME", "Param": "BAD&^&P001"}).text
+
+        assert elapsed >= 0.2
+        assert "<PROJ_NME>專案 P001</PROJ_NME><IS_CHK_MODULE>Y</IS_CHK_MODULE>" in project
+        assert "<WORK_ITEM_NME>工作類別 A07</WORK_ITEM_NME><WORK_CATG_CD>A</WORK_CATG_CD>" in item
+        assert "WORK_ITEM_NME" not in error
+
+    def _post_save(self, stand_in, rows, **fields):
+        """以瀏覽器送出的格式儲存：每行欄位名稱重複，依行的順序"""
+        with httpx.Client() as http:
+            page = http.get(f"{stand_in.tcs_url}{MAIN_FRAME_PATH}").text
+            viewstate = page.split('name="__VIEWSTATE" id="__VIEWSTATE" value="')[1].split('"')[0]
+            data = [("__VIEWSTATE", viewstate), ("txtDate", "20251124"), ("btnSave", "儲存")]
+            for row in rows:
+                data += [(name, row.get(name, "")) for name in (
+                    "txtPROJ_CD", "txtIS_CHK_MODULE", "txtMODULE_CD", "txtWORK_ITEM_CD", "txtWORK_CATG_CD",
+                    "txtREQ_CD", "txtWORK_HR", "txtWROK_DESC", "txtPRGRS_RATE",
+                )]
+            data += list(fields.items())
+            response = http.post(
+                f"{stand_in.tcs_url}{MAIN_FRAME_PATH}",
+                content=urlencode(data),
+                headers={"Content-Type": "application/x-www-form-urlencoded"},
+            )
+            return page, response.text
+
+    ROW = {
+        "txtPROJ_CD": "P001", "txtIS_CHK_MODULE": "Y", "txtMODULE_CD": "A00",
+        "txtWORK_ITEM_CD": "A07", "txtWORK_CATG_CD": "A", "txtWORK_HR": "7.5", "txtWROK_DESC": "開發",
+    }
+
+    def test_dialog_behaviour(self):
+        """confirm 模式寫入頁面；關閉 alert 後儲存結果只顯示在 spanMSG"""
+        with TCSStandIn(confirm_on_save="always", alert_on_save=False) as stand_in:
+            page, saved = self._post_save(stand_in, [self.ROW, {}])
+
+        assert "const CONFIRM_MODE = 'always';" in page
+        assert 'var strMSG = "";' in saved
+        assert '<span id="spanMSG">儲存成功</span>' in saved
+        # 空白行與 checkData 相同略過
+        assert len(stand_in.rows_by_date["20251124"]) == 1
+        assert stand_in.rows_by_date["20251124"][0]["work_hours"] == "7.5"
+
+    def test_save_checks_hidden_fields(self):
+        """儲存時核對隱藏的工作類別代碼，結果以 strMSG 顯示"""
+        with TCSStandIn() as stand_in:
+            _, saved = self._post_save(stand_in, [{**self.ROW, "txtWORK_CATG_CD": ""}])
+
+        assert 'var strMSG = "儲存失敗：第 1 筆 工作類別代碼 錯誤";' in saved
+        assert stand_in.rows_by_date == {}
+
+    def test_assets_with_latency(self):
+        """頁面引用的樣式表、圖片與字型依設定延遲回應"""
+        with TCSStandIn(asset_latency=0.1) as stand_in:
+            page = httpx.get(f"{stand_in.tcs_url}{MAIN_FRAME_PATH}").text
+            begin = time.perf_counter()
+            image = httpx.get(f"{stand_in.tcs_url}images/logo.png")
+            elapsed = time.perf_counter() - begin
+            css = httpx.get(f"{stand_in.tcs_url}styles/site.css")
+
+        assert '<link rel="stylesheet" href="styles/site.css">' in page
+        assert elapsed >= 0.1
+        assert image.headers["content-type"] == "image/png"
+        assert image.content.startswith(b"\x89PNG")
+        assert "fonts/tcs.woff" in css.text
+
+    def test_invalid_confirm_mode(self):
+        with pytest.raises(ValueError):
+            TCSStandIn(confirm_on_save="sometimes")
+
+
+class TestBenchmarkSummary:
+    """測試效能測試的彙總計算"""
+
+    def test_summarize_and_marginal_cost(self):
+        results_by_rows = [
+            [{'rows': rows, 'fill': (100 + 20 * rows + jitter) / 1000, 'save': 0.3} for jitter in (-5, 5)]
+            for rows in (1, 5, 10)
+        ]
+        summaries = [summarize(results) for results in results_by_rows]
+
+        assert summaries[1]['fill_mean'] == pytest.approx(200)
+        assert summaries[1]['per_row'] == pytest.approx(40)
+        assert summaries[1]['save_mean'] == pytest.approx(300)
+        assert summaries[1]['day_mean'] == pytest.approx(500)
+        assert marginal_row_cost(summaries) == pytest.approx(20)
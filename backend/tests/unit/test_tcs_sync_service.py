@@ -0,0 +1,138 @@
+"""
+單元測試：TCS 同步紀錄服務（使用 in-memory SQLite）
+"""
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app.models import AccountGroup, Project, TCSSyncLedger, TimeEntry, WorkCategory
+from app.services.tcs_service import (
+    compute_fingerprint,
+    convert_entries_to_tcs_format,
+    get_date_entries,
+)
+from app.services.tcs_sync_service import (
+    get_sync_ledger,
+    is_unchanged,
+    list_dirty_days,
+    record_sync_result,
+)
+
+
+@pytest.fixture
+def two_days(db_session):
+    """建立 11/24（2 筆）與 11/25（1 筆，未指定模組）的工時記錄"""
+    account_group = AccountGroup(code="O18", name="數據智能應用科")
+    work_category = WorkCategory(code="A07", name="其它")
+    project = Project(code="商2025智001", requirement_code="R1", name="語音質檢系統")
+    db_session.add_all([account_group, work_category, project])
+    db_session.flush()
+    for entry_date, hours, group_id in [
+        (date(2025, 11, 24), "4.0", account_group.id),
+        (date(2025, 11, 24), "3.5", account_group.id),
+        (date(2025, 11, 25), "7.5", None),
+    ]:
+        db_session.add(TimeEntry(
+            date=entry_date,
+            project_id=project.id,
+            account_group_id=group_id,
+            work_category_id=work_category.id,
+            hours=Decimal(hours),
+            description="開發",
+        ))
+    db_session.commit()
+    return db_session
+
+
+def _fingerprint(db, target_date):
+    return compute_fingerprint(convert_entries_to_tcs_format(get_date_entries(db, target_date), db))
+
+
+def _push(db, target_date, success=True):
+    fingerprint = _fingerprint(db, target_date)
+    return record_sync_result(db, target_date, fingerprint, success, "ok", 2, Decimal("7.5"))
+
+
+@pytest.mark.unit
+class TestFingerprint:
+    """測試內容指紋"""
+
+    def test_fingerprint_is_stable_and_sensitive(self):
+        """相同內容指紋相同；任一欄位或順序改變則不同"""
+        entries = [
+            {"project_code": "P1", "account_group": "A00", "work_category": "A07",
+             "hours": 4.0, "description": "a", "requirement_no": "", "progress_rate": 0},
+            {"project_code": "P2", "account_group": "A00", "work_category": "A07",
+             "hours": 3.5, "description": "b", "requirement_no": "", "progress_rate": 0},
+        ]
+        fingerprint = compute_fingerprint(entries)
+
+        assert compute_fingerprint([dict(e) for e in entries]) == fingerprint
+        assert compute_fingerprint(list(reversed(entries))) != fingerprint
+        changed = [dict(entries[0], description="a!"), entries[1]]
+        assert compute_fingerprint(changed) != fingerprint
+
+
+@pytest.mark.unit
+class TestSyncLedger:
+    """測試同步結果記錄"""
+
+    def test_success_marks_day_unchanged(self, two_days):
+        """成功同步後相同指紋視為未變更"""
+        _push(two_days, date(2025, 11, 24))
+
+        ledger = get_sync_ledger(two_days, date(2025, 11, 24))
+        assert ledger.last_status == "success"
+        assert ledger.synced_at is not None
+        assert is_unchanged(ledger, _fingerprint(two_days, date(2025, 11, 24)))
+
+    def test_failure_keeps_last_success(self, two_days):
+        """失敗的嘗試不覆蓋上次成功的指紋"""
+        _push(two_days, date(2025, 11, 24))
+        ledger = record_sync_result(
+            two_days, date(2025, 11, 24), "other", False, "逾時", 2, Decimal("7.5")
+        )
+
+        assert ledger.last_status == "failed"
+        assert ledger.last_message == "逾時"
+        assert ledger.synced_fingerprint == _fingerprint(two_days, date(2025, 11, 24))
+        assert two_days.query(TCSSyncLedger).count() == 1
+
+
+@pytest.mark.unit
+class TestListDirtyDays:
+    """測試列出需要同步的日期"""
+
+    def test_lists_never_synced_and_changed_days(self, two_days):
+        """從未同步為 never_synced，同步後修改為 changed，未變更不列出"""
+        assert [d.status for d in list_dirty_days(two_days)] == ["never_synced", "never_synced"]
+
+        _push(two_days, date(2025, 11, 24))
+        _push(two_days, date(2025, 11, 25))
+        assert list_dirty_days(two_days) == []
+
+        entry = two_days.query(TimeEntry).filter(TimeEntry.date == date(2025, 11, 25)).one()
+        entry.description = "開發（修正）"
+        two_days.commit()
+
+        dirty = list_dirty_days(two_days)
+        assert [(d.date, d.status, d.entry_count) for d in dirty] == [
+            (date(2025, 11, 25), "changed", 1),
+        ]
+        assert dirty[0].total_hours == Decimal("7.5")
+
+    def test_range_filter(self, two_days):
+        """只列出區間內的日期"""
+        dirty = list_dirty_days(two_days, date(2025, 11, 25), date(2025, 11, 30))
+        assert [d.date for d in dirty] == [date(2025, 11, 25)]
+
+    def test_single_query(self, two_days, query_counter):
+        """無論日期數多少都只發出一次查詢"""
+        _push(two_days, date(2025, 11, 24))
+        two_days.expire_all()
+        query_counter.reset()
+
+        list_dirty_days(two_days)
+
+        assert query_counter.count == 1
@@ -0,0 +1,119 @@
+"""
+單元測試：群組提交寫入佇列（使用暫存 SQLite 檔案，寫入在佇列的執行緒上執行）
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, create_db_engine
+from app.models import AccountGroup
+from app.services.write_queue_service import _STOP, WriteQueue
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_db_engine(f"sqlite:///{tmp_path / 'queue.db'}")
+    Base.metadata.create_all(bind=engine)
+    yield sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def write_queue(session_factory):
+    write_queue = WriteQueue(session_factory, window=0.05)
+    yield write_queue
+    write_queue.close()
+
+
+def _add(code, flush=True):
+    """新增一個模組並回傳其 id（flush=False 時錯誤會延到 commit 才發生）"""
+    def op(db):
+        group = AccountGroup(code=code, name=f"模組 {code}")
+        db.add(group)
+        if flush:
+            db.flush()
+            return group.id
+        return code
+    return op
+
+
+def _codes(session_factory):
+    db = session_factory()
+    try:
+        return sorted(code for code, in db.query(AccountGroup.code))
+    finally:
+        db.close()
+
+
+def _submit_all(write_queue, ops):
+    """同時送出所有寫入，回傳每一筆的結果或例外"""
+    def submit(op):
+        try:
+            return write_queue.submit(op)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=len(ops)) as pool:
+        return list(pool.map(submit, ops))
+
+
+@pytest.mark.unit
+class TestWriteQueue:
+    """測試批次提交與每筆寫入各自的結果"""
+
+    def test_concurrent_writes_share_commits(self, write_queue, session_factory):
+        results = _submit_all(write_queue, [_add(f"A{i:02d}") for i in range(20)])
+
+        assert sorted(results) == list(range(1, 21))
+        assert _codes(session_factory) == [f"A{i:02d}" for i in range(20)]
+        assert write_queue.writes == 20
+        assert write_queue.batches < 20
+
+    def test_failed_write_does_not_affect_batch(self, write_queue, session_factory):
+        def missing(db):
+            raise LookupError("not found")
+
+        results = _submit_all(write_queue, [_add("A01"), missing, _add("A02")])
+
+        assert isinstance(results[1], LookupError)
+        assert _codes(session_factory) == ["A01", "A02"]
+
+    def test_failed_commit_falls_back_to_single_writes(self, write_queue, session_factory):
+        # 重複的代碼到 commit 才違反唯一限制，其餘寫入改為逐筆提交
+        results = _submit_all(write_queue, [_add(code, flush=False) for code in ("A01", "A01", "A02")])
+
+        assert sum(isinstance(r, Exception) for r in results) == 1
+        assert _codes(session_factory) == ["A01", "A02"]
+
+    def test_close_rejects_new_writes(self, write_queue):
+        write_queue.close()
+        with pytest.raises(RuntimeError):
+            write_queue.submit(_add("A01"))
+
+    def test_session_factory_error_fails_batch_and_keeps_writer(self, session_factory):
+        # 開啟 session 失敗時，該批次的呼叫者收到例外，寫入執行緒繼續處理後續寫入
+        calls = []
+
+        def flaky_factory():
+            calls.append(None)
+            if len(calls) == 1:
+                raise OSError("unable to open database file")
+            return session_factory()
+
+        write_queue = WriteQueue(flaky_factory, window=0)
+        try:
+            with pytest.raises(OSError):
+                write_queue.submit(_add("A01"))
+            assert write_queue.submit(_add("A02")) == 1
+        finally:
+            write_queue.close()
+        assert _codes(session_factory) == ["A02"]
+
+    def test_submit_raises_when_writer_thread_is_gone(self, session_factory):
+        write_queue = WriteQueue(session_factory)
+        write_queue._queue.put(_STOP)  # 執行緒結束但佇列未標記為關閉
+        write_queue._thread.join(timeout=5)
+        assert not write_queue._thread.is_alive()
+        with pytest.raises(RuntimeError):
+            write_queue.submit(_add("A01"))